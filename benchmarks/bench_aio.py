@@ -0,0 +1,108 @@
+"""
+Benchmark: consultas concurrentes con database.aio frente a un hilo por consulta.
+
+Lanza N consultas de estudiante a la vez (datos, solvencia y la primera
+página de sus pagos) de tres formas:
+
+- un hilo por consulta (lo que haría un servidor con un hilo por petición);
+- asyncio sin agrupar (batch_size=1: un préstamo de conexión por lectura);
+- asyncio agrupando las lecturas pendientes en una conexión (batch_size).
+
+Uso:
+    python -m benchmarks.bench_aio [--consultas 500] [--lectores 2] [--lote 32]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.bench_indexes import build_database
+from consultas.consultas_db import check_solvency_status
+from database.aio import AsyncDBExecutor
+from database.migrations import apply_migrations
+from database.pool import close_all_pools, configure_pools, get_pool
+from ingresos.ingresos_db import fetch_estudiante_by_id, fetch_pagos_page
+
+
+def consulta(estudiante_id: int, db_path: str) -> None:
+    fetch_estudiante_by_id(estudiante_id, db_path)
+    check_solvency_status(estudiante_id, db_path)
+    fetch_pagos_page(None, 50, "", db_path, [estudiante_id])
+
+
+def con_hilos(ids, db_path: str) -> float:
+    start = time.perf_counter()
+    hilos = [threading.Thread(target=consulta, args=(estudiante_id, db_path)) for estudiante_id in ids]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return time.perf_counter() - start
+
+
+def con_asyncio(ids, db_path: str, lectores: int, lote: int) -> tuple[float, dict]:
+    executor = AsyncDBExecutor(readers=lectores, batch_size=lote, max_pending=len(ids) * 3)
+
+    async def una(estudiante_id: int) -> None:
+        await asyncio.gather(
+            executor.read(db_path, fetch_estudiante_by_id, estudiante_id, db_path),
+            executor.read(db_path, check_solvency_status, estudiante_id, db_path),
+            executor.read(db_path, fetch_pagos_page, None, 50, "", db_path, [estudiante_id]),
+        )
+
+    async def todas() -> None:
+        await asyncio.gather(*(una(estudiante_id) for estudiante_id in ids))
+
+    try:
+        start = time.perf_counter()
+        asyncio.run(todas())
+        return time.perf_counter() - start, executor.stats()
+    finally:
+        executor.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--estudiantes", type=int, default=20_000)
+    parser.add_argument("--pagos", type=int, default=200_000)
+    parser.add_argument("--consultas", type=int, default=500)
+    parser.add_argument("--lectores", type=int, default=2)
+    parser.add_argument("--lote", type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "academia.db")
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(db_path, str(Path(args.db).resolve()), args.estudiantes, args.pagos)
+        apply_migrations(db_path)
+        # Los hilos por consulta esperan conexión; que no venza el préstamo
+        configure_pools(max_size=max(4, args.lectores), timeout=60.0)
+
+        rnd = random.Random(7)
+        ids = [rnd.randint(1, args.estudiantes) for _ in range(args.consultas)]
+        try:
+            con_hilos(ids[:20], db_path)  # Calentamiento del pool y de la caché de páginas
+            casos = [("un hilo por consulta", con_hilos(ids, db_path), None)]
+            segundos, stats = con_asyncio(ids, db_path, args.lectores, 1)
+            casos.append(("asyncio, sin agrupar", segundos, stats))
+            segundos, stats = con_asyncio(ids, db_path, args.lectores, args.lote)
+            casos.append((f"asyncio, lotes de {args.lote}", segundos, stats))
+            pool = get_pool(db_path).stats()
+        finally:
+            close_all_pools()
+
+    print(f"\n{args.consultas} consultas simultáneas (3 lecturas cada una)")
+    print(f"{'modo':<26}{'total ms':>10}{'consultas/s':>13}{'préstamos':>11}")
+    for nombre, segundos, stats in casos:
+        prestamos = f"{stats['prestamos']}" if stats else "-"
+        print(f"{nombre:<26}{segundos * 1000:>10.1f}{args.consultas / segundos:>13.0f}{prestamos:>11}")
+    print(f"\nPool: {pool}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: exportación de pagos (consultas.exportar).
+
+Sobre una base sintética mide, para CSV y JSON Lines:
+
+- filas por segundo de la exportación completa y de un mes;
+- memoria máxima de Python (tracemalloc, en una pasada aparte porque
+  tracemalloc hace más lenta la ejecución) comparada con leer todo con
+  fetchall, para comprobar que la exportación no crece con la tabla.
+
+Uso:
+    python -m benchmarks.bench_exportar [--pagos 300000] [--lote 1000]
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.bench_indexes import build_database
+from consultas.exportar import FORMATOS, exportar, exportar_a_archivo
+from database.migrations import apply_migrations
+from database.pool import close_all_pools, get_connection
+
+
+def memoria_maxima(func) -> float:
+    """MB máximos asignados por Python mientras corre func()."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--pagos", type=int, default=300_000)
+    parser.add_argument("--estudiantes", type=int, default=20_000)
+    parser.add_argument("--lote", type=int, default=1000, help="Filas por fetchmany")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "academia.db")
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(db_path, str(Path(args.db).resolve()), args.estudiantes, args.pagos)
+        apply_migrations(db_path)
+        with get_connection(db_path) as conn:
+            ultima = conn.execute("SELECT MAX(fecha) FROM pago;").fetchone()[0]
+        mes = (ultima[:8] + "01", ultima)
+
+        try:
+            print(f"\n{'exportación':<22}{'filas':>10}{'s':>8}{'filas/s':>12}{'MB archivo':>12}")
+            for formato in FORMATOS:
+                for nombre, filtros in (("completa", {}), (f"mes {mes[0][:7]}", {"desde": mes[0], "hasta": mes[1]})):
+                    destino = str(Path(tmp) / f"pagos.{formato}")
+                    start = time.perf_counter()
+                    filas = exportar_a_archivo("pagos", destino, formato, db_path=db_path, batch_size=args.lote, **filtros)
+                    segundos = time.perf_counter() - start
+                    print(f"{formato + ' ' + nombre:<22}{filas:>10}{segundos:>8.2f}{filas / segundos:>12,.0f}"
+                          f"{os.path.getsize(destino) / 1e6:>12.1f}")
+
+            class Descartar(io.TextIOBase):
+                def write(self, texto: str) -> int:
+                    return len(texto)
+
+            def fetchall() -> None:
+                with get_connection(db_path) as conn:
+                    cur = conn.cursor()
+                    cur.execute("SELECT * FROM pago ORDER BY fecha, pago_id;")
+                    cur.fetchall()
+
+            print(f"\n{'memoria máxima (MB)':<36}{'MB':>8}")
+            print(f"{'exportar csv, mes':<36}{memoria_maxima(lambda: exportar('pagos', Descartar(), 'csv', db_path, *mes, batch_size=args.lote)):>8.2f}")
+            print(f"{'exportar csv, completa':<36}{memoria_maxima(lambda: exportar('pagos', Descartar(), 'csv', db_path, batch_size=args.lote)):>8.2f}")
+            print(f"{'exportar jsonl, completa':<36}{memoria_maxima(lambda: exportar('pagos', Descartar(), 'jsonl', db_path, batch_size=args.lote)):>8.2f}")
+            print(f"{'fetchall de pago (referencia)':<36}{memoria_maxima(fetchall):>8.2f}")
+        finally:
+            close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
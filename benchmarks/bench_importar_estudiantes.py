@@ -0,0 +1,99 @@
+"""
+Benchmark: importación masiva de estudiantes desde CSV.
+
+Genera un CSV sintético y compara, sobre copias de la misma base:
+
+- insert_estudiante fila por fila (como el formulario, un commit por fila);
+- importar_estudiantes_csv con distintos tamaños de lote, con y sin la
+  búsqueda FTS5 activada.
+
+Uso:
+    python -m benchmarks.bench_importar_estudiantes [--filas 50000] [--lotes 500,1000,5000]
+"""
+
+import argparse
+import csv
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from database.fts import enable_student_fts
+from database.migrations import apply_migrations
+from database.pool import close_all_pools
+from ingresos.importar_estudiantes import importar_estudiantes_csv
+from ingresos.ingresos_db import fetch_grados_with_ids, insert_estudiante
+
+
+def generar_csv(destino: str, filas: int, grados: list, seed: int) -> None:
+    rnd = random.Random(seed)
+    with open(destino, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(["nombre", "apellido", "telefono", "grado", "institucion"])
+        for i in range(filas):
+            escritor.writerow([
+                f"Nombre{i}", f"Apellido{rnd.randrange(filas)}", f"5{rnd.randrange(10**7):07d}",
+                rnd.choice(grados), f"Institución {rnd.randrange(50)}",
+            ])
+
+
+def fila_por_fila(csv_path: str, db_path: str, grados: dict) -> float:
+    start = time.perf_counter()
+    filas = 0
+    with open(csv_path, newline="", encoding="utf-8") as archivo:
+        for fila in csv.DictReader(archivo):
+            insert_estudiante(fila["nombre"], fila["apellido"], fila["telefono"],
+                              grados[fila["grado"]], fila["institucion"], db_path)
+            filas += 1
+    return filas / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base que se copia para cada corrida")
+    parser.add_argument("--filas", type=int, default=50_000)
+    parser.add_argument("--fila-por-fila", type=int, default=2_000, help="Filas para la medición fila por fila")
+    parser.add_argument("--lotes", default="500,1000,5000")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    lotes = [int(lote) for lote in args.lotes.split(",") if lote.strip()]
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        base = str(Path(tmp) / "base.db")
+        shutil.copy(args.db, base)
+        apply_migrations(base)
+        grados = {nombre: grado_id for grado_id, nombre in fetch_grados_with_ids(base)}
+        csv_path = str(Path(tmp) / "estudiantes.csv")
+        generar_csv(csv_path, args.filas, list(grados), args.seed)
+        chico = str(Path(tmp) / "chico.csv")
+        generar_csv(chico, min(args.filas, args.fila_por_fila), list(grados), args.seed)
+
+        for fts in (False, True):
+            etiqueta = "fts" if fts else "sin fts"
+            for nombre, lote in [("fila por fila", None)] + [(f"lote {lote}", lote) for lote in lotes]:
+                db_path = str(Path(tmp) / f"{etiqueta}-{nombre}.db".replace(" ", "_"))
+                shutil.copy(base, db_path)
+                if fts and not enable_student_fts(db_path):
+                    print("FTS5 no disponible en esta versión de SQLite")
+                    break
+                try:
+                    if lote is None:
+                        filas_s = fila_por_fila(chico, db_path, grados)
+                    else:
+                        resultado = importar_estudiantes_csv(csv_path, db_path, lote)
+                        if resultado.rechazados:
+                            print(f"Aviso: {len(resultado.rechazados)} filas rechazadas en {nombre}")
+                        filas_s = resultado.filas_por_segundo
+                finally:
+                    close_all_pools()
+                resultados.append((etiqueta, nombre, filas_s))
+
+    print(f"\n{'búsqueda':<10}{'método':<18}{'filas/s':>12}")
+    for etiqueta, nombre, filas_s in resultados:
+        print(f"{etiqueta:<10}{nombre:<18}{filas_s:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: planes de consulta y tiempos antes/después de las migraciones.
+
+Construye una base sintética con el esquema de academia.db (por defecto
+500.000 pagos), ejecuta las consultas que usa la aplicación sin índices
+secundarios, aplica las migraciones y repite la medición.
+
+Uso:
+    python -m benchmarks.bench_indexes [--pagos 500000] [--estudiantes 20000]
+"""
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.datos_sinteticos import generar_base
+from database.migrations import apply_migrations, get_schema_version
+from database.pool import close_all_pools
+
+
+# (nombre, sql, parámetros) tal como las ejecutan los módulos *_db y permissions
+QUERIES = [
+    (
+        "pagos por estudiante y concepto",
+        "SELECT monto FROM pago WHERE estudiante_id = ? AND concepto_pago_id = ? ORDER BY fecha DESC;",
+        lambda rnd, n: (rnd.randint(1, n), rnd.randint(1, 17)),
+    ),
+    (
+        "totales por concepto",
+        "SELECT concepto_pago_id, COALESCE(SUM(monto), 0) FROM pago WHERE estudiante_id = ? GROUP BY concepto_pago_id;",
+        lambda rnd, n: (rnd.randint(1, n),),
+    ),
+    (
+        "última calificación",
+        "SELECT nota_uno, nota_dos, nota_tres, nota_cuatro FROM calificacion "
+        "WHERE estudiante_id = ? ORDER BY calificacion_id DESC LIMIT 1;",
+        lambda rnd, n: (rnd.randint(1, n),),
+    ),
+    (
+        "permiso de acción",
+        """
+        SELECT COUNT(*)
+        FROM usuario u
+        JOIN usuario_rol ur ON u.usuario_id = ur.usuario_id
+        JOIN rol r ON ur.rol_id = r.rol_id
+        JOIN permiso_rol pr ON r.rol_id = pr.rol_id
+        JOIN permiso p ON pr.permiso_id = p.permiso_id
+        WHERE u.usuario_id = ? AND p.nombre_permiso = ?;
+        """,
+        lambda rnd, n: (1, "Registrar Pagos"),
+    ),
+    (
+        "autenticación",
+        "SELECT usuario_id FROM usuario WHERE nombre = ? AND contrasena = ? LIMIT 1;",
+        lambda rnd, n: ("jeferson", "x"),
+    ),
+]
+
+def build_database(db_path: str, source_db: str, estudiantes: int, pagos: int, seed: int = 42) -> None:
+    """Crea una base sintética copiando el esquema (sin índices) y los catálogos de source_db."""
+    generar_base(db_path, source_db, estudiantes, pagos, seed)
+
+
+def measure(db_path: str, estudiantes: int, repeticiones: int) -> dict:
+    """Retorna {consulta: (plan, microsegundos_promedio)}."""
+    results = {}
+    conn = sqlite3.connect(db_path)
+    try:
+        for name, sql, params_factory in QUERIES:
+            rnd = random.Random(7)
+            plan = " | ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params_factory(rnd, estudiantes)))
+            start = time.perf_counter()
+            for _ in range(repeticiones):
+                conn.execute(sql, params_factory(rnd, estudiantes)).fetchall()
+            elapsed = (time.perf_counter() - start) / repeticiones
+            results[name] = (plan, elapsed * 1e6)
+    finally:
+        conn.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--pagos", type=int, default=500_000)
+    parser.add_argument("--estudiantes", type=int, default=20_000)
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench_indices.db")
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(db_path, args.db, args.estudiantes, args.pagos)
+
+        antes = measure(db_path, args.estudiantes, args.repeticiones)
+        start = time.perf_counter()
+        version = apply_migrations(db_path)
+        migracion = time.perf_counter() - start
+        close_all_pools()
+        despues = measure(db_path, args.estudiantes, args.repeticiones)
+
+        print(f"Migraciones aplicadas hasta versión {version} en {migracion:.2f} s")
+        for name, _, _ in QUERIES:
+            plan_antes, us_antes = antes[name]
+            plan_despues, us_despues = despues[name]
+            print(f"\n== {name}")
+            print(f"  sin índices: {us_antes:10.1f} us  [{plan_antes}]")
+            print(f"  con índices: {us_despues:10.1f} us  [{plan_despues}]")
+
+        # Segunda ejecución: no debe haber cambios
+        assert apply_migrations(db_path) == version == get_schema_version(db_path)
+        close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
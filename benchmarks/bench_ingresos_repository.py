@@ -0,0 +1,106 @@
+"""
+Benchmark: motores de IngresosRepository (SQLite vs memoria indexada).
+
+Ejecuta sobre una base sintética las mismas operaciones con
+`SQLiteIngresosRepository` y `MemoryIngresosRepository` (cargado desde la
+misma base): lectura por id, búsqueda por concepto, rango de fechas,
+páginas de la tabla (con y sin filtro de estudiantes, con saltos) y
+escrituras. No necesita pantalla.
+
+Uso:
+    python -m benchmarks.bench_ingresos_repository [--pagos 300000] [--operaciones 500]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_indexes import build_database
+from database.migrations import apply_migrations
+from database.pool import close_all_pools
+from ingresos.ingresos_db import (
+    MemoryIngresosRepository,
+    SQLiteIngresosRepository,
+    fetch_conceptos_pago_with_ids,
+)
+
+
+PAGE_SIZE = 200
+
+
+def medir(func, repeticiones: int) -> float:
+    """Retorna ms por operación."""
+    start = time.perf_counter()
+    for i in range(repeticiones):
+        func(i)
+    return (time.perf_counter() - start) * 1000 / repeticiones
+
+
+def operaciones(repo, args, rng: random.Random, conceptos: list, fechas: list) -> dict:
+    total = repo.contar()
+    ids = [repo.id_en(rng.randrange(total)) for _ in range(args.operaciones)]
+    estudiantes = rng.sample(range(1, args.estudiantes + 1), max(1, args.estudiantes // 100))
+    rangos = []
+    for _ in range(args.operaciones):
+        desde = rng.randrange(len(fechas))
+        rangos.append((fechas[desde], fechas[min(len(fechas) - 1, desde + 7)]))
+    repeticiones_lentas = max(1, args.operaciones // 50)
+
+    resultados = {}
+    resultados["obtener por id"] = medir(lambda i: repo.obtener(ids[i]), args.operaciones)
+    resultados["buscar concepto"] = medir(lambda i: repo.buscar(conceptos[i % len(conceptos)][:4]), repeticiones_lentas)
+    resultados["rango de 7 días"] = medir(lambda i: repo.entre_fechas(*rangos[i]), repeticiones_lentas)
+    resultados["primera página"] = medir(lambda i: repo.pagina(None, PAGE_SIZE), args.operaciones)
+    resultados["salto a página"] = medir(
+        lambda i: repo.pagina(repo.id_en(rng.randrange(total)), PAGE_SIZE), args.operaciones
+    )
+    resultados["página filtrada"] = medir(
+        lambda i: (repo.contar("", estudiantes), repo.pagina(None, PAGE_SIZE, "", estudiantes)), repeticiones_lentas
+    )
+
+    nuevos = []
+    resultados["agregar"] = medir(lambda i: nuevos.append(repo.agregar(1, 1 + i % 50, 1, 10.0)), args.operaciones)
+    resultados["actualizar"] = medir(lambda i: repo.actualizar(nuevos[i].id, 2, 1 + i % 50, 1, 20.0), args.operaciones)
+    resultados["eliminar"] = medir(lambda i: repo.eliminar(nuevos[i].id), args.operaciones)
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--pagos", type=int, default=300_000)
+    parser.add_argument("--estudiantes", type=int, default=20_000)
+    parser.add_argument("--operaciones", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "academia.db")
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(db_path, str(Path(args.db).resolve()), args.estudiantes, args.pagos, seed=args.seed)
+        apply_migrations(db_path)
+        conceptos = [nombre for _, nombre in fetch_conceptos_pago_with_ids(db_path)]
+
+        try:
+            sqlite_repo = SQLiteIngresosRepository(db_path)
+            start = time.perf_counter()
+            memoria_repo = MemoryIngresosRepository.from_sqlite(db_path)
+            carga_ms = (time.perf_counter() - start) * 1000
+            fechas = sorted({ingreso.fecha for ingreso in memoria_repo.listar()})
+            print(f"Carga del motor en memoria: {carga_ms:.0f} ms ({len(memoria_repo)} pagos)")
+
+            resultados = {}
+            for nombre, repo in (("sqlite", sqlite_repo), ("memoria", memoria_repo)):
+                resultados[nombre] = operaciones(repo, args, random.Random(args.seed), conceptos, fechas)
+        finally:
+            close_all_pools()
+
+    print(f"\n{'operación (ms por llamada)':<28}{'sqlite':>12}{'memoria':>12}")
+    for operacion in resultados["sqlite"]:
+        print(f"{operacion:<28}{resultados['sqlite'][operacion]:>12.3f}{resultados['memoria'][operacion]:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
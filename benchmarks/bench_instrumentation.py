@@ -0,0 +1,86 @@
+"""
+Benchmark: costo de la instrumentación de consultas (database.instrumentation).
+
+Mide las mismas funciones de datos con la instrumentación desactivada y
+activa (sin registrar consultas lentas, para medir solo los contadores):
+
+- consultas por clave que leen una o pocas filas;
+- páginas de 100 filas y listados completos (costo por fila del cursor);
+- una escritura.
+
+Uso:
+    python -m benchmarks.bench_instrumentation [--pagos 200000] [--repeticiones 2000]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_indexes import build_database
+from consultas.consultas_db import check_solvency_status, fetch_estudiantes_for_autocomplete
+from database.instrumentation import configure_instrumentation, reset_stats, snapshot
+from database.migrations import apply_migrations
+from database.pool import close_all_pools
+from ingresos.ingresos_db import fetch_estudiante_by_id, fetch_pagos_page, insert_pago
+
+
+def medir(func, repeticiones: int) -> float:
+    """Retorna microsegundos por operación."""
+    start = time.perf_counter()
+    for i in range(repeticiones):
+        func(i)
+    return (time.perf_counter() - start) * 1e6 / repeticiones
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--pagos", type=int, default=200_000)
+    parser.add_argument("--estudiantes", type=int, default=20_000)
+    parser.add_argument("--repeticiones", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "academia.db")
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(db_path, str(Path(args.db).resolve()), args.estudiantes, args.pagos)
+        apply_migrations(db_path)
+
+        rnd = random.Random(3)
+        ids = [rnd.randint(1, args.estudiantes) for _ in range(args.repeticiones)]
+        pocas = max(1, args.repeticiones // 100)
+        casos = [
+            ("fetch_estudiante_by_id", lambda i: fetch_estudiante_by_id(ids[i], db_path), args.repeticiones),
+            ("check_solvency_status", lambda i: check_solvency_status(ids[i], db_path), args.repeticiones),
+            ("fetch_pagos_page (100)", lambda i: fetch_pagos_page(ids[i] * 5, 100, "", db_path), args.repeticiones // 4),
+            ("autocompletar (todos)", lambda i: fetch_estudiantes_for_autocomplete(db_path), pocas),
+            ("insert_pago", lambda i: insert_pago(2, ids[i], 1, 150.0, db_path), args.repeticiones // 4),
+        ]
+
+        resultados = {}
+        try:
+            for activa in (False, True, False, True):
+                # Umbral alto: se miden los contadores, no el EXPLAIN de las lentas
+                configure_instrumentation(enabled=activa, slow_query_ms=1e9)
+                for nombre, func, repeticiones in casos:
+                    us = medir(func, repeticiones)
+                    # Se conserva la mejor de las dos pasadas de cada modo
+                    clave = (nombre, activa)
+                    resultados[clave] = min(us, resultados.get(clave, us))
+            funciones = len(snapshot()["funciones"])
+        finally:
+            configure_instrumentation(enabled=False)
+            reset_stats()
+            close_all_pools()
+
+    print(f"\n{'operación (us)':<28}{'sin':>12}{'con':>12}{'costo':>10}")
+    for nombre, _func, _repeticiones in casos:
+        sin, con = resultados[(nombre, False)], resultados[(nombre, True)]
+        print(f"{nombre:<28}{sin:>12.1f}{con:>12.1f}{(con / sin - 1) * 100:>9.1f}%")
+    print(f"\nFunciones registradas: {funciones}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: crecimiento de memoria al iniciar y cerrar sesión muchas veces.
+
+Abre la ventana principal (main.create_main_window) sobre una base
+sintética y repite iniciar sesión / abrir cada pestaña permitida / cerrar
+sesión, alternando usuarios con distintos roles. Después de unos ciclos de
+calentamiento compara memoria de Python (tracemalloc), cantidad de widgets
+y de comandos Tcl. Como las vistas se reutilizan entre sesiones, ninguno de
+los tres debería crecer; si crecen más que el margen el proceso termina con
+código 1.
+
+Las vistas leen "academia.db" del directorio actual, por eso el benchmark
+genera la base en un directorio temporal y se ejecuta allí. Necesita una
+pantalla (DISPLAY); sin ella termina con un aviso.
+
+Uso:
+    python -m benchmarks.bench_login_cycles [--ciclos 1000] [--usuarios 1,2,3]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tkinter as tk
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.bench_indexes import build_database
+from database.executor import shutdown_executor
+from database.migrations import apply_migrations
+from database.pool import close_all_pools
+from lazy_tabs import TAB_SETTINGS
+from main import create_main_window
+
+
+def contar_widgets(widget: tk.Misc) -> int:
+    return 1 + sum(contar_widgets(child) for child in widget.winfo_children())
+
+
+def procesar_eventos(root: tk.Tk, tabs, limite_s: float = 10.0) -> None:
+    """Procesa eventos hasta que las vistas no tengan lecturas pendientes."""
+    fin = time.perf_counter() + limite_s
+    while time.perf_counter() < fin:
+        root.update()
+        pendientes = sum(
+            getattr(getattr(vista, "_dispatcher", None), "pending", 0) for vista in tabs.built_views()
+        )
+        if pendientes == 0:
+            return
+        time.sleep(0.001)
+
+
+def ciclo(root: tk.Tk, usuario_id: int) -> None:
+    tabs = root.lazy_tabs
+    root.iniciar_sesion(usuario_id)
+    for name in tabs.names():
+        if tabs.is_visible(name):
+            tabs.select(name)
+            procesar_eventos(root, tabs)
+    root.cerrar_sesion()
+    procesar_eventos(root, tabs)
+
+
+def estado(root: tk.Tk) -> tuple:
+    gc.collect()
+    return contar_widgets(root), len(root.tk.splitlist(root.tk.call("info", "commands")))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema, catálogos y usuarios")
+    parser.add_argument("--ciclos", type=int, default=1000)
+    parser.add_argument("--calentamiento", type=int, default=10)
+    parser.add_argument("--usuarios", default="1,2,3", help="Usuarios que se alternan en cada ciclo")
+    parser.add_argument("--pagos", type=int, default=20_000)
+    parser.add_argument("--estudiantes", type=int, default=2_000)
+    parser.add_argument("--margen-kb", type=int, default=512, help="Crecimiento de memoria tolerado")
+    args = parser.parse_args()
+
+    usuarios = [int(u) for u in args.usuarios.split(",") if u.strip()]
+    source_db = str(Path(args.db).resolve())
+    previous_cwd = os.getcwd()
+    TAB_SETTINGS['prefetch'] = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(str(Path(tmp) / "academia.db"), source_db, args.estudiantes, args.pagos)
+        apply_migrations(str(Path(tmp) / "academia.db"))
+        os.chdir(tmp)
+        try:
+            try:
+                root = create_main_window()
+            except tk.TclError as exc:
+                print(f"Se necesita una pantalla para este benchmark: {exc}")
+                return
+            root.withdraw()
+            try:
+                for i in range(args.calentamiento):
+                    ciclo(root, usuarios[i % len(usuarios)])
+
+                widgets_antes, comandos_antes = estado(root)
+                tracemalloc.start()
+                inicial = tracemalloc.take_snapshot()
+                start = time.perf_counter()
+                for i in range(args.ciclos):
+                    ciclo(root, usuarios[i % len(usuarios)])
+                elapsed = time.perf_counter() - start
+                widgets_despues, comandos_despues = estado(root)
+                final = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+            finally:
+                root.destroy()
+        finally:
+            shutdown_executor()
+            close_all_pools()
+            os.chdir(previous_cwd)
+
+    diferencias = final.compare_to(inicial, "lineno")
+    crecimiento = sum(stat.size_diff for stat in diferencias)
+    print(f"\n{args.ciclos} ciclos en {elapsed:.1f} s ({elapsed / args.ciclos * 1000:.1f} ms por ciclo)")
+    print(f"widgets:      {widgets_antes} -> {widgets_despues}")
+    print(f"comandos Tcl: {comandos_antes} -> {comandos_despues}")
+    print(f"memoria:      {crecimiento / 1024:+.1f} KB")
+    for stat in diferencias[:5]:
+        print(f"  {stat}")
+
+    if widgets_despues > widgets_antes or comandos_despues > comandos_antes or crecimiento > args.margen_kb * 1024:
+        print("\nFALLA: la memoria crece con cada inicio de sesión")
+        sys.exit(1)
+    print("\nOK: sin crecimiento entre sesiones")
+
+
+if __name__ == "__main__":
+    main()
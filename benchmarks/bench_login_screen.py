@@ -0,0 +1,111 @@
+"""
+Benchmark: tiempo desde el inicio de sesión hasta la primera pantalla usable.
+
+Compara construir todas las pestañas al iniciar sesión (como hacía
+main.on_login_success) con LazyNotebook, que solo construye la pestaña
+seleccionada. Para cada modo mide el primer dibujo y el momento en que
+llegan los datos iniciales de las vistas construidas.
+
+Las vistas leen "academia.db" del directorio actual, por eso el benchmark
+genera la base sintética en un directorio temporal y se ejecuta allí.
+Necesita una pantalla (DISPLAY); sin ella termina con un aviso.
+
+Uso:
+    python -m benchmarks.bench_login_screen [--pagos 300000] [--repeticiones 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tkinter as tk
+from pathlib import Path
+from tkinter import ttk
+
+from benchmarks.bench_indexes import build_database
+from consultas.consultas import create_consultas_tab
+from database.executor import shutdown_executor
+from database.migrations import apply_migrations
+from database.pool import close_all_pools
+from ingresos.ingresos import create_ingresos_tab
+from lazy_tabs import TAB_SETTINGS, LazyNotebook
+from usuarios.registro_usuarios import create_usuarios_tab
+
+
+def _registrar_pestanas(tabs: LazyNotebook) -> None:
+    tabs.add("ingresos", "Ingresos", lambda parent: create_ingresos_tab(parent, 1, None))
+    tabs.add("consultas", "Consultas", lambda parent: create_consultas_tab(parent, None))
+    tabs.add("registro_usuarios", "Usuarios", lambda parent: create_usuarios_tab(parent, None))
+
+
+def medir(root: tk.Tk, diferido: bool) -> tuple:
+    """Retorna (ms hasta el primer dibujo, ms hasta tener los datos iniciales)."""
+    notebook = ttk.Notebook(root)
+    notebook.pack(fill=tk.BOTH, expand=True)
+    tabs = LazyNotebook(notebook)
+    _registrar_pestanas(tabs)
+
+    start = time.perf_counter()
+    if not diferido:
+        for name in tabs.names():
+            tabs.ensure_built(name)
+    tabs.select("ingresos")
+    root.update_idletasks()
+    primer_dibujo = (time.perf_counter() - start) * 1000
+
+    # Procesar eventos hasta que las vistas construidas reciban sus datos
+    while True:
+        root.update()
+        vistas = [tabs.view(name) for name in tabs.names()]
+        pendientes = sum(
+            getattr(getattr(vista, "_dispatcher", None), "pending", 0) for vista in vistas if vista is not None
+        )
+        if pendientes == 0 and time.perf_counter() - start > 0.05:
+            break
+        time.sleep(0.002)
+    datos = (time.perf_counter() - start) * 1000
+
+    tabs.remove_all()
+    notebook.destroy()
+    return primer_dibujo, datos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--pagos", type=int, default=300_000)
+    parser.add_argument("--estudiantes", type=int, default=20_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    source_db = str(Path(args.db).resolve())
+    try:
+        root = tk.Tk()
+    except tk.TclError as exc:
+        print(f"Se necesita una pantalla para este benchmark: {exc}")
+        return
+    root.geometry("1280x800")
+    TAB_SETTINGS['prefetch'] = False
+
+    previous_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(str(Path(tmp) / "academia.db"), source_db, args.estudiantes, args.pagos)
+        apply_migrations(str(Path(tmp) / "academia.db"))
+        os.chdir(tmp)
+        try:
+            print(f"\n{'modo':<28}{'primer dibujo':>16}{'datos listos':>16}")
+            for label, diferido in (("todas las pestañas", False), ("pestañas diferidas", True)):
+                resultados = [medir(root, diferido) for _ in range(args.repeticiones)]
+                dibujo = min(r[0] for r in resultados)
+                datos = min(r[1] for r in resultados)
+                print(f"{label:<28}{dibujo:>13.1f} ms{datos:>13.1f} ms")
+        finally:
+            root.destroy()
+            shutdown_executor()
+            close_all_pools()
+            os.chdir(previous_cwd)
+
+
+if __name__ == "__main__":
+    main()
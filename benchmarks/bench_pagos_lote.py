@@ -0,0 +1,80 @@
+"""
+Benchmark: pagos por lote (insert_pagos_bulk) contra un pago por vez.
+
+Sobre copias de la misma base sintética registra el mismo concepto para un
+grupo de estudiantes (como la mensualidad de todo un grado):
+
+- con insert_pago en un ciclo, un commit por pago (Guardar Pago repetido);
+- con insert_pagos_bulk, una sola transacción.
+
+Uso:
+    python -m benchmarks.bench_pagos_lote [--tamanos 30,200,1000] [--repeticiones 5]
+"""
+
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_indexes import build_database
+from database.migrations import apply_migrations
+from database.pool import close_all_pools
+from ingresos.ingresos_db import insert_pago, insert_pagos_bulk
+
+
+def uno_por_uno(db_path: str, estudiante_ids: list) -> float:
+    start = time.perf_counter()
+    for estudiante_id in estudiante_ids:
+        insert_pago(1, estudiante_id, 1, 100.0, db_path)
+    return (time.perf_counter() - start) * 1000
+
+
+def por_lote(db_path: str, estudiante_ids: list) -> float:
+    start = time.perf_counter()
+    if len(insert_pagos_bulk(1, estudiante_ids, 1, 100.0, db_path)) != len(estudiante_ids):
+        raise RuntimeError("insert_pagos_bulk no registró todos los pagos")
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--pagos", type=int, default=200_000)
+    parser.add_argument("--estudiantes", type=int, default=20_000)
+    parser.add_argument("--tamanos", default="30,200,1000", help="Estudiantes por lote")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    tamanos = [int(t) for t in args.tamanos.split(",") if t.strip()]
+    rnd = random.Random(3)
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        base = str(Path(tmp) / "base.db")
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(base, str(Path(args.db).resolve()), args.estudiantes, args.pagos)
+        apply_migrations(base)
+        close_all_pools()
+
+        for nombre, medir in (("uno por uno", uno_por_uno), ("por lote", por_lote)):
+            db_path = str(Path(tmp) / f"{nombre.replace(' ', '_')}.db")
+            shutil.copy(base, db_path)
+            try:
+                for tamano in tamanos:
+                    tiempos = [
+                        medir(db_path, rnd.sample(range(1, args.estudiantes + 1), min(tamano, args.estudiantes)))
+                        for _ in range(args.repeticiones)
+                    ]
+                    resultados.append((nombre, tamano, statistics.median(tiempos)))
+            finally:
+                close_all_pools()
+
+    print(f"\n{'método':<14}{'pagos':>8}{'ms (mediana)':>15}{'pagos/s':>12}")
+    for nombre, tamano, ms in resultados:
+        print(f"{nombre:<14}{tamano:>8}{ms:>15.1f}{tamano / ms * 1000:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: conexión por llamada vs pool compartido.
+
+Simula la consulta de un estudiante en ConsultasView (datos, conceptos y un
+pago por concepto) abriendo una conexión nueva en cada consulta, y luego
+reutilizando las conexiones del pool.
+
+Uso:
+    python -m benchmarks.bench_pool [--db academia.db] [--iteraciones 200]
+"""
+
+import argparse
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from database.pool import close_all_pools, get_connection
+
+
+QUERY_ESTUDIANTE = "SELECT nombre, apellido, telefono, institucion FROM estudiante WHERE estudiante_id = ?;"
+QUERY_CONCEPTOS = "SELECT concepto_pago_id, nombre FROM concepto_pago ORDER BY concepto_pago_id;"
+QUERY_PAGOS = "SELECT monto FROM pago WHERE estudiante_id = ? AND concepto_pago_id = ?;"
+
+
+def _lookup_connect_per_call(db_path: str, estudiante_id: int) -> None:
+    def run(sql: str, params: tuple = ()) -> list:
+        if not Path(db_path).exists():
+            return []
+        conn = sqlite3.connect(db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    run(QUERY_ESTUDIANTE, (estudiante_id,))
+    for concepto_id, _ in run(QUERY_CONCEPTOS):
+        run(QUERY_PAGOS, (estudiante_id, concepto_id))
+
+
+def _lookup_pooled(db_path: str, estudiante_id: int) -> None:
+    def run(sql: str, params: tuple = ()) -> list:
+        with get_connection(db_path) as conn:
+            return conn.execute(sql, params).fetchall()
+
+    run(QUERY_ESTUDIANTE, (estudiante_id,))
+    for concepto_id, _ in run(QUERY_CONCEPTOS):
+        run(QUERY_PAGOS, (estudiante_id, concepto_id))
+
+
+def _measure(func, db_path: str, iteraciones: int) -> float:
+    start = time.perf_counter()
+    for i in range(iteraciones):
+        func(db_path, (i % 50) + 1)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de datos de origen (se copia a un temporal)")
+    parser.add_argument("--iteraciones", type=int, default=200, help="Consultas de estudiante a simular")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        shutil.copy(args.db, db_path)
+
+        # Calentamiento para igualar caché del sistema operativo
+        _lookup_connect_per_call(db_path, 1)
+        _lookup_pooled(db_path, 1)
+
+        antes = _measure(_lookup_connect_per_call, db_path, args.iteraciones)
+        despues = _measure(_lookup_pooled, db_path, args.iteraciones)
+        close_all_pools()
+
+    print(f"Consultas de estudiante: {args.iteraciones}")
+    print(f"Conexión por llamada: {antes * 1000:.1f} ms ({antes / args.iteraciones * 1e6:.0f} us/consulta)")
+    print(f"Pool compartido:      {despues * 1000:.1f} ms ({despues / args.iteraciones * 1e6:.0f} us/consulta)")
+    if despues > 0:
+        print(f"Aceleración: {antes / despues:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
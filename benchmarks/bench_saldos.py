@@ -0,0 +1,102 @@
+"""
+Benchmark: tabla de saldos precalculados (database.saldos).
+
+Compara una base con la tabla saldo_estudiante_concepto y sus triggers
+contra una copia sin ella (lecturas sumando la tabla pago):
+
+- totales pagados de un estudiante (fetch_totales_pagados_by_estudiante);
+- reporte de un concepto para todo un grado (fetch_solvencia_por_grado);
+- costo de los triggers al escribir pagos (uno por vez y por lote);
+- tiempo de reconstruir y de verificar la tabla.
+
+Uso:
+    python -m benchmarks.bench_saldos [--pagos 300000] [--operaciones 2000]
+"""
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_indexes import build_database
+from consultas.consultas_db import fetch_solvencia_por_grado, fetch_totales_pagados_by_estudiante
+from database.migrations import apply_migrations
+from database.pool import close_all_pools, get_connection
+from database.saldos import SALDO_TABLE, check_saldos, has_saldos, rebuild_saldos, reset_saldo_status
+from ingresos.ingresos_db import fetch_grados_with_ids, insert_pago, insert_pagos_bulk
+
+
+def medir(func, repeticiones: int) -> float:
+    """Retorna ms por operación."""
+    start = time.perf_counter()
+    for i in range(repeticiones):
+        func(i)
+    return (time.perf_counter() - start) * 1000 / repeticiones
+
+
+def quitar_saldos(db_path: str) -> None:
+    with get_connection(db_path) as conn:
+        conn.execute("BEGIN;")
+        for trigger in ("saldo_pago_ai", "saldo_pago_ad", "saldo_pago_au"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger};")
+        conn.execute(f"DROP TABLE IF EXISTS {SALDO_TABLE};")
+        conn.commit()
+    reset_saldo_status(db_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--pagos", type=int, default=300_000)
+    parser.add_argument("--estudiantes", type=int, default=20_000)
+    parser.add_argument("--operaciones", type=int, default=2_000)
+    args = parser.parse_args()
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        base = str(Path(tmp) / "base.db")
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(base, str(Path(args.db).resolve()), args.estudiantes, args.pagos)
+        close_all_pools()
+
+        for nombre in ("con saldos", "sin saldos"):
+            db_path = str(Path(tmp) / f"{nombre.replace(' ', '_')}.db")
+            shutil.copy(base, db_path)
+            start = time.perf_counter()
+            apply_migrations(db_path)
+            migracion_s = time.perf_counter() - start
+            if nombre == "sin saldos":
+                quitar_saldos(db_path)
+            try:
+                rnd = random.Random(5)
+                estudiantes = [rnd.randint(1, args.estudiantes) for _ in range(args.operaciones)]
+                grados = [grado_id for grado_id, _ in fetch_grados_with_ids(db_path)]
+                lento = max(1, args.operaciones // 100)
+                r = {}
+                r["totales de un estudiante"] = medir(
+                    lambda i: fetch_totales_pagados_by_estudiante(estudiantes[i], db_path), args.operaciones)
+                r["concepto para un grado"] = medir(
+                    lambda i: fetch_solvencia_por_grado(grados[i % len(grados)], 1 + i % 17, db_path), lento)
+                r["insert_pago"] = medir(
+                    lambda i: insert_pago(1 + i % 17, estudiantes[i], 1, 100.0, db_path), args.operaciones // 4)
+                r["lote de 200 pagos"] = medir(
+                    lambda i: insert_pagos_bulk(1 + i % 17, estudiantes[i * 200 % len(estudiantes):][:200], 1, 100.0, db_path),
+                    lento)
+                if has_saldos(db_path):
+                    r["reconstruir (una vez)"] = medir(lambda i: rebuild_saldos(db_path), 1)
+                    r["verificar (una vez)"] = medir(lambda i: check_saldos(db_path), 1)
+                    print(f"Migración con saldos: {migracion_s:.2f} s; diferencias: {len(check_saldos(db_path))}")
+                resultados[nombre] = r
+            finally:
+                close_all_pools()
+
+    print(f"\n{'operación (ms)':<28}{'con saldos':>12}{'sin saldos':>12}")
+    for operacion, ms in resultados["con saldos"].items():
+        sin = resultados["sin saldos"].get(operacion)
+        print(f"{operacion:<28}{ms:>12.3f}{sin:>12.3f}" if sin is not None else f"{operacion:<28}{ms:>12.1f}{'-':>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: autocompletado con índice en memoria vs `LIKE '%texto%'`.
+
+Genera nombres sintéticos, construye el EstudianteSearchIndex y compara la
+latencia de búsqueda por prefijo con la consulta SQL original sobre una base
+en memoria con los mismos datos.
+
+Uso:
+    python -m benchmarks.bench_search_index [--nombres 100000]
+"""
+
+import argparse
+import random
+import sqlite3
+import time
+
+from consultas.consultas_index import EstudianteSearchIndex
+
+
+NOMBRES = ["Ana", "Luis", "María", "José", "Carlos", "Lucía", "Pedro", "Sofía", "Jorge", "Elena",
+           "Andrés", "Mónica", "Raúl", "Inés", "Tomás", "Verónica", "Héctor", "Julián", "Ángela", "Óscar"]
+APELLIDOS = ["García", "López", "Pérez", "Escobar", "Morales", "Castillo", "Ramírez", "Hernández",
+             "Gómez", "Díaz", "Martínez", "Rodríguez", "Sánchez", "Cruz", "Ordóñez", "Muñoz"]
+
+CONSULTAS = ["a", "ma", "mar", "maria", "jose gar", "lopez", "ordonez", "angela mu", "x"]
+
+LIKE_SQL = """
+SELECT estudiante_id,
+       TRIM(COALESCE(nombre, '')) || ' ' || TRIM(COALESCE(apellido, '')) AS nombre_completo
+FROM estudiante
+WHERE TRIM(COALESCE(nombre, '')) || ' ' || TRIM(COALESCE(apellido, '')) LIKE ?
+ORDER BY nombre_completo ASC;
+"""
+
+
+def generate_names(count: int, seed: int = 42) -> list:
+    rnd = random.Random(seed)
+    rows = []
+    for estudiante_id in range(1, count + 1):
+        nombre = rnd.choice(NOMBRES)
+        if rnd.random() < 0.3:
+            nombre += " " + rnd.choice(NOMBRES)
+        apellido = f"{rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}"
+        rows.append((estudiante_id, nombre, apellido))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nombres", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = generate_names(args.nombres)
+
+    start = time.perf_counter()
+    index = EstudianteSearchIndex((i, f"{n} {a}") for i, n, a in rows)
+    build = time.perf_counter() - start
+    print(f"Índice con {len(index)} nombres construido en {build * 1000:.0f} ms")
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE estudiante (estudiante_id INTEGER PRIMARY KEY, nombre TEXT, apellido TEXT);")
+    conn.executemany("INSERT INTO estudiante VALUES (?, ?, ?);", rows)
+
+    print(f"\n{'consulta':<12}{'índice (us)':>14}{'LIKE (us)':>14}")
+    for texto in CONSULTAS:
+        start = time.perf_counter()
+        for _ in range(args.repeticiones):
+            index.search(texto, limit=5)
+        indexed = (time.perf_counter() - start) / args.repeticiones
+
+        repeticiones_sql = max(1, args.repeticiones // 20)
+        start = time.perf_counter()
+        for _ in range(repeticiones_sql):
+            conn.execute(LIKE_SQL, (f"%{texto}%",)).fetchall()
+        like = (time.perf_counter() - start) / repeticiones_sql
+
+        print(f"{texto:<12}{indexed * 1e6:>14.1f}{like * 1e6:>14.1f}")
+
+    start = time.perf_counter()
+    for i in range(1000):
+        index.upsert(args.nombres + i + 1, "Nuevo Estudiante")
+    print(f"\n1000 altas incrementales: {(time.perf_counter() - start) * 1000:.1f} ms")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmark: prueba de carga del servidor de datos (servicio.servidor).
+
+Levanta el servidor en otro proceso (para que no comparta el GIL con los
+clientes) sobre una base sintética y lo usa desde muchos clientes
+simultáneos (un hilo y una conexión keep-alive por cliente) durante unos
+segundos, con una mezcla parecida al uso de las vistas:
+
+- consultas de un estudiante (datos y solvencia);
+- páginas de pagos y de estudiantes, con y sin búsqueda;
+- catálogos (grados);
+- registro de pagos (--escrituras, proporción del total).
+
+Informa peticiones por segundo, latencias p50/p95/p99 por operación y
+errores. Se repite para cada modo del servidor (hilos y asyncio) y cada
+número de clientes de --clientes.
+
+Uso:
+    python -m benchmarks.bench_servidor [--clientes 1 8 64 256] [--modos hilos asyncio] [--duracion 5]
+"""
+
+import argparse
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.bench_indexes import build_database
+from servicio.cliente import ClienteAcademia, ErrorRemoto
+
+
+BUSQUEDAS = ("mar", "gon", "ana lo", "per", "jo")
+
+
+def operacion(rnd: random.Random, estudiantes: int, escrituras: float) -> Tuple[str, str, dict]:
+    """(nombre, ruta, argumentos) de una petición al azar."""
+    estudiante_id = rnd.randint(1, estudiantes)
+    if rnd.random() < escrituras:
+        return "insert_pago", "ingresos_db/insert_pago", {
+            "concepto_pago_id": rnd.randint(1, 4), "estudiante_id": estudiante_id, "usuario_id": 1, "monto": 150.0,
+        }
+    opciones = (
+        ("fetch_estudiante_by_id", "ingresos_db/fetch_estudiante_by_id", {"estudiante_id": estudiante_id}),
+        ("check_solvency_status", "consultas_db/check_solvency_status", {"estudiante_id": estudiante_id}),
+        ("fetch_pagos_page", "ingresos_db/fetch_pagos_page", {"after_pago_id": None, "limit": 100}),
+        ("fetch_pagos_page (búsqueda)", "ingresos_db/fetch_pagos_page",
+         {"after_pago_id": None, "limit": 100, "search_text": rnd.choice(BUSQUEDAS)}),
+        ("fetch_estudiantes_page", "ingresos_db/fetch_estudiantes_page",
+         {"after_estudiante_id": estudiante_id, "limit": 100}),
+        ("fetch_grados_with_ids", "ingresos_db/fetch_grados_with_ids", {}),
+    )
+    return rnd.choice(opciones)
+
+
+def cliente(url: str, estudiantes: int, escrituras: float, hasta: float, semilla: int,
+            tiempos: Dict[str, List[float]], errores: Dict[str, int], lock: threading.Lock) -> None:
+    conexion = ClienteAcademia(url, timeout=30.0)
+    rnd = random.Random(semilla)
+    propios: Dict[str, List[float]] = defaultdict(list)
+    fallas: Dict[str, int] = defaultdict(int)
+    try:
+        while time.perf_counter() < hasta:
+            nombre, ruta, argumentos = operacion(rnd, estudiantes, escrituras)
+            modulo, func = ruta.split("/")
+            start = time.perf_counter()
+            try:
+                conexion.llamar(modulo, func, argumentos)
+            except ErrorRemoto:
+                fallas[nombre] += 1
+                continue
+            propios[nombre].append((time.perf_counter() - start) * 1000)
+    finally:
+        conexion.cerrar()
+    with lock:
+        for nombre, valores in propios.items():
+            tiempos[nombre].extend(valores)
+        for nombre, cantidad in fallas.items():
+            errores[nombre] += cantidad
+
+
+def percentil(valores: List[float], p: float) -> float:
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def carga(url: str, clientes: int, duracion: float, estudiantes: int, escrituras: float) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    tiempos: Dict[str, List[float]] = defaultdict(list)
+    errores: Dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+    start = time.perf_counter()
+    hasta = start + duracion
+    hilos = [
+        threading.Thread(target=cliente, args=(url, estudiantes, escrituras, hasta, i, tiempos, errores, lock))
+        for i in range(clientes)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return tiempos, errores, time.perf_counter() - start
+
+
+def puerto_libre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def esperar_servidor(url: str, proceso: subprocess.Popen, limite: float = 30.0) -> None:
+    cliente = ClienteAcademia(url)
+    hasta = time.perf_counter() + limite
+    while True:
+        try:
+            cliente.salud()
+            return
+        except ErrorRemoto:
+            if proceso.poll() is not None or time.perf_counter() > hasta:
+                raise RuntimeError("El servidor no inició")
+            time.sleep(0.1)
+        finally:
+            cliente.cerrar()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--estudiantes", type=int, default=20_000)
+    parser.add_argument("--pagos", type=int, default=200_000)
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1, 8, 64, 256])
+    parser.add_argument("--modos", nargs="+", choices=("hilos", "asyncio"), default=["hilos", "asyncio"])
+    parser.add_argument("--duracion", type=float, default=5.0, help="Segundos de carga por ronda")
+    parser.add_argument("--escrituras", type=float, default=0.05, help="Proporción de peticiones que registran un pago")
+    parser.add_argument("--max-concurrentes", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "academia.db")
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(db_path, str(Path(args.db).resolve()), args.estudiantes, args.pagos)
+
+        for modo in args.modos:
+            puerto = puerto_libre()
+            # El servidor aplica migraciones y FTS al iniciar, como en producción
+            comando = [
+                sys.executable, "-m", "servicio.servidor", "--db", db_path, "--puerto", str(puerto),
+                "--max-concurrentes", str(args.max_concurrentes),
+            ]
+            if modo == "asyncio":
+                comando.append("--asyncio")
+            proceso = subprocess.Popen(comando, cwd=Path(__file__).resolve().parent.parent, stderr=subprocess.DEVNULL)
+            url = f"http://127.0.0.1:{puerto}"
+            try:
+                esperar_servidor(url, proceso)
+                for clientes in args.clientes:
+                    tiempos, errores, segundos = carga(url, clientes, args.duracion, args.estudiantes, args.escrituras)
+                    total = sum(len(valores) for valores in tiempos.values())
+                    fallas = sum(errores.values())
+                    print(f"\n[{modo}] {clientes} clientes: {total / segundos:,.0f} peticiones/s, {fallas} errores")
+                    print(f"{'operación (ms)':<30}{'n':>8}{'media':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+                    for nombre in sorted(tiempos):
+                        valores = sorted(tiempos[nombre])
+                        print(f"{nombre:<30}{len(valores):>8}{statistics.fmean(valores):>9.2f}"
+                              f"{percentil(valores, 0.50):>9.2f}{percentil(valores, 0.95):>9.2f}{percentil(valores, 0.99):>9.2f}")
+            finally:
+                proceso.terminate()
+                proceso.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: perfiles de conexión SQLite (database.pool.CONNECTION_PROFILES).
+
+Para cada perfil copia la misma base sintética y mide:
+
+- escrituras por segundo de un escritor solo (insert_pago, un commit por pago);
+- con un escritor continuo y varios lectores a la vez (como Ingresos
+  guardando mientras Consultas busca estudiantes): escrituras por segundo,
+  latencia de los lectores (fetch_estudiante_resumen) y operaciones
+  fallidas por bloqueo.
+
+Uso:
+    python -m benchmarks.bench_sqlite_profiles [--perfiles rollback,wal,wal_full] [--segundos 5]
+"""
+
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.bench_indexes import build_database
+from consultas.consultas_db import fetch_estudiante_resumen
+from database.migrations import apply_migrations
+from database.pool import CONNECTION_PROFILES, close_all_pools, configure_pools, get_pool
+from ingresos.ingresos_db import insert_pago
+
+
+def escrituras_solas(db_path: str, cantidad: int, estudiantes: int) -> float:
+    rnd = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(cantidad):
+        insert_pago(rnd.randint(1, 17), rnd.randint(1, estudiantes), 1, 100.0, db_path)
+    return cantidad / (time.perf_counter() - start)
+
+
+def carga_concurrente(db_path: str, segundos: float, lectores: int, estudiantes: int) -> dict:
+    fin = time.perf_counter() + segundos
+    escrituras = [0, 0]  # ok, fallidas
+    latencias: list = []
+    lecturas_fallidas = [0]
+    lock = threading.Lock()
+
+    def escritor() -> None:
+        rnd = random.Random(2)
+        while time.perf_counter() < fin:
+            ok = insert_pago(rnd.randint(1, 17), rnd.randint(1, estudiantes), 1, 100.0, db_path)
+            escrituras[0 if ok else 1] += 1
+
+    def lector(seed: int) -> None:
+        rnd = random.Random(seed)
+        propias = []
+        fallidas = 0
+        while time.perf_counter() < fin:
+            start = time.perf_counter()
+            resumen = fetch_estudiante_resumen(rnd.randint(1, estudiantes), db_path)
+            propias.append((time.perf_counter() - start) * 1000)
+            if resumen is None:
+                fallidas += 1
+        with lock:
+            latencias.extend(propias)
+            lecturas_fallidas[0] += fallidas
+
+    hilos = [threading.Thread(target=escritor)] + [
+        threading.Thread(target=lector, args=(10 + i,)) for i in range(lectores)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    latencias.sort()
+    return {
+        "escrituras_s": escrituras[0] / segundos,
+        "escrituras_fallidas": escrituras[1],
+        "lecturas_s": len(latencias) / segundos,
+        "p50": statistics.median(latencias) if latencias else 0.0,
+        "p95": latencias[int(len(latencias) * 0.95)] if latencias else 0.0,
+        "max": latencias[-1] if latencias else 0.0,
+        "lecturas_fallidas": lecturas_fallidas[0],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--perfiles", default=",".join(CONNECTION_PROFILES))
+    parser.add_argument("--pagos", type=int, default=200_000)
+    parser.add_argument("--estudiantes", type=int, default=20_000)
+    parser.add_argument("--escrituras", type=int, default=500, help="Pagos del escritor solo")
+    parser.add_argument("--segundos", type=float, default=5.0, help="Duración de la carga concurrente")
+    parser.add_argument("--lectores", type=int, default=3)
+    args = parser.parse_args()
+
+    perfiles = [p.strip() for p in args.perfiles.split(",") if p.strip()]
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        base = str(Path(tmp) / "base.db")
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(base, str(Path(args.db).resolve()), args.estudiantes, args.pagos)
+        apply_migrations(base)
+        close_all_pools()
+
+        # Un lector por conexión más el escritor
+        configure_pools(max_size=args.lectores + 1)
+        for perfil in perfiles:
+            db_path = str(Path(tmp) / f"{perfil}.db")
+            shutil.copy(base, db_path)
+            configure_pools(profile=perfil)
+            try:
+                solas = escrituras_solas(db_path, args.escrituras, args.estudiantes)
+                resultados[perfil] = (solas, carga_concurrente(db_path, args.segundos, args.lectores, args.estudiantes))
+                errores = get_pool(db_path).stats()["profile_errors"]
+                if errores:
+                    print(f"Aviso: {errores} conexiones de '{perfil}' no aceptaron todos los PRAGMAs")
+            finally:
+                close_all_pools()
+
+    print(f"\n{'perfil':<12}{'escr/s solo':>13}{'escr/s conc':>13}{'lect/s':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'fallidas':>10}")
+    for perfil, (solas, conc) in resultados.items():
+        fallidas = conc["escrituras_fallidas"] + conc["lecturas_fallidas"]
+        print(f"{perfil:<12}{solas:>13.0f}{conc['escrituras_s']:>13.0f}{conc['lecturas_s']:>10.0f}"
+              f"{conc['p50']:>10.2f}{conc['p95']:>10.2f}{conc['max']:>10.1f}{fallidas:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: arranque en frío de main.py contra un presupuesto.
+
+Lanza varias veces `python main.py --profile-startup ARCHIVO
+--exit-after-paint` en un proceso nuevo, sobre una copia de la base en un
+directorio temporal, y lee el informe de cada arranque. El tiempo total va
+desde que se lanza el proceso (incluye el arranque del intérprete) hasta
+el primer dibujo. Con --sin-cache cada arranque usa un directorio de .pyc
+vacío, como la primera ejecución tras una actualización.
+
+Termina con código 1 si la mediana de los imports o del arranque total
+supera el presupuesto (por defecto startup_profile.STARTUP_BUDGET). Sin
+pantalla solo se puede comprobar el presupuesto de imports.
+
+Uso:
+    python -m benchmarks.bench_startup [--repeticiones 5] [--presupuesto-ms 5000]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from startup_profile import STARTUP_BUDGET
+
+
+MAIN = Path(__file__).resolve().parent.parent / "main.py"
+
+
+def arrancar(directorio: str, sin_cache: bool) -> dict:
+    """Lanza main.py una vez y retorna su informe con 'proceso_ms' agregado."""
+    informe_path = Path(directorio) / "arranque.json"
+    if informe_path.exists():
+        informe_path.unlink()
+    env = dict(os.environ)
+    if sin_cache:
+        env["PYTHONPYCACHEPREFIX"] = tempfile.mkdtemp(dir=directorio, prefix="pyc-")
+    lanzado = time.time()
+    subprocess.run(
+        [sys.executable, str(MAIN), "--profile-startup", str(informe_path), "--exit-after-paint"],
+        cwd=directorio, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120,
+    )
+    if not informe_path.exists():
+        raise RuntimeError("main.py terminó sin escribir el informe de arranque")
+    informe = json.loads(informe_path.read_text(encoding="utf-8"))
+    if 'primer_dibujo' in informe['marcas']:
+        # Lanzamiento del proceso + tiempo hasta el primer dibujo medido dentro
+        informe['proceso_ms'] = (informe['inicio_epoch'] - lanzado) * 1000 + informe['marcas']['primer_dibujo']
+    return informe
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base que se copia para cada corrida")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--sin-cache", action="store_true", help="Compilar los .pyc en cada arranque")
+    parser.add_argument("--presupuesto-ms", type=float, default=STARTUP_BUDGET['total_ms'])
+    parser.add_argument("--presupuesto-imports-ms", type=float, default=STARTUP_BUDGET['imports_ms'])
+    parser.add_argument("--json", help="Guardar el resumen y los informes en este archivo")
+    args = parser.parse_args()
+
+    informes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(args.db, Path(tmp) / "academia.db")
+        for _ in range(args.repeticiones):
+            informes.append(arrancar(tmp, args.sin_cache))
+
+    imports = statistics.median(informe['imports_ms'] for informe in informes)
+    totales = [informe['proceso_ms'] for informe in informes if 'proceso_ms' in informe]
+    print(f"{args.repeticiones} arranques{' sin caché de .pyc' if args.sin_cache else ''}")
+    print(f"{'medición':<28}{'mediana':>12}{'presupuesto':>14}")
+    print(f"{'imports':<28}{imports:>9.1f} ms{args.presupuesto_imports_ms:>11.0f} ms")
+
+    # Fases y imports más lentos del arranque mediano
+    mediano = sorted(informes, key=lambda informe: informe['imports_ms'])[len(informes) // 2]
+    for entry in sorted(mediano['imports'], key=lambda entry: entry['ms'], reverse=True)[:3]:
+        print(f"  {entry['modulo']:<26}{entry['ms']:>9.1f} ms")
+    for entry in mediano['fases']:
+        print(f"  fase {entry['fase']:<21}{entry['ms']:>9.1f} ms")
+
+    fallas = []
+    if imports > args.presupuesto_imports_ms:
+        fallas.append("imports")
+    total = None
+    if totales:
+        total = statistics.median(totales)
+        print(f"{'arranque hasta primer dibujo':<28}{total:>9.1f} ms{args.presupuesto_ms:>11.0f} ms")
+        if total > args.presupuesto_ms:
+            fallas.append("arranque total")
+    else:
+        print(f"\nSin primer dibujo ({informes[0]['error']}); solo se comprobaron los imports")
+
+    if args.json:
+        resumen = {
+            'imports_ms': imports,
+            'total_ms': total,
+            'presupuesto': {'imports_ms': args.presupuesto_imports_ms, 'total_ms': args.presupuesto_ms},
+            'informes': informes,
+        }
+        Path(args.json).write_text(json.dumps(resumen, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    if fallas:
+        print(f"\nFALLA: se superó el presupuesto de {', '.join(fallas)}")
+        sys.exit(1)
+    print("\nOK: arranque dentro del presupuesto")
+
+
+if __name__ == "__main__":
+    main()
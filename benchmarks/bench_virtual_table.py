@@ -0,0 +1,88 @@
+"""
+Benchmark: carga completa de la tabla de pagos vs tabla virtual paginada.
+
+Compara `fetch_pagos_for_table` (lo que hacía IngresosView al cargar) con el
+`PagedRowCache` + `KeysetTableSource` que usa `VirtualTreeview`: tiempo hasta
+la primera pantalla, desplazamiento secuencial, saltos con la barra y memoria
+máxima (tracemalloc). No necesita pantalla: mide la capa de datos del widget.
+
+Uso:
+    python -m benchmarks.bench_virtual_table [--pagos 1000000]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.bench_indexes import build_database
+from database.migrations import apply_migrations
+from database.pool import close_all_pools
+from ingresos.ingresos_db import count_pagos, count_pagos_before, fetch_pago_id_at, fetch_pagos_for_table, fetch_pagos_page
+from ingresos.virtual_table import KeysetTableSource, PagedRowCache
+
+
+VISIBLE_ROWS = 20
+
+
+def measure(label: str, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<38}{elapsed * 1000:>12.1f} ms{peak / 1024 / 1024:>12.1f} MB")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--pagos", type=int, default=1_000_000)
+    parser.add_argument("--estudiantes", type=int, default=20_000)
+    parser.add_argument("--ventanas", type=int, default=2_000, help="Ventanas recorridas al desplazarse")
+    parser.add_argument("--saltos", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench_tabla_virtual.db")
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(db_path, args.db, args.estudiantes, args.pagos)
+        apply_migrations(db_path)
+
+        source = KeysetTableSource(
+            count_fn=lambda: count_pagos("", db_path),
+            page_fn=lambda after_id, limit: fetch_pagos_page(after_id, limit, "", db_path),
+            key_at_fn=lambda offset: fetch_pago_id_at(offset, "", db_path),
+            position_fn=lambda pago_id: count_pagos_before(pago_id, "", db_path),
+        )
+        cache = PagedRowCache(source)
+
+        print(f"\n{'operación':<38}{'tiempo':>15}{'memoria pico':>15}")
+        measure("carga completa (antes)", lambda: len(fetch_pagos_for_table(db_path)))
+        measure("primera pantalla (virtual)", lambda: cache.rows(0, VISIBLE_ROWS))
+
+        def scroll() -> None:
+            for window in range(args.ventanas):
+                cache.rows(window * 3, VISIBLE_ROWS)
+
+        measure(f"desplazar {args.ventanas} ventanas", scroll)
+
+        rnd = random.Random(5)
+        total = cache.count()
+
+        def jumps() -> None:
+            for _ in range(args.saltos):
+                cache.rows(rnd.randrange(max(1, total - VISIBLE_ROWS)), VISIBLE_ROWS)
+
+        measure(f"{args.saltos} saltos aleatorios", jumps)
+        measure("ir al final", lambda: cache.rows(total - VISIBLE_ROWS, VISIBLE_ROWS))
+        print(f"\nPáginas pedidas a SQLite: {cache.fetches} (máximo en caché: {cache.max_pages} x {cache.page_size} filas)")
+        close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark: escrituras concurrentes con y sin la cola de commit agrupado.
+
+Varios hilos registran a la vez una mezcla de pagos (insert_pago) y notas
+(insert_calificacion / update_calificacion), como estaciones de caja y de
+secretaría trabajando al mismo tiempo. Cada caso usa una copia nueva de la
+misma base sintética y se mide:
+
+- sin cola: cada escritura hace su propio commit (comportamiento normal);
+- con cola: database.write_queue junta las escrituras simultáneas en una
+  transacción por lote.
+
+con los perfiles "wal" (synchronous NORMAL) y "wal_full" (FULL, un fsync
+por commit), donde más se nota agrupar.
+
+Uso:
+    python -m benchmarks.bench_write_queue [--escritores 1,8,32] [--escrituras 2000] [--ventana 0]
+"""
+
+import argparse
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.bench_indexes import build_database
+from database.migrations import apply_migrations
+from database.pool import close_all_pools, configure_pools
+from database.write_queue import close_write_queues, configure_write_queue, get_write_queue
+from ingresos.ingresos_db import insert_calificacion, insert_pago, update_calificacion
+
+
+def escritor(db_path: str, indice: int, cantidad: int, estudiantes: int, latencias: list, fallidas: list) -> None:
+    calificacion_id = None
+    for i in range(cantidad):
+        estudiante_id = (indice * 7919 + i * 31) % estudiantes + 1
+        start = time.perf_counter()
+        if i % 3 == 0:
+            ok = insert_pago(1, estudiante_id, 1, 100.0, db_path) is not None
+        elif calificacion_id is None or i % 3 == 1:
+            calificacion_id = insert_calificacion(estudiante_id, 15.0, 16.0, 17.0, 18.0, db_path)
+            ok = calificacion_id is not None
+        else:
+            ok = update_calificacion(calificacion_id, 18.0, 17.0, 16.0, 15.0, db_path)
+        latencias.append(time.perf_counter() - start)
+        if not ok:
+            fallidas.append(i)
+
+
+def medir(db_path: str, escritores: int, escrituras: int, estudiantes: int) -> dict:
+    latencias: list = []
+    fallidas: list = []
+    por_hilo = max(1, escrituras // escritores)
+    hilos = [
+        threading.Thread(target=escritor, args=(db_path, i, por_hilo, estudiantes, latencias, fallidas))
+        for i in range(escritores)
+    ]
+    start = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - start
+    latencias.sort()
+    return {
+        "por_segundo": len(latencias) / segundos,
+        "p50": statistics.median(latencias) * 1000,
+        "p95": latencias[int(len(latencias) * 0.95) - 1] * 1000,
+        "fallidas": len(fallidas),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--estudiantes", type=int, default=20_000)
+    parser.add_argument("--pagos", type=int, default=200_000)
+    parser.add_argument("--escritores", default="1,8,32", help="Hilos escritores por caso")
+    parser.add_argument("--escrituras", type=int, default=2000, help="Escrituras por caso")
+    parser.add_argument("--ventana", type=float, default=0.0, help="window_ms de la cola")
+    parser.add_argument("--perfiles", nargs="+", default=["wal", "wal_full"])
+    args = parser.parse_args()
+
+    escritores = [int(n) for n in args.escritores.split(",") if n.strip()]
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        base = str(Path(tmp) / "base.db")
+        print(f"Generando {args.estudiantes} estudiantes y {args.pagos} pagos...")
+        build_database(base, str(Path(args.db).resolve()), args.estudiantes, args.pagos)
+        apply_migrations(base)
+        close_all_pools()
+
+        for perfil in args.perfiles:
+            for cola in (False, True):
+                for n in escritores:
+                    db_path = str(Path(tmp) / f"{perfil}_{int(cola)}_{n}.db")
+                    shutil.copy(base, db_path)
+                    # Sin cola los hilos compiten por el bloqueo de escritura; que no venza el préstamo
+                    configure_pools(max_size=max(4, n + 1), timeout=60.0, profile=perfil)
+                    configure_write_queue(enabled=cola, window_ms=args.ventana)
+                    try:
+                        caso = medir(db_path, n, args.escrituras, args.estudiantes)
+                        caso["por_lote"] = get_write_queue(db_path).stats()["escrituras_por_lote"] if cola else 1.0
+                    finally:
+                        close_write_queues()
+                        close_all_pools()
+                    resultados.append((perfil, "con cola" if cola else "sin cola", n, caso))
+        configure_write_queue(enabled=False)
+
+    print(f"\n{args.escrituras} escrituras por caso (pagos y calificaciones), ventana {args.ventana} ms")
+    print(f"{'perfil':<10}{'modo':<10}{'hilos':>6}{'escrituras/s':>14}{'p50 ms':>9}{'p95 ms':>9}{'por lote':>10}{'fallidas':>10}")
+    for perfil, modo, n, caso in resultados:
+        print(
+            f"{perfil:<10}{modo:<10}{n:>6}{caso['por_segundo']:>14,.0f}{caso['p50']:>9.2f}"
+            f"{caso['p95']:>9.2f}{caso['por_lote']:>10.1f}{caso['fallidas']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
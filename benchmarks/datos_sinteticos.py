@@ -0,0 +1,279 @@
+"""
+Generador de bases sintéticas con el esquema de academia.db.
+
+Copia de la base de origen el esquema de tablas (sin índices, como una base
+sin migrar) y los catálogos, y genera estudiantes, pagos y calificaciones
+reproducibles a partir de una semilla:
+
+- nombres, dobles apellidos e instituciones con frecuencias tipo Zipf
+  (pocos nombres muy repetidos y una cola larga), como en un padrón real;
+- grados con más alumnos en los primeros años;
+- pagos en orden cronológico (pago_id crece con la fecha), con conceptos
+  y montos según el tipo (inscripción, mensualidad, examen, papelería) y
+  algunos pagos parciales;
+- cajeros adicionales (usuarios con un rol que puede registrar pagos);
+- una calificación para la mayoría de los estudiantes.
+
+Se conservan los catálogos de origen (usuario 1, conceptos 1-17, grados),
+así que las consultas de los módulos *_db funcionan igual que en la base real.
+
+Uso:
+    python -m benchmarks.datos_sinteticos salida.db [--escala pequena|mediana|grande]
+        [--estudiantes N] [--pagos N] [--seed 42] [--db academia.db]
+"""
+
+import argparse
+import itertools
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# escala -> (estudiantes, pagos)
+ESCALAS: Dict[str, Tuple[int, int]] = {
+    "pequena": (1_000, 10_000),
+    "mediana": (100_000, 1_000_000),
+    "grande": (1_000_000, 10_000_000),
+}
+
+CATALOGOS = ("grado", "concepto_pago", "rol", "permiso", "permiso_rol", "usuario", "usuario_rol")
+
+# Ordenados de más a menos frecuente; el peso de cada uno es 1 / posición
+NOMBRES = [
+    "María", "José", "Juan", "Ana", "Luis", "Carlos", "Sofía", "Jorge", "Lucía", "Pedro",
+    "Carmen", "Miguel", "Rosa", "Mario", "Elena", "Fernando", "Gabriela", "Diego", "Andrea", "Ricardo",
+    "Valeria", "Manuel", "Daniela", "Francisco", "Paola", "Roberto", "Fernanda", "Julio", "Alejandra", "Óscar",
+    "Karla", "Edgar", "Mónica", "Héctor", "Claudia", "Sergio", "Patricia", "Raúl", "Isabel", "Byron",
+    "Wendy", "Marvin", "Ingrid", "Kevin", "Astrid", "Erick", "Jennifer", "Brayan", "Dulce", "Jeferson",
+]
+APELLIDOS = [
+    "García", "López", "Hernández", "Pérez", "González", "Rodríguez", "Morales", "Martínez", "Ramírez", "Castillo",
+    "Méndez", "Juárez", "Ruiz", "Gómez", "Escobar", "Díaz", "Reyes", "Cruz", "Ortiz", "Chávez",
+    "Flores", "Mejía", "Aguilar", "Sánchez", "Estrada", "Barrios", "Velásquez", "Orellana", "Fuentes", "Castro",
+    "Monterroso", "Alvarado", "Cifuentes", "Solares", "Guzmán", "Paredes", "Rosales", "Marroquín", "Toledo", "Quiñónez",
+]
+INSTITUCIONES = [
+    "Instituto Nacional", "Colegio San José", "Liceo Guatemala", "Escuela Oficial Mixta", "Colegio Evangélico",
+    "Instituto por Cooperativa", "Colegio Bilingüe", "Escuela Rural Mixta", "Liceo Cristiano", "Colegio Santa Teresa",
+    "Instituto Técnico", "Colegio El Valle",
+]
+
+# Pesos y montos por tipo de concepto (ids del catálogo de academia.db)
+_INSCRIPCION, _MENSUALIDADES, _EXAMENES, _PAPELERIA = (1,), range(2, 13), range(13, 17), (17,)
+_TIPOS_CONCEPTO = (
+    (_INSCRIPCION, 6.0, 300.0),
+    (_MENSUALIDADES, 7.0, 150.0),
+    (_EXAMENES, 3.0, 50.0),
+    (_PAPELERIA, 2.0, 75.0),
+)
+
+# Filas por executemany; las elecciones al azar se hacen por bloque
+_LOTE = 50_000
+
+
+def escala(nombre: str) -> Tuple[int, int]:
+    """(estudiantes, pagos) de una escala predefinida."""
+    return ESCALAS[nombre]
+
+
+def _zipf(valores: Sequence, exponente: float = 1.0) -> List[float]:
+    """Pesos acumulados 1/k^s para usar con random.choices(cum_weights=...)."""
+    return list(itertools.accumulate(1.0 / (k ** exponente) for k in range(1, len(valores) + 1)))
+
+
+def _bloques(total: int, tamano: int = _LOTE):
+    inicio = 0
+    while inicio < total:
+        yield inicio, min(tamano, total - inicio)
+        inicio += tamano
+
+
+def _copiar_esquema(src: sqlite3.Connection, dst: sqlite3.Connection) -> None:
+    for (sql,) in src.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND sql NOT LIKE 'CREATE VIRTUAL%';"
+    ):
+        dst.execute(sql)
+    for table in CATALOGOS:
+        rows = src.execute(f"SELECT * FROM {table};").fetchall()
+        if rows:
+            marks = ", ".join("?" for _ in rows[0])
+            dst.executemany(f"INSERT INTO {table} VALUES ({marks});", rows)
+
+
+def _agregar_cajeros(dst: sqlite3.Connection, cajeros: int) -> List[int]:
+    """Crea usuarios cajero1..N con un rol que puede registrar pagos; retorna quiénes pueden cobrar."""
+    row = dst.execute(
+        """
+        SELECT pr.rol_id
+        FROM permiso_rol pr
+        JOIN permiso p ON p.permiso_id = pr.permiso_id
+        WHERE p.nombre_permiso = 'Registrar Pagos'
+        ORDER BY (SELECT COUNT(*) FROM permiso_rol x WHERE x.rol_id = pr.rol_id), pr.rol_id
+        LIMIT 1;
+        """
+    ).fetchone()
+    rol_id = row[0] if row else None
+    for n in range(1, cajeros + 1):
+        usuario_id = dst.execute("INSERT INTO usuario (nombre, contrasena) VALUES (?, ?);", (f"cajero{n}", "123")).lastrowid
+        if rol_id is not None:
+            dst.execute("INSERT INTO usuario_rol (usuario_id, rol_id) VALUES (?, ?);", (usuario_id, rol_id))
+    cobran = dst.execute(
+        """
+        SELECT DISTINCT ur.usuario_id
+        FROM usuario_rol ur
+        JOIN permiso_rol pr ON pr.rol_id = ur.rol_id
+        JOIN permiso p ON p.permiso_id = pr.permiso_id
+        WHERE p.nombre_permiso = 'Registrar Pagos'
+        ORDER BY ur.usuario_id;
+        """
+    ).fetchall()
+    return [usuario_id for (usuario_id,) in cobran] or [1]
+
+
+def _insertar_estudiantes(dst: sqlite3.Connection, rnd: random.Random, estudiantes: int, grados: List[int]) -> None:
+    pesos_nombre, pesos_apellido, pesos_institucion = _zipf(NOMBRES), _zipf(APELLIDOS, 0.8), _zipf(INSTITUCIONES, 1.2)
+    # Más alumnos en los primeros grados
+    pesos_grado = list(itertools.accumulate(1.0 / (1 + 0.25 * i) for i in range(len(grados))))
+    for _inicio, n in _bloques(estudiantes):
+        nombres = rnd.choices(NOMBRES, cum_weights=pesos_nombre, k=n)
+        apellidos = rnd.choices(APELLIDOS, cum_weights=pesos_apellido, k=2 * n)
+        instituciones = rnd.choices(INSTITUCIONES, cum_weights=pesos_institucion, k=n)
+        grados_lote = rnd.choices(grados, cum_weights=pesos_grado, k=n)
+        dst.executemany(
+            "INSERT INTO estudiante (nombre, apellido, telefono, grado_id, institucion) VALUES (?, ?, ?, ?, ?);",
+            (
+                (nombres[i], f"{apellidos[2 * i]} {apellidos[2 * i + 1]}",
+                 f"{rnd.choice('345')}{rnd.randint(1000000, 9999999)}", grados_lote[i], instituciones[i])
+                for i in range(n)
+            ),
+        )
+
+
+def _insertar_pagos(
+    dst: sqlite3.Connection, rnd: random.Random, pagos: int, estudiantes: int, usuarios: List[int],
+    conceptos: List[int], inicio: date, dias: int,
+) -> None:
+    monto_de: Dict[int, float] = {}
+    pesos: List[float] = []
+    for concepto_id in conceptos:
+        peso, monto = 1.0, 100.0
+        for ids, peso_tipo, monto_tipo in _TIPOS_CONCEPTO:
+            if concepto_id in ids:
+                peso, monto = peso_tipo, monto_tipo
+        monto_de[concepto_id] = monto
+        pesos.append(peso)
+    pesos_concepto = list(itertools.accumulate(pesos))
+    # Los primeros usuarios (administración) registran la mayoría; los cajeros, el resto
+    pesos_usuario = _zipf(usuarios, 1.5)
+    fechas = [(inicio + timedelta(days=d)).isoformat() for d in range(dias + 1)]
+    for primero, n in _bloques(pagos):
+        conceptos_lote = rnd.choices(conceptos, cum_weights=pesos_concepto, k=n)
+        usuarios_lote = rnd.choices(usuarios, cum_weights=pesos_usuario, k=n)
+        dst.executemany(
+            "INSERT INTO pago (concepto_pago_id, estudiante_id, usuario_id, monto, fecha) VALUES (?, ?, ?, ?, ?);",
+            (
+                (conceptos_lote[i], rnd.randint(1, estudiantes), usuarios_lote[i],
+                 # Uno de cada diez pagos es un abono parcial
+                 monto_de[conceptos_lote[i]] / 2 if rnd.random() < 0.1 else monto_de[conceptos_lote[i]],
+                 fechas[(primero + i) * dias // max(1, pagos - 1)] if pagos > 1 else fechas[0])
+                for i in range(n)
+            ),
+        )
+
+
+def _insertar_calificaciones(dst: sqlite3.Connection, rnd: random.Random, estudiantes: int) -> None:
+    def nota() -> float:
+        return round(min(100.0, max(0.0, rnd.gauss(75.0, 12.0))), 1)
+
+    for primero, n in _bloques(estudiantes):
+        dst.executemany(
+            "INSERT INTO calificacion (estudiante_id, nota_uno, nota_dos, nota_tres, nota_cuatro) VALUES (?, ?, ?, ?, ?);",
+            (
+                (estudiante_id, nota(), nota(), nota(), nota())
+                for estudiante_id in range(primero + 1, primero + n + 1)
+                # Una parte de los estudiantes todavía no tiene notas
+                if rnd.random() < 0.9
+            ),
+        )
+
+
+def generar_base(
+    db_path: str,
+    source_db: str = "academia.db",
+    estudiantes: int = 1_000,
+    pagos: int = 10_000,
+    seed: int = 42,
+    cajeros: int = 4,
+    inicio: date = date(2020, 1, 1),
+    dias: int = 1800,
+) -> Dict[str, int]:
+    """Crea en db_path una base sintética sin índices secundarios.
+
+    db_path no debe existir (o estar vacía). Con la misma semilla y los
+    mismos parámetros el contenido es idéntico. Retorna las filas creadas
+    por tabla.
+    """
+    rnd = random.Random(seed)
+    src = sqlite3.connect(source_db)
+    dst = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        # Solo para construir: si el proceso se interrumpe la base se descarta
+        dst.execute("PRAGMA journal_mode = OFF;")
+        dst.execute("PRAGMA synchronous = OFF;")
+        dst.execute("BEGIN;")
+        _copiar_esquema(src, dst)
+        usuarios = _agregar_cajeros(dst, cajeros)
+        grados = [grado_id for (grado_id,) in dst.execute("SELECT grado_id FROM grado ORDER BY grado_id;")]
+        conceptos = [concepto_id for (concepto_id,) in dst.execute(
+            "SELECT concepto_pago_id FROM concepto_pago ORDER BY concepto_pago_id;")]
+        _insertar_estudiantes(dst, rnd, estudiantes, grados or [1])
+        if estudiantes:
+            _insertar_pagos(dst, rnd, pagos, estudiantes, usuarios, conceptos or [1], inicio, dias)
+        _insertar_calificaciones(dst, rnd, estudiantes)
+        dst.execute("COMMIT;")
+        return {
+            table: dst.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0]
+            for table in ("estudiante", "pago", "calificacion", "usuario")
+        }
+    finally:
+        src.close()
+        dst.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("salida", help="Base a crear (no debe existir)")
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena")
+    parser.add_argument("--estudiantes", type=int, help="Reemplaza el valor de la escala")
+    parser.add_argument("--pagos", type=int, help="Reemplaza el valor de la escala")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    args = parser.parse_args(argv)
+
+    if Path(args.salida).exists():
+        print(f"Ya existe: {args.salida}", file=sys.stderr)
+        return 2
+    if not Path(args.db).exists():
+        print(f"No existe la base de datos: {args.db}", file=sys.stderr)
+        return 2
+    estudiantes, pagos = escala(args.escala)
+    estudiantes = args.estudiantes if args.estudiantes is not None else estudiantes
+    pagos = args.pagos if args.pagos is not None else pagos
+
+    start = time.perf_counter()
+    try:
+        filas = generar_base(args.salida, args.db, estudiantes, pagos, args.seed)
+    except Exception as exc:
+        print(f"No se pudo generar la base: {exc}", file=sys.stderr)
+        Path(args.salida).unlink(missing_ok=True)
+        return 2
+    print(", ".join(f"{n} {table}" for table, n in filas.items()) + f" en {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
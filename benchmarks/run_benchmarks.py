@@ -0,0 +1,317 @@
+"""
+Benchmark de toda la capa de datos: cada función pública de los módulos
+*_db y de permissions sobre una base sintética (benchmarks.datos_sinteticos).
+
+Las funciones se descubren por introspección: si se agrega una función
+pública a un módulo *_db entra sola en la medición, siempre que sus
+parámetros tengan un generador en ARGUMENTOS (o valor por defecto). Las
+que no se pueden llamar quedan listadas como omitidas en el resultado.
+
+Las lecturas corren sobre una base migrada y las escrituras (insert_,
+update_, delete_) sobre una copia aparte, para que no alteren lo que miden
+las lecturas. Cada función se llama hasta --repeticiones veces o hasta
+agotar --presupuesto segundos, con argumentos al azar pero reproducibles.
+
+El resultado se guarda en JSON (tiempos en ms, commit, versiones y escala)
+para comparar corridas entre commits:
+
+Uso:
+    python -m benchmarks.run_benchmarks [--escala pequena|mediana|grande] [--seed 42]
+        [--salida resultado.json] [--comparar anterior.json] [--base sintetica.db]
+        [--repeticiones 50] [--presupuesto 2.0] [--sin-cache] [--solo fetch_pagos]
+"""
+
+import argparse
+import importlib
+import inspect
+import json
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.datos_sinteticos import APELLIDOS, ESCALAS, NOMBRES, generar_base
+from database.catalog_cache import CATALOG_CACHE_SETTINGS
+from database.migrations import apply_migrations
+from database.pool import close_all_pools, get_connection
+from permissions import PERMISSION_TO_TAB_MAPPING, invalidate_permissions
+
+
+MODULOS = ("ingresos.ingresos_db", "consultas.consultas_db", "usuarios.usuarios_db", "permissions")
+
+PREFIJOS_ESCRITURA = ("insert_", "update_", "delete_")
+
+
+class Contexto:
+    """Datos de la base sintética de los que salen los argumentos."""
+
+    def __init__(self, db_path: str, seed: int):
+        self.db_path = db_path
+        self.rnd = random.Random(seed)
+        with get_connection(db_path) as conn:
+            def ids(sql: str) -> List[int]:
+                return [row[0] for row in conn.execute(sql)]
+
+            self.estudiantes = conn.execute("SELECT MAX(estudiante_id) FROM estudiante;").fetchone()[0] or 1
+            self.pagos = conn.execute("SELECT MAX(pago_id) FROM pago;").fetchone()[0] or 1
+            self.calificaciones = conn.execute("SELECT MAX(calificacion_id) FROM calificacion;").fetchone()[0] or 1
+            self.grados = ids("SELECT grado_id FROM grado;") or [1]
+            self.conceptos = ids("SELECT concepto_pago_id FROM concepto_pago;") or [1]
+            self.roles = ids("SELECT rol_id FROM rol;") or [1]
+            self.usuarios = conn.execute("SELECT usuario_id, nombre, contrasena FROM usuario;").fetchall()
+
+    def estudiante_id(self) -> int:
+        return self.rnd.randint(1, self.estudiantes)
+
+    def usuario(self) -> Tuple[int, str, str]:
+        return self.rnd.choice(self.usuarios)
+
+
+def _nota(ctx: Contexto) -> float:
+    return round(ctx.rnd.uniform(40, 100), 1)
+
+
+# parámetro -> generador(ctx); los parámetros con valor por defecto sin generador usan el defecto
+ARGUMENTOS: Dict[str, Callable[[Contexto], object]] = {
+    "db_path": lambda ctx: ctx.db_path,
+    "estudiante_id": lambda ctx: ctx.estudiante_id(),
+    "estudiante_ids": lambda ctx: [ctx.estudiante_id() for _ in range(50)],
+    "after_estudiante_id": lambda ctx: ctx.rnd.choice((None, ctx.estudiante_id())),
+    "pago_id": lambda ctx: ctx.rnd.randint(1, ctx.pagos),
+    "after_pago_id": lambda ctx: ctx.rnd.choice((None, ctx.rnd.randint(1, ctx.pagos))),
+    "calificacion_id": lambda ctx: ctx.rnd.randint(1, ctx.calificaciones),
+    "concepto_pago_id": lambda ctx: ctx.rnd.choice(ctx.conceptos),
+    "grado_id": lambda ctx: ctx.rnd.choice(ctx.grados),
+    "usuario_id": lambda ctx: ctx.usuario()[0],
+    "rol_id": lambda ctx: ctx.rnd.choice(ctx.roles),
+    "search_text": lambda ctx: ctx.rnd.choice(NOMBRES)[:ctx.rnd.randint(3, 5)],
+    "limit": lambda ctx: 100,
+    "offset": lambda ctx: ctx.rnd.randint(0, 1000),
+    "monto": lambda ctx: 150.0,
+    "nombre": lambda ctx: ctx.rnd.choice(NOMBRES),
+    "apellido": lambda ctx: f"{ctx.rnd.choice(APELLIDOS)} {ctx.rnd.choice(APELLIDOS)}",
+    "telefono": lambda ctx: f"5{ctx.rnd.randint(1000000, 9999999)}",
+    "institucion": lambda ctx: "Instituto Nacional",
+    "usuario": lambda ctx: ctx.usuario()[1],
+    "contrasena": lambda ctx: ctx.usuario()[2],
+    "nota_uno": _nota,
+    "nota_dos": _nota,
+    "nota_tres": _nota,
+    "nota_cuatro": _nota,
+    "nota": _nota,
+    "notas": lambda ctx: [_nota(ctx) for _ in range(4)],
+    "tab_name": lambda ctx: ctx.rnd.choice(sorted(set(PERMISSION_TO_TAB_MAPPING.values()))),
+    "action": lambda ctx: ctx.rnd.choice(sorted(PERMISSION_TO_TAB_MAPPING)),
+    "permissions": lambda ctx: ctx.rnd.sample(sorted(PERMISSION_TO_TAB_MAPPING), 3),
+}
+
+
+def descubrir(modulos=MODULOS) -> List[Tuple[str, Callable]]:
+    """(módulo.función, función) públicas definidas en cada módulo (no las importadas)."""
+    funciones = []
+    for nombre_modulo in modulos:
+        modulo = importlib.import_module(nombre_modulo)
+        for nombre, func in inspect.getmembers(modulo, inspect.isfunction):
+            if nombre.startswith("_") or inspect.unwrap(func).__module__ != modulo.__name__:
+                continue
+            # Las versiones *_async solo agregan el salto al executor asyncio
+            if inspect.iscoroutinefunction(func):
+                continue
+            funciones.append((f"{nombre_modulo}.{nombre}", func))
+    return funciones
+
+
+def es_escritura(nombre: str) -> bool:
+    return nombre.rsplit(".", 1)[-1].startswith(PREFIJOS_ESCRITURA)
+
+
+def preparar_llamada(func: Callable) -> Tuple[Optional[Callable[[Contexto], dict]], str]:
+    """Retorna (fábrica de kwargs, "") o (None, motivo) si algún parámetro no tiene generador."""
+    generadores = {}
+    for parametro in inspect.signature(func).parameters.values():
+        if parametro.kind in (parametro.VAR_POSITIONAL, parametro.VAR_KEYWORD):
+            continue
+        if parametro.name in ARGUMENTOS:
+            generadores[parametro.name] = ARGUMENTOS[parametro.name]
+        elif parametro.default is parametro.empty:
+            return None, f"sin generador para el parámetro {parametro.name}"
+    return (lambda ctx: {nombre: generar(ctx) for nombre, generar in generadores.items()}), ""
+
+
+def medir(func: Callable, kwargs: Callable[[Contexto], dict], ctx: Contexto,
+          repeticiones: int, presupuesto: float, sin_cache: bool) -> dict:
+    """Llama a func con argumentos nuevos en cada vuelta; retorna estadísticas en ms."""
+    func(**kwargs(ctx))   # calentamiento: conexión del pool, cachés y páginas de SQLite
+    tiempos: List[float] = []
+    limite = time.perf_counter() + presupuesto
+    while len(tiempos) < repeticiones and (len(tiempos) < 3 or time.perf_counter() < limite):
+        argumentos = kwargs(ctx)
+        if sin_cache:
+            invalidate_permissions()
+        start = time.perf_counter()
+        func(**argumentos)
+        tiempos.append((time.perf_counter() - start) * 1000)
+    tiempos.sort()
+    return {
+        "llamadas": len(tiempos),
+        "media_ms": statistics.fmean(tiempos),
+        "p50_ms": tiempos[len(tiempos) // 2],
+        "p95_ms": tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))],
+        "min_ms": tiempos[0],
+        "max_ms": tiempos[-1],
+    }
+
+
+def git_commit() -> Tuple[Optional[str], bool]:
+    """(commit actual, hay cambios sin commit) o (None, False) fuera de un repositorio."""
+    raiz = Path(__file__).resolve().parent.parent
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=raiz,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        sucio = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=raiz,
+                               capture_output=True, text=True, check=True).stdout.strip() != ""
+        return commit, sucio
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def ejecutar(lectura_db: str, escritura_db: str, seed: int, repeticiones: int, presupuesto: float,
+             sin_cache: bool = False, solo: Optional[str] = None) -> Tuple[Dict[str, dict], Dict[str, str]]:
+    """Mide todas las funciones; retorna (resultados, omitidas)."""
+    resultados: Dict[str, dict] = {}
+    omitidas: Dict[str, str] = {}
+    funciones = descubrir()
+    # Las escrituras al final y los delete_ después de insert_/update_
+    funciones.sort(key=lambda item: (es_escritura(item[0]), item[0].rsplit(".", 1)[-1].startswith("delete_")))
+    contextos = {False: Contexto(lectura_db, seed), True: Contexto(escritura_db, seed)}
+    CATALOG_CACHE_SETTINGS['enabled'] = not sin_cache
+    for nombre, func in funciones:
+        if solo and solo not in nombre:
+            continue
+        kwargs, motivo = preparar_llamada(func)
+        if kwargs is None:
+            omitidas[nombre] = motivo
+            continue
+        escritura = es_escritura(nombre)
+        try:
+            resultados[nombre] = medir(func, kwargs, contextos[escritura], repeticiones, presupuesto, sin_cache)
+            resultados[nombre]["escritura"] = escritura
+        except Exception as exc:
+            omitidas[nombre] = f"error: {exc!r}"
+        print(f"  {nombre:<62}{resultados[nombre]['p50_ms']:>10.3f} ms" if nombre in resultados
+              else f"  {nombre:<62}{'omitida':>13}", file=sys.stderr)
+    return resultados, omitidas
+
+
+def comparar(actual: dict, anterior: dict) -> None:
+    """Imprime p50 de ambas corridas y la razón actual/anterior."""
+    previos = anterior.get("resultados", {})
+    print(f"\n{'función':<62}{'antes ms':>11}{'ahora ms':>11}{'razón':>8}")
+    for nombre, datos in sorted(actual["resultados"].items()):
+        previo = previos.get(nombre)
+        if previo is None:
+            print(f"{nombre:<62}{'-':>11}{datos['p50_ms']:>11.3f}{'nueva':>8}")
+            continue
+        razon = datos["p50_ms"] / previo["p50_ms"] if previo["p50_ms"] else float("inf")
+        marca = "  <-" if razon > 1.25 else ""
+        print(f"{nombre:<62}{previo['p50_ms']:>11.3f}{datos['p50_ms']:>11.3f}{razon:>8.2f}{marca}")
+    for nombre in sorted(set(previos) - set(actual["resultados"])):
+        print(f"{nombre:<62}{previos[nombre]['p50_ms']:>11.3f}{'-':>11}{'quitada':>8}")
+    meta = anterior.get("meta", {})
+    if meta.get("estudiantes") != actual["meta"]["estudiantes"] or meta.get("pagos") != actual["meta"]["pagos"]:
+        print("\nAviso: las corridas usan bases de distinto tamaño", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de la que se copian esquema y catálogos")
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena")
+    parser.add_argument("--estudiantes", type=int, help="Reemplaza el valor de la escala")
+    parser.add_argument("--pagos", type=int, help="Reemplaza el valor de la escala")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base", help="Base sintética ya generada (se copia, no se modifica)")
+    parser.add_argument("--repeticiones", type=int, default=50, help="Llamadas máximas por función")
+    parser.add_argument("--presupuesto", type=float, default=2.0, help="Segundos máximos por función")
+    parser.add_argument("--sin-cache", action="store_true", help="Desactiva las cachés de catálogos y permisos")
+    parser.add_argument("--solo", help="Medir solo las funciones cuyo nombre contiene este texto")
+    parser.add_argument("--salida", help="Archivo JSON (por defecto bench-<commit>-<escala>.json)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args(argv)
+
+    estudiantes, pagos = ESCALAS[args.escala]
+    estudiantes = args.estudiantes if args.estudiantes is not None else estudiantes
+    pagos = args.pagos if args.pagos is not None else pagos
+    commit, sucio = git_commit()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lectura_db = str(Path(tmp) / "lectura.db")
+        escritura_db = str(Path(tmp) / "escritura.db")
+        if args.base:
+            if not Path(args.base).exists():
+                print(f"No existe la base: {args.base}", file=sys.stderr)
+                return 2
+            shutil.copy(args.base, lectura_db)
+            with closing(sqlite3.connect(lectura_db)) as conn:
+                estudiantes = conn.execute("SELECT COUNT(*) FROM estudiante;").fetchone()[0]
+                pagos = conn.execute("SELECT COUNT(*) FROM pago;").fetchone()[0]
+        else:
+            print(f"Generando {estudiantes} estudiantes y {pagos} pagos (seed {args.seed})...", file=sys.stderr)
+            generar_base(lectura_db, str(Path(args.db).resolve()), estudiantes, pagos, args.seed)
+        version = apply_migrations(lectura_db)
+        close_all_pools()
+        shutil.copy(lectura_db, escritura_db)
+
+        try:
+            resultados, omitidas = ejecutar(lectura_db, escritura_db, args.seed, args.repeticiones,
+                                            args.presupuesto, args.sin_cache, args.solo)
+        finally:
+            close_all_pools()
+
+    resultado = {
+        "meta": {
+            "commit": commit,
+            "cambios_sin_commit": sucio,
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+            "escala": None if args.base or args.estudiantes is not None or args.pagos is not None else args.escala,
+            "estudiantes": estudiantes,
+            "pagos": pagos,
+            "seed": args.seed,
+            "esquema": version,
+            "repeticiones": args.repeticiones,
+            "presupuesto_s": args.presupuesto,
+            "sin_cache": args.sin_cache,
+        },
+        "resultados": resultados,
+        "omitidas": omitidas,
+    }
+    salida = args.salida or f"bench-{commit or 'local'}-{resultado['meta']['escala'] or estudiantes}.json"
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+    print(f"{len(resultados)} funciones medidas, {len(omitidas)} omitidas; resultado en {salida}")
+    for nombre, motivo in omitidas.items():
+        print(f"  omitida {nombre}: {motivo}")
+
+    if args.comparar:
+        try:
+            with open(args.comparar, encoding="utf-8") as archivo:
+                comparar(resultado, json.load(archivo))
+        except (OSError, ValueError) as exc:
+            print(f"No se pudo leer {args.comparar}: {exc}", file=sys.stderr)
+            return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
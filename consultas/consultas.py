@@ -18,3 +18,14 @@ def create_consultas_tab(parent: tk.Widget, on_logout_callback=None) -> tk.Widge
     podrá inyectar servicios de datos definidos en consultas_db.
     """
     return ConsultasView(parent, on_logout_callback)
+
+
+def prefetch_consultas_data(db_path: str = "academia.db") -> None:
+    """Construye en segundo plano el índice de búsqueda antes de abrir la pestaña.
+
+    El índice se comparte por base de datos, así que la vista lo encuentra
+    listo (y la búsqueda de Ingresos también lo aprovecha).
+    """
+    from consultas.consultas_index import get_estudiantes_index
+
+    get_estudiantes_index(db_path)
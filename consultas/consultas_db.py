@@ -1,15 +1,15 @@
-from typing import List, Optional, Tuple
-import sqlite3
-from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from database.catalog_cache import cached_catalog
+from database.fts import build_match_query, has_student_fts
+from database.pool import get_connection
+from database.saldos import SALDO_TABLE, has_saldos
 
 
 def fetch_estudiantes_for_autocomplete(db_path: str = "academia.db") -> List[Tuple[int, str]]:
     """Retorna lista de (estudiante_id, nombre_completo) para autocompletado."""
     try:
-        if not Path(db_path).exists():
-            return []
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -21,8 +21,6 @@ def fetch_estudiantes_for_autocomplete(db_path: str = "academia.db") -> List[Tup
                 """
             )
             return cur.fetchall()
-        finally:
-            conn.close()
     except Exception:
         return []
 
@@ -30,10 +28,7 @@ def fetch_estudiantes_for_autocomplete(db_path: str = "academia.db") -> List[Tup
 def fetch_estudiante_complete_data(estudiante_id: int, db_path: str = "academia.db") -> Optional[Tuple[str, str, str, str]]:
     """Retorna (nombre_completo, grado, telefono, institucion) para el estudiante dado."""
     try:
-        if not Path(db_path).exists():
-            return None
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -51,19 +46,40 @@ def fetch_estudiante_complete_data(estudiante_id: int, db_path: str = "academia.
             if row is None:
                 return None
             return row
-        finally:
-            conn.close()
     except Exception:
         return None
 
 
 def search_estudiantes_by_name(search_text: str, db_path: str = "academia.db") -> List[Tuple[int, str]]:
-    """Busca estudiantes por nombre/apellido que contengan el texto de búsqueda."""
-    try:
-        if not Path(db_path).exists():
+    """Busca estudiantes por nombre/apellido que coincidan con el texto de búsqueda.
+
+    Con FTS5 disponible cada palabra se busca como prefijo (sin distinguir
+    tildes) y los resultados se ordenan por relevancia; si no, se usa una
+    búsqueda por subcadena con LIKE.
+    """
+    if has_student_fts(db_path):
+        match = build_match_query(search_text, columns=("nombre", "apellido"))
+        if match is None:
             return []
-        conn = sqlite3.connect(db_path)
         try:
+            with get_connection(db_path) as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """
+                    SELECT e.estudiante_id,
+                           TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS nombre_completo
+                    FROM estudiante_fts f
+                    JOIN estudiante e ON e.estudiante_id = f.rowid
+                    WHERE estudiante_fts MATCH ?
+                    ORDER BY bm25(estudiante_fts), nombre_completo ASC;
+                    """,
+                    (match,)
+                )
+                return cur.fetchall()
+        except Exception:
+            pass  # Continuar con la búsqueda LIKE
+    try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             search_pattern = f"%{search_text.strip()}%"
             cur.execute(
@@ -77,19 +93,15 @@ def search_estudiantes_by_name(search_text: str, db_path: str = "academia.db") -
                 (search_pattern,)
             )
             return cur.fetchall()
-        finally:
-            conn.close()
     except Exception:
         return []
 
 
+@cached_catalog("concepto_pago")
 def fetch_conceptos_pago_for_solvency(db_path: str = "academia.db") -> List[Tuple[int, str]]:
     """Retorna lista de (concepto_pago_id, nombre) para la tabla de solvencia."""
     try:
-        if not Path(db_path).exists():
-            return []
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -99,8 +111,6 @@ def fetch_conceptos_pago_for_solvency(db_path: str = "academia.db") -> List[Tupl
                 """
             )
             return cur.fetchall()
-        finally:
-            conn.close()
     except Exception:
         return []
 
@@ -108,10 +118,7 @@ def fetch_conceptos_pago_for_solvency(db_path: str = "academia.db") -> List[Tupl
 def fetch_pagos_by_estudiante_and_concepto(estudiante_id: int, concepto_pago_id: int, db_path: str = "academia.db") -> List[float]:
     """Retorna lista de montos pagados por un estudiante para un concepto específico."""
     try:
-        if not Path(db_path).exists():
-            return []
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -123,14 +130,92 @@ def fetch_pagos_by_estudiante_and_concepto(estudiante_id: int, concepto_pago_id:
                 (estudiante_id, concepto_pago_id)
             )
             return [row[0] for row in cur.fetchall()]
-        finally:
-            conn.close()
     except Exception:
         return []
 
 
-def check_solvency_status(estudiante_id: int, db_path: str = "academia.db") -> Tuple[bool, str]:
-    """Verifica el estado de solvencia del estudiante basado en el mes actual."""
+def fetch_totales_pagados_by_estudiante(estudiante_id: int, db_path: str = "academia.db") -> Dict[int, float]:
+    """Retorna {concepto_pago_id: total_pagado} para un estudiante en una sola consulta.
+
+    Solo incluye conceptos con al menos un pago registrado. Con la tabla de
+    saldos (database.saldos) es una lectura por clave; si no existe se suma
+    la tabla pago.
+    """
+    try:
+        with get_connection(db_path) as conn:
+            cur = conn.cursor()
+            if has_saldos(db_path):
+                cur.execute(
+                    f"""
+                    SELECT concepto_pago_id, total
+                    FROM {SALDO_TABLE}
+                    WHERE estudiante_id = ?;
+                    """,
+                    (estudiante_id,)
+                )
+            else:
+                cur.execute(
+                    """
+                    SELECT concepto_pago_id, COALESCE(SUM(monto), 0)
+                    FROM pago
+                    WHERE estudiante_id = ?
+                    GROUP BY concepto_pago_id;
+                    """,
+                    (estudiante_id,)
+                )
+            return {int(concepto_id): float(total) for concepto_id, total in cur.fetchall() if concepto_id is not None}
+    except Exception:
+        return {}
+
+
+def fetch_solvencia_por_grado(grado_id: int, concepto_pago_id: int, db_path: str = "academia.db") -> List[Tuple[int, str, float, Optional[str]]]:
+    """Retorna (estudiante_id, nombre_completo, total_pagado, fecha_ultimo_pago) de cada estudiante del grado.
+
+    Incluye a quienes no pagaron el concepto (total 0 y fecha None),
+    ordenados por nombre. Con la tabla de saldos cada estudiante es una
+    lectura por clave.
+    """
+    if has_saldos(db_path):
+        pagado = f"""
+            LEFT JOIN {SALDO_TABLE} s
+                ON s.estudiante_id = e.estudiante_id AND s.concepto_pago_id = ?
+        """
+    else:
+        pagado = """
+            LEFT JOIN (
+                SELECT estudiante_id, SUM(monto) AS total, MAX(fecha) AS last_fecha
+                FROM pago
+                WHERE concepto_pago_id = ?
+                GROUP BY estudiante_id
+            ) s ON s.estudiante_id = e.estudiante_id
+        """
+    try:
+        with get_connection(db_path) as conn:
+            cur = conn.cursor()
+            cur.execute(
+                f"""
+                SELECT e.estudiante_id,
+                       TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS nombre_completo,
+                       COALESCE(s.total, 0),
+                       s.last_fecha
+                FROM estudiante e
+                {pagado}
+                WHERE e.grado_id = ?
+                ORDER BY nombre_completo ASC;
+                """,
+                (concepto_pago_id, grado_id)
+            )
+            return [(int(i), nombre, float(total), fecha) for i, nombre, total, fecha in cur.fetchall()]
+    except Exception:
+        return []
+
+
+def check_solvency_status(estudiante_id: int, db_path: str = "academia.db", totales: Optional[Dict[int, float]] = None) -> Tuple[bool, str]:
+    """Verifica el estado de solvencia del estudiante basado en el mes actual.
+
+    Si se pasa `totales` (resultado de fetch_totales_pagados_by_estudiante)
+    se reutiliza en lugar de consultar de nuevo la base de datos.
+    """
     from datetime import datetime
     
     try:
@@ -157,10 +242,11 @@ def check_solvency_status(estudiante_id: int, db_path: str = "academia.db") -> T
             return False, "No Solvente"
         
         concepto_id = month_concept_map[current_month]
-        pagos = fetch_pagos_by_estudiante_and_concepto(estudiante_id, concepto_id, db_path)
+        if totales is None:
+            totales = fetch_totales_pagados_by_estudiante(estudiante_id, db_path)
         
         # Si hay pagos para el mes actual, está solvente
-        if pagos:
+        if concepto_id in totales:
             return True, "Solvente"
         else:
             return False, "No Solvente"
@@ -169,13 +255,11 @@ def check_solvency_status(estudiante_id: int, db_path: str = "academia.db") -> T
         return False, "No Solvente"
 
 
+@cached_catalog("concepto_pago")
 def fetch_exam_conceptos_pago(db_path: str = "academia.db") -> List[Tuple[int, str]]:
     """Retorna lista de conceptos de pago para exámenes (asumiendo conceptos 13-17)."""
     try:
-        if not Path(db_path).exists():
-            return []
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -186,8 +270,6 @@ def fetch_exam_conceptos_pago(db_path: str = "academia.db") -> List[Tuple[int, s
                 """
             )
             return cur.fetchall()
-        finally:
-            conn.close()
     except Exception:
         return []
 
@@ -195,10 +277,7 @@ def fetch_exam_conceptos_pago(db_path: str = "academia.db") -> List[Tuple[int, s
 def fetch_calificaciones_by_estudiante(estudiante_id: int, db_path: str = "academia.db") -> Optional[Tuple[float, float, float, float]]:
     """Retorna las calificaciones del estudiante: (nota_uno, nota_dos, nota_tres, nota_cuatro)."""
     try:
-        if not Path(db_path).exists():
-            return None
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -214,12 +293,66 @@ def fetch_calificaciones_by_estudiante(estudiante_id: int, db_path: str = "acade
             if row is None:
                 return None
             return (float(row[0] or 0), float(row[1] or 0), float(row[2] or 0), float(row[3] or 0))
-        finally:
-            conn.close()
     except Exception:
         return None
 
 
+def fetch_estudiante_resumen(estudiante_id: int, db_path: str = "academia.db") -> Optional[Dict[str, object]]:
+    """Reúne todo lo que muestra la consulta de un estudiante usando una sola conexión.
+
+    Retorna None si el estudiante no existe. Claves: datos
+    (fetch_estudiante_complete_data), totales, conceptos, examenes,
+    calificaciones y solvencia (resultado de check_solvency_status).
+    """
+    try:
+        with get_connection(db_path):
+            # Las funciones internas reutilizan la conexión de este hilo
+            datos = fetch_estudiante_complete_data(estudiante_id, db_path)
+            if not datos:
+                return None
+            totales = fetch_totales_pagados_by_estudiante(estudiante_id, db_path)
+            return {
+                "datos": datos,
+                "totales": totales,
+                "conceptos": fetch_conceptos_pago_for_solvency(db_path),
+                "examenes": fetch_exam_conceptos_pago(db_path),
+                "calificaciones": fetch_calificaciones_by_estudiante(estudiante_id, db_path),
+                "solvencia": check_solvency_status(estudiante_id, db_path, totales),
+            }
+    except Exception:
+        return None
+
+
+async def fetch_estudiante_complete_data_async(estudiante_id: int, db_path: str = "academia.db") -> Optional[Tuple[str, str, str, str]]:
+    """Versión asyncio de fetch_estudiante_complete_data (ver database.aio)."""
+    from database.aio import get_async_executor
+    return await get_async_executor().read(db_path, fetch_estudiante_complete_data, estudiante_id, db_path)
+
+
+async def fetch_estudiante_resumen_async(estudiante_id: int, db_path: str = "academia.db") -> Optional[Dict[str, object]]:
+    """Versión asyncio de fetch_estudiante_resumen (ver database.aio)."""
+    from database.aio import get_async_executor
+    return await get_async_executor().read(db_path, fetch_estudiante_resumen, estudiante_id, db_path)
+
+
+async def fetch_totales_pagados_by_estudiante_async(estudiante_id: int, db_path: str = "academia.db") -> Dict[int, float]:
+    """Versión asyncio de fetch_totales_pagados_by_estudiante (ver database.aio)."""
+    from database.aio import get_async_executor
+    return await get_async_executor().read(db_path, fetch_totales_pagados_by_estudiante, estudiante_id, db_path)
+
+
+async def check_solvency_status_async(estudiante_id: int, db_path: str = "academia.db", totales: Optional[Dict[int, float]] = None) -> Tuple[bool, str]:
+    """Versión asyncio de check_solvency_status (ver database.aio)."""
+    from database.aio import get_async_executor
+    return await get_async_executor().read(db_path, check_solvency_status, estudiante_id, db_path, totales)
+
+
+async def fetch_solvencia_por_grado_async(grado_id: int, concepto_pago_id: int, db_path: str = "academia.db") -> List[Tuple[int, str, float, Optional[str]]]:
+    """Versión asyncio de fetch_solvencia_por_grado (ver database.aio)."""
+    from database.aio import get_async_executor
+    return await get_async_executor().read(db_path, fetch_solvencia_por_grado, grado_id, concepto_pago_id, db_path)
+
+
 def calculate_average(notas: Tuple[float, float, float, float]) -> float:
     """Calcula el promedio de las 4 notas."""
     return sum(notas) / 4.0 if notas else 0.0
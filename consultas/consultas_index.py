@@ -0,0 +1,232 @@
+"""
+Índice en memoria para el autocompletado de estudiantes.
+
+Guarda los tokens normalizados (minúsculas, sin tildes) de nombre y apellido
+en un arreglo ordenado, de modo que una búsqueda por prefijo es una búsqueda
+binaria en lugar de un `LIKE '%texto%'` sobre toda la tabla. El índice se
+comparte por base de datos y se actualiza de forma incremental cuando
+ingresos_db inserta, modifica o elimina estudiantes.
+"""
+
+import heapq
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from consultas.consultas_db import fetch_estudiantes_for_autocomplete
+
+
+@lru_cache(maxsize=65536)
+def _fold_word(word: str) -> str:
+    if word.isascii():
+        return word.lower()
+    decomposed = unicodedata.normalize("NFKD", word)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def normalize_text(text: str) -> str:
+    """Convierte a minúsculas, elimina tildes/diacríticos y colapsa espacios."""
+    # Los nombres se repiten mucho, por eso se guarda en caché cada palabra
+    return " ".join(_fold_word(word) for word in (text or "").split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Divide un texto normalizado en palabras."""
+    return normalize_text(text).split()
+
+
+def format_nombre_completo(nombre: Optional[str], apellido: Optional[str]) -> str:
+    """Replica `TRIM(COALESCE(nombre, '')) || ' ' || TRIM(COALESCE(apellido, ''))`."""
+    return f"{(nombre or '').strip(' ')} {(apellido or '').strip(' ')}"
+
+
+class EstudianteSearchIndex:
+    """Índice de prefijos sobre los nombres completos de los estudiantes.
+
+    `_entries` guarda `(token, nombre_normalizado, id)` ordenado, así que las
+    entradas de un mismo token ya están en orden alfabético de nombre y los
+    primeros resultados se obtienen mezclando pocos tramos ordenados.
+    `_ordered` guarda `(nombre_normalizado, id)` para prefijos muy cortos que
+    abarcan demasiados tokens distintos.
+    """
+
+    # Máximo de tokens distintos a mezclar antes de recorrer `_ordered`
+    MAX_RUNS = 32
+
+    def __init__(self, rows: Iterable[Tuple[int, str]] = ()):
+        self._lock = threading.Lock()
+        self._names: Dict[int, str] = {}
+        self._tokens: Dict[int, Tuple[str, ...]] = {}
+        self._sort_keys: Dict[int, Tuple[str, int]] = {}
+        self._entries: List[Tuple[str, str, int]] = []
+        self._ordered: List[Tuple[str, int]] = []
+        # Aumenta con cada cambio; permite saber si una copia derivada quedó vieja
+        self.version = 0
+        self._load(rows)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _load(self, rows: Iterable[Tuple[int, str]]) -> None:
+        entries: List[Tuple[str, str, int]] = []
+        for estudiante_id, nombre_completo in rows:
+            if not nombre_completo.strip():
+                continue
+            estudiante_id = int(estudiante_id)
+            tokens = self._register(estudiante_id, nombre_completo)
+            normalized = self._sort_keys[estudiante_id][0]
+            entries.extend((token, normalized, estudiante_id) for token in tokens)
+        entries.sort()
+        self._entries = entries
+        self._ordered = sorted(self._sort_keys.values())
+
+    def _register(self, estudiante_id: int, nombre_completo: str) -> Tuple[str, ...]:
+        normalized = normalize_text(nombre_completo)
+        tokens = tuple(dict.fromkeys(normalized.split()))
+        self._names[estudiante_id] = nombre_completo
+        self._tokens[estudiante_id] = tokens
+        self._sort_keys[estudiante_id] = (normalized, estudiante_id)
+        return tokens
+
+    @staticmethod
+    def _remove_sorted(items: list, item: tuple) -> None:
+        pos = bisect_left(items, item)
+        if pos < len(items) and items[pos] == item:
+            del items[pos]
+
+    def _unregister(self, estudiante_id: int) -> None:
+        sort_key = self._sort_keys.pop(estudiante_id, None)
+        if sort_key is None:
+            return
+        for token in self._tokens.pop(estudiante_id, ()):
+            self._remove_sorted(self._entries, (token, sort_key[0], estudiante_id))
+        self._remove_sorted(self._ordered, sort_key)
+        self._names.pop(estudiante_id, None)
+
+    def rebuild(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """Reemplaza todo el contenido del índice."""
+        with self._lock:
+            self._names.clear()
+            self._tokens.clear()
+            self._sort_keys.clear()
+            self._load(rows)
+            self.version += 1
+
+    def upsert(self, estudiante_id: int, nombre_completo: str) -> None:
+        """Agrega o actualiza un estudiante."""
+        with self._lock:
+            self._unregister(estudiante_id)
+            self.version += 1
+            if not nombre_completo.strip():
+                return
+            tokens = self._register(estudiante_id, nombre_completo)
+            sort_key = self._sort_keys[estudiante_id]
+            for token in tokens:
+                insort(self._entries, (token, sort_key[0], estudiante_id))
+            insort(self._ordered, sort_key)
+
+    def remove(self, estudiante_id: int) -> None:
+        """Elimina un estudiante del índice."""
+        with self._lock:
+            self._unregister(estudiante_id)
+            self.version += 1
+
+    def normalized_items(self) -> Tuple[int, List[Tuple[int, str]]]:
+        """Retorna (version, [(estudiante_id, nombre_normalizado), ...]) ordenado por id."""
+        with self._lock:
+            items = sorted((estudiante_id, key[0]) for estudiante_id, key in self._sort_keys.items())
+            return self.version, items
+
+    def _run(self, start: int, end: int) -> Iterator[Tuple[str, int]]:
+        entries = self._entries
+        for pos in range(start, end):
+            yield entries[pos][1:]
+
+    def search(self, text: str, limit: int = 5) -> List[Tuple[int, str]]:
+        """Retorna hasta `limit` (estudiante_id, nombre_completo) ordenados por nombre.
+
+        Cada palabra del texto debe ser prefijo de alguna palabra del nombre
+        o apellido, sin distinguir mayúsculas ni tildes.
+        """
+        query = tokenize(text)
+        if not query or limit <= 0:
+            return []
+        with self._lock:
+            # La palabra más larga es la más selectiva para el rango inicial
+            pivot = max(query, key=len)
+            others = list(query)
+            others.remove(pivot)
+
+            lo = bisect_left(self._entries, (pivot,))
+            hi = bisect_left(self._entries, (pivot + "\uffff",), lo)
+
+            # Separar el rango en tramos de un mismo token (ya ordenados por nombre)
+            runs = []
+            pos = lo
+            while pos < hi and len(runs) < self.MAX_RUNS:
+                end = bisect_left(self._entries, (self._entries[pos][0] + "\0",), pos, hi)
+                runs.append(self._run(pos, end))
+                pos = end
+
+            if pos < hi:
+                # Prefijo muy corto: recorrer todos los nombres en orden alfabético
+                candidates: Iterable[Tuple[str, int]] = self._ordered
+                others = query
+            else:
+                candidates = heapq.merge(*runs)
+
+            result: List[Tuple[int, str]] = []
+            seen = set()
+            for _, estudiante_id in candidates:
+                if estudiante_id in seen:
+                    continue
+                seen.add(estudiante_id)
+                tokens = self._tokens[estudiante_id]
+                if all(any(token.startswith(word) for token in tokens) for word in others):
+                    result.append((estudiante_id, self._names[estudiante_id]))
+                    if len(result) >= limit:
+                        break
+            return result
+
+
+_indexes: Dict[str, EstudianteSearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_estudiantes_index(db_path: str = "academia.db", refresh: bool = False) -> EstudianteSearchIndex:
+    """Retorna el índice compartido de db_path, construyéndolo en el primer uso."""
+    key = str(db_path)
+    index = _indexes.get(key)
+    if index is not None and not refresh:
+        return index
+    rows = fetch_estudiantes_for_autocomplete(db_path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = EstudianteSearchIndex(rows)
+            _indexes[key] = index
+        elif refresh:
+            index.rebuild(rows)
+        return index
+
+
+def index_upsert_estudiante(estudiante_id: int, nombre_completo: str, db_path: str = "academia.db") -> None:
+    """Actualiza un estudiante en el índice si este ya fue construido."""
+    index = _indexes.get(str(db_path))
+    if index is not None:
+        index.upsert(estudiante_id, nombre_completo)
+
+
+def index_remove_estudiante(estudiante_id: int, db_path: str = "academia.db") -> None:
+    """Quita un estudiante del índice si este ya fue construido."""
+    index = _indexes.get(str(db_path))
+    if index is not None:
+        index.remove(estudiante_id)
+
+
+def index_refresh(db_path: str = "academia.db") -> None:
+    """Reconstruye el índice si ya fue construido (por ejemplo tras una importación masiva)."""
+    if str(db_path) in _indexes:
+        get_estudiantes_index(db_path, refresh=True)
@@ -1,27 +1,29 @@
 import tkinter as tk
 from tkinter import ttk
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from consultas.consultas_db import (
-    fetch_estudiantes_for_autocomplete,
-    fetch_estudiante_complete_data,
     search_estudiantes_by_name,
-    fetch_conceptos_pago_for_solvency,
-    fetch_pagos_by_estudiante_and_concepto,
-    check_solvency_status,
-    fetch_exam_conceptos_pago,
-    fetch_calificaciones_by_estudiante,
+    fetch_estudiante_resumen,
     calculate_average,
     is_approved,
 )
+from consultas.consultas_index import EstudianteSearchIndex, get_estudiantes_index
+from database.executor import TkDispatcher
 
 
 class ConsultasView(ttk.Frame):
-    """Vista para consultar datos de estudiantes."""
+    """Vista para consultar datos de estudiantes.
+
+    La vista se crea una vez por proceso: `attach_user` la asocia a una
+    sesión y `detach_user` la limpia al cerrar sesión.
+    """
 
     def __init__(self, parent: tk.Widget, on_logout_callback=None):
         super().__init__(parent)
         self.on_logout_callback = on_logout_callback
+        self._usuario_id = 0
+        self._permisos = None
         
         # Configure the frame to expand and fill the available space
         self.pack(fill=tk.BOTH, expand=True)
@@ -34,19 +36,25 @@ class ConsultasView(ttk.Frame):
         style.configure("Large.TTreeview.Heading", font=("Segoe UI", 14, "bold"))
         
         # Variables para la búsqueda y autocompletado
-        self._estudiantes_data: List[Tuple[int, str]] = []
+        self._estudiantes_index: Optional[EstudianteSearchIndex] = None
         self._filtered_estudiantes: List[Tuple[int, str]] = []
         self._selected_estudiante_id: Optional[int] = None
         self.suggestions_toplevel = None
         self.suggestions_listbox = None
 
+        # Las consultas corren en segundo plano; los resultados vuelven al hilo de Tk
+        self._dispatcher = TkDispatcher(self)
+        self._dispatcher.add_busy_listener(self._on_db_busy)
+        self.bind("<Destroy>", self._on_destroy, add="+")
+
         self._build_header()
         self._build_layout()
         self._build_section1(self.center_frame)
         self._build_section2(self.center_frame)
         self._build_section3(self.center_frame)
-        self._load_estudiantes_data()
         self._setup_search_events()
+        # El índice se pide después del primer dibujo para no competir con él
+        self.after_idle(self._load_estudiantes_data)
 
     def _build_header(self) -> None:
         """Construye el encabezado."""
@@ -352,8 +360,49 @@ class ConsultasView(ttk.Frame):
         self.promedio_value_label.grid(row=5, column=2, sticky="ew", padx=1, pady=1)
 
     def _load_estudiantes_data(self) -> None:
-        """Carga los datos de estudiantes para la búsqueda."""
-        self._estudiantes_data = fetch_estudiantes_for_autocomplete("academia.db")
+        """Carga en segundo plano el índice en memoria de estudiantes para la búsqueda."""
+        self._dispatcher.submit(
+            get_estudiantes_index, "academia.db",
+            key="indice", on_success=self._set_estudiantes_index,
+        )
+
+    def _set_estudiantes_index(self, index: EstudianteSearchIndex) -> None:
+        self._estudiantes_index = index
+
+    def _on_db_busy(self, busy: bool) -> None:
+        """Muestra el cursor de espera mientras hay consultas pendientes."""
+        try:
+            self.configure(cursor="watch" if busy else "")
+        except tk.TclError:
+            pass
+
+    def _on_destroy(self, event: tk.Event) -> None:
+        if event.widget is self:
+            self._dispatcher.close()
+
+    # --- Sesión ------------------------------------------------------------
+
+    def attach_user(self, usuario_id: int, permisos=None) -> None:
+        """Asocia la vista a una sesión.
+
+        No hay datos que recargar: el índice de búsqueda se actualiza solo
+        cuando cambian los estudiantes.
+        """
+        self._usuario_id = usuario_id or 0
+        self._permisos = permisos
+
+    def detach_user(self) -> None:
+        """Desvincula la vista al cerrar sesión."""
+        self.reset()
+        self._usuario_id = 0
+        self._permisos = None
+
+    def reset(self) -> None:
+        """Quita el estudiante consultado y las sugerencias."""
+        self._hide_suggestions()
+        self._filtered_estudiantes = []
+        self._selected_estudiante_id = None
+        self._clear_all_fields()
 
     def _setup_search_events(self) -> None:
         """Configura los eventos para la búsqueda y autocompletado."""
@@ -374,9 +423,13 @@ class ConsultasView(ttk.Frame):
         
         search_text = self.entry_nombre.get().strip()
         
+        if self._estudiantes_index is None:
+            # El índice aún se está cargando
+            return
+        
         if len(search_text) >= 1:
             try:
-                self._filtered_estudiantes = search_estudiantes_by_name(search_text, "academia.db")
+                self._filtered_estudiantes = self._estudiantes_index.search(search_text, limit=5)
                 self._show_suggestions()
             except Exception as e:
                 print(f"Error en búsqueda: {e}")
@@ -566,35 +619,50 @@ class ConsultasView(ttk.Frame):
 
 
     def _load_estudiante_data(self, estudiante_id: int) -> None:
-        """Carga y muestra los datos del estudiante seleccionado."""
-        data = fetch_estudiante_complete_data(estudiante_id, "academia.db")
-        if data:
-            nombre_completo, grado, telefono, institucion = data
-            
-            # Limpiar campos
-            self._clear_readonly_fields()
-            
-            # Llenar campos (usando el método interno para campos readonly)
-            self._set_readonly_field(self.entry_grado, grado)
-            self._set_readonly_field(self.entry_telefono, telefono)
-            self._set_readonly_field(self.entry_institucion, institucion)
-            
-            self._selected_estudiante_id = estudiante_id
-            
-            # Actualizar tabla de solvencia
-            self._update_solvency_table(estudiante_id)
-            
-            # Actualizar estado de solvencia
-            self._update_solvency_status(estudiante_id)
-            
-            # Actualizar tabla de exámenes
-            self._update_exam_solvency_table(estudiante_id)
-            
-            # Actualizar tabla de notas
-            self._update_grades_table(estudiante_id)
-            
-            # Actualizar estado de notas
-            self._update_grades_status(estudiante_id)
+        """Carga en segundo plano los datos del estudiante seleccionado y los muestra."""
+        # Una selección nueva reemplaza a la que aún no terminó de cargar
+        self._dispatcher.submit(
+            fetch_estudiante_resumen, estudiante_id, "academia.db",
+            key="estudiante",
+            on_success=lambda resumen: self._show_estudiante_resumen(estudiante_id, resumen),
+        )
+
+    def _show_estudiante_resumen(self, estudiante_id: int, resumen: Optional[Dict[str, object]], mostrar_nombre: bool = False) -> None:
+        """Muestra el resultado de fetch_estudiante_resumen en las tres secciones."""
+        if not resumen:
+            return
+        nombre_completo, grado, telefono, institucion = resumen["datos"]
+        
+        if mostrar_nombre:
+            self.entry_nombre.delete(0, tk.END)
+            self.entry_nombre.insert(0, nombre_completo)
+        
+        # Limpiar campos
+        self._clear_readonly_fields()
+        
+        # Llenar campos (usando el método interno para campos readonly)
+        self._set_readonly_field(self.entry_grado, grado)
+        self._set_readonly_field(self.entry_telefono, telefono)
+        self._set_readonly_field(self.entry_institucion, institucion)
+        
+        self._selected_estudiante_id = estudiante_id
+        
+        totales = resumen["totales"]
+        
+        # Actualizar tabla de solvencia
+        self._update_solvency_table(resumen["conceptos"], totales)
+        
+        # Actualizar estado de solvencia
+        self._update_solvency_status(resumen["solvencia"])
+        
+        # Actualizar tabla de exámenes
+        self._update_exam_solvency_table(resumen["examenes"], totales)
+        
+        # Actualizar tabla de notas
+        self._update_grades_table(resumen["calificaciones"])
+        
+        # Actualizar estado de notas
+        self._update_grades_status(resumen["calificaciones"])
 
     def _clear_readonly_fields(self) -> None:
         """Limpia los campos de solo lectura."""
@@ -609,31 +677,25 @@ class ConsultasView(ttk.Frame):
         entry.insert(0, value)
         entry.config(state="readonly")
 
-    def _update_solvency_table(self, estudiante_id: int) -> None:
-        """Actualiza la tabla de solvencia con los datos del estudiante."""
+    def _update_solvency_table(self, conceptos: List[Tuple[int, str]], totales: Dict[int, float]) -> None:
+        """Actualiza la tabla de solvencia con los conceptos y totales pagados del estudiante."""
         # Limpiar la tabla
         for label in self.solvency_data_labels:
             label.config(text="")
         
-        # Obtener conceptos de pago
-        conceptos = fetch_conceptos_pago_for_solvency("academia.db")
-        
         # Mapeo de conceptos a columnas (asumiendo orden secuencial)
         for i, (concepto_id, concepto_nombre) in enumerate(conceptos):
             if i < len(self.solvency_data_labels):
-                # Obtener pagos para este concepto
-                pagos = fetch_pagos_by_estudiante_and_concepto(estudiante_id, concepto_id, "academia.db")
-                
-                if pagos:
+                if concepto_id in totales:
                     # Mostrar el monto total pagado
-                    total = sum(pagos)
+                    total = totales[concepto_id]
                     self.solvency_data_labels[i].config(text=f"Q{total:.2f}")
                 else:
                     self.solvency_data_labels[i].config(text="No pagado")
 
-    def _update_solvency_status(self, estudiante_id: int) -> None:
-        """Actualiza el estado de solvencia del estudiante."""
-        is_solvent, status_text = check_solvency_status(estudiante_id, "academia.db")
+    def _update_solvency_status(self, solvencia: Tuple[bool, str]) -> None:
+        """Actualiza el estado de solvencia (resultado de check_solvency_status)."""
+        is_solvent, status_text = solvencia
         
         self.solvency_status_label.config(text=status_text)
         
@@ -643,16 +705,13 @@ class ConsultasView(ttk.Frame):
         else:
             self.solvency_status_label.config(foreground="red", background="lightcoral")
 
-    def _update_exam_solvency_table(self, estudiante_id: int) -> None:
+    def _update_exam_solvency_table(self, conceptos: List[Tuple[int, str]], totales: Dict[int, float]) -> None:
         """Actualiza la tabla de solvencia de exámenes."""
         # Limpiar la tabla
         for concepto_label, estado_label in self.exam_data_labels:
             concepto_label.config(text="")
             estado_label.config(text="")
         
-        # Obtener conceptos de exámenes
-        conceptos = fetch_exam_conceptos_pago("academia.db")
-        
         # Llenar la tabla
         for i, (concepto_id, concepto_nombre) in enumerate(conceptos):
             if i < len(self.exam_data_labels):
@@ -662,16 +721,14 @@ class ConsultasView(ttk.Frame):
                 concepto_label.config(text=concepto_nombre)
                 
                 # Verificar si hay pagos
-                pagos = fetch_pagos_by_estudiante_and_concepto(estudiante_id, concepto_id, "academia.db")
-                
-                if pagos:
+                if concepto_id in totales:
                     # Mostrar el monto total pagado
-                    total = sum(pagos)
+                    total = totales[concepto_id]
                     estado_label.config(text=f"Q{total:.2f}")
                 else:
                     estado_label.config(text="0")
 
-    def _update_grades_table(self, estudiante_id: int) -> None:
+    def _update_grades_table(self, calificaciones: Optional[Tuple[float, float, float, float]]) -> None:
         """Actualiza la tabla de notas."""
         # Limpiar la tabla
         for nota_label, calif_label, estado_label in self.grades_data_labels:
@@ -679,9 +736,6 @@ class ConsultasView(ttk.Frame):
             estado_label.config(text="")
         self.promedio_value_label.config(text="")
         
-        # Obtener calificaciones del estudiante
-        calificaciones = fetch_calificaciones_by_estudiante(estudiante_id, "academia.db")
-        
         if calificaciones:
             nota_uno, nota_dos, nota_tres, nota_cuatro = calificaciones
             notas = [nota_uno, nota_dos, nota_tres, nota_cuatro]
@@ -704,10 +758,8 @@ class ConsultasView(ttk.Frame):
             promedio = calculate_average(calificaciones)
             self.promedio_value_label.config(text=f"{promedio:.1f}")
 
-    def _update_grades_status(self, estudiante_id: int) -> None:
+    def _update_grades_status(self, calificaciones: Optional[Tuple[float, float, float, float]]) -> None:
         """Actualiza el estado general de las notas."""
-        calificaciones = fetch_calificaciones_by_estudiante(estudiante_id, "academia.db")
-        
         if calificaciones:
             promedio = calculate_average(calificaciones)
             
@@ -761,6 +813,8 @@ class ConsultasView(ttk.Frame):
 
     def _clear_all_fields(self) -> None:
         """Limpia todos los campos del formulario."""
+        # Descartar una carga en curso para que no vuelva a llenar los campos
+        self._dispatcher.cancel("estudiante")
         self.entry_nombre.delete(0, tk.END)
         self.entry_grado.config(state="normal")
         self.entry_grado.delete(0, tk.END)
@@ -803,55 +857,35 @@ class ConsultasView(ttk.Frame):
             self.promedio_value_label.config(text="")
 
     def _search_estudiante_by_name(self, search_text: str) -> None:
-        """Busca un estudiante por nombre y carga sus datos."""
-        try:
-            # Buscar estudiantes que coincidan con el texto
-            resultados = search_estudiantes_by_name(search_text, "academia.db")
-            
-            if resultados:
-                # Si hay resultados, tomar el primero
-                estudiante_id, nombre_completo = resultados[0]
-                
-                # Cargar los datos del estudiante
-                datos = fetch_estudiante_complete_data(estudiante_id, "academia.db")
-                
-                if datos:
-                    nombre, grado, telefono, institucion = datos
-                    
-                    # Actualizar los campos
-                    self.entry_nombre.delete(0, tk.END)
-                    self.entry_nombre.insert(0, nombre)
-                    
-                    self.entry_grado.config(state="normal")
-                    self.entry_grado.delete(0, tk.END)
-                    self.entry_grado.insert(0, grado)
-                    self.entry_grado.config(state="readonly")
-                    
-                    self.entry_telefono.config(state="normal")
-                    self.entry_telefono.delete(0, tk.END)
-                    self.entry_telefono.insert(0, telefono)
-                    self.entry_telefono.config(state="readonly")
-                    
-                    self.entry_institucion.config(state="normal")
-                    self.entry_institucion.delete(0, tk.END)
-                    self.entry_institucion.insert(0, institucion)
-                    self.entry_institucion.config(state="readonly")
-                    
-                    # Actualizar las secciones 2 y 3
-                    self._update_solvency_table(estudiante_id)
-                    self._update_solvency_status(estudiante_id)
-                    self._update_exam_solvency_table(estudiante_id)
-                    self._update_grades_table(estudiante_id)
-                    self._update_grades_status(estudiante_id)
-                    
-                    print(f"DEBUG: Estudiante encontrado: {nombre}")
-                else:
-                    print(f"DEBUG: No se encontraron datos para el estudiante ID: {estudiante_id}")
-            else:
+        """Busca un estudiante por nombre y carga sus datos en segundo plano."""
+        index = self._estudiantes_index
+
+        def buscar():
+            # Índice por prefijo y búsqueda por subcadena en la base como respaldo
+            resultados = index.search(search_text, limit=1) if index is not None else []
+            if not resultados:
+                resultados = search_estudiantes_by_name(search_text, "academia.db")
+            if not resultados:
+                return None
+            # Si hay resultados, tomar el primero
+            estudiante_id, _ = resultados[0]
+            return estudiante_id, fetch_estudiante_resumen(estudiante_id, "academia.db")
+
+        def mostrar(resultado) -> None:
+            if resultado is None:
                 print(f"DEBUG: No se encontraron estudiantes con el nombre: {search_text}")
                 # Limpiar campos si no se encuentra nada
                 self._clear_all_fields()
-                
-        except Exception as e:
-            print(f"DEBUG: Error al buscar estudiante: {e}")
+                return
+            estudiante_id, resumen = resultado
+            if not resumen:
+                print(f"DEBUG: No se encontraron datos para el estudiante ID: {estudiante_id}")
+                return
+            self._show_estudiante_resumen(estudiante_id, resumen, mostrar_nombre=True)
+            print(f"DEBUG: Estudiante encontrado: {resumen['datos'][0]}")
+
+        def fallar(error: BaseException) -> None:
+            print(f"DEBUG: Error al buscar estudiante: {error}")
             self._clear_all_fields()
+
+        self._dispatcher.submit(buscar, key="estudiante", on_success=mostrar, on_error=fallar)
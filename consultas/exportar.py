@@ -0,0 +1,258 @@
+"""
+Exportación de pagos y calificaciones a CSV o JSON Lines.
+
+Las filas se leen con un solo SELECT y `fetchmany` por lotes, y cada lote
+se escribe antes de pedir el siguiente: la memoria usada no depende del
+tamaño de la tabla. Todo el archivo sale de una misma lectura consistente
+de la base aunque otros usuarios sigan registrando pagos.
+
+Filtros: rango de fechas (solo pagos, por la columna fecha) y grado (por
+nombre o número). Al escribir a un archivo se usa uno temporal que se
+renombra al terminar, así un proceso programado nunca deja un archivo a
+medias.
+
+Uso (por ejemplo desde cron):
+    python -m consultas.exportar pagos --desde 2025-01-01 --hasta 2025-01-31
+        [--grado "Primero Basico"] [--formato csv|jsonl] [--salida pagos.csv] [--db academia.db]
+    python -m consultas.exportar calificaciones --formato jsonl --salida notas.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from consultas.consultas_index import normalize_text
+from database.pool import get_connection
+from ingresos.ingresos_db import fetch_grados_with_ids
+
+
+# Configuración por defecto de la exportación
+EXPORT_SETTINGS = {
+    'batch_size': 1000,   # Filas por fetchmany
+}
+
+FORMATOS = ("csv", "jsonl")
+
+# tipo -> (columnas, SELECT sin WHERE ni ORDER BY, columna de fecha, orden)
+_EXPORTS = {
+    "pagos": (
+        ("pago_id", "fecha", "concepto", "monto", "estudiante_id", "estudiante", "grado", "usuario"),
+        """
+        SELECT p.pago_id,
+               p.fecha,
+               cp.nombre AS concepto,
+               p.monto,
+               p.estudiante_id,
+               TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS estudiante,
+               g.nombre AS grado,
+               u.nombre AS usuario
+        FROM pago p
+        LEFT JOIN concepto_pago cp ON cp.concepto_pago_id = p.concepto_pago_id
+        LEFT JOIN estudiante e ON e.estudiante_id = p.estudiante_id
+        LEFT JOIN grado g ON g.grado_id = e.grado_id
+        LEFT JOIN usuario u ON u.usuario_id = p.usuario_id
+        """,
+        "p.fecha",
+        "p.fecha ASC, p.pago_id ASC",
+    ),
+    "calificaciones": (
+        ("calificacion_id", "estudiante_id", "estudiante", "grado",
+         "nota_uno", "nota_dos", "nota_tres", "nota_cuatro", "promedio"),
+        """
+        SELECT c.calificacion_id,
+               c.estudiante_id,
+               TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS estudiante,
+               g.nombre AS grado,
+               c.nota_uno,
+               c.nota_dos,
+               c.nota_tres,
+               c.nota_cuatro,
+               (COALESCE(c.nota_uno, 0) + COALESCE(c.nota_dos, 0)
+                + COALESCE(c.nota_tres, 0) + COALESCE(c.nota_cuatro, 0)) / 4.0 AS promedio
+        FROM calificacion c
+        LEFT JOIN estudiante e ON e.estudiante_id = c.estudiante_id
+        LEFT JOIN grado g ON g.grado_id = e.grado_id
+        """,
+        None,
+        "c.calificacion_id ASC",
+    ),
+}
+
+
+def export_columns(tipo: str) -> Tuple[str, ...]:
+    """Columnas de la exportación, en el orden de cada fila."""
+    return _EXPORTS[tipo][0]
+
+
+def resolver_grado(texto: str, db_path: str = "academia.db") -> Optional[int]:
+    """grado_id a partir del nombre (sin importar mayúsculas ni tildes) o del número."""
+    clave = normalize_text(texto)
+    for grado_id, nombre in fetch_grados_with_ids(db_path):
+        if clave in (normalize_text(nombre), str(grado_id)):
+            return grado_id
+    return None
+
+
+def iter_export(
+    tipo: str,
+    db_path: str = "academia.db",
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    grado_id: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Iterator[List[tuple]]:
+    """Genera lotes de filas de la exportación `tipo` ("pagos" o "calificaciones").
+
+    desde y hasta (YYYY-MM-DD, inclusivos) solo aplican a pagos. Lanza
+    ValueError si el tipo o los filtros no son válidos; los errores de la
+    base se propagan para que quien exporta no confunda un fallo con un
+    archivo vacío.
+    """
+    if tipo not in _EXPORTS:
+        raise ValueError(f"Exportación desconocida: {tipo}")
+    _columnas, select, columna_fecha, orden = _EXPORTS[tipo]
+    condiciones: List[str] = []
+    params: List[object] = []
+    if desde or hasta:
+        if columna_fecha is None:
+            raise ValueError(f"La exportación de {tipo} no tiene fecha")
+        if desde:
+            condiciones.append(f"{columna_fecha} >= ?")
+            params.append(desde)
+        if hasta:
+            condiciones.append(f"{columna_fecha} <= ?")
+            params.append(hasta)
+    if grado_id is not None:
+        condiciones.append("e.grado_id = ?")
+        params.append(int(grado_id))
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    batch_size = max(1, int(batch_size or EXPORT_SETTINGS['batch_size']))
+    # Los filtros se validan arriba, antes de escribir nada; la lectura empieza con el primer lote
+    return _leer_lotes(db_path, f"{select} {where} ORDER BY {orden};", tuple(params), batch_size)
+
+
+def _leer_lotes(db_path: str, sql: str, params: tuple, batch_size: int) -> Iterator[List[tuple]]:
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+        cur.arraysize = batch_size
+        # El cursor avanza en la base a medida que se piden lotes: no se materializa el resultado
+        cur.execute(sql, params)
+        try:
+            while True:
+                lote = cur.fetchmany()
+                if not lote:
+                    break
+                yield lote
+        finally:
+            cur.close()
+
+
+def escribir_lotes(lotes: Iterator[Sequence[tuple]], columnas: Sequence[str], destino: TextIO, formato: str = "csv") -> int:
+    """Escribe los lotes en destino en formato csv o jsonl; retorna las filas escritas."""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato}")
+    filas = 0
+    if formato == "csv":
+        escritor = csv.writer(destino)
+        escritor.writerow(columnas)
+        for lote in lotes:
+            escritor.writerows(lote)
+            filas += len(lote)
+    else:
+        for lote in lotes:
+            destino.write("".join(
+                json.dumps(dict(zip(columnas, fila)), ensure_ascii=False) + "\n" for fila in lote
+            ))
+            filas += len(lote)
+    return filas
+
+
+def exportar(
+    tipo: str,
+    destino: TextIO,
+    formato: str = "csv",
+    db_path: str = "academia.db",
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    grado_id: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> int:
+    """Exporta `tipo` a un archivo abierto en modo texto; retorna las filas escritas."""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato}")
+    lotes = iter_export(tipo, db_path, desde, hasta, grado_id, batch_size)
+    return escribir_lotes(lotes, export_columns(tipo), destino, formato)
+
+
+def exportar_a_archivo(tipo: str, ruta: str, formato: Optional[str] = None, **filtros) -> int:
+    """Exporta a ruta mediante un archivo temporal que se renombra al terminar.
+
+    Si no se indica formato se deduce de la extensión (.jsonl, o csv).
+    filtros son los argumentos con nombre de `exportar`.
+    """
+    formato = formato or ("jsonl" if Path(ruta).suffix.lower() in (".jsonl", ".ndjson") else "csv")
+    directorio = Path(ruta).resolve().parent
+    fd, temporal = tempfile.mkstemp(dir=directorio, prefix=".exportar-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as archivo:
+            filas = exportar(tipo, archivo, formato, **filtros)
+        os.replace(temporal, ruta)
+        return filas
+    except BaseException:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
+        raise
+
+
+def _fecha(texto: str) -> str:
+    try:
+        return date.fromisoformat(texto).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha inválida (YYYY-MM-DD): {texto}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tipo", choices=sorted(_EXPORTS))
+    parser.add_argument("--salida", default="-", help="Archivo de destino (- para la salida estándar)")
+    parser.add_argument("--formato", choices=FORMATOS, help="Por defecto según la extensión de --salida, o csv")
+    parser.add_argument("--desde", type=_fecha, help="Primera fecha incluida (solo pagos)")
+    parser.add_argument("--hasta", type=_fecha, help="Última fecha incluida (solo pagos)")
+    parser.add_argument("--grado", help="Nombre o número de grado")
+    parser.add_argument("--db", default="academia.db")
+    parser.add_argument("--lote", type=int, default=EXPORT_SETTINGS['batch_size'], help="Filas por lectura")
+    args = parser.parse_args(argv)
+
+    if not Path(args.db).exists():
+        print(f"No existe la base de datos: {args.db}", file=sys.stderr)
+        return 2
+    grado_id = None
+    if args.grado:
+        grado_id = resolver_grado(args.grado, args.db)
+        if grado_id is None:
+            print(f"Grado desconocido: {args.grado}", file=sys.stderr)
+            return 2
+
+    filtros = dict(db_path=args.db, desde=args.desde, hasta=args.hasta, grado_id=grado_id, batch_size=args.lote)
+    try:
+        if args.salida == "-":
+            filas = exportar(args.tipo, sys.stdout, args.formato or "csv", **filtros)
+        else:
+            filas = exportar_a_archivo(args.tipo, args.salida, args.formato, **filtros)
+    except Exception as exc:
+        print(f"No se pudo exportar: {exc}", file=sys.stderr)
+        return 2
+    print(f"{filas} filas de {args.tipo} exportadas", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
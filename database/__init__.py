@@ -0,0 +1 @@
+# Módulo de acceso a datos compartido
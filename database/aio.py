@@ -0,0 +1,242 @@
+"""
+Acceso a datos desde asyncio.
+
+Las funciones de datos son síncronas; `AsyncDBExecutor` las ejecuta en un
+número fijo de hilos lectores y entrega el resultado como awaitable, de modo
+que un proceso puede tener cientos de consultas en curso sin un hilo por
+consulta:
+
+- cada lector toma de la cola todas las lecturas pendientes (hasta
+  `batch_size`) y las ejecuta con una sola conexión del pool: el pool es
+  reentrante por hilo, así que las funciones reutilizan esa conexión en
+  lugar de pedir una cada una;
+- las escrituras van al hilo escritor de database.executor, el mismo que
+  usa la interfaz, para que siga habiendo un único escritor por proceso;
+  con la cola de database.write_queue activa ya hay un escritor único, y
+  las escrituras esperan su commit en hilos propios para poder agruparse;
+- `max_pending` limita las operaciones en curso por event loop: las demás
+  esperan en un semáforo sin ocupar la cola.
+
+Las versiones asyncio de las funciones más usadas están junto a las
+originales, con el sufijo `_async` (ingresos_db, consultas_db); importan
+este módulo al usarse para no cargar asyncio al iniciar la aplicación.
+"""
+
+import asyncio
+import atexit
+import functools
+import queue
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from database.executor import get_executor
+from database.pool import get_connection
+from database.write_queue import is_enabled as write_queue_enabled
+
+
+# Configuración por defecto del executor asyncio compartido
+AIO_SETTINGS = {
+    'readers': 2,          # Hilos lectores (cada uno usa una de las 4 conexiones del pool)
+    'batch_size': 32,      # Lecturas que comparten un préstamo de conexión
+    'max_pending': 1000,   # Operaciones en curso por event loop
+    'write_waiters': 64,   # Escrituras esperando el commit de la cola a la vez
+}
+
+
+class _Lectura:
+    __slots__ = ("db_path", "fn", "args", "kwargs", "loop", "future")
+
+    def __init__(self, db_path: str, fn: Callable, args: tuple, kwargs: dict, loop: asyncio.AbstractEventLoop, future: asyncio.Future):
+        self.db_path = db_path
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.loop = loop
+        self.future = future
+
+    def run(self) -> Optional[Tuple[asyncio.Future, bool, Any]]:
+        """Ejecuta la lectura; retorna (future, es_error, valor) o None si se canceló."""
+        if self.future.cancelled():
+            return None
+        try:
+            return self.future, False, self.fn(*self.args, **self.kwargs)
+        except BaseException as exc:
+            return self.future, True, exc
+
+
+def _entregar(resultados: List[Tuple[asyncio.Future, bool, Any]]) -> None:
+    """Completa en el event loop los futures de un lote."""
+    for future, es_error, valor in resultados:
+        if future.done():
+            continue
+        if es_error:
+            future.set_exception(valor)
+        else:
+            future.set_result(valor)
+
+
+class AsyncDBExecutor:
+    """Lectores que agrupan consultas por conexión más el escritor compartido."""
+
+    def __init__(self, readers: Optional[int] = None, batch_size: Optional[int] = None, max_pending: Optional[int] = None):
+        self.readers = max(1, int(readers or AIO_SETTINGS['readers']))
+        self.batch_size = max(1, int(batch_size or AIO_SETTINGS['batch_size']))
+        self.max_pending = max(1, int(max_pending or AIO_SETTINGS['max_pending']))
+        self._queue: "queue.SimpleQueue[Optional[_Lectura]]" = queue.SimpleQueue()
+        # asyncio.Semaphore queda ligado al primer loop que lo usa
+        self._limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._waiters: Optional[ThreadPoolExecutor] = None
+
+        # Contadores para monitoreo
+        self._reads = 0
+        self._batches = 0
+        self._checkouts = 0
+        self._largest_batch = 0
+        self._writes = 0
+
+        self._threads = [
+            threading.Thread(target=self._reader, name=f"db-aio-{i}", daemon=True) for i in range(self.readers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _limit(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limit = self._limits.get(loop)
+        if limit is None:
+            limit = self._limits[loop] = asyncio.Semaphore(self.max_pending)
+        return limit
+
+    async def read(self, db_path: str, fn: Callable, *args, **kwargs) -> Any:
+        """Ejecuta fn(*args, **kwargs) en un lector y retorna su resultado.
+
+        Las lecturas con el mismo db_path que coinciden en la cola comparten
+        una conexión; fn debe usar esa base.
+        """
+        async with self._limit():
+            if self._closed:
+                raise RuntimeError("AsyncDBExecutor cerrado")
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._queue.put(_Lectura(str(db_path), fn, args, kwargs, loop, future))
+            return await future
+
+    async def write(self, fn: Callable, *args, **kwargs) -> Any:
+        """Ejecuta fn(*args, **kwargs) en el hilo escritor de database.executor.
+
+        Con la cola de escrituras activa fn corre en hilos que solo esperan
+        su commit: en el hilo escritor cada lote sería de una escritura.
+        """
+        async with self._limit():
+            with self._lock:
+                self._writes += 1
+                if write_queue_enabled() and self._waiters is None:
+                    self._waiters = ThreadPoolExecutor(AIO_SETTINGS['write_waiters'], thread_name_prefix="db-aio-write")
+                waiters = self._waiters
+            if waiters is not None and write_queue_enabled():
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(waiters, functools.partial(fn, *args, **kwargs))
+            return await asyncio.wrap_future(get_executor().submit(fn, *args, write=True, **kwargs))
+
+    def _reader(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Se devuelve para que este hilo termine tras el lote
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[_Lectura]) -> None:
+        by_db: Dict[str, List[_Lectura]] = {}
+        for item in batch:
+            by_db.setdefault(item.db_path, []).append(item)
+        with self._lock:
+            self._reads += len(batch)
+            self._batches += 1
+            self._checkouts += len(by_db)
+            self._largest_batch = max(self._largest_batch, len(batch))
+
+        for db_path, items in by_db.items():
+            resultados: Dict[asyncio.AbstractEventLoop, list] = {}
+            with ExitStack() as stack:
+                try:
+                    conn = stack.enter_context(get_connection(db_path))
+                except Exception:
+                    # Sin base o sin conexiones libres: cada función maneja el error como siempre
+                    conn = None
+                for item in items:
+                    resultado = item.run()
+                    if resultado is not None:
+                        resultados.setdefault(item.loop, []).append(resultado)
+                    # Una lectura no debe dejar una transacción abierta a las siguientes
+                    if conn is not None and conn.in_transaction:
+                        conn.rollback()
+            # Un solo aviso por loop y préstamo: call_soon_threadsafe despierta al loop
+            for loop, lote in resultados.items():
+                try:
+                    loop.call_soon_threadsafe(_entregar, lote)
+                except RuntimeError:
+                    pass  # El event loop ya se cerró
+
+    def stats(self) -> Dict[str, float]:
+        """Lecturas, lotes y préstamos de conexión desde que se creó."""
+        with self._lock:
+            return {
+                "lecturas": self._reads,
+                "lotes": self._batches,
+                "prestamos": self._checkouts,
+                "lote_max": self._largest_batch,
+                "lecturas_por_prestamo": self._reads / self._checkouts if self._checkouts else 0.0,
+                "escrituras": self._writes,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Termina los lectores después de las lecturas ya encoladas."""
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        if self._waiters is not None:
+            self._waiters.shutdown(wait=wait)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+_executor: Optional[AsyncDBExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_async_executor() -> AsyncDBExecutor:
+    """Retorna el executor asyncio compartido, creándolo en el primer uso."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = AsyncDBExecutor()
+        return _executor
+
+
+def shutdown_async_executor(wait: bool = True) -> None:
+    """Detiene el executor compartido (se vuelve a crear si se usa otra vez)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+atexit.register(shutdown_async_executor)
@@ -0,0 +1,206 @@
+"""
+Caché de lectura para las tablas de catálogo (grado, concepto_pago, rol).
+
+Las funciones fetch_* de catálogos se decoran con `cached_catalog(tablas)`:
+la primera llamada lee la base y las siguientes reutilizan el resultado.
+Una entrada deja de valer cuando:
+
+- cambia el contador (database.changes) de alguna de sus tablas, porque
+  este proceso las modificó o se llamó a `invalidate_catalogs`;
+- vence el TTL y `PRAGMA data_version` indica que otra conexión (otro
+  proceso, o este mismo escribiendo en cualquier tabla) confirmó cambios
+  desde la lectura. Si data_version no cambió, la entrada se renueva sin
+  volver a leer.
+
+Se guardan como máximo `max_entries` entradas (se descarta la usada hace
+más tiempo). `catalog_cache_stats()` expone aciertos, fallos,
+revalidaciones, invalidaciones y descartes para monitoreo.
+"""
+
+import atexit
+import functools
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from database.changes import mark_changed, table_versions
+
+
+# Configuración por defecto de la caché de catálogos
+CATALOG_CACHE_SETTINGS = {
+    'enabled': True,
+    'ttl': 300.0,        # Segundos antes de revisar data_version
+    'max_entries': 64,   # Entradas (función, base) guardadas como máximo
+}
+
+F = TypeVar("F", bound=Callable)
+
+
+class _Entry:
+    __slots__ = ("value", "loaded_at", "versions", "data_version")
+
+    def __init__(self, value, loaded_at: float, versions: tuple, data_version: Optional[int]):
+        self.value = value
+        self.loaded_at = loaded_at
+        self.versions = versions
+        self.data_version = data_version
+
+
+class CatalogCache:
+    """Caché LRU con TTL de resultados de catálogos, segura entre hilos."""
+
+    def __init__(self):
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Una conexión de solo lectura por base para consultar data_version:
+        # el valor solo es comparable si se lee siempre desde la misma conexión
+        self._watchers: Dict[str, sqlite3.Connection] = {}
+        self._watchers_lock = threading.Lock()
+
+        # Contadores para monitoreo
+        self._hits = 0
+        self._misses = 0
+        self._revalidated = 0
+        self._invalidated = 0
+        self._evicted = 0
+
+    def _data_version(self, db_path: str) -> Optional[int]:
+        with self._watchers_lock:
+            conn = self._watchers.get(db_path)
+            try:
+                if conn is None:
+                    if not Path(db_path).exists():
+                        return None
+                    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+                    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+                    self._watchers[db_path] = conn
+                return int(conn.execute("PRAGMA data_version;").fetchone()[0])
+            except sqlite3.Error:
+                self._watchers.pop(db_path, None)
+                return None
+
+    def get(self, db_path: str, name: str, tables: Tuple[str, ...], loader: Callable[[], object]):
+        """Retorna el valor guardado para (db_path, name) o lo lee con loader().
+
+        Los resultados vacíos no se guardan: las funciones de catálogo
+        retornan [] también cuando la lectura falla.
+        """
+        db_path = str(db_path)
+        key = (db_path, name)
+        versions = table_versions(db_path, tables)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.versions != versions:
+                del self._entries[key]
+                self._invalidated += 1
+                entry = None
+            if entry is not None and now - entry.loaded_at < CATALOG_CACHE_SETTINGS['ttl']:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.value
+
+        # Leer data_version antes de cargar: un cambio durante la carga
+        # hará que la próxima revisión vuelva a leer
+        data_version = self._data_version(db_path)
+        if entry is not None and data_version is not None and data_version == entry.data_version:
+            with self._lock:
+                entry.loaded_at = now
+                self._revalidated += 1
+                self._hits += 1
+                return entry.value
+
+        value = loader()
+        with self._lock:
+            self._misses += 1
+            if value:
+                self._entries[key] = _Entry(value, now, versions, data_version)
+                self._entries.move_to_end(key)
+                while len(self._entries) > max(1, int(CATALOG_CACHE_SETTINGS['max_entries'])):
+                    self._entries.popitem(last=False)
+                    self._evicted += 1
+        return value
+
+    def invalidate(self, db_path: Optional[str] = None) -> None:
+        """Descarta las entradas de db_path (o todas si es None)."""
+        with self._lock:
+            keys = [key for key in self._entries if db_path is None or key[0] == str(db_path)]
+            for key in keys:
+                del self._entries[key]
+            self._invalidated += len(keys)
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna contadores de la caché para monitoreo."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": int(CATALOG_CACHE_SETTINGS['max_entries']),
+                "hits": self._hits,
+                "misses": self._misses,
+                "revalidated": self._revalidated,
+                "invalidated": self._invalidated,
+                "evicted": self._evicted,
+            }
+
+    def close(self) -> None:
+        """Vacía la caché y cierra las conexiones de data_version."""
+        self.invalidate()
+        with self._watchers_lock:
+            watchers, self._watchers = self._watchers, {}
+        for conn in watchers.values():
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+_cache = CatalogCache()
+
+
+def get_catalog_cache() -> CatalogCache:
+    return _cache
+
+
+def cached_catalog(*tables: str) -> Callable[[F], F]:
+    """Decora una función fetch_*(db_path) de catálogo con la caché compartida.
+
+    tables son las tablas que lee; la función sin caché queda en __wrapped__.
+    """
+    def decorator(func: F) -> F:
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(db_path: str = "academia.db"):
+            if not CATALOG_CACHE_SETTINGS['enabled']:
+                return func(db_path)
+            value = _cache.get(db_path, name, tables, lambda: func(db_path))
+            # Copia: quien llama puede modificar la lista sin afectar la caché
+            return list(value)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def invalidate_catalogs(db_path: Optional[str] = None, *tables: str) -> None:
+    """Fuerza a releer catálogos.
+
+    Con tablas, las marca como modificadas (database.changes): se descartan
+    las entradas que las leen y las vistas que dependen de ellas también
+    lo notan. Sin tablas, descarta todas las entradas de db_path (o de todas
+    las bases si es None).
+    """
+    if tables and db_path is not None:
+        mark_changed(db_path, *tables)
+    else:
+        _cache.invalidate(db_path)
+
+
+def catalog_cache_stats() -> Dict[str, int]:
+    return _cache.stats()
+
+
+atexit.register(_cache.close)
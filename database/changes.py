@@ -0,0 +1,43 @@
+"""
+Contadores de cambios por tabla.
+
+Los módulos *_db llaman a `mark_changed` después de confirmar una
+escritura. Las vistas guardan los contadores de las tablas de las que
+depende cada dato que muestran y, cuando se reutilizan en otra sesión,
+solo vuelven a consultar lo que cambió. Solo se registran los cambios
+hechos por este proceso.
+"""
+
+import threading
+from typing import Dict, Iterable, Tuple
+
+
+_versions: Dict[Tuple[str, str], int] = {}
+_versions_lock = threading.Lock()
+
+
+def mark_changed(db_path: str, *tables: str) -> None:
+    """Registra que las tablas indicadas de db_path fueron modificadas."""
+    with _versions_lock:
+        for table in tables:
+            key = (str(db_path), table)
+            _versions[key] = _versions.get(key, 0) + 1
+
+
+def table_versions(db_path: str, tables: Iterable[str]) -> Tuple[int, ...]:
+    """Contadores actuales de las tablas, en el mismo orden."""
+    with _versions_lock:
+        return tuple(_versions.get((str(db_path), table), 0) for table in tables)
+
+
+def db_versions(db_path: str) -> Dict[str, int]:
+    """Contadores de todas las tablas de db_path modificadas por este proceso."""
+    key = str(db_path)
+    with _versions_lock:
+        return {table: version for (path, table), version in _versions.items() if path == key}
+
+
+def changed_tables(db_path: str, before: Dict[str, int]) -> Tuple[str, ...]:
+    """Tablas de db_path cuyo contador cambió respecto de `before` (ver db_versions)."""
+    current = db_versions(db_path)
+    return tuple(sorted(table for table, version in current.items() if before.get(table, 0) != version))
@@ -0,0 +1,194 @@
+"""
+Ejecución de consultas fuera del hilo de Tk.
+
+`DBExecutor` separa las operaciones en un único hilo escritor (SQLite admite
+un escritor a la vez, así se evitan esperas por bloqueo entre escrituras) y
+varios hilos lectores. `TkDispatcher` envía trabajo al executor y entrega los
+resultados en el hilo de Tk: los hilos solo dejan el Future terminado en una
+cola y el hilo de Tk la vacía con `after()`, porque Tkinter no debe usarse
+desde otros hilos.
+
+Las solicitudes con la misma `key` se reemplazan entre sí: al enviar una
+nueva se cancela la anterior si aún no empezó y, si ya estaba corriendo, su
+resultado se descarta al llegar.
+"""
+
+import atexit
+import itertools
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Configuración por defecto del executor compartido
+EXECUTOR_SETTINGS = {
+    'readers': 2,            # Hilos lectores (el pool admite 4 conexiones por base)
+    'poll_interval_ms': 15,  # Frecuencia con que Tk revisa resultados pendientes
+}
+
+
+class DBExecutor:
+    """Hilo escritor único más un grupo de hilos lectores."""
+
+    def __init__(self, readers: int = 2):
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._readers = ThreadPoolExecutor(max_workers=max(1, int(readers)), thread_name_prefix="db-reader")
+
+    def submit(self, fn: Callable, *args, write: bool = False, **kwargs) -> Future:
+        """Ejecuta fn(*args, **kwargs) en el hilo escritor (write=True) o en un lector."""
+        pool = self._writer if write else self._readers
+        return pool.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._readers.shutdown(wait=wait, cancel_futures=True)
+        # Las escrituras ya encoladas se completan antes de cerrar
+        self._writer.shutdown(wait=wait)
+
+
+_executor: Optional[DBExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> DBExecutor:
+    """Retorna el executor compartido, creándolo en el primer uso."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = DBExecutor(EXECUTOR_SETTINGS['readers'])
+        return _executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """Detiene el executor compartido (se vuelve a crear si se usa otra vez)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+atexit.register(shutdown_executor)
+
+
+class TkDispatcher:
+    """Envía trabajo al DBExecutor y ejecuta los callbacks en el hilo de Tk.
+
+    Los listeners de `add_busy_listener` reciben True cuando empieza a haber
+    trabajo pendiente y False cuando termina, para mostrar un indicador de
+    carga.
+    """
+
+    def __init__(self, widget, executor: Optional[DBExecutor] = None, poll_interval_ms: Optional[int] = None):
+        self._widget = widget
+        self._executor = executor
+        self._poll_interval = int(poll_interval_ms or EXECUTOR_SETTINGS['poll_interval_ms'])
+        self._results: "queue.Queue[Tuple[int, Optional[str], Future, Optional[Callable], Optional[Callable]]]" = queue.Queue()
+        self._tickets = itertools.count(1)
+        self._latest: Dict[str, Tuple[int, Future]] = {}
+        self._pending = 0
+        self._after_id: Optional[str] = None
+        self._busy_listeners: List[Callable[[bool], None]] = []
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def add_busy_listener(self, callback: Callable[[bool], None]) -> None:
+        self._busy_listeners.append(callback)
+
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        on_success: Optional[Callable] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        key: Optional[str] = None,
+        write: bool = False,
+        **kwargs,
+    ) -> Optional[Future]:
+        """Ejecuta fn en segundo plano y llama on_success(resultado) en el hilo de Tk.
+
+        Solo debe llamarse desde el hilo de Tk.
+        """
+        if self._closed:
+            return None
+        if key is not None:
+            self.cancel(key)
+        executor = self._executor or get_executor()
+        ticket = next(self._tickets)
+        future = executor.submit(fn, *args, write=write, **kwargs)
+        if key is not None:
+            self._latest[key] = (ticket, future)
+        self._pending += 1
+        if self._pending == 1:
+            self._notify_busy(True)
+        future.add_done_callback(
+            lambda f: self._results.put((ticket, key, f, on_success, on_error))
+        )
+        self._schedule_poll()
+        return future
+
+    def cancel(self, key: str) -> None:
+        """Cancela la solicitud vigente con esa clave (su resultado se descarta)."""
+        latest = self._latest.pop(key, None)
+        if latest is not None:
+            latest[1].cancel()
+
+    def close(self) -> None:
+        """Descarta los resultados pendientes y deja de revisar la cola."""
+        self._closed = True
+        for _, future in self._latest.values():
+            future.cancel()
+        self._latest.clear()
+        if self._after_id is not None:
+            try:
+                self._widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _schedule_poll(self) -> None:
+        if self._after_id is None and not self._closed:
+            try:
+                self._after_id = self._widget.after(self._poll_interval, self._poll)
+            except Exception:
+                # El widget ya fue destruido
+                self._closed = True
+
+    def _poll(self) -> None:
+        self._after_id = None
+        while True:
+            try:
+                ticket, key, future, on_success, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if key is not None:
+                latest = self._latest.get(key)
+                if latest is None or latest[0] != ticket:
+                    continue  # Reemplazada por una solicitud más reciente
+                del self._latest[key]
+            if future.cancelled() or self._closed:
+                continue
+            error = future.exception()
+            try:
+                if error is not None:
+                    if on_error is not None:
+                        on_error(error)
+                elif on_success is not None:
+                    on_success(future.result())
+            except Exception as e:
+                print(f"Error en callback de base de datos: {e}")
+        if self._pending > 0:
+            self._schedule_poll()
+        else:
+            self._notify_busy(False)
+
+    def _notify_busy(self, busy: bool) -> None:
+        for callback in list(self._busy_listeners):
+            try:
+                callback(busy)
+            except Exception:
+                pass
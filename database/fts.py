@@ -0,0 +1,193 @@
+"""
+Búsqueda de texto completo (FTS5) opcional para la tabla estudiante.
+
+`estudiante_fts` es una tabla virtual de contenido externo que refleja
+nombre, apellido, institucion y telefono de `estudiante` y se mantiene
+sincronizada con triggers. Usa el tokenizador unicode61 sin diacríticos, por
+lo que "angela" encuentra "Ángela", e índices de prefijo para las búsquedas
+mientras se escribe.
+
+Si la versión de SQLite no incluye FTS5 se eliminan los triggers (para que
+las escrituras en `estudiante` sigan funcionando) y `has_student_fts`
+devuelve False, de modo que los módulos *_db usan su búsqueda con LIKE.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Sequence
+
+from database.pool import get_connection
+
+
+FTS_TABLE = "estudiante_fts"
+
+_CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    nombre, apellido, institucion, telefono,
+    content='estudiante',
+    content_rowid='estudiante_id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+"""
+
+_TRIGGERS = {
+    f"{FTS_TABLE}_ai": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON estudiante BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, nombre, apellido, institucion, telefono)
+            VALUES (new.estudiante_id, new.nombre, new.apellido, new.institucion, new.telefono);
+        END;
+    """,
+    f"{FTS_TABLE}_ad": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON estudiante BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, nombre, apellido, institucion, telefono)
+            VALUES ('delete', old.estudiante_id, old.nombre, old.apellido, old.institucion, old.telefono);
+        END;
+    """,
+    f"{FTS_TABLE}_au": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON estudiante BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, nombre, apellido, institucion, telefono)
+            VALUES ('delete', old.estudiante_id, old.nombre, old.apellido, old.institucion, old.telefono);
+            INSERT INTO {FTS_TABLE} (rowid, nombre, apellido, institucion, telefono)
+            VALUES (new.estudiante_id, new.nombre, new.apellido, new.institucion, new.telefono);
+        END;
+    """,
+}
+
+_fts_status: Dict[str, bool] = {}
+_fts_lock = threading.Lock()
+
+
+def fts5_supported(conn: sqlite3.Connection) -> bool:
+    """Verifica si la biblioteca SQLite en uso incluye el módulo FTS5."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x);")
+        conn.execute("DROP TABLE temp.fts5_probe;")
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def _existing_objects(conn: sqlite3.Connection) -> set:
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE name = ? OR (type = 'trigger' AND name LIKE ?);",
+        (FTS_TABLE, f"{FTS_TABLE}_%"),
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+def enable_student_fts(db_path: str = "academia.db") -> bool:
+    """Crea (o repara) la tabla FTS y sus triggers. Devuelve True si quedó activa.
+
+    Si la tabla existía sin triggers (por ejemplo tras usarse la aplicación
+    con un SQLite sin FTS5) se reconstruye el índice desde `estudiante`.
+    """
+    try:
+        with get_connection(db_path) as conn:
+            existing = _existing_objects(conn)
+            if not fts5_supported(conn):
+                # Sin FTS5 los triggers romperían cualquier escritura en estudiante
+                conn.execute("BEGIN;")
+                for name in _TRIGGERS:
+                    if name in existing:
+                        conn.execute(f"DROP TRIGGER {name};")
+                conn.commit()
+                active = False
+            else:
+                needs_rebuild = FTS_TABLE not in existing or not all(name in existing for name in _TRIGGERS)
+                conn.execute("BEGIN;")
+                conn.execute(_CREATE_TABLE)
+                for sql in _TRIGGERS.values():
+                    conn.execute(sql)
+                if needs_rebuild:
+                    conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild');")
+                conn.commit()
+                active = True
+    except Exception:
+        active = False
+    with _fts_lock:
+        _fts_status[str(db_path)] = active
+    return active
+
+
+@contextmanager
+def deferred_student_fts(conn: sqlite3.Connection) -> Iterator[None]:
+    """Indexa de una sola vez los estudiantes insertados dentro del bloque.
+
+    Debe usarse dentro de una transacción abierta con BEGIN IMMEDIATE (lee
+    el último estudiante_id antes de escribir; con WAL una transacción
+    diferida falla con "database is locked" si otra conexión escribe en el
+    medio): quita el trigger de inserción, y al salir agrega a la tabla FTS con un solo
+    INSERT ... SELECT las filas nuevas y vuelve a crear el trigger. Como el
+    DDL es transaccional, las demás conexiones nunca ven la tabla sin
+    trigger y un error revierte todo. Pensado para importaciones masivas,
+    donde el trigger fila por fila es varias veces más lento.
+    """
+    name = f"{FTS_TABLE}_ai"
+    if name not in _existing_objects(conn):
+        yield
+        return
+    # estudiante_id es AUTOINCREMENT: las filas nuevas quedan por encima del máximo actual
+    last_id = conn.execute("SELECT COALESCE(MAX(estudiante_id), 0) FROM estudiante;").fetchone()[0]
+    conn.execute(f"DROP TRIGGER {name};")
+    yield
+    conn.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, nombre, apellido, institucion, telefono) "
+        "SELECT estudiante_id, nombre, apellido, institucion, telefono FROM estudiante WHERE estudiante_id > ?;",
+        (last_id,),
+    )
+    conn.execute(_TRIGGERS[name])
+
+
+def disable_student_fts(db_path: str = "academia.db") -> None:
+    """Elimina la tabla FTS y sus triggers."""
+    try:
+        with get_connection(db_path) as conn:
+            conn.execute("BEGIN;")
+            for name in _TRIGGERS:
+                conn.execute(f"DROP TRIGGER IF EXISTS {name};")
+            conn.execute(f"DROP TABLE IF EXISTS {FTS_TABLE};")
+            conn.commit()
+    except Exception:
+        pass
+    with _fts_lock:
+        _fts_status[str(db_path)] = False
+
+
+def has_student_fts(db_path: str = "academia.db") -> bool:
+    """Indica si la búsqueda FTS está disponible para db_path."""
+    status = _fts_status.get(str(db_path))
+    if status is not None:
+        return status
+    try:
+        with get_connection(db_path) as conn:
+            existing = _existing_objects(conn)
+            status = (
+                FTS_TABLE in existing
+                and all(name in existing for name in _TRIGGERS)
+                and fts5_supported(conn)
+            )
+    except Exception:
+        status = False
+    with _fts_lock:
+        _fts_status[str(db_path)] = status
+    return status
+
+
+def build_match_query(text: str, columns: Optional[Sequence[str]] = None) -> Optional[str]:
+    """Convierte texto libre en una expresión MATCH de prefijos.
+
+    Cada palabra se escapa como cadena FTS5 y se busca como prefijo; todas
+    deben coincidir. Retorna None si el texto no contiene palabras.
+    """
+    words = [
+        word.replace('"', '""') for word in (text or "").split()
+        if any(ch.isalnum() for ch in word)
+    ]
+    if not words:
+        return None
+    expression = " AND ".join(f'"{word}"*' for word in words)
+    if columns:
+        return "{" + " ".join(columns) + "} : (" + expression + ")"
+    return expression
@@ -0,0 +1,397 @@
+"""
+Instrumentación de consultas del pool (database.pool).
+
+Las funciones de datos atrapan todas las excepciones y retornan [] o None,
+así que un error o una consulta lenta no se ven desde afuera. Con la
+instrumentación activa, el pool registra:
+
+- por función de datos (la que llama a get_connection): llamadas, errores
+  que salen del bloque `with`, filas leídas y un histograma de latencia;
+- por sentencia SQL (normalizada): lo mismo, medido en execute y en los
+  fetch del cursor, y las funciones que la ejecutan;
+- un registro de consultas lentas (más de slow_query_ms) con su EXPLAIN
+  QUERY PLAN, que además se escribe con logging.
+
+Está desactivada por defecto: las conexiones sin instrumentar son las de
+sqlite3 sin ninguna capa. `snapshot()` retorna todo en dicts y listas
+simples para un panel de diagnóstico o para guardarlo como JSON.
+"""
+
+import bisect
+import logging
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Configuración por defecto de la instrumentación
+INSTRUMENTATION_SETTINGS = {
+    'enabled': False,
+    'slow_query_ms': 100.0,     # Umbral del registro de consultas lentas
+    'explain_slow': True,       # Agregar EXPLAIN QUERY PLAN a las lentas
+    'slow_log_size': 50,        # Consultas lentas que se conservan
+    'max_statements': 500,      # Sentencias distintas; el resto se agrupa
+}
+
+# Límites superiores (ms) de los buckets del histograma; el último es "más"
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (0.1, 0.5, 1.0, 5.0, 10.0, 50.0, 100.0, 500.0, 1000.0)
+
+_OTRAS_SENTENCIAS = "<otras sentencias>"
+
+_ESPACIOS = re.compile(r"\s+")
+_LISTA_PARAMETROS = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+class _Stats:
+    __slots__ = ("calls", "errors", "rows", "total_ms", "max_ms", "buckets", "funciones")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.funciones: Optional[Set[str]] = None
+
+    def add(self, ms: float, rows: int, error: bool) -> None:
+        self.calls += 1
+        self.errors += int(error)
+        self.rows += rows
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+
+    def as_dict(self) -> Dict[str, object]:
+        datos = {
+            "llamadas": self.calls,
+            "errores": self.errors,
+            "filas": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "media_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "histograma": dict(zip([f"<={limite:g}ms" for limite in LATENCY_BUCKETS_MS] + ["mas"], self.buckets)),
+        }
+        if self.funciones is not None:
+            datos["funciones"] = sorted(self.funciones)
+        return datos
+
+
+_by_function: Dict[str, _Stats] = {}
+_by_statement: Dict[str, _Stats] = {}
+_slow_log: Deque[Dict[str, object]] = deque(maxlen=INSTRUMENTATION_SETTINGS['slow_log_size'])
+_stats_lock = threading.Lock()
+_local = threading.local()
+_since = datetime.now()
+# Texto SQL -> clave normalizada (las sentencias de los módulos *_db son pocas y fijas)
+_normalized: Dict[str, str] = {}
+
+
+def is_enabled() -> bool:
+    return bool(INSTRUMENTATION_SETTINGS['enabled'])
+
+
+def normalize_sql(sql: str) -> str:
+    """Clave de una sentencia: espacios colapsados y listas IN (?, ?, ...) de cualquier largo iguales."""
+    key = _normalized.get(sql)
+    if key is None:
+        key = _LISTA_PARAMETROS.sub("?, ...", _ESPACIOS.sub(" ", sql).strip())
+        if len(_normalized) >= 4 * INSTRUMENTATION_SETTINGS['max_statements']:
+            _normalized.clear()
+        _normalized[sql] = key
+    return key
+
+
+def _current_function() -> Optional[str]:
+    frames = getattr(_local, "frames", None)
+    return frames[-1].name if frames else None
+
+
+class _Frame:
+    """Una llamada en curso a get_connection: context manager que envuelve al del pool
+    y acumula las filas leídas y los cursores abiertos."""
+
+    __slots__ = ("name", "rows", "cursors", "_connection_cm", "_start")
+
+    def __init__(self, connection_cm, name: str):
+        self.name = name
+        self.rows = 0
+        self.cursors: List["InstrumentedCursor"] = []
+        self._connection_cm = connection_cm
+        self._start = 0.0
+
+    def __enter__(self) -> sqlite3.Connection:
+        frames = getattr(_local, "frames", None)
+        if frames is None:
+            frames = _local.frames = []
+        frames.append(self)
+        self._start = time.perf_counter()
+        try:
+            return self._connection_cm.__enter__()
+        except BaseException as exc:
+            frames.remove(self)
+            _record_function(self.name, (time.perf_counter() - self._start) * 1000, 0, isinstance(exc, Exception))
+            raise
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            # Sentencias que no se leyeron hasta el final; la conexión sigue prestada
+            for cursor in self.cursors:
+                cursor._finish()
+        finally:
+            try:
+                return self._connection_cm.__exit__(exc_type, exc, tb)
+            finally:
+                # Un generador puede cerrar su bloque fuera de orden: se quita este frame, no el último
+                _local.frames.remove(self)
+                # GeneratorExit o KeyboardInterrupt no son errores de la función
+                error = exc_type is not None and issubclass(exc_type, Exception)
+                _record_function(self.name, (time.perf_counter() - self._start) * 1000, self.rows, error)
+
+
+def _record_statement(key: str, ms: float, rows: int, error: bool, funcion: Optional[str]) -> None:
+    with _stats_lock:
+        stats = _by_statement.get(key)
+        if stats is None:
+            if len(_by_statement) >= INSTRUMENTATION_SETTINGS['max_statements']:
+                key = _OTRAS_SENTENCIAS
+                stats = _by_statement.get(key)
+            if stats is None:
+                stats = _by_statement[key] = _Stats()
+                stats.funciones = set()
+        stats.add(ms, rows, error)
+        if funcion is not None and len(stats.funciones) < 20:
+            stats.funciones.add(funcion)
+
+
+def _explain(conn: sqlite3.Connection, sql: str, params) -> Optional[str]:
+    if params is None:
+        return None
+    try:
+        # Cursor base de sqlite3: el EXPLAIN no se registra como otra sentencia
+        rows = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        return " | ".join(str(row[-1]) for row in rows) or None
+    except sqlite3.Error:
+        return None
+
+
+def _log_slow(conn: sqlite3.Connection, sql: str, params, ms: float, rows: int, funcion: Optional[str]) -> None:
+    plan = _explain(conn, sql, params) if INSTRUMENTATION_SETTINGS['explain_slow'] else None
+    entrada = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "funcion": funcion,
+        "sql": normalize_sql(sql),
+        "ms": round(ms, 3),
+        "filas": rows,
+        "plan": plan,
+    }
+    with _stats_lock:
+        _slow_log.append(entrada)
+    logger.warning("Consulta lenta (%.1f ms, %d filas) en %s: %s%s",
+                   ms, rows, funcion or "?", entrada["sql"], f" [plan: {plan}]" if plan else "")
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor que mide execute y los fetch de la sentencia en curso."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sql: Optional[str] = None
+        self._params = None
+        self._ms = 0.0
+        self._rows = 0
+        self._funcion: Optional[str] = None
+        self._frame: Optional[_Frame] = None
+
+    def _begin(self, sql: str, params) -> None:
+        self._finish()
+        self._sql, self._params, self._ms, self._rows = sql, params, 0.0, 0
+        self._funcion = _current_function()
+        frames = getattr(_local, "frames", None)
+        if frames and self._frame is not frames[-1]:
+            self._frame = frames[-1]
+            self._frame.cursors.append(self)
+
+    def _finish(self, error: bool = False) -> None:
+        """Registra la sentencia en curso (al terminar de leerla, al reutilizar o cerrar el cursor)."""
+        sql, self._sql = self._sql, None
+        if sql is None:
+            return
+        _record_statement(normalize_sql(sql), self._ms, self._rows, error, self._funcion)
+        if self._ms >= INSTRUMENTATION_SETTINGS['slow_query_ms'] and not error:
+            _log_slow(self.connection, sql, self._params, self._ms, self._rows, self._funcion)
+
+    def _count(self, start: float, rows: int, exhausted: bool) -> None:
+        self._ms += (time.perf_counter() - start) * 1000
+        self._rows += rows
+        frames = getattr(_local, "frames", None)
+        if frames:
+            frames[-1].rows += rows
+        if exhausted:
+            self._finish()
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameters)
+        start = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        except BaseException:
+            self._ms += (time.perf_counter() - start) * 1000
+            self._finish(error=True)
+            raise
+        # Sin filas por leer (DML, DDL) la sentencia ya terminó
+        self._count(start, 0, self.description is None)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._begin(sql, None)
+        start = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        except BaseException:
+            self._ms += (time.perf_counter() - start) * 1000
+            self._finish(error=True)
+            raise
+        self._count(start, 0, True)
+        return self
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._count(start, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._count(start, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._count(start, len(rows), True)
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._count(start, 0, True)
+            raise
+        self._count(start, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Conexión cuyos cursores (también los de execute) son InstrumentedCursor."""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connection_factory() -> type:
+    """Clase de conexión que debe usar el pool para las conexiones nuevas."""
+    return InstrumentedConnection if is_enabled() else sqlite3.Connection
+
+
+def _record_function(name: str, ms: float, rows: int, error: bool) -> None:
+    with _stats_lock:
+        stats = _by_function.get(name)
+        if stats is None:
+            stats = _by_function[name] = _Stats()
+        stats.add(ms, rows, error)
+
+
+def track_function(connection_cm, name: str) -> "_Frame":
+    """Envuelve pool.connection() midiendo la función de datos `name`."""
+    return _Frame(connection_cm, name)
+
+
+def record_function_error(name: str) -> None:
+    """Registra un error de `name` antes de obtener conexión (por ejemplo, la base no existe)."""
+    _record_function(name, 0.0, 0, True)
+
+
+def caller_name(depth: int = 2) -> str:
+    """módulo.función de quien llamó a get_connection."""
+    code_frame = sys._getframe(depth)
+    code = code_frame.f_code
+    return f"{code_frame.f_globals.get('__name__', '?')}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def configure_instrumentation(
+    enabled: Optional[bool] = None,
+    slow_query_ms: Optional[float] = None,
+    explain_slow: Optional[bool] = None,
+    slow_log_size: Optional[int] = None,
+) -> None:
+    """Activa o ajusta la instrumentación.
+
+    Al activarla o desactivarla se cierran las conexiones inactivas de los
+    pools para que las siguientes se abran con la clase que corresponde.
+    """
+    global _slow_log
+    cambia = enabled is not None and bool(enabled) != is_enabled()
+    if enabled is not None:
+        INSTRUMENTATION_SETTINGS['enabled'] = bool(enabled)
+    if slow_query_ms is not None:
+        INSTRUMENTATION_SETTINGS['slow_query_ms'] = float(slow_query_ms)
+    if explain_slow is not None:
+        INSTRUMENTATION_SETTINGS['explain_slow'] = bool(explain_slow)
+    if slow_log_size is not None:
+        INSTRUMENTATION_SETTINGS['slow_log_size'] = max(1, int(slow_log_size))
+        with _stats_lock:
+            _slow_log = deque(_slow_log, maxlen=INSTRUMENTATION_SETTINGS['slow_log_size'])
+    if cambia:
+        from database.pool import recycle_idle_connections
+        recycle_idle_connections()
+
+
+def reset_stats() -> None:
+    """Descarta los contadores y el registro de consultas lentas."""
+    global _since
+    with _stats_lock:
+        _by_function.clear()
+        _by_statement.clear()
+        _slow_log.clear()
+        _since = datetime.now()
+
+
+def snapshot() -> Dict[str, object]:
+    """Copia de los contadores, ordenados por tiempo total (lo más costoso primero)."""
+    with _stats_lock:
+        funciones = {name: stats.as_dict() for name, stats in _by_function.items()}
+        sentencias = {sql: stats.as_dict() for sql, stats in _by_statement.items()}
+        lentas = list(_slow_log)
+        desde = _since
+
+    def ordenar(datos: Dict[str, dict]) -> Dict[str, dict]:
+        return dict(sorted(datos.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+
+    return {
+        "activa": is_enabled(),
+        "desde": desde.isoformat(timespec="seconds"),
+        "umbral_lenta_ms": INSTRUMENTATION_SETTINGS['slow_query_ms'],
+        "funciones": ordenar(funciones),
+        "sentencias": ordenar(sentencias),
+        "lentas": lentas,
+    }
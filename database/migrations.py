@@ -0,0 +1,98 @@
+"""
+Migraciones versionadas del esquema de academia.db.
+
+La versión aplicada se guarda en `PRAGMA user_version`. Cada migración se
+ejecuta dentro de su propia transacción junto con el cambio de versión, por
+lo que aplicar las migraciones al iniciar la aplicación es idempotente.
+"""
+
+from typing import List, Tuple
+
+from database.pool import get_connection
+from database.saldos import SALDO_MIGRATION, reset_saldo_status
+
+
+# (versión, descripción, sentencias)
+MIGRATIONS: List[Tuple[int, str, Tuple[str, ...]]] = [
+    (
+        1,
+        "Índices secundarios para pagos, calificaciones, estudiantes y permisos",
+        (
+            # Solvencia: WHERE estudiante_id = ? AND concepto_pago_id = ? ORDER BY fecha
+            # y totales por estudiante: WHERE estudiante_id = ? GROUP BY concepto_pago_id
+            "CREATE INDEX IF NOT EXISTS idx_pago_estudiante_concepto_fecha "
+            "ON pago (estudiante_id, concepto_pago_id, fecha);",
+            # Notas: WHERE estudiante_id = ? ORDER BY calificacion_id DESC LIMIT 1
+            "CREATE INDEX IF NOT EXISTS idx_calificacion_estudiante "
+            "ON calificacion (estudiante_id);",
+            # Listados y reportes por grado
+            "CREATE INDEX IF NOT EXISTS idx_estudiante_grado "
+            "ON estudiante (grado_id);",
+            # Autocompletado: ORDER BY nombre_completo sobre la misma expresión
+            "CREATE INDEX IF NOT EXISTS idx_estudiante_nombre_completo "
+            "ON estudiante (TRIM(COALESCE(nombre, '')) || ' ' || TRIM(COALESCE(apellido, '')));",
+            # Joins de permisos: usuario -> usuario_rol -> permiso_rol
+            "CREATE INDEX IF NOT EXISTS idx_usuario_rol_usuario "
+            "ON usuario_rol (usuario_id, rol_id);",
+            "CREATE INDEX IF NOT EXISTS idx_permiso_rol_rol "
+            "ON permiso_rol (rol_id, permiso_id);",
+            # Autenticación: WHERE nombre = ? AND contrasena = ?
+            "CREATE INDEX IF NOT EXISTS idx_usuario_nombre "
+            "ON usuario (nombre);",
+        ),
+    ),
+    (
+        2,
+        "Índice por fecha de pago para exportaciones y reportes por período",
+        (
+            # Exportación: WHERE fecha BETWEEN ? AND ? ORDER BY fecha, pago_id
+            # (el índice ya incluye pago_id, no hace falta ordenar aparte)
+            "CREATE INDEX IF NOT EXISTS idx_pago_fecha "
+            "ON pago (fecha);",
+        ),
+    ),
+    (
+        3,
+        "Saldos por estudiante y concepto mantenidos con triggers (database.saldos)",
+        SALDO_MIGRATION,
+    ),
+]
+
+
+def get_schema_version(db_path: str = "academia.db") -> int:
+    """Retorna la versión de esquema aplicada (0 si no hay migraciones o falla)."""
+    try:
+        with get_connection(db_path) as conn:
+            row = conn.execute("PRAGMA user_version;").fetchone()
+            return int(row[0]) if row else 0
+    except Exception:
+        return 0
+
+
+def apply_migrations(db_path: str = "academia.db") -> int:
+    """Aplica las migraciones pendientes y devuelve la versión resultante.
+
+    Si una migración falla se revierte y se detiene el proceso, dejando la
+    base en la última versión aplicada con éxito.
+    """
+    try:
+        with get_connection(db_path) as conn:
+            version = int(conn.execute("PRAGMA user_version;").fetchone()[0])
+            for target, _description, statements in MIGRATIONS:
+                if target <= version:
+                    continue
+                try:
+                    conn.execute("BEGIN;")
+                    for sql in statements:
+                        conn.execute(sql)
+                    conn.execute(f"PRAGMA user_version = {int(target)};")
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    break
+                version = target
+                # has_saldos pudo haberse consultado antes de crear la tabla
+                reset_saldo_status(db_path)
+            return version
+    except Exception:
+        return 0
@@ -0,0 +1,368 @@
+"""
+Pool de conexiones SQLite compartido por los módulos *_db y permissions.
+
+Antes cada función de datos verificaba la existencia del archivo, abría una
+conexión nueva y la cerraba al terminar. Este módulo mantiene un pool por
+ruta de base de datos: las conexiones se reutilizan entre llamadas, se
+verifican periódicamente y son reentrantes por hilo (una función que llama a
+otra dentro del mismo hilo comparte la misma conexión).
+
+Cada conexión nueva recibe los PRAGMAs del perfil configurado
+(`CONNECTION_PROFILES`, por defecto "wal"): con WAL los lectores no esperan
+al escritor y cada commit sincroniza el disco una sola vez.
+
+Con la instrumentación activa (database.instrumentation) las conexiones
+nuevas miden cada sentencia y get_connection mide la función que la pide.
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from database import instrumentation
+
+
+# Perfiles de conexión: PRAGMAs que se aplican a cada conexión nueva.
+# journal_mode se guarda en el archivo, por eso cada perfil lo fija de forma
+# explícita (al volver a "rollback" la base deja de usar WAL).
+CONNECTION_PROFILES: Dict[str, Dict[str, object]] = {
+    # Comportamiento por defecto de SQLite: diario de reversión y fsync completo
+    'rollback': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+    },
+    # Lectores concurrentes con un escritor; un fsync por checkpoint en lugar de por commit
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,       # KiB (negativo) de caché de páginas por conexión
+        'mmap_size': 134217728,     # 128 MiB de lectura por memoria mapeada
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,       # ms de espera ante un bloqueo
+    },
+    # WAL con fsync en cada commit (no pierde transacciones si se corta la luz)
+    'wal_full': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -16000,
+        'mmap_size': 134217728,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+}
+
+_PROFILE_PRAGMAS = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout')
+
+# Configuración por defecto de los pools
+POOL_SETTINGS = {
+    'max_size': 4,                 # Conexiones máximas por base de datos
+    'health_check_interval': 30.0, # Segundos de inactividad antes de verificar
+    'timeout': 5.0,                # Espera máxima por una conexión libre
+    'profile': 'wal',              # Clave de CONNECTION_PROFILES
+}
+
+
+def _profile_pragmas(profile) -> Dict[str, object]:
+    """PRAGMAs de un perfil dado por nombre o como dict."""
+    pragmas = CONNECTION_PROFILES[profile] if isinstance(profile, str) else dict(profile or {})
+    for name, value in pragmas.items():
+        if name not in _PROFILE_PRAGMAS:
+            raise ValueError(f"PRAGMA no admitido en un perfil: {name}")
+        if not (isinstance(value, int) or str(value).isalnum()):
+            raise ValueError(f"Valor no válido para PRAGMA {name}: {value!r}")
+    return pragmas
+
+
+def apply_profile(conn: sqlite3.Connection, profile) -> List[str]:
+    """Aplica los PRAGMAs del perfil a conn y retorna los que fallaron.
+
+    Un PRAGMA que falla (por ejemplo journal_mode en una base de solo
+    lectura) no impide usar la conexión.
+    """
+    failed = []
+    # Cursor base: los PRAGMAs de apertura no cuentan en la instrumentación
+    cur = conn.cursor(sqlite3.Cursor)
+    for name, value in _profile_pragmas(profile).items():
+        try:
+            cur.execute(f"PRAGMA {name} = {value};").fetchall()
+        except sqlite3.Error:
+            failed.append(name)
+    return failed
+
+
+class ConnectionPool:
+    """Pool de conexiones para una sola base de datos SQLite."""
+
+    def __init__(self, db_path: str, max_size: int = 4, health_check_interval: float = 30.0, timeout: float = 5.0, profile="wal"):
+        self.db_path = str(db_path)
+        self.max_size = max(1, int(max_size))
+        self.health_check_interval = float(health_check_interval)
+        self.timeout = float(timeout)
+        self.profile = profile
+        _profile_pragmas(profile)
+
+        self._idle: List[Tuple[sqlite3.Connection, float]] = []
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+        # Contadores para monitoreo
+        self._hits = 0
+        self._misses = 0
+        self._discarded = 0
+        self._profile_errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path, timeout=self.timeout, check_same_thread=False, factory=instrumentation.connection_factory()
+        )
+        failed = apply_profile(conn, self.profile)
+        if failed:
+            with self._cond:
+                self._profile_errors += 1
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1;").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._created -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    def acquire(self) -> sqlite3.Connection:
+        """Presta una conexión del pool, creando una nueva si hay capacidad."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn: Optional[sqlite3.Connection] = None
+            last_used = 0.0
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise sqlite3.ProgrammingError(f"Pool cerrado: {self.db_path}")
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        self._hits += 1
+                        break
+                    if self._created < self.max_size:
+                        self._created += 1
+                        self._misses += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        raise TimeoutError(f"Sin conexiones libres para {self.db_path}")
+
+            if conn is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._cond:
+                        self._created -= 1
+                        self._cond.notify()
+                    raise
+
+            # Verificar solo conexiones que llevan tiempo inactivas
+            if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Devuelve una conexión al pool descartando transacciones abiertas."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        with self._cond:
+            if not self._closed:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+                return
+            self._created -= 1
+        conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Context manager reentrante por hilo que presta una conexión."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self.acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            raise
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self.release(conn)
+
+    def held_by_current_thread(self) -> bool:
+        """True si este hilo ya tiene una conexión prestada (dentro de connection())."""
+        return getattr(self._local, "conn", None) is not None
+
+    def _take_idle(self) -> List[sqlite3.Connection]:
+        """Quita las conexiones inactivas del pool (el llamador tiene _cond y las cierra)."""
+        idle = [conn for conn, _ in self._idle]
+        self._created -= len(idle)
+        self._idle = []
+        self._cond.notify_all()
+        return idle
+
+    def close(self) -> None:
+        """Cierra las conexiones inactivas y rechaza préstamos futuros."""
+        with self._cond:
+            self._closed = True
+            idle = self._take_idle()
+        _close_connections(idle)
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna contadores del pool para monitoreo."""
+        with self._cond:
+            return {
+                "size": self._created,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "discarded": self._discarded,
+                "profile_errors": self._profile_errors,
+            }
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def configure_pools(max_size: Optional[int] = None, health_check_interval: Optional[float] = None, timeout: Optional[float] = None, profile=None) -> None:
+    """Ajusta la configuración de los pools actuales y futuros.
+
+    Al cambiar el perfil se cierran las conexiones inactivas para que las
+    siguientes se abran con los PRAGMAs nuevos; las prestadas conservan el
+    perfil anterior hasta descartarse.
+    """
+    if profile is not None:
+        _profile_pragmas(profile)
+    updates = {
+        'max_size': max_size,
+        'health_check_interval': health_check_interval,
+        'timeout': timeout,
+        'profile': profile,
+    }
+    stale: List[sqlite3.Connection] = []
+    with _pools_lock:
+        for key, value in updates.items():
+            if value is not None:
+                POOL_SETTINGS[key] = value
+        for pool in _pools.values():
+            with pool._cond:
+                pool.max_size = max(1, int(POOL_SETTINGS['max_size']))
+                pool.health_check_interval = float(POOL_SETTINGS['health_check_interval'])
+                pool.timeout = float(POOL_SETTINGS['timeout'])
+                if profile is not None:
+                    pool.profile = profile
+                    stale.extend(pool._take_idle())
+                pool._cond.notify_all()
+    _close_connections(stale)
+
+
+def recycle_idle_connections() -> None:
+    """Cierra las conexiones inactivas de todos los pools; las siguientes se abren de nuevo."""
+    stale: List[sqlite3.Connection] = []
+    with _pools_lock:
+        for pool in _pools.values():
+            with pool._cond:
+                stale.extend(pool._take_idle())
+    _close_connections(stale)
+
+
+def _close_connections(connections: List[sqlite3.Connection]) -> None:
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+def get_pool(db_path: str = "academia.db") -> ConnectionPool:
+    """Retorna el pool asociado a db_path, creándolo en el primer uso.
+
+    Lanza FileNotFoundError si la base de datos no existe, para no crear
+    archivos vacíos de forma accidental.
+    """
+    key = str(db_path)
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if not Path(db_path).exists():
+                raise FileNotFoundError(db_path)
+            pool = ConnectionPool(key, **POOL_SETTINGS)
+            _pools[key] = pool
+        return pool
+
+
+def get_connection(db_path: str = "academia.db"):
+    """Atajo para `get_pool(db_path).connection()`.
+
+    Con la instrumentación activa el bloque se mide a nombre de la función
+    que llama (módulo.función).
+    """
+    if not instrumentation.is_enabled():
+        return get_pool(db_path).connection()
+    name = instrumentation.caller_name()
+    try:
+        pool = get_pool(db_path)
+    except Exception:
+        instrumentation.record_function_error(name)
+        raise
+    return instrumentation.track_function(pool.connection(), name)
+
+
+def close_pool(db_path: str) -> None:
+    """Cierra y olvida el pool de una base de datos."""
+    with _pools_lock:
+        pool = _pools.pop(str(db_path), None)
+    if pool is not None:
+        pool.close()
+
+
+def close_all_pools() -> None:
+    """Cierra todos los pools abiertos."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all_pools)
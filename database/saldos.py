@@ -0,0 +1,256 @@
+"""
+Saldos precalculados por estudiante y concepto de pago.
+
+`saldo_estudiante_concepto` guarda, por (estudiante_id, concepto_pago_id),
+el total pagado, la cantidad de pagos y la fecha del último pago. Se
+mantiene con triggers sobre `pago` (insert, update y delete), así que la
+solvencia de un estudiante o de todo un grado se lee por clave en lugar de
+sumar la tabla pago en cada consulta. La migración 3 crea la tabla y la
+llena con los pagos existentes.
+
+`rebuild_saldos` vuelve a calcular la tabla desde pago y `check_saldos`
+compara ambas y lista las diferencias. Desde la línea de comandos:
+
+    python -m database.saldos verificar [--db academia.db] [--reparar]
+    python -m database.saldos reconstruir [--db academia.db]
+"""
+
+import argparse
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from database.pool import get_connection
+
+
+SALDO_TABLE = "saldo_estudiante_concepto"
+
+# Diferencia de total tolerada por el verificador (sumas y restas de REAL)
+SALDO_TOLERANCIA = 0.005
+
+_CREATE_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {SALDO_TABLE} (
+    estudiante_id INTEGER NOT NULL,
+    concepto_pago_id INTEGER NOT NULL,
+    total REAL NOT NULL DEFAULT 0,
+    pagos INTEGER NOT NULL DEFAULT 0,
+    last_fecha TEXT,
+    PRIMARY KEY (estudiante_id, concepto_pago_id)
+) WITHOUT ROWID;
+"""
+
+# Reportes por concepto: quién pagó (o no) un concepto en un grado
+_CREATE_INDEX = f"""
+CREATE INDEX IF NOT EXISTS idx_saldo_concepto_estudiante
+ON {SALDO_TABLE} (concepto_pago_id, estudiante_id);
+"""
+
+# Los pagos sin estudiante o sin concepto no tienen saldo
+_SUMAR = f"""
+    INSERT INTO {SALDO_TABLE} (estudiante_id, concepto_pago_id, total, pagos, last_fecha)
+    SELECT {{row}}.estudiante_id, {{row}}.concepto_pago_id, COALESCE({{row}}.monto, 0), 1, {{row}}.fecha
+    WHERE {{row}}.estudiante_id IS NOT NULL AND {{row}}.concepto_pago_id IS NOT NULL
+    ON CONFLICT (estudiante_id, concepto_pago_id) DO UPDATE SET
+        total = total + excluded.total,
+        pagos = pagos + 1,
+        last_fecha = COALESCE(MAX(last_fecha, excluded.last_fecha), last_fecha, excluded.last_fecha);
+"""
+
+# Se ejecuta después del DELETE/UPDATE: la última fecha sale del índice
+# idx_pago_estudiante_concepto_fecha sin recorrer los pagos del estudiante
+_RESTAR = f"""
+    UPDATE {SALDO_TABLE}
+    SET total = total - COALESCE(old.monto, 0),
+        pagos = pagos - 1,
+        last_fecha = (
+            SELECT MAX(fecha) FROM pago
+            WHERE estudiante_id = old.estudiante_id AND concepto_pago_id = old.concepto_pago_id
+        )
+    WHERE estudiante_id = old.estudiante_id AND concepto_pago_id = old.concepto_pago_id;
+    DELETE FROM {SALDO_TABLE}
+    WHERE estudiante_id = old.estudiante_id AND concepto_pago_id = old.concepto_pago_id AND pagos <= 0;
+"""
+
+_TRIGGERS = {
+    "saldo_pago_ai": f"""
+        CREATE TRIGGER IF NOT EXISTS saldo_pago_ai AFTER INSERT ON pago BEGIN
+            {_SUMAR.format(row="new")}
+        END;
+    """,
+    "saldo_pago_ad": f"""
+        CREATE TRIGGER IF NOT EXISTS saldo_pago_ad AFTER DELETE ON pago BEGIN
+            {_RESTAR}
+        END;
+    """,
+    "saldo_pago_au": f"""
+        CREATE TRIGGER IF NOT EXISTS saldo_pago_au
+        AFTER UPDATE OF estudiante_id, concepto_pago_id, monto, fecha ON pago BEGIN
+            {_RESTAR}
+            {_SUMAR.format(row="new")}
+        END;
+    """,
+}
+
+_FILL = f"""
+    INSERT INTO {SALDO_TABLE} (estudiante_id, concepto_pago_id, total, pagos, last_fecha)
+    SELECT estudiante_id, concepto_pago_id, COALESCE(SUM(monto), 0), COUNT(*), MAX(fecha)
+    FROM pago
+    WHERE estudiante_id IS NOT NULL AND concepto_pago_id IS NOT NULL
+    GROUP BY estudiante_id, concepto_pago_id;
+"""
+
+# Sentencias de la migración 3 (database.migrations)
+SALDO_MIGRATION: Tuple[str, ...] = (_CREATE_TABLE, _CREATE_INDEX, *_TRIGGERS.values(), _FILL)
+
+_saldo_status: Dict[str, bool] = {}
+_saldo_lock = threading.Lock()
+
+
+@dataclass
+class DiferenciaSaldo:
+    """Un par (estudiante, concepto) cuyo saldo guardado no coincide con pago."""
+    estudiante_id: int
+    concepto_pago_id: int
+    esperado: Optional[Tuple[float, int, Optional[str]]]   # (total, pagos, last_fecha) según pago
+    guardado: Optional[Tuple[float, int, Optional[str]]]   # lo que hay en la tabla de saldos
+
+
+def _existing_objects(conn) -> set:
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE name = ? OR (type = 'trigger' AND name LIKE 'saldo_pago_%');",
+        (SALDO_TABLE,),
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+def has_saldos(db_path: str = "academia.db") -> bool:
+    """Indica si la tabla de saldos existe y está mantenida por sus triggers."""
+    status = _saldo_status.get(str(db_path))
+    if status is not None:
+        return status
+    try:
+        with get_connection(db_path) as conn:
+            existing = _existing_objects(conn)
+            status = SALDO_TABLE in existing and all(name in existing for name in _TRIGGERS)
+    except Exception:
+        status = False
+    with _saldo_lock:
+        _saldo_status[str(db_path)] = status
+    return status
+
+
+def reset_saldo_status(db_path: Optional[str] = None) -> None:
+    """Olvida el estado guardado por has_saldos (tras migrar o cambiar el esquema)."""
+    with _saldo_lock:
+        if db_path is None:
+            _saldo_status.clear()
+        else:
+            _saldo_status.pop(str(db_path), None)
+
+
+def rebuild_saldos(db_path: str = "academia.db") -> int:
+    """Crea (o repara) tabla y triggers y recalcula todos los saldos desde pago.
+
+    Retorna la cantidad de saldos, o -1 si falla (la base queda como estaba).
+    """
+    try:
+        with get_connection(db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE;")
+            conn.execute(_CREATE_TABLE)
+            conn.execute(_CREATE_INDEX)
+            for sql in _TRIGGERS.values():
+                conn.execute(sql)
+            conn.execute(f"DELETE FROM {SALDO_TABLE};")
+            conn.execute(_FILL)
+            count = conn.execute(f"SELECT COUNT(*) FROM {SALDO_TABLE};").fetchone()[0]
+            conn.commit()
+    except Exception:
+        reset_saldo_status(db_path)
+        return -1
+    with _saldo_lock:
+        _saldo_status[str(db_path)] = True
+    return int(count)
+
+
+def check_saldos(db_path: str = "academia.db") -> List[DiferenciaSaldo]:
+    """Compara la tabla de saldos con la suma de pago y retorna las diferencias.
+
+    Lanza sqlite3.Error si la tabla de saldos no existe.
+    """
+    with get_connection(db_path) as conn:
+        # Ambos lados se recorren ordenados por la misma clave, como un merge
+        esperados = conn.execute(
+            """
+            SELECT estudiante_id, concepto_pago_id, COALESCE(SUM(monto), 0), COUNT(*), MAX(fecha)
+            FROM pago
+            WHERE estudiante_id IS NOT NULL AND concepto_pago_id IS NOT NULL
+            GROUP BY estudiante_id, concepto_pago_id
+            ORDER BY estudiante_id, concepto_pago_id;
+            """
+        )
+        guardados = conn.cursor().execute(
+            f"""
+            SELECT estudiante_id, concepto_pago_id, total, pagos, last_fecha
+            FROM {SALDO_TABLE}
+            ORDER BY estudiante_id, concepto_pago_id;
+            """
+        )
+        diferencias: List[DiferenciaSaldo] = []
+        esperado, guardado = next(esperados, None), next(guardados, None)
+        while esperado is not None or guardado is not None:
+            clave_e = tuple(esperado[:2]) if esperado is not None else None
+            clave_g = tuple(guardado[:2]) if guardado is not None else None
+            if clave_g is None or (clave_e is not None and clave_e < clave_g):
+                diferencias.append(DiferenciaSaldo(*clave_e, tuple(esperado[2:]), None))
+                esperado = next(esperados, None)
+            elif clave_e is None or clave_g < clave_e:
+                diferencias.append(DiferenciaSaldo(*clave_g, None, tuple(guardado[2:])))
+                guardado = next(guardados, None)
+            else:
+                total_e, pagos_e, fecha_e = esperado[2:]
+                total_g, pagos_g, fecha_g = guardado[2:]
+                if abs(total_e - total_g) > SALDO_TOLERANCIA or pagos_e != pagos_g or fecha_e != fecha_g:
+                    diferencias.append(DiferenciaSaldo(*clave_e, tuple(esperado[2:]), tuple(guardado[2:])))
+                esperado, guardado = next(esperados, None), next(guardados, None)
+        return diferencias
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("accion", choices=("verificar", "reconstruir"))
+    parser.add_argument("--db", default="academia.db")
+    parser.add_argument("--reparar", action="store_true", help="Reconstruir si la verificación encuentra diferencias")
+    args = parser.parse_args(argv)
+
+    if args.accion == "reconstruir":
+        count = rebuild_saldos(args.db)
+        if count < 0:
+            print("No se pudo reconstruir la tabla de saldos", file=sys.stderr)
+            return 2
+        print(f"{count} saldos recalculados")
+        return 0
+
+    try:
+        diferencias = check_saldos(args.db)
+    except Exception as exc:
+        print(f"No se pudo verificar: {exc}", file=sys.stderr)
+        return 2
+    if not diferencias:
+        print("Saldos consistentes con la tabla pago")
+        return 0
+    print(f"{len(diferencias)} saldos no coinciden con la tabla pago")
+    for diferencia in diferencias[:20]:
+        print(f"  estudiante {diferencia.estudiante_id}, concepto {diferencia.concepto_pago_id}: "
+              f"esperado {diferencia.esperado}, guardado {diferencia.guardado}")
+    if len(diferencias) > 20:
+        print(f"  ... y {len(diferencias) - 20} más")
+    if args.reparar:
+        count = rebuild_saldos(args.db)
+        print(f"Tabla reconstruida: {count} saldos" if count >= 0 else "No se pudo reconstruir la tabla de saldos")
+        return 0 if count >= 0 else 2
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Cola de escrituras con commit agrupado.
+
+Cada escritura de las funciones *_db abre su transacción y hace su propio
+commit; con varias estaciones registrando pagos a la vez, todas esperan el
+bloqueo de escritura de SQLite y cada una paga su sincronización a disco.
+Con la cola activa (`configure_write_queue(enabled=True)`) las escrituras
+de pagos y calificaciones (y las bajas de estudiantes, que borran sus
+pagos) se envían a un único hilo escritor por base, que junta las
+pendientes (hasta `max_batch`) y las confirma en una sola transacción. Las que llegan durante un commit forman el lote siguiente, así
+que con `window_ms` en 0 no se agrega espera; una ventana mayor junta más
+escrituras por commit a cambio de latencia (útil si cada fsync es lento). En cada lote:
+
+- cada escritura corre en su propio SAVEPOINT: si falla, solo ella se
+  revierte y su llamador recibe el valor de error de siempre (None/False);
+- el llamador recibe su resultado (fila nueva, id, True...) solo después
+  del COMMIT del lote, nunca antes;
+- si el COMMIT falla no se guarda ninguna escritura del lote y todos
+  reciben el valor de error;
+- `synchronous` fija el PRAGMA synchronous durante los commits de la cola
+  ("FULL": cada lote llega al disco antes de responder; "NORMAL" con WAL:
+  sobrevive a un cierre del proceso, no a un corte de luz). None conserva
+  el del perfil del pool.
+
+Las funciones definen su escritura como `apply(conn, *args)` sin commit y
+la ejecutan con `run_write`, que sin la cola hace lo mismo que antes: una
+conexión del pool, la escritura y un commit.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from database.changes import mark_changed
+from database.pool import get_connection, get_pool
+
+
+# Configuración por defecto de la cola de escrituras
+WRITE_QUEUE_SETTINGS = {
+    'enabled': False,      # Enviar las escrituras de run_write a la cola
+    'window_ms': 0.0,      # Espera desde la primera escritura pendiente para juntar más
+    'max_batch': 256,      # Escrituras por transacción como máximo
+    'synchronous': None,   # PRAGMA synchronous de los commits ("FULL", "NORMAL", "OFF" o None)
+}
+
+_SYNCHRONOUS = (None, 'OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+class _Escritura:
+    __slots__ = ("apply", "args", "tables", "default", "future")
+
+    def __init__(self, apply: Callable, args: tuple, tables: Tuple[str, ...], default: Any):
+        self.apply = apply
+        self.args = args
+        self.tables = tables
+        self.default = default
+        self.future: Future = Future()
+
+
+class WriteQueue:
+    """Hilo escritor de una base que confirma las escrituras por lotes."""
+
+    def __init__(self, db_path: str, window_ms: Optional[float] = None, max_batch: Optional[int] = None, synchronous: Optional[str] = None):
+        self.db_path = str(db_path)
+        self.window_ms = float(WRITE_QUEUE_SETTINGS['window_ms'] if window_ms is None else window_ms)
+        self.max_batch = max(1, int(max_batch or WRITE_QUEUE_SETTINGS['max_batch']))
+        self.synchronous = _check_synchronous(synchronous if synchronous is not None else WRITE_QUEUE_SETTINGS['synchronous'])
+        self._queue: "queue.SimpleQueue[Optional[_Escritura]]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Contadores para monitoreo
+        self._writes = 0
+        self._batches = 0
+        self._largest_batch = 0
+        self._failed_items = 0
+        self._failed_commits = 0
+
+        self._thread = threading.Thread(target=self._run, name="db-write-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, apply: Callable, args: tuple = (), tables: Iterable[str] = (), default: Any = None) -> Future:
+        """Encola apply(conn, *args); el Future se completa tras el COMMIT de su lote."""
+        item = _Escritura(apply, tuple(args), tuple(tables), default)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"Cola de escrituras cerrada: {self.db_path}")
+            self._queue.put(item)
+        return item.future
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window_ms / 1000.0
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch: List[_Escritura]) -> None:
+        batch = [item for item in batch if item.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        results: List[Any] = []
+        tables = set()
+        failed = 0
+        try:
+            with get_connection(self.db_path) as conn:
+                previous = None
+                if self.synchronous is not None:
+                    previous = conn.execute("PRAGMA synchronous;").fetchone()[0]
+                    conn.execute(f"PRAGMA synchronous = {self.synchronous};")
+                try:
+                    conn.execute("BEGIN IMMEDIATE;")
+                    for item in batch:
+                        conn.execute("SAVEPOINT escritura;")
+                        try:
+                            results.append(item.apply(conn, *item.args))
+                            conn.execute("RELEASE escritura;")
+                            tables.update(item.tables)
+                        except Exception:
+                            conn.execute("ROLLBACK TO escritura;")
+                            conn.execute("RELEASE escritura;")
+                            results.append(item.default)
+                            failed += 1
+                    conn.commit()
+                finally:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    if previous is not None:
+                        conn.execute(f"PRAGMA synchronous = {int(previous)};")
+        except Exception:
+            # Sin COMMIT no quedó guardada ninguna escritura del lote
+            with self._lock:
+                self._batches += 1
+                self._writes += len(batch)
+                self._failed_commits += 1
+            for item in batch:
+                item.future.set_result(item.default)
+            return
+
+        if tables:
+            mark_changed(self.db_path, *tables)
+        with self._lock:
+            self._batches += 1
+            self._writes += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+            self._failed_items += failed
+        for item, result in zip(batch, results):
+            item.future.set_result(result)
+
+    def stats(self) -> Dict[str, float]:
+        """Escrituras, lotes y fallas desde que se creó."""
+        with self._lock:
+            return {
+                "escrituras": self._writes,
+                "lotes": self._batches,
+                "lote_max": self._largest_batch,
+                "escrituras_por_lote": self._writes / self._batches if self._batches else 0.0,
+                "fallidas": self._failed_items,
+                "commits_fallidos": self._failed_commits,
+            }
+
+    def close(self, wait: bool = True) -> None:
+        """Confirma las escrituras ya encoladas y detiene el hilo."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+
+def _check_synchronous(value: Optional[str]) -> Optional[str]:
+    value = value.upper() if isinstance(value, str) else value
+    if value not in _SYNCHRONOUS:
+        raise ValueError(f"Valor no válido para synchronous: {value!r}")
+    return value
+
+
+_queues: Dict[str, WriteQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_write_queue(db_path: str = "academia.db") -> WriteQueue:
+    """Retorna la cola de escrituras de db_path, creándola en el primer uso."""
+    key = str(db_path)
+    with _queues_lock:
+        write_queue = _queues.get(key)
+        if write_queue is None:
+            write_queue = _queues[key] = WriteQueue(key)
+        return write_queue
+
+
+def configure_write_queue(enabled: Optional[bool] = None, window_ms: Optional[float] = None, max_batch: Optional[int] = None, synchronous: Optional[str] = None) -> None:
+    """Ajusta la cola de escrituras; las colas abiertas se cierran y se crean de nuevo al usarse."""
+    if synchronous is not None:
+        WRITE_QUEUE_SETTINGS['synchronous'] = _check_synchronous(synchronous)
+    for key, value in (('enabled', enabled), ('window_ms', window_ms), ('max_batch', max_batch)):
+        if value is not None:
+            WRITE_QUEUE_SETTINGS[key] = value
+    close_write_queues()
+
+
+def close_write_queues() -> None:
+    """Confirma lo pendiente y cierra todas las colas."""
+    with _queues_lock:
+        queues = list(_queues.values())
+        _queues.clear()
+    for write_queue in queues:
+        write_queue.close()
+
+
+atexit.register(close_write_queues)
+
+
+def is_enabled() -> bool:
+    return bool(WRITE_QUEUE_SETTINGS['enabled'])
+
+
+def run_write(db_path: str, apply: Callable, *args, tables: Iterable[str] = (), default: Any = None) -> Any:
+    """Ejecuta apply(conn, *args) y confirma; retorna su resultado o default si falla.
+
+    Con la cola activa la escritura se agrupa con las de otros hilos. Un hilo
+    que ya tiene una conexión prestada (por ejemplo dentro de otra función
+    de datos o del propio lote) escribe directamente para no esperarse a sí
+    mismo.
+    """
+    try:
+        if is_enabled() and not get_pool(db_path).held_by_current_thread():
+            return get_write_queue(db_path).submit(apply, args, tables, default).result()
+        with get_connection(db_path) as conn:
+            result = apply(conn, *args)
+            conn.commit()
+    except Exception:
+        return default
+    if tables:
+        mark_changed(db_path, *tables)
+    return result
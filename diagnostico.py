@@ -0,0 +1,116 @@
+"""
+Panel de diagnóstico de la capa de datos (solo administradores).
+
+Muestra lo que registra database.instrumentation: tiempo, llamadas,
+errores y filas por función de datos, y las últimas consultas lentas con
+su plan. Se abre con Ctrl+Shift+D en la ventana principal; la
+instrumentación se puede activar desde el panel o al iniciar con
+`python main.py --instrumentar`.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+from database import instrumentation
+
+
+class DiagnosticoDialog(tk.Toplevel):
+    """Ventana no modal que refresca el snapshot de la instrumentación."""
+
+    REFRESH_MS = 2000
+
+    def __init__(self, parent: tk.Widget):
+        super().__init__(parent)
+        self.title("Diagnóstico de consultas")
+        self.transient(parent.winfo_toplevel())
+        self.geometry("1000x620")
+        self._after_id = None
+
+        body = ttk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True, padx=16, pady=12)
+
+        top = ttk.Frame(body)
+        top.pack(fill=tk.X, pady=(0, 8))
+        self.var_activa = tk.BooleanVar(value=instrumentation.is_enabled())
+        ttk.Checkbutton(top, text="Registrar consultas", variable=self.var_activa,
+                        command=self._on_toggle).pack(side=tk.LEFT)
+        self.label_resumen = ttk.Label(top, text="", font=("Segoe UI", 11))
+        self.label_resumen.pack(side=tk.LEFT, padx=12)
+        ttk.Button(top, text="Reiniciar", command=self._on_reiniciar, width=10).pack(side=tk.RIGHT)
+        ttk.Button(top, text="Actualizar", command=self.refresh, width=10).pack(side=tk.RIGHT, padx=(0, 4))
+
+        panes = ttk.PanedWindow(body, orient=tk.VERTICAL)
+        panes.pack(fill=tk.BOTH, expand=True)
+        self.tree_funciones = self._tabla(panes, (
+            ("funcion", "Función", 360, "w"),
+            ("llamadas", "Llamadas", 80, "e"),
+            ("errores", "Errores", 70, "e"),
+            ("filas", "Filas", 90, "e"),
+            ("media", "Media ms", 90, "e"),
+            ("max", "Máx ms", 90, "e"),
+            ("total", "Total ms", 100, "e"),
+        ))
+        self.tree_lentas = self._tabla(panes, (
+            ("fecha", "Fecha", 150, "w"),
+            ("ms", "ms", 80, "e"),
+            ("funcion", "Función", 240, "w"),
+            ("sql", "Sentencia", 300, "w"),
+            ("plan", "Plan", 300, "w"),
+        ))
+
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+        self.refresh()
+
+    def _tabla(self, panes: ttk.PanedWindow, columnas) -> ttk.Treeview:
+        frame = ttk.Frame(panes)
+        tree = ttk.Treeview(frame, columns=[c[0] for c in columnas], show="headings", height=10)
+        for nombre, titulo, ancho, anchor in columnas:
+            tree.heading(nombre, text=titulo)
+            tree.column(nombre, width=ancho, anchor=anchor)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        panes.add(frame, weight=1)
+        return tree
+
+    def _on_toggle(self) -> None:
+        instrumentation.configure_instrumentation(enabled=self.var_activa.get())
+        self.refresh()
+
+    def _on_reiniciar(self) -> None:
+        instrumentation.reset_stats()
+        self.refresh()
+
+    def refresh(self) -> None:
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        if not self.winfo_exists():
+            return
+        snap = instrumentation.snapshot()
+        funciones = snap["funciones"]
+        self.tree_funciones.delete(*self.tree_funciones.get_children())
+        for nombre, datos in funciones.items():
+            self.tree_funciones.insert("", tk.END, values=(
+                nombre, datos["llamadas"], datos["errores"], datos["filas"],
+                f"{datos['media_ms']:.2f}", f"{datos['max_ms']:.2f}", f"{datos['total_ms']:.1f}",
+            ))
+        self.tree_lentas.delete(*self.tree_lentas.get_children())
+        for entrada in reversed(snap["lentas"]):
+            self.tree_lentas.insert("", tk.END, values=(
+                entrada["fecha"], f"{entrada['ms']:.1f}", entrada["funcion"] or "", entrada["sql"], entrada["plan"] or "",
+            ))
+        errores = sum(datos["errores"] for datos in funciones.values())
+        estado = "activa" if snap["activa"] else "desactivada"
+        self.label_resumen.configure(
+            text=f"Instrumentación {estado} desde {snap['desde']} · {len(funciones)} funciones · "
+                 f"{errores} errores · {len(snap['lentas'])} lentas (> {snap['umbral_lenta_ms']:g} ms)"
+        )
+        self._after_id = self.after(self.REFRESH_MS, self.refresh)
+
+    def destroy(self) -> None:
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        super().destroy()
@@ -0,0 +1,258 @@
+"""
+Importación masiva de estudiantes desde CSV.
+
+Lee el archivo fila por fila (no lo carga completo), valida cada fila,
+traduce el grado (nombre o número) a grado_id con el catálogo en caché e
+inserta por lotes con `executemany`, un commit por lote (la tabla FTS se
+actualiza una vez por lote). Las filas
+inválidas no detienen la importación: se informan en el resultado con su
+número de línea y el motivo.
+
+Columnas (encabezado obligatorio, sin importar mayúsculas ni tildes):
+nombre, apellido, grado y, opcionales, telefono e institucion. El
+separador (coma, punto y coma o tabulador) se detecta solo.
+
+Uso:
+    python -m ingresos.importar_estudiantes estudiantes.csv [--db academia.db]
+        [--lote 1000] [--rechazados rechazados.csv] [--validar]
+"""
+
+import argparse
+import csv
+import io
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+from consultas.consultas_index import index_refresh, normalize_text
+from database.changes import mark_changed
+from database.fts import deferred_student_fts
+from database.pool import get_connection
+from ingresos.ingresos_db import fetch_grados_with_ids
+
+
+# Configuración por defecto de la importación
+IMPORT_SETTINGS = {
+    'chunk_size': 1000,   # Filas por transacción
+}
+
+COLUMNAS_OBLIGATORIAS = ("nombre", "apellido", "grado")
+COLUMNAS_OPCIONALES = ("telefono", "institucion")
+_CARACTERES_TELEFONO = set("0123456789+-() ")
+
+_INSERT_ESTUDIANTE = """
+    INSERT INTO estudiante (nombre, apellido, telefono, grado_id, institucion)
+    VALUES (?, ?, ?, ?, ?);
+"""
+
+
+@dataclass
+class FilaRechazada:
+    linea: int
+    motivo: str
+    datos: Dict[str, str]
+
+
+@dataclass
+class ResultadoImportacion:
+    importados: int = 0
+    rechazados: List[FilaRechazada] = field(default_factory=list)
+    segundos: float = 0.0
+
+    @property
+    def filas_por_segundo(self) -> float:
+        total = self.importados + len(self.rechazados)
+        return total / self.segundos if self.segundos > 0 else 0.0
+
+
+class _MapaGrados:
+    """Traduce el texto de la columna grado a grado_id.
+
+    Acepta el nombre (sin importar mayúsculas ni tildes) o el número de
+    grado. Guarda cada texto ya resuelto para no normalizarlo otra vez.
+    """
+
+    def __init__(self, grados: List[Tuple[int, str]]):
+        self._por_clave: Dict[str, int] = {}
+        for grado_id, nombre in grados:
+            self._por_clave[normalize_text(nombre)] = grado_id
+            self._por_clave[str(grado_id)] = grado_id
+        self._resueltos: Dict[str, Optional[int]] = {}
+
+    def resolver(self, texto: str) -> Optional[int]:
+        grado_id = self._resueltos.get(texto, -1)
+        if grado_id == -1:
+            grado_id = self._por_clave.get(normalize_text(texto))
+            self._resueltos[texto] = grado_id
+        return grado_id
+
+
+def _leer_csv(fuente: TextIO) -> Tuple[Dict[str, int], Iterator[Tuple[int, List[str]]]]:
+    """Retorna (posición de cada columna, iterador de (línea, valores))."""
+    # La muestra termina en un fin de línea para no cortar una fila en dos
+    muestra = fuente.read(4096)
+    muestra += fuente.readline()
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+    except csv.Error:
+        dialecto = csv.excel
+    restante = io.StringIO(muestra)
+    lector = csv.reader(_encadenar(restante, fuente), dialecto)
+    encabezado = next(lector, None)
+    if not encabezado:
+        raise ValueError("El archivo está vacío")
+    columnas = {normalize_text(nombre): pos for pos, nombre in enumerate(encabezado)}
+    faltantes = [nombre for nombre in COLUMNAS_OBLIGATORIAS if nombre not in columnas]
+    if faltantes:
+        raise ValueError(f"Faltan columnas: {', '.join(faltantes)}")
+
+    def filas() -> Iterator[Tuple[int, List[str]]]:
+        for valores in lector:
+            if any(valor.strip() for valor in valores):
+                yield lector.line_num, valores
+
+    return columnas, filas()
+
+
+def _encadenar(inicio: TextIO, resto: TextIO) -> Iterator[str]:
+    # La muestra leída para detectar el separador se vuelve a entregar primero
+    yield from inicio
+    yield from resto
+
+
+def _validar(columnas: Dict[str, int], valores: List[str], grados: _MapaGrados) -> Tuple[Optional[tuple], str]:
+    """Retorna (fila para INSERT, "") o (None, motivo del rechazo)."""
+    def valor(nombre: str) -> str:
+        pos = columnas.get(nombre)
+        return valores[pos].strip() if pos is not None and pos < len(valores) else ""
+
+    nombre, apellido, grado = valor("nombre"), valor("apellido"), valor("grado")
+    if not nombre:
+        return None, "nombre vacío"
+    if not apellido:
+        return None, "apellido vacío"
+    if not grado:
+        return None, "grado vacío"
+    grado_id = grados.resolver(grado)
+    if grado_id is None:
+        return None, f"grado desconocido: {grado}"
+    telefono = valor("telefono")
+    if telefono and not set(telefono) <= _CARACTERES_TELEFONO:
+        return None, f"teléfono inválido: {telefono}"
+    return (nombre, apellido, telefono, grado_id, valor("institucion")), ""
+
+
+def _insertar_lote(db_path: str, lote: List[tuple]) -> Optional[str]:
+    """Inserta el lote en una transacción; retorna el error si se revirtió."""
+    try:
+        with get_connection(db_path) as conn:
+            # IMMEDIATE: deferred_student_fts lee antes de escribir y con WAL
+            # una transacción diferida no podría pasar a escritura si otra
+            # estación confirmó en el medio
+            conn.execute("BEGIN IMMEDIATE;")
+            # La búsqueda FTS se actualiza una vez por lote en lugar de por fila
+            with deferred_student_fts(conn):
+                conn.executemany(_INSERT_ESTUDIANTE, lote)
+            conn.commit()
+        return None
+    except Exception as exc:
+        return str(exc) or type(exc).__name__
+
+
+def importar_estudiantes_csv(
+    fuente: Union[str, TextIO],
+    db_path: str = "academia.db",
+    chunk_size: Optional[int] = None,
+    validar_solo: bool = False,
+) -> ResultadoImportacion:
+    """Importa estudiantes desde un CSV (ruta o archivo abierto en modo texto).
+
+    Con validar_solo=True se revisan las filas sin escribir en la base.
+    Lanza ValueError si el archivo no tiene encabezado o le faltan
+    columnas obligatorias.
+    """
+    if isinstance(fuente, str):
+        with open(fuente, newline="", encoding="utf-8-sig") as archivo:
+            return importar_estudiantes_csv(archivo, db_path, chunk_size, validar_solo)
+
+    start = time.perf_counter()
+    chunk_size = max(1, int(chunk_size or IMPORT_SETTINGS['chunk_size']))
+    resultado = ResultadoImportacion()
+    grados = _MapaGrados(fetch_grados_with_ids(db_path))
+    columnas, filas = _leer_csv(fuente)
+    nombres = sorted(columnas, key=columnas.get)
+
+    lote: List[tuple] = []
+    lineas: List[Tuple[int, List[str]]] = []
+
+    def guardar_lote() -> None:
+        error = None if validar_solo else _insertar_lote(db_path, lote)
+        if error is None:
+            resultado.importados += len(lote)
+        else:
+            for linea, valores in lineas:
+                resultado.rechazados.append(FilaRechazada(linea, f"error al guardar el lote: {error}", dict(zip(nombres, valores))))
+        lote.clear()
+        lineas.clear()
+
+    for linea, valores in filas:
+        fila, motivo = _validar(columnas, valores, grados)
+        if fila is None:
+            resultado.rechazados.append(FilaRechazada(linea, motivo, dict(zip(nombres, valores))))
+            continue
+        lote.append(fila)
+        lineas.append((linea, valores))
+        if len(lote) >= chunk_size:
+            guardar_lote()
+    if lote:
+        guardar_lote()
+
+    if resultado.importados and not validar_solo:
+        mark_changed(db_path, "estudiante")
+        # El índice de autocompletado se rehace una vez en lugar de fila por fila
+        index_refresh(db_path)
+    resultado.segundos = time.perf_counter() - start
+    return resultado
+
+
+def escribir_rechazados(rechazados: List[FilaRechazada], destino: str) -> None:
+    """Guarda las filas rechazadas en un CSV con su línea y motivo."""
+    columnas = ["linea", "motivo"] + [c for c in COLUMNAS_OBLIGATORIAS + COLUMNAS_OPCIONALES]
+    with open(destino, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=columnas, extrasaction="ignore")
+        escritor.writeheader()
+        for fila in rechazados:
+            escritor.writerow({**fila.datos, "linea": fila.linea, "motivo": fila.motivo})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archivo", help="CSV de estudiantes")
+    parser.add_argument("--db", default="academia.db")
+    parser.add_argument("--lote", type=int, default=IMPORT_SETTINGS['chunk_size'], help="Filas por transacción")
+    parser.add_argument("--rechazados", help="Guardar las filas rechazadas en este CSV")
+    parser.add_argument("--validar", action="store_true", help="Solo validar, sin escribir en la base")
+    args = parser.parse_args(argv)
+
+    try:
+        resultado = importar_estudiantes_csv(args.archivo, args.db, args.lote, args.validar)
+    except (OSError, ValueError) as exc:
+        print(f"No se pudo importar: {exc}", file=sys.stderr)
+        return 2
+
+    accion = "válidos" if args.validar else "importados"
+    print(f"{resultado.importados} estudiantes {accion}, {len(resultado.rechazados)} rechazados "
+          f"en {resultado.segundos:.2f} s ({resultado.filas_por_segundo:,.0f} filas/s)")
+    for fila in resultado.rechazados[:20]:
+        print(f"  línea {fila.linea}: {fila.motivo}")
+    if len(resultado.rechazados) > 20:
+        print(f"  ... y {len(resultado.rechazados) - 20} más")
+    if args.rechazados and resultado.rechazados:
+        escribir_rechazados(resultado.rechazados, args.rechazados)
+        print(f"Filas rechazadas guardadas en {args.rechazados}")
+    return 0 if not resultado.rechazados else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,17 +6,18 @@ try:
 except Exception as exc:
     # Fallback simple si UI aún no está lista
     class IngresosView(ttk.Frame):
-        def __init__(self, parent: tk.Widget, usuario_id: int | None = None):
+        def __init__(self, parent: tk.Widget, usuario_id: int | None = None, on_logout_callback=None, repositorio=None):
             super().__init__(parent)
             ttk.Label(self, text=f"UI Ingresos no disponible: {exc}").pack(padx=12, pady=12)
 
 
-def create_ingresos_tab(parent: tk.Widget, usuario_id: int | None = None, on_logout_callback=None) -> tk.Widget:
+def create_ingresos_tab(parent: tk.Widget, usuario_id: int | None = None, on_logout_callback=None, repositorio=None) -> tk.Widget:
     """Crea y devuelve el contenedor principal de la pestaña Ingresos.
 
-    Este módulo actúa como orquestador: importa la vista y más adelante
-    podrá inyectar servicios de datos definidos en ingresos_db.
+    Este módulo actúa como orquestador: importa la vista y le inyecta el
+    IngresosRepository de ingresos_db (si no se indica, la vista crea el
+    del motor configurado en INGRESOS_SETTINGS).
     """
-    return IngresosView(parent, usuario_id, on_logout_callback)
+    return IngresosView(parent, usuario_id, on_logout_callback, repositorio)
 
 
@@ -1,83 +1,133 @@
+import bisect
+import json
+import threading
 from dataclasses import dataclass
-from typing import List, Optional
-import sqlite3
-from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 from datetime import date
 
+from database.catalog_cache import cached_catalog
+from database.changes import mark_changed
+from database.fts import build_match_query, has_student_fts
+from database.pool import get_connection
+from database.write_queue import run_write
+from consultas.consultas_index import (
+    format_nombre_completo,
+    index_remove_estudiante,
+    index_upsert_estudiante,
+    normalize_text,
+    tokenize,
+)
+
 
 @dataclass
 class Ingreso:
+    """Un pago de la tabla pago con los nombres que muestra la vista."""
     id: int
     fecha: str
     concepto: str
     monto: float
+    estudiante: str = ""
+    usuario: str = ""
+    concepto_pago_id: Optional[int] = None
+    estudiante_id: Optional[int] = None
+    usuario_id: Optional[int] = None
+
+    def table_row(self) -> tuple[int, str, str, str, float, str]:
+        """Fila con la forma de fetch_pagos_for_table."""
+        return (self.id, self.concepto, self.estudiante, self.usuario, self.monto, self.fecha)
 
 
 class IngresosRepository:
-    """Repositorio de datos para Ingresos.
+    """Interfaz de datos de Ingresos (pagos) que usa IngresosView.
 
-    Por ahora es un stub en memoria. Luego se cambiará a SQLite u otro motor.
-    """
+    Hay dos motores: `SQLiteIngresosRepository` sobre la tabla pago y
+    `MemoryIngresosRepository`, indexado en memoria, para pruebas y
+    kioscos; servicio.cliente agrega `RemoteIngresosRepository`. `create_ingresos_repository` elige uno según
+    INGRESOS_SETTINGS['engine'].
 
-    def __init__(self):
-        self._items: List[Ingreso] = []
-        self._next_id: int = 1
+    Los métodos de paginación (contar, pagina, id_en, posicion) siguen a
+    count_pagos y compañía: filtran por nombre de estudiante (search_text)
+    o por estudiante_ids y retornan filas con la forma de
+    fetch_pagos_for_table, ordenadas por id.
+    """
 
     def listar(self) -> List[Ingreso]:
-        return list(self._items)
+        raise NotImplementedError
+
+    def obtener(self, ingreso_id: int) -> Optional[Ingreso]:
+        raise NotImplementedError
 
     def buscar(self, texto: str) -> List[Ingreso]:
-        criterio = texto.lower().strip()
-        return [i for i in self._items if criterio in i.concepto.lower()]
+        """Ingresos cuyo concepto tiene palabras que empiezan con cada palabra de texto."""
+        raise NotImplementedError
 
-    def agregar(self, fecha: str, concepto: str, monto: float) -> Ingreso:
-        item = Ingreso(id=self._next_id, fecha=fecha, concepto=concepto, monto=monto)
-        self._items.append(item)
-        self._next_id += 1
-        return item
+    def entre_fechas(self, desde: str, hasta: str) -> List[Ingreso]:
+        """Ingresos con fecha en [desde, hasta] (YYYY-MM-DD), ordenados por fecha."""
+        raise NotImplementedError
+
+    def agregar(self, concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float, fecha: Optional[str] = None) -> Optional[Ingreso]:
+        """Registra un pago (fecha actual si no se indica); None si falla."""
+        raise NotImplementedError
+
+    def agregar_lote(self, concepto_pago_id: int, estudiante_ids: Sequence[int], usuario_id: int, monto: float, fecha: Optional[str] = None) -> List[Ingreso]:
+        """Registra el mismo pago para varios estudiantes, todos o ninguno.
+
+        Retorna los ingresos nuevos ordenados por id ([] si falla).
+        """
+        raise NotImplementedError
+
+    def actualizar(self, ingreso_id: int, concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float) -> Optional[Ingreso]:
+        """Modifica un pago conservando su fecha; None si no existe o falla."""
+        raise NotImplementedError
 
     def eliminar(self, ingreso_id: int) -> bool:
-        for idx, item in enumerate(self._items):
-            if item.id == ingreso_id:
-                del self._items[idx]
-                return True
-        return False
+        raise NotImplementedError
 
-    def obtener(self, ingreso_id: int) -> Optional[Ingreso]:
-        for item in self._items:
-            if item.id == ingreso_id:
-                return item
-        return None
+    def contar(self, search_text: str = "", estudiante_ids: Optional[Sequence[int]] = None) -> int:
+        raise NotImplementedError
+
+    def pagina(self, after_id: Optional[int], limit: int, search_text: str = "", estudiante_ids: Optional[Sequence[int]] = None) -> List[tuple[int, str, str, str, float, str]]:
+        raise NotImplementedError
+
+    def id_en(self, offset: int, search_text: str = "", estudiante_ids: Optional[Sequence[int]] = None) -> Optional[int]:
+        raise NotImplementedError
+
+    def posicion(self, ingreso_id: int, search_text: str = "", estudiante_ids: Optional[Sequence[int]] = None) -> int:
+        raise NotImplementedError
+
+    # Los motores que guardan los pagos en memoria aplican aquí los cambios
+    # hechos en la tabla estudiante; el motor SQLite ya lee el estado actual.
 
+    def estudiante_guardado(self, estudiante_id: int, nombre_completo: str) -> None:
+        pass
 
+    def estudiante_eliminado(self, estudiante_id: int) -> None:
+        """El estudiante se eliminó junto con sus pagos (delete_estudiante_cascade)."""
+        pass
+
+
+@cached_catalog("grado")
 def fetch_grados(db_path: str = "academia.db") -> List[str]:
     """Obtiene la lista de grados (campo nombre) desde la base de datos.
 
     Si la base o la tabla/campo no existen, devuelve una lista vacía.
     """
     try:
-        if not Path(db_path).exists():
-            return []
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute("SELECT nombre FROM grado ORDER BY nombre ASC;")
             rows = cur.fetchall()
             return [r[0] for r in rows if r and r[0] is not None]
-        finally:
-            conn.close()
     except Exception:
         # Silencioso por ahora; en futuro se agregará logging
         return []
 
 
+@cached_catalog("grado")
 def fetch_grados_with_ids(db_path: str = "academia.db") -> List[tuple[int, str]]:
     """Retorna lista de tuplas (id, nombre) de la tabla grado."""
     try:
-        if not Path(db_path).exists():
-            return []
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute("SELECT grado_id, nombre FROM grado ORDER BY nombre ASC;")
             rows = cur.fetchall()
@@ -87,19 +137,15 @@ def fetch_grados_with_ids(db_path: str = "academia.db") -> List[tuple[int, str]]
                 if r and r[0] is not None and r[1] is not None:
                     result.append((int(r[0]), str(r[1])))
             return result
-        finally:
-            conn.close()
     except Exception:
         return []
 
 
+@cached_catalog("concepto_pago")
 def fetch_conceptos_pago_with_ids(db_path: str = "academia.db") -> List[tuple[int, str]]:
     """Retorna lista de tuplas (id, nombre) de la tabla concepto_pago."""
     try:
-        if not Path(db_path).exists():
-            return []
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute("SELECT concepto_pago_id, nombre FROM concepto_pago ORDER BY nombre ASC;")
             rows = cur.fetchall()
@@ -108,8 +154,6 @@ def fetch_conceptos_pago_with_ids(db_path: str = "academia.db") -> List[tuple[in
                 if r and r[0] is not None and r[1] is not None:
                     result.append((int(r[0]), str(r[1])))
             return result
-        finally:
-            conn.close()
     except Exception:
         return []
 
@@ -117,10 +161,167 @@ def fetch_conceptos_pago_with_ids(db_path: str = "academia.db") -> List[tuple[in
 def fetch_estudiantes_for_table(db_path: str = "academia.db") -> List[tuple[int, str, str, str, str]]:
     """Retorna filas para tabla de estudiantes: (estudiante_id, NombreCompleto, Institucion, GradoNombre, Telefono)."""
     try:
-        if not Path(db_path).exists():
+        with get_connection(db_path) as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT e.estudiante_id,
+                       TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS nombre_completo,
+                       e.institucion,
+                       g.nombre AS grado,
+                       e.telefono
+                FROM estudiante e
+                LEFT JOIN grado g ON g.grado_id = e.grado_id
+                ORDER BY e.estudiante_id ASC;
+                """
+            )
+            return cur.fetchall()
+    except Exception:
+        return []
+
+
+def search_estudiantes_for_table(search_text: str, db_path: str = "academia.db") -> List[tuple[int, str, str, str, str]]:
+    """Busca estudiantes con la forma de fetch_estudiantes_for_table.
+
+    Con FTS5 cada palabra se busca como prefijo en nombre, apellido,
+    institución o teléfono, ordenando por relevancia; sin FTS5 se filtra el
+    nombre completo con LIKE.
+    """
+    select = """
+        SELECT e.estudiante_id,
+               TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS nombre_completo,
+               e.institucion,
+               g.nombre AS grado,
+               e.telefono
+    """
+    if has_student_fts(db_path):
+        match = build_match_query(search_text)
+        if match is None:
             return []
-        conn = sqlite3.connect(db_path)
         try:
+            with get_connection(db_path) as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    select + """
+                    FROM estudiante_fts f
+                    JOIN estudiante e ON e.estudiante_id = f.rowid
+                    LEFT JOIN grado g ON g.grado_id = e.grado_id
+                    WHERE estudiante_fts MATCH ?
+                    ORDER BY bm25(estudiante_fts, 10.0, 10.0, 1.0, 1.0), e.estudiante_id ASC;
+                    """,
+                    (match,)
+                )
+                return cur.fetchall()
+        except Exception:
+            pass  # Continuar con la búsqueda LIKE
+    try:
+        with get_connection(db_path) as conn:
+            cur = conn.cursor()
+            cur.execute(
+                select + """
+                FROM estudiante e
+                LEFT JOIN grado g ON g.grado_id = e.grado_id
+                WHERE TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) LIKE ?
+                ORDER BY e.estudiante_id ASC;
+                """,
+                (f"%{search_text.strip()}%",)
+            )
+            return cur.fetchall()
+    except Exception:
+        return []
+
+
+def _estudiantes_filtro(search_text: str) -> tuple[str, tuple]:
+    """Condición LIKE sobre el nombre completo usada por las páginas de estudiantes."""
+    texto = (search_text or "").strip()
+    if not texto:
+        return "", ()
+    return (
+        "AND TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) LIKE ?",
+        (f"%{texto}%",),
+    )
+
+
+def count_estudiantes(search_text: str = "", db_path: str = "academia.db") -> int:
+    """Cantidad de estudiantes (filtrados por nombre si se indica search_text)."""
+    filtro, params = _estudiantes_filtro(search_text)
+    try:
+        with get_connection(db_path) as conn:
+            row = conn.execute(f"SELECT COUNT(*) FROM estudiante e WHERE 1 = 1 {filtro};", params).fetchone()
+            return int(row[0]) if row else 0
+    except Exception:
+        return 0
+
+
+def fetch_estudiantes_page(after_estudiante_id: Optional[int], limit: int, search_text: str = "", db_path: str = "academia.db") -> List[tuple[int, str, str, str, str]]:
+    """Página de la tabla de estudiantes con paginación por clave (estudiante_id > ?).
+
+    Las filas tienen la forma de fetch_estudiantes_for_table. Con
+    after_estudiante_id None se retorna la primera página.
+    """
+    filtro, params = _estudiantes_filtro(search_text)
+    try:
+        with get_connection(db_path) as conn:
+            cur = conn.cursor()
+            cur.execute(
+                f"""
+                SELECT e.estudiante_id,
+                       TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS nombre_completo,
+                       e.institucion,
+                       g.nombre AS grado,
+                       e.telefono
+                FROM estudiante e
+                LEFT JOIN grado g ON g.grado_id = e.grado_id
+                WHERE e.estudiante_id > ? {filtro}
+                ORDER BY e.estudiante_id ASC
+                LIMIT ?;
+                """,
+                (after_estudiante_id if after_estudiante_id is not None else -1, *params, int(limit))
+            )
+            return cur.fetchall()
+    except Exception:
+        return []
+
+
+def fetch_estudiante_id_at(offset: int, search_text: str = "", db_path: str = "academia.db") -> Optional[int]:
+    """Retorna el estudiante_id en la posición offset (base 0) del listado."""
+    filtro, params = _estudiantes_filtro(search_text)
+    try:
+        with get_connection(db_path) as conn:
+            row = conn.execute(
+                f"SELECT e.estudiante_id FROM estudiante e WHERE 1 = 1 {filtro} "
+                "ORDER BY e.estudiante_id ASC LIMIT 1 OFFSET ?;",
+                (*params, int(offset))
+            ).fetchone()
+            return int(row[0]) if row else None
+    except Exception:
+        return None
+
+
+def count_estudiantes_before(estudiante_id: int, search_text: str = "", db_path: str = "academia.db") -> int:
+    """Posición (base 0) que ocupa estudiante_id en el listado."""
+    filtro, params = _estudiantes_filtro(search_text)
+    try:
+        with get_connection(db_path) as conn:
+            row = conn.execute(
+                f"SELECT COUNT(*) FROM estudiante e WHERE e.estudiante_id < ? {filtro};",
+                (estudiante_id, *params)
+            ).fetchone()
+            return int(row[0]) if row else 0
+    except Exception:
+        return 0
+
+
+def fetch_estudiantes_by_ids(estudiante_ids: Sequence[int], db_path: str = "academia.db") -> List[tuple[int, str, str, str, str]]:
+    """Filas de la tabla de estudiantes para los ids dados, ordenadas por estudiante_id.
+
+    Lo usa la búsqueda de IngresosView para leer solo la página visible de
+    un resultado ya filtrado en memoria.
+    """
+    if not estudiante_ids:
+        return []
+    try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -131,12 +332,32 @@ def fetch_estudiantes_for_table(db_path: str = "academia.db") -> List[tuple[int,
                        e.telefono
                 FROM estudiante e
                 LEFT JOIN grado g ON g.grado_id = e.grado_id
+                WHERE e.estudiante_id IN (SELECT value FROM json_each(?))
                 ORDER BY e.estudiante_id ASC;
+                """,
+                (json.dumps([int(i) for i in estudiante_ids]),)
+            )
+            return cur.fetchall()
+    except Exception:
+        return []
+
+
+def fetch_estudiantes_by_grado(grado_id: int, db_path: str = "academia.db") -> List[tuple[int, str]]:
+    """Retorna (estudiante_id, nombre_completo) de los estudiantes de un grado, por estudiante_id."""
+    try:
+        with get_connection(db_path) as conn:
+            cur = conn.cursor()
+            cur.execute(
                 """
+                SELECT e.estudiante_id,
+                       TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS nombre_completo
+                FROM estudiante e
+                WHERE e.grado_id = ?
+                ORDER BY e.estudiante_id ASC;
+                """,
+                (grado_id,)
             )
             return cur.fetchall()
-        finally:
-            conn.close()
     except Exception:
         return []
 
@@ -144,10 +365,7 @@ def fetch_estudiantes_for_table(db_path: str = "academia.db") -> List[tuple[int,
 def fetch_pagos_for_table(db_path: str = "academia.db") -> List[tuple[int, str, str, str, float, str]]:
     """Retorna filas para tabla de pagos: (pago_id, ConceptoNombre, EstudianteNombre, UsuarioNombre, Monto, Fecha)."""
     try:
-        if not Path(db_path).exists():
-            return []
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -165,19 +383,151 @@ def fetch_pagos_for_table(db_path: str = "academia.db") -> List[tuple[int, str,
                 """
             )
             return cur.fetchall()
-        finally:
-            conn.close()
     except Exception:
         return []
 
 
+def _estudiante_table_row(conn, estudiante_id: int) -> Optional[tuple[int, str, str, str, str]]:
+    """Fila de un estudiante con la forma de fetch_estudiantes_for_table."""
+    return conn.execute(
+        """
+        SELECT e.estudiante_id,
+               TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS nombre_completo,
+               e.institucion,
+               g.nombre AS grado,
+               e.telefono
+        FROM estudiante e
+        LEFT JOIN grado g ON g.grado_id = e.grado_id
+        WHERE e.estudiante_id = ?;
+        """,
+        (estudiante_id,)
+    ).fetchone()
+
+
+def _pago_table_row(conn, pago_id: int) -> Optional[tuple[int, str, str, str, float, str]]:
+    """Fila de un pago con la forma de fetch_pagos_for_table."""
+    return conn.execute(
+        """
+        SELECT p.pago_id,
+               cp.nombre AS concepto,
+               TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS estudiante,
+               u.nombre AS usuario,
+               p.monto,
+               p.fecha
+        FROM pago p
+        LEFT JOIN concepto_pago cp ON cp.concepto_pago_id = p.concepto_pago_id
+        LEFT JOIN estudiante e ON e.estudiante_id = p.estudiante_id
+        LEFT JOIN usuario u ON u.usuario_id = p.usuario_id
+        WHERE p.pago_id = ?;
+        """,
+        (pago_id,)
+    ).fetchone()
+
+
+def _pagos_filtro(search_text: str, estudiante_ids: Optional[Sequence[int]] = None) -> tuple[str, str, tuple]:
+    """Join y condiciones usados por las páginas de pagos.
+
+    search_text filtra con LIKE sobre el nombre del estudiante; estudiante_ids
+    limita los pagos a esos estudiantes (el filtro de nombres ya resuelto en
+    memoria) y se pasa como un único parámetro JSON para no depender del
+    límite de variables de SQLite.
+    """
+    join, filtro, params = "", "", ()
+    texto = (search_text or "").strip()
+    if texto:
+        join = "LEFT JOIN estudiante e ON e.estudiante_id = p.estudiante_id"
+        filtro = "AND TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) LIKE ?"
+        params = (f"%{texto}%",)
+    if estudiante_ids is not None:
+        filtro += " AND p.estudiante_id IN (SELECT value FROM json_each(?))"
+        params += (json.dumps([int(i) for i in estudiante_ids]),)
+    return join, filtro, params
+
+
+def count_pagos(search_text: str = "", db_path: str = "academia.db", estudiante_ids: Optional[Sequence[int]] = None) -> int:
+    """Cantidad de pagos (filtrados por nombre o por estudiante_ids si se indican)."""
+    join, filtro, params = _pagos_filtro(search_text, estudiante_ids)
+    try:
+        with get_connection(db_path) as conn:
+            row = conn.execute(f"SELECT COUNT(*) FROM pago p {join} WHERE 1 = 1 {filtro};", params).fetchone()
+            return int(row[0]) if row else 0
+    except Exception:
+        return 0
+
+
+def fetch_pagos_page(after_pago_id: Optional[int], limit: int, search_text: str = "", db_path: str = "academia.db", estudiante_ids: Optional[Sequence[int]] = None) -> List[tuple[int, str, str, str, float, str]]:
+    """Página de la tabla de pagos con paginación por clave (pago_id > ?).
+
+    Las filas tienen la forma de fetch_pagos_for_table. El costo no depende
+    de la posición de la página: SQLite continúa el recorrido del rowid
+    desde after_pago_id en lugar de saltar filas con OFFSET.
+    """
+    join, filtro, params = _pagos_filtro(search_text, estudiante_ids)
+    if not join:
+        join = "LEFT JOIN estudiante e ON e.estudiante_id = p.estudiante_id"
+    try:
+        with get_connection(db_path) as conn:
+            cur = conn.cursor()
+            cur.execute(
+                f"""
+                SELECT p.pago_id,
+                       cp.nombre AS concepto,
+                       TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS estudiante,
+                       u.nombre AS usuario,
+                       p.monto,
+                       p.fecha
+                FROM pago p
+                {join}
+                LEFT JOIN concepto_pago cp ON cp.concepto_pago_id = p.concepto_pago_id
+                LEFT JOIN usuario u ON u.usuario_id = p.usuario_id
+                WHERE p.pago_id > ? {filtro}
+                ORDER BY p.pago_id ASC
+                LIMIT ?;
+                """,
+                (after_pago_id if after_pago_id is not None else -1, *params, int(limit))
+            )
+            return cur.fetchall()
+    except Exception:
+        return []
+
+
+def fetch_pago_id_at(offset: int, search_text: str = "", db_path: str = "academia.db", estudiante_ids: Optional[Sequence[int]] = None) -> Optional[int]:
+    """Retorna el pago_id en la posición offset (base 0) del listado.
+
+    Se usa solo para saltos de la barra de desplazamiento; recorre el índice
+    del rowid sin leer las columnas de cada pago.
+    """
+    join, filtro, params = _pagos_filtro(search_text, estudiante_ids)
+    try:
+        with get_connection(db_path) as conn:
+            row = conn.execute(
+                f"SELECT p.pago_id FROM pago p {join} WHERE 1 = 1 {filtro} "
+                "ORDER BY p.pago_id ASC LIMIT 1 OFFSET ?;",
+                (*params, int(offset))
+            ).fetchone()
+            return int(row[0]) if row else None
+    except Exception:
+        return None
+
+
+def count_pagos_before(pago_id: int, search_text: str = "", db_path: str = "academia.db", estudiante_ids: Optional[Sequence[int]] = None) -> int:
+    """Posición (base 0) que ocupa pago_id en el listado."""
+    join, filtro, params = _pagos_filtro(search_text, estudiante_ids)
+    try:
+        with get_connection(db_path) as conn:
+            row = conn.execute(
+                f"SELECT COUNT(*) FROM pago p {join} WHERE p.pago_id < ? {filtro};",
+                (pago_id, *params)
+            ).fetchone()
+            return int(row[0]) if row else 0
+    except Exception:
+        return 0
+
+
 def fetch_pago_by_id(pago_id: int, db_path: str = "academia.db") -> Optional[tuple[int, int, float, str]]:
     """Retorna (concepto_pago_id, estudiante_id, monto, fecha) para un pago."""
     try:
-        if not Path(db_path).exists():
-            return None
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -192,43 +542,38 @@ def fetch_pago_by_id(pago_id: int, db_path: str = "academia.db") -> Optional[tup
                 return None
             concepto_pago_id, estudiante_id, monto, fecha = row
             return (int(concepto_pago_id), int(estudiante_id), float(monto), str(fecha))
-        finally:
-            conn.close()
     except Exception:
         return None
 
 
-def update_pago(pago_id: int, concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float, db_path: str = "academia.db") -> bool:
-    """Actualiza un pago (fecha permanece igual)."""
-    try:
-        if not Path(db_path).exists():
-            return False
-        conn = sqlite3.connect(db_path)
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                UPDATE pago
-                SET concepto_pago_id = ?, estudiante_id = ?, usuario_id = ?, monto = ?
-                WHERE pago_id = ?;
-                """,
-                (concepto_pago_id, estudiante_id, usuario_id, float(monto), pago_id)
-            )
-            conn.commit()
-            return cur.rowcount > 0
-        finally:
-            conn.close()
-    except Exception:
-        return False
+def update_pago(pago_id: int, concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float, db_path: str = "academia.db") -> Optional[tuple[int, str, str, str, float, str]]:
+    """Actualiza un pago (fecha permanece igual).
+
+    Devuelve la fila actualizada con la forma de fetch_pagos_for_table, o
+    None si el pago no existe o falla la escritura.
+    """
+    return run_write(db_path, _do_update_pago, pago_id, concepto_pago_id, estudiante_id, usuario_id, monto, tables=("pago",))
+
+
+def _do_update_pago(conn, pago_id: int, concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float) -> Optional[tuple[int, str, str, str, float, str]]:
+    cur = conn.cursor()
+    cur.execute(
+        """
+        UPDATE pago
+        SET concepto_pago_id = ?, estudiante_id = ?, usuario_id = ?, monto = ?
+        WHERE pago_id = ?;
+        """,
+        (concepto_pago_id, estudiante_id, usuario_id, float(monto), pago_id)
+    )
+    if cur.rowcount <= 0:
+        return None
+    return _pago_table_row(conn, pago_id)
 
 
 def fetch_estudiante_by_id(estudiante_id: int, db_path: str = "academia.db") -> Optional[tuple[str, str, str, int, str]]:
     """Retorna (nombre, apellido, institucion, grado_id, telefono) para el estudiante dado."""
     try:
-        if not Path(db_path).exists():
-            return None
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -243,19 +588,17 @@ def fetch_estudiante_by_id(estudiante_id: int, db_path: str = "academia.db") ->
                 return None
             nombre, apellido, institucion, grado_id, telefono = row
             return (str(nombre or ""), str(apellido or ""), str(institucion or ""), int(grado_id) if grado_id is not None else 0, str(telefono or ""))
-        finally:
-            conn.close()
     except Exception:
         return None
 
 
-def insert_estudiante(nombre: str, apellido: str, telefono: str, grado_id: int, institucion: str, db_path: str = "academia.db") -> Optional[int]:
-    """Inserta un estudiante y devuelve su nuevo estudiante_id."""
+def insert_estudiante(nombre: str, apellido: str, telefono: str, grado_id: int, institucion: str, db_path: str = "academia.db") -> Optional[tuple[int, str, str, str, str]]:
+    """Inserta un estudiante y devuelve su fila con la forma de fetch_estudiantes_for_table.
+
+    El nuevo estudiante_id es el primer elemento de la fila.
+    """
     try:
-        if not Path(db_path).exists():
-            return None
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -265,20 +608,18 @@ def insert_estudiante(nombre: str, apellido: str, telefono: str, grado_id: int,
                 (nombre, apellido, telefono, grado_id, institucion)
             )
             conn.commit()
-            return int(cur.lastrowid)
-        finally:
-            conn.close()
+            estudiante_id = int(cur.lastrowid)
+            index_upsert_estudiante(estudiante_id, format_nombre_completo(nombre, apellido), db_path)
+            mark_changed(db_path, "estudiante")
+            return _estudiante_table_row(conn, estudiante_id)
     except Exception:
         return None
 
 
-def update_estudiante(estudiante_id: int, nombre: str, apellido: str, telefono: str, grado_id: int, institucion: str, db_path: str = "academia.db") -> bool:
-    """Actualiza un estudiante por su ID."""
+def update_estudiante(estudiante_id: int, nombre: str, apellido: str, telefono: str, grado_id: int, institucion: str, db_path: str = "academia.db") -> Optional[tuple[int, str, str, str, str]]:
+    """Actualiza un estudiante por su ID y devuelve su fila para la tabla (None si no existe)."""
     try:
-        if not Path(db_path).exists():
-            return False
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -289,20 +630,19 @@ def update_estudiante(estudiante_id: int, nombre: str, apellido: str, telefono:
                 (nombre, apellido, telefono, grado_id, institucion, estudiante_id)
             )
             conn.commit()
-            return cur.rowcount > 0
-        finally:
-            conn.close()
+            if cur.rowcount <= 0:
+                return None
+            index_upsert_estudiante(estudiante_id, format_nombre_completo(nombre, apellido), db_path)
+            mark_changed(db_path, "estudiante")
+            return _estudiante_table_row(conn, estudiante_id)
     except Exception:
-        return False
+        return None
 
 
 def validar_credenciales(usuario: str, contrasena: str, db_path: str = "academia.db") -> bool:
     """Devuelve True si existe un registro en usuario(nombre, contrasena) que coincide exactamente."""
     try:
-        if not Path(db_path).exists():
-            return False
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -313,8 +653,6 @@ def validar_credenciales(usuario: str, contrasena: str, db_path: str = "academia
                 (usuario, contrasena)
             )
             return cur.fetchone() is not None
-        finally:
-            conn.close()
     except Exception:
         return False
 
@@ -322,10 +660,7 @@ def validar_credenciales(usuario: str, contrasena: str, db_path: str = "academia
 def authenticate_user(usuario: str, contrasena: str, db_path: str = "academia.db") -> Optional[int]:
     """Retorna usuario_id si las credenciales son válidas; None en caso contrario."""
     try:
-        if not Path(db_path).exists():
-            return None
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -339,90 +674,117 @@ def authenticate_user(usuario: str, contrasena: str, db_path: str = "academia.db
             if row is None:
                 return None
             return int(row[0])
-        finally:
-            conn.close()
     except Exception:
         return None
 
 
-def insert_pago(concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float, db_path: str = "academia.db") -> Optional[int]:
-    """Inserta un pago con fecha actual (YYYY-MM-DD). Devuelve pago_id."""
-    try:
-        if not Path(db_path).exists():
-            return None
-        conn = sqlite3.connect(db_path)
-        try:
-            cur = conn.cursor()
-            fecha_hoy = date.today().isoformat()
-            cur.execute(
-                """
-                INSERT INTO pago (concepto_pago_id, estudiante_id, usuario_id, monto, fecha)
-                VALUES (?, ?, ?, ?, ?);
-                """,
-                (concepto_pago_id, estudiante_id, usuario_id, float(monto), fecha_hoy)
-            )
-            conn.commit()
-            return int(cur.lastrowid)
-        finally:
-            conn.close()
-    except Exception:
-        return None
+def insert_pago(concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float, db_path: str = "academia.db", fecha: Optional[str] = None) -> Optional[tuple[int, str, str, str, float, str]]:
+    """Inserta un pago con fecha actual (YYYY-MM-DD) o la indicada.
+
+    Devuelve la fila con la forma de fetch_pagos_for_table; el nuevo pago_id
+    es su primer elemento.
+    """
+    return run_write(db_path, _do_insert_pago, concepto_pago_id, estudiante_id, usuario_id, monto, fecha, tables=("pago",))
+
+
+def _do_insert_pago(conn, concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float, fecha: Optional[str]) -> Optional[tuple[int, str, str, str, float, str]]:
+    cur = conn.cursor()
+    fecha_pago = fecha or date.today().isoformat()
+    cur.execute(
+        """
+        INSERT INTO pago (concepto_pago_id, estudiante_id, usuario_id, monto, fecha)
+        VALUES (?, ?, ?, ?, ?);
+        """,
+        (concepto_pago_id, estudiante_id, usuario_id, float(monto), fecha_pago)
+    )
+    return _pago_table_row(conn, int(cur.lastrowid))
+
+
+def insert_pagos_bulk(concepto_pago_id: int, estudiante_ids: Sequence[int], usuario_id: int, monto: float, db_path: str = "academia.db", fecha: Optional[str] = None) -> List[tuple[int, str, str, str, float, str]]:
+    """Inserta el mismo pago para varios estudiantes en una sola transacción.
+
+    Se registran todos o ninguno. Devuelve las filas nuevas con la forma de
+    fetch_pagos_for_table, ordenadas por pago_id, o [] si falla. Los ids
+    repetidos se registran una sola vez.
+    """
+    return run_write(db_path, _do_insert_pagos_bulk, concepto_pago_id, estudiante_ids, usuario_id, monto, fecha, tables=("pago",), default=[])
+
+
+def _do_insert_pagos_bulk(conn, concepto_pago_id: int, estudiante_ids: Sequence[int], usuario_id: int, monto: float, fecha: Optional[str]) -> List[tuple[int, str, str, str, float, str]]:
+    ids = list(dict.fromkeys(int(i) for i in estudiante_ids))
+    if not ids:
+        return []
+    fecha_pago = fecha or date.today().isoformat()
+    # IMMEDIATE: nadie más inserta pagos entre leer el último id y el commit
+    # (en la cola de escrituras el lote ya abrió la transacción así)
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE;")
+    last_id = conn.execute("SELECT COALESCE(MAX(pago_id), 0) FROM pago;").fetchone()[0]
+    conn.executemany(
+        """
+        INSERT INTO pago (concepto_pago_id, estudiante_id, usuario_id, monto, fecha)
+        VALUES (?, ?, ?, ?, ?);
+        """,
+        [(concepto_pago_id, estudiante_id, usuario_id, float(monto), fecha_pago) for estudiante_id in ids]
+    )
+    return conn.execute(
+        """
+        SELECT p.pago_id,
+               cp.nombre AS concepto,
+               TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS estudiante,
+               u.nombre AS usuario,
+               p.monto,
+               p.fecha
+        FROM pago p
+        LEFT JOIN concepto_pago cp ON cp.concepto_pago_id = p.concepto_pago_id
+        LEFT JOIN estudiante e ON e.estudiante_id = p.estudiante_id
+        LEFT JOIN usuario u ON u.usuario_id = p.usuario_id
+        WHERE p.pago_id > ?
+        ORDER BY p.pago_id ASC;
+        """,
+        (last_id,)
+    ).fetchall()
 
 
 def insert_calificacion(estudiante_id: int, nota_uno: float, nota_dos: float, nota_tres: float, nota_cuatro: float, db_path: str = "academia.db") -> Optional[int]:
     """Inserta una calificación y devuelve su calificacion_id."""
-    try:
-        if not Path(db_path).exists():
-            return None
-        conn = sqlite3.connect(db_path)
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO calificacion (estudiante_id, nota_uno, nota_dos, nota_tres, nota_cuatro)
-                VALUES (?, ?, ?, ?, ?);
-                """,
-                (estudiante_id, float(nota_uno), float(nota_dos), float(nota_tres), float(nota_cuatro))
-            )
-            conn.commit()
-            return int(cur.lastrowid)
-        finally:
-            conn.close()
-    except Exception:
-        return None
+    return run_write(db_path, _do_insert_calificacion, estudiante_id, nota_uno, nota_dos, nota_tres, nota_cuatro)
+
+
+def _do_insert_calificacion(conn, estudiante_id: int, nota_uno: float, nota_dos: float, nota_tres: float, nota_cuatro: float) -> int:
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO calificacion (estudiante_id, nota_uno, nota_dos, nota_tres, nota_cuatro)
+        VALUES (?, ?, ?, ?, ?);
+        """,
+        (estudiante_id, float(nota_uno), float(nota_dos), float(nota_tres), float(nota_cuatro))
+    )
+    return int(cur.lastrowid)
 
 
 def update_calificacion(calificacion_id: int, nota_uno: float, nota_dos: float, nota_tres: float, nota_cuatro: float, db_path: str = "academia.db") -> bool:
     """Actualiza una calificación por su ID."""
-    try:
-        if not Path(db_path).exists():
-            return False
-        conn = sqlite3.connect(db_path)
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                UPDATE calificacion
-                SET nota_uno = ?, nota_dos = ?, nota_tres = ?, nota_cuatro = ?
-                WHERE calificacion_id = ?;
-                """,
-                (float(nota_uno), float(nota_dos), float(nota_tres), float(nota_cuatro), calificacion_id)
-            )
-            conn.commit()
-            return cur.rowcount > 0
-        finally:
-            conn.close()
-    except Exception:
-        return False
+    return run_write(db_path, _do_update_calificacion, calificacion_id, nota_uno, nota_dos, nota_tres, nota_cuatro, default=False)
+
+
+def _do_update_calificacion(conn, calificacion_id: int, nota_uno: float, nota_dos: float, nota_tres: float, nota_cuatro: float) -> bool:
+    cur = conn.cursor()
+    cur.execute(
+        """
+        UPDATE calificacion
+        SET nota_uno = ?, nota_dos = ?, nota_tres = ?, nota_cuatro = ?
+        WHERE calificacion_id = ?;
+        """,
+        (float(nota_uno), float(nota_dos), float(nota_tres), float(nota_cuatro), calificacion_id)
+    )
+    return cur.rowcount > 0
 
 
 def fetch_calificacion_by_estudiante(estudiante_id: int, db_path: str = "academia.db") -> Optional[tuple[int, float, float, float, float]]:
     """Retorna (calificacion_id, nota_uno, nota_dos, nota_tres, nota_cuatro) para un estudiante."""
     try:
-        if not Path(db_path).exists():
-            return None
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute(
                 """
@@ -437,78 +799,450 @@ def fetch_calificacion_by_estudiante(estudiante_id: int, db_path: str = "academi
                 return None
             calificacion_id, nota_uno, nota_dos, nota_tres, nota_cuatro = row
             return (int(calificacion_id), float(nota_uno), float(nota_dos), float(nota_tres), float(nota_cuatro))
-        finally:
-            conn.close()
     except Exception:
         return None
 
 
 def delete_calificacion(calificacion_id: int, db_path: str = "academia.db") -> bool:
     """Elimina una calificación por su ID."""
-    try:
-        if not Path(db_path).exists():
-            return False
-        conn = sqlite3.connect(db_path)
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                DELETE FROM calificacion
-                WHERE calificacion_id = ?;
-                """,
-                (calificacion_id,)
-            )
-            conn.commit()
-            return cur.rowcount > 0
-        finally:
-            conn.close()
-    except Exception:
-        return False
+    return run_write(db_path, _do_delete_calificacion, calificacion_id, default=False)
+
+
+def _do_delete_calificacion(conn, calificacion_id: int) -> bool:
+    cur = conn.cursor()
+    cur.execute(
+        """
+        DELETE FROM calificacion
+        WHERE calificacion_id = ?;
+        """,
+        (calificacion_id,)
+    )
+    return cur.rowcount > 0
 
 
 def delete_pago(pago_id: int, db_path: str = "academia.db") -> bool:
     """Elimina un pago por su ID."""
-    try:
-        if not Path(db_path).exists():
-            return False
-        conn = sqlite3.connect(db_path)
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                DELETE FROM pago
-                WHERE pago_id = ?;
-                """,
-                (pago_id,)
-            )
-            conn.commit()
-            return cur.rowcount > 0
-        finally:
-            conn.close()
-    except Exception:
-        return False
+    return run_write(db_path, _do_delete_pago, pago_id, tables=("pago",), default=False)
+
+
+def _do_delete_pago(conn, pago_id: int) -> bool:
+    cur = conn.cursor()
+    cur.execute(
+        """
+        DELETE FROM pago
+        WHERE pago_id = ?;
+        """,
+        (pago_id,)
+    )
+    return cur.rowcount > 0
 
 
 def delete_estudiante_cascade(estudiante_id: int, db_path: str = "academia.db") -> bool:
     """Elimina un estudiante y todas sus relaciones (pagos, calificaciones)."""
+    ok = run_write(db_path, _do_delete_estudiante_cascade, estudiante_id, tables=("estudiante", "pago", "calificacion"), default=False)
+    if ok:
+        index_remove_estudiante(estudiante_id, db_path)
+    return ok
+
+
+def _do_delete_estudiante_cascade(conn, estudiante_id: int) -> bool:
+    cur = conn.cursor()
+    # Eliminar en cascada: primero pagos, luego calificaciones, finalmente estudiante
+    cur.execute("DELETE FROM pago WHERE estudiante_id = ?;", (estudiante_id,))
+    cur.execute("DELETE FROM calificacion WHERE estudiante_id = ?;", (estudiante_id,))
+    cur.execute("DELETE FROM estudiante WHERE estudiante_id = ?;", (estudiante_id,))
+    return cur.rowcount > 0
+
+
+
+
+
+
+
+# ---------------------------------------------------------------------------
+# Versiones asyncio (database.aio): lecturas agrupadas por conexión en los
+# lectores del executor asyncio, escrituras en el hilo escritor
+# ---------------------------------------------------------------------------
+
+async def fetch_estudiante_by_id_async(estudiante_id: int, db_path: str = "academia.db") -> Optional[tuple[str, str, str, int, str]]:
+    """Versión asyncio de fetch_estudiante_by_id."""
+    from database.aio import get_async_executor
+    return await get_async_executor().read(db_path, fetch_estudiante_by_id, estudiante_id, db_path)
+
+
+async def fetch_estudiantes_page_async(after_estudiante_id: Optional[int], limit: int, search_text: str = "", db_path: str = "academia.db") -> List[tuple[int, str, str, str, str]]:
+    """Versión asyncio de fetch_estudiantes_page."""
+    from database.aio import get_async_executor
+    return await get_async_executor().read(db_path, fetch_estudiantes_page, after_estudiante_id, limit, search_text, db_path)
+
+
+async def count_pagos_async(search_text: str = "", db_path: str = "academia.db", estudiante_ids: Optional[Sequence[int]] = None) -> int:
+    """Versión asyncio de count_pagos."""
+    from database.aio import get_async_executor
+    return await get_async_executor().read(db_path, count_pagos, search_text, db_path, estudiante_ids)
+
+
+async def fetch_pagos_page_async(after_pago_id: Optional[int], limit: int, search_text: str = "", db_path: str = "academia.db", estudiante_ids: Optional[Sequence[int]] = None) -> List[tuple[int, str, str, str, float, str]]:
+    """Versión asyncio de fetch_pagos_page."""
+    from database.aio import get_async_executor
+    return await get_async_executor().read(db_path, fetch_pagos_page, after_pago_id, limit, search_text, db_path, estudiante_ids)
+
+
+async def insert_pago_async(concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float, db_path: str = "academia.db", fecha: Optional[str] = None) -> Optional[tuple[int, str, str, str, float, str]]:
+    """Versión asyncio de insert_pago (en el hilo escritor compartido)."""
+    from database.aio import get_async_executor
+    return await get_async_executor().write(insert_pago, concepto_pago_id, estudiante_id, usuario_id, monto, db_path, fecha)
+
+
+# ---------------------------------------------------------------------------
+# Motores de IngresosRepository
+# ---------------------------------------------------------------------------
+
+# Motor por defecto de create_ingresos_repository: "sqlite", "memoria" o
+# "remoto" (servicio.cliente.instalar_remoto agrega 'servidor' y 'token')
+INGRESOS_SETTINGS = {
+    'engine': 'sqlite',
+}
+
+_INGRESO_SELECT = """
+    SELECT p.pago_id,
+           p.fecha,
+           cp.nombre AS concepto,
+           p.monto,
+           TRIM(COALESCE(e.nombre, '')) || ' ' || TRIM(COALESCE(e.apellido, '')) AS estudiante,
+           u.nombre AS usuario,
+           p.concepto_pago_id,
+           p.estudiante_id,
+           p.usuario_id
+    FROM pago p
+    LEFT JOIN concepto_pago cp ON cp.concepto_pago_id = p.concepto_pago_id
+    LEFT JOIN estudiante e ON e.estudiante_id = p.estudiante_id
+    LEFT JOIN usuario u ON u.usuario_id = p.usuario_id
+"""
+
+
+def _ingreso_from_row(row: tuple) -> Ingreso:
+    pago_id, fecha, concepto, monto, estudiante, usuario, concepto_pago_id, estudiante_id, usuario_id = row
+    return Ingreso(
+        id=int(pago_id), fecha=str(fecha or ""), concepto=concepto or "", monto=float(monto or 0),
+        estudiante=estudiante or "", usuario=usuario or "",
+        concepto_pago_id=concepto_pago_id, estudiante_id=estudiante_id, usuario_id=usuario_id,
+    )
+
+
+def _fetch_ingresos(db_path: str, where: str = "", params: tuple = (), order: str = "p.pago_id ASC") -> List[Ingreso]:
     try:
-        if not Path(db_path).exists():
-            return False
-        conn = sqlite3.connect(db_path)
-        try:
-            cur = conn.cursor()
-            # Eliminar en cascada: primero pagos, luego calificaciones, finalmente estudiante
-            cur.execute("DELETE FROM pago WHERE estudiante_id = ?;", (estudiante_id,))
-            cur.execute("DELETE FROM calificacion WHERE estudiante_id = ?;", (estudiante_id,))
-            cur.execute("DELETE FROM estudiante WHERE estudiante_id = ?;", (estudiante_id,))
-            conn.commit()
-            return cur.rowcount > 0
-        finally:
-            conn.close()
+        with get_connection(db_path) as conn:
+            rows = conn.execute(f"{_INGRESO_SELECT} {where} ORDER BY {order};", params).fetchall()
+            return [_ingreso_from_row(row) for row in rows]
     except Exception:
-        return False
+        return []
+
+
+def _conceptos_coinciden(texto: str, nombres: Dict[int, str]) -> List[int]:
+    """Ids de los conceptos cuyo nombre tiene palabras que empiezan con cada palabra de texto."""
+    consulta = tokenize(texto)
+    coinciden = []
+    for concepto_id, nombre in nombres.items():
+        palabras = tokenize(nombre)
+        if all(any(palabra.startswith(q) for palabra in palabras) for q in consulta):
+            coinciden.append(concepto_id)
+    return coinciden
+
+
+class SQLiteIngresosRepository(IngresosRepository):
+    """Motor sobre la tabla pago; usa las funciones de este módulo."""
+
+    def __init__(self, db_path: str = "academia.db"):
+        self.db_path = db_path
+
+    def listar(self) -> List[Ingreso]:
+        return _fetch_ingresos(self.db_path)
+
+    def obtener(self, ingreso_id: int) -> Optional[Ingreso]:
+        rows = _fetch_ingresos(self.db_path, "WHERE p.pago_id = ?", (int(ingreso_id),))
+        return rows[0] if rows else None
+
+    def buscar(self, texto: str) -> List[Ingreso]:
+        if not tokenize(texto):
+            return self.listar()
+        # Los conceptos son pocos: se comparan en Python con la misma regla que el motor en memoria
+        conceptos = _conceptos_coinciden(texto, dict(fetch_conceptos_pago_with_ids(self.db_path)))
+        return _fetch_ingresos(
+            self.db_path, "WHERE p.concepto_pago_id IN (SELECT value FROM json_each(?))", (json.dumps(conceptos),)
+        )
+
+    def entre_fechas(self, desde: str, hasta: str) -> List[Ingreso]:
+        return _fetch_ingresos(
+            self.db_path, "WHERE p.fecha BETWEEN ? AND ?", (desde, hasta), order="p.fecha ASC, p.pago_id ASC"
+        )
+
+    def agregar(self, concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float, fecha: Optional[str] = None) -> Optional[Ingreso]:
+        row = insert_pago(concepto_pago_id, estudiante_id, usuario_id, monto, self.db_path, fecha=fecha)
+        return self.obtener(row[0]) if row else None
+
+    def agregar_lote(self, concepto_pago_id: int, estudiante_ids: Sequence[int], usuario_id: int, monto: float, fecha: Optional[str] = None) -> List[Ingreso]:
+        rows = insert_pagos_bulk(concepto_pago_id, estudiante_ids, usuario_id, monto, self.db_path, fecha=fecha)
+        if not rows:
+            return []
+        return _fetch_ingresos(self.db_path, "WHERE p.pago_id BETWEEN ? AND ?", (rows[0][0], rows[-1][0]))
+
+    def actualizar(self, ingreso_id: int, concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float) -> Optional[Ingreso]:
+        row = update_pago(ingreso_id, concepto_pago_id, estudiante_id, usuario_id, monto, self.db_path)
+        return self.obtener(ingreso_id) if row else None
+
+    def eliminar(self, ingreso_id: int) -> bool:
+        return delete_pago(ingreso_id, self.db_path)
+
+    def contar(self, search_text: str = "", estudiante_ids: Optional[Sequence[int]] = None) -> int:
+        return count_pagos(search_text, self.db_path, estudiante_ids=estudiante_ids)
+
+    def pagina(self, after_id: Optional[int], limit: int, search_text: str = "", estudiante_ids: Optional[Sequence[int]] = None) -> List[tuple[int, str, str, str, float, str]]:
+        return fetch_pagos_page(after_id, limit, search_text, self.db_path, estudiante_ids=estudiante_ids)
+
+    def id_en(self, offset: int, search_text: str = "", estudiante_ids: Optional[Sequence[int]] = None) -> Optional[int]:
+        return fetch_pago_id_at(offset, search_text, self.db_path, estudiante_ids=estudiante_ids)
+
+    def posicion(self, ingreso_id: int, search_text: str = "", estudiante_ids: Optional[Sequence[int]] = None) -> int:
+        return count_pagos_before(ingreso_id, search_text, self.db_path, estudiante_ids=estudiante_ids)
+
+
+class MemoryIngresosRepository(IngresosRepository):
+    """Motor en memoria con índices por id, por fecha y por palabra del concepto.
+
+    - `_por_id`: dict id -> Ingreso, y `_ids` con los ids ordenados para la
+      paginación por clave (bisect).
+    - `_por_fecha`: lista ordenada de (fecha, id) para `entre_fechas`.
+    - `_por_palabra`: palabra normalizada del concepto -> ids, para `buscar`.
+
+    conceptos, estudiantes y usuarios son dicts id -> nombre con los que se
+    completan los ingresos nuevos. A diferencia del LIKE de SQLite, el
+    filtro search_text ignora tildes, como el resto de las búsquedas de
+    nombres. Es seguro usarlo desde varios hilos.
+    """
+
+    def __init__(
+        self,
+        ingresos: Iterable[Ingreso] = (),
+        conceptos: Optional[Dict[int, str]] = None,
+        estudiantes: Optional[Dict[int, str]] = None,
+        usuarios: Optional[Dict[int, str]] = None,
+    ):
+        self._lock = threading.RLock()
+        self._por_id: Dict[int, Ingreso] = {}
+        self._ids: List[int] = []
+        self._por_fecha: List[Tuple[str, int]] = []
+        self._por_palabra: Dict[str, Set[int]] = {}
+        self._conceptos = dict(conceptos or {})
+        self._estudiantes = dict(estudiantes or {})
+        self._usuarios = dict(usuarios or {})
+        self._next_id = 1
+        self._version = 0
+        # Último filtro de paginación: (clave, ids); se reutiliza mientras la tabla no cambie
+        self._filtrado: Optional[tuple] = None
+        self._cargar(ingresos)
+
+    @classmethod
+    def from_sqlite(cls, db_path: str = "academia.db") -> "MemoryIngresosRepository":
+        """Carga en memoria los pagos y catálogos de una base SQLite."""
+        estudiantes = {row[0]: row[1] for row in fetch_estudiantes_for_table(db_path)}
+        try:
+            with get_connection(db_path) as conn:
+                usuarios = dict(conn.execute("SELECT usuario_id, nombre FROM usuario;").fetchall())
+        except Exception:
+            usuarios = {}
+        return cls(
+            _fetch_ingresos(db_path),
+            conceptos=dict(fetch_conceptos_pago_with_ids(db_path)),
+            estudiantes=estudiantes,
+            usuarios=usuarios,
+        )
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _cargar(self, ingresos: Iterable[Ingreso]) -> None:
+        """Carga inicial: ordena los índices una sola vez en lugar de insertar uno a uno."""
+        palabras_por_concepto: Dict[str, List[str]] = {}
+        for ingreso in ingresos:
+            self._por_id[ingreso.id] = ingreso
+            palabras = palabras_por_concepto.get(ingreso.concepto)
+            if palabras is None:
+                palabras = palabras_por_concepto[ingreso.concepto] = tokenize(ingreso.concepto)
+            for palabra in palabras:
+                self._por_palabra.setdefault(palabra, set()).add(ingreso.id)
+        self._ids = sorted(self._por_id)
+        self._por_fecha = sorted((ingreso.fecha, ingreso.id) for ingreso in self._por_id.values())
+        if self._ids:
+            self._next_id = self._ids[-1] + 1
+
+    def _indexar(self, ingreso: Ingreso) -> None:
+        self._por_id[ingreso.id] = ingreso
+        if not self._ids or ingreso.id > self._ids[-1]:
+            self._ids.append(ingreso.id)
+        else:
+            bisect.insort(self._ids, ingreso.id)
+        bisect.insort(self._por_fecha, (ingreso.fecha, ingreso.id))
+        for palabra in tokenize(ingreso.concepto):
+            self._por_palabra.setdefault(palabra, set()).add(ingreso.id)
+        self._next_id = max(self._next_id, ingreso.id + 1)
+        self._version += 1
+
+    def _desindexar(self, ingreso: Ingreso) -> None:
+        del self._por_id[ingreso.id]
+        del self._ids[bisect.bisect_left(self._ids, ingreso.id)]
+        del self._por_fecha[bisect.bisect_left(self._por_fecha, (ingreso.fecha, ingreso.id))]
+        for palabra in tokenize(ingreso.concepto):
+            ids = self._por_palabra.get(palabra)
+            if ids is not None:
+                ids.discard(ingreso.id)
+                if not ids:
+                    del self._por_palabra[palabra]
+        self._version += 1
+
+    def listar(self) -> List[Ingreso]:
+        with self._lock:
+            return [self._por_id[i] for i in self._ids]
+
+    def obtener(self, ingreso_id: int) -> Optional[Ingreso]:
+        with self._lock:
+            return self._por_id.get(int(ingreso_id))
+
+    def buscar(self, texto: str) -> List[Ingreso]:
+        consulta = tokenize(texto)
+        with self._lock:
+            if not consulta:
+                return self.listar()
+            encontrados: Optional[Set[int]] = None
+            for q in consulta:
+                ids: Set[int] = set()
+                for palabra, palabra_ids in self._por_palabra.items():
+                    if palabra.startswith(q):
+                        ids |= palabra_ids
+                encontrados = ids if encontrados is None else encontrados & ids
+                if not encontrados:
+                    return []
+            return [self._por_id[i] for i in sorted(encontrados)]
+
+    def entre_fechas(self, desde: str, hasta: str) -> List[Ingreso]:
+        with self._lock:
+            inicio = bisect.bisect_left(self._por_fecha, (desde,))
+            fin = bisect.bisect_right(self._por_fecha, (hasta, float("inf")))
+            return [self._por_id[i] for _, i in self._por_fecha[inicio:fin]]
+
+    def agregar(self, concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float, fecha: Optional[str] = None) -> Optional[Ingreso]:
+        with self._lock:
+            ingreso = Ingreso(
+                id=self._next_id,
+                fecha=fecha or date.today().isoformat(),
+                concepto=self._conceptos.get(concepto_pago_id, ""),
+                monto=float(monto),
+                estudiante=self._estudiantes.get(estudiante_id, ""),
+                usuario=self._usuarios.get(usuario_id, ""),
+                concepto_pago_id=concepto_pago_id,
+                estudiante_id=estudiante_id,
+                usuario_id=usuario_id,
+            )
+            self._indexar(ingreso)
+            return ingreso
+
+    def agregar_lote(self, concepto_pago_id: int, estudiante_ids: Sequence[int], usuario_id: int, monto: float, fecha: Optional[str] = None) -> List[Ingreso]:
+        with self._lock:
+            return [
+                self.agregar(concepto_pago_id, estudiante_id, usuario_id, monto, fecha)
+                for estudiante_id in dict.fromkeys(int(i) for i in estudiante_ids)
+            ]
+
+    def actualizar(self, ingreso_id: int, concepto_pago_id: int, estudiante_id: int, usuario_id: int, monto: float) -> Optional[Ingreso]:
+        with self._lock:
+            anterior = self._por_id.get(int(ingreso_id))
+            if anterior is None:
+                return None
+            ingreso = Ingreso(
+                id=anterior.id,
+                fecha=anterior.fecha,
+                concepto=self._conceptos.get(concepto_pago_id, ""),
+                monto=float(monto),
+                estudiante=self._estudiantes.get(estudiante_id, ""),
+                usuario=self._usuarios.get(usuario_id, ""),
+                concepto_pago_id=concepto_pago_id,
+                estudiante_id=estudiante_id,
+                usuario_id=usuario_id,
+            )
+            self._desindexar(anterior)
+            self._indexar(ingreso)
+            return ingreso
+
+    def eliminar(self, ingreso_id: int) -> bool:
+        with self._lock:
+            ingreso = self._por_id.get(int(ingreso_id))
+            if ingreso is None:
+                return False
+            self._desindexar(ingreso)
+            return True
+
+    def estudiante_guardado(self, estudiante_id: int, nombre_completo: str) -> None:
+        with self._lock:
+            self._estudiantes[estudiante_id] = nombre_completo
+            for ingreso in self._por_id.values():
+                if ingreso.estudiante_id == estudiante_id:
+                    ingreso.estudiante = nombre_completo
+            self._version += 1
+
+    def estudiante_eliminado(self, estudiante_id: int) -> None:
+        with self._lock:
+            self._estudiantes.pop(estudiante_id, None)
+            for ingreso in [i for i in self._por_id.values() if i.estudiante_id == estudiante_id]:
+                self._desindexar(ingreso)
+
+    def _filtrar(self, search_text: str, estudiante_ids: Optional[Sequence[int]]) -> List[int]:
+        """Ids ordenados que cumplen el filtro (llamar con el lock tomado)."""
+        texto = normalize_text(search_text)
+        if not texto and estudiante_ids is None:
+            return self._ids
+        # estudiante_ids se compara por identidad: las fuentes de la vista
+        # reutilizan la misma lista en count, pagina, id_en y posicion
+        clave = (self._version, texto, id(estudiante_ids))
+        if self._filtrado is not None and self._filtrado[0] == clave:
+            return self._filtrado[2]
+        permitidos = set(estudiante_ids) if estudiante_ids is not None else None
+        ids = [
+            i for i in self._ids
+            if (permitidos is None or self._por_id[i].estudiante_id in permitidos)
+            and (not texto or texto in normalize_text(self._por_id[i].estudiante))
+        ]
+        self._filtrado = (clave, estudiante_ids, ids)
+        return ids
+
+    def contar(self, search_text: str = "", estudiante_ids: Optional[Sequence[int]] = None) -> int:
+        with self._lock:
+            return len(self._filtrar(search_text, estudiante_ids))
 
+    def pagina(self, after_id: Optional[int], limit: int, search_text: str = "", estudiante_ids: Optional[Sequence[int]] = None) -> List[tuple[int, str, str, str, float, str]]:
+        with self._lock:
+            ids = self._filtrar(search_text, estudiante_ids)
+            inicio = bisect.bisect_right(ids, after_id) if after_id is not None else 0
+            return [self._por_id[i].table_row() for i in ids[inicio:inicio + int(limit)]]
 
+    def id_en(self, offset: int, search_text: str = "", estudiante_ids: Optional[Sequence[int]] = None) -> Optional[int]:
+        with self._lock:
+            ids = self._filtrar(search_text, estudiante_ids)
+            return ids[offset] if 0 <= offset < len(ids) else None
 
+    def posicion(self, ingreso_id: int, search_text: str = "", estudiante_ids: Optional[Sequence[int]] = None) -> int:
+        with self._lock:
+            return bisect.bisect_left(self._filtrar(search_text, estudiante_ids), ingreso_id)
 
 
+def create_ingresos_repository(engine: Optional[str] = None, db_path: str = "academia.db") -> IngresosRepository:
+    """Crea el repositorio de ingresos con el motor indicado (o INGRESOS_SETTINGS['engine'])."""
+    engine = engine or INGRESOS_SETTINGS['engine']
+    if engine == "sqlite":
+        return SQLiteIngresosRepository(db_path)
+    if engine == "memoria":
+        return MemoryIngresosRepository.from_sqlite(db_path)
+    if engine == "remoto":
+        from servicio.cliente import ClienteAcademia, RemoteIngresosRepository, cliente_instalado
+        cliente = cliente_instalado() or ClienteAcademia(INGRESOS_SETTINGS['servidor'], INGRESOS_SETTINGS.get('token'))
+        return RemoteIngresosRepository(cliente, db_path)
+    raise ValueError(f"Motor de ingresos desconocido: {engine}")
@@ -1,3 +1,4 @@
+import threading
 import tkinter as tk
 from tkinter import ttk
 from typing import List
@@ -5,20 +6,38 @@ from typing import List
 from ingresos.ingresos_db import (
     fetch_grados_with_ids,
     fetch_conceptos_pago_with_ids,
-    fetch_estudiantes_for_table,
-    fetch_pagos_for_table,
+    count_estudiantes,
+    fetch_estudiantes_page,
+    fetch_estudiante_id_at,
+    count_estudiantes_before,
+    fetch_estudiantes_by_ids,
+    search_estudiantes_for_table,
     fetch_estudiante_by_id,
     insert_estudiante,
     update_estudiante,
-    insert_pago,
-    fetch_pago_by_id,
-    update_pago,
     insert_calificacion,
     update_calificacion,
     fetch_calificacion_by_estudiante,
     delete_calificacion,
-    delete_pago,
     delete_estudiante_cascade,
+    IngresosRepository,
+    create_ingresos_repository,
+)
+
+from consultas.consultas_index import get_estudiantes_index
+from database.catalog_cache import invalidate_catalogs
+from database.changes import table_versions
+from database.executor import TkDispatcher
+from database.fts import has_student_fts
+from ingresos.pagos_lote import PagosLoteDialog
+from ingresos.search_pipeline import DebouncedSearch, IncrementalFilter
+from ingresos.virtual_table import (
+    KeyListTableSource,
+    KeysetTableSource,
+    ListTableSource,
+    TableSource,
+    VirtualTreeview,
+    prefetch,
 )
 
 # Importar sistema de permisos
@@ -34,12 +53,37 @@ class IngresosView(ttk.Frame):
 
     Por ahora solo muestra un encabezado y placeholders. Más adelante se
     agregarán formularios, tablas y acciones.
+
+    La vista se crea una vez por proceso: `attach_user` la asocia a una
+    sesión y `detach_user` la limpia al cerrar sesión.
     """
 
-    def __init__(self, parent: tk.Widget, usuario_id: int | None = None, on_logout_callback=None):
+    # Botones que dependen de un permiso: (atributo, permiso, método, estilo habilitado)
+    _BOTONES_CON_PERMISO = (
+        ("btn_modificar_estudiante", "Modificar Estudiantes", "_on_modificar_estudiante", "Edit.TButton"),
+        ("btn_eliminar_estudiante", "Eliminar Estudiantes", "_on_eliminar_estudiante", "Delete.TButton"),
+        ("btn_modificar_pago", "Modificar Pagos", "_on_modificar_pago", "Edit.TButton"),
+        ("btn_eliminar_pago", "Eliminar Pagos", "_on_eliminar_pago", "Delete.TButton"),
+        ("btn_modificar_nota", "Modificar Notas", "_on_modificar_nota", "Edit.TButton"),
+        ("btn_eliminar_nota", "Eliminar Notas", "_on_eliminar_nota", "Delete.TButton"),
+    )
+
+    # Tablas de las que depende cada dato mostrado; si alguna cambió se vuelve a leer
+    _DEPENDENCIAS = {
+        "catalogos": ("grado", "concepto_pago"),
+        "estudiantes": ("estudiante", "grado"),
+        "pagos": ("pago", "estudiante", "usuario", "concepto_pago"),
+    }
+
+    def __init__(self, parent: tk.Widget, usuario_id: int | None = None, on_logout_callback=None, repositorio: IngresosRepository | None = None):
         super().__init__(parent)
         self._usuario_id = usuario_id or 0
+        # Pagos: motor elegido en INGRESOS_SETTINGS salvo que se inyecte otro
+        self._ingresos = repositorio or create_ingresos_repository(db_path="academia.db")
+        self._permisos = None
         self.on_logout_callback = on_logout_callback
+        # Contadores de cambios (database.changes) con que se leyó cada dato
+        self._versiones: dict = {}
 
         # Los estilos de botones se configuran globalmente en main.py
         style = ttk.Style()
@@ -51,10 +95,21 @@ class IngresosView(ttk.Frame):
         # Configurar solo fuente para Treeview (tablas) - sin colores de fondo
         style.configure("Large.Treeview", font=("Segoe UI", 18), rowheight=40)
         style.configure("Large.Treeview.Heading", font=("Segoe UI", 18, "bold"))
-        
-        # Variables para filtros de tablas
-        self._all_students_data: List[tuple] = []
-        self._all_payments_data: List[tuple] = []
+
+        # Lecturas y escrituras corren en segundo plano; los resultados vuelven al hilo de Tk
+        self._dispatcher = TkDispatcher(self)
+        self._dispatcher.add_busy_listener(self._on_db_busy)
+        self.bind("<Destroy>", self._on_destroy, add="+")
+
+        # Filtros de nombres por tabla: (versión del índice, filtro)
+        self._filtros_nombre: dict = {}
+        self._filtros_lock = threading.Lock()
+        self._students_search = DebouncedSearch(
+            self, self._dispatcher, self._buscar_estudiantes, self._show_students_search, key="busqueda_estudiantes"
+        )
+        self._payments_search = DebouncedSearch(
+            self, self._dispatcher, self._buscar_pagos, self._show_payments_search, key="busqueda_pagos"
+        )
 
         self._build_header()
         self._build_layout()
@@ -63,6 +118,8 @@ class IngresosView(ttk.Frame):
         self._build_section_ingresos_notas(self.left_center_frame)
         self._build_actions(self.left_center_frame)
         self._build_right_column(self.right_col)
+        # Catálogos y tablas se leen en segundo plano después del primer dibujo
+        self.after_idle(self._load_initial_data)
 
     def _build_header(self) -> None:
         header = ttk.Frame(self)
@@ -118,8 +175,9 @@ class IngresosView(ttk.Frame):
         students_table_frame.pack(fill=tk.BOTH, expand=True)
 
         columns_students = ("num", "nombre", "institucion", "grado", "telefono")
-        self.tree_students = ttk.Treeview(
-            students_table_frame, columns=columns_students, show="headings", style="Large.Treeview"
+        # Solo se materializan las filas visibles; el resto se pide por páginas
+        self.tree_students = VirtualTreeview(
+            students_table_frame, columns=columns_students, style="Large.Treeview", dispatcher=self._dispatcher
         )
         self.tree_students.heading("num", text="No.")
         self.tree_students.heading("nombre", text="Nombre")
@@ -133,7 +191,6 @@ class IngresosView(ttk.Frame):
         self.tree_students.column("telefono", width=110, anchor="center")
         self.tree_students.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
 
-        self._load_students_table()
         self.tree_students.bind("<<TreeviewSelect>>", self._on_student_select)
         
         # Bind para deseleccionar al hacer clic fuera
@@ -164,8 +221,8 @@ class IngresosView(ttk.Frame):
         payments_table_frame.pack(fill=tk.BOTH, expand=True)
 
         columns_payments = ("num", "concepto", "estudiante", "ejecutor", "monto", "fecha")
-        self.tree_payments = ttk.Treeview(
-            payments_table_frame, columns=columns_payments, show="headings", style="Large.Treeview"
+        self.tree_payments = VirtualTreeview(
+            payments_table_frame, columns=columns_payments, style="Large.Treeview", dispatcher=self._dispatcher
         )
         self.tree_payments.heading("num", text="No.")
         self.tree_payments.heading("concepto",text="Concepto")
@@ -181,7 +238,6 @@ class IngresosView(ttk.Frame):
         self.tree_payments.column("fecha", width=110, anchor="center")
         self.tree_payments.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
 
-        self._load_payments_table()
         self.tree_payments.bind("<<TreeviewSelect>>", self._on_payment_select)
         
         # Bind para deseleccionar al hacer clic fuera
@@ -219,14 +275,8 @@ class IngresosView(ttk.Frame):
 
         self._grado_ids: List[int] = []
         self._grado_nombres: List[str] = []
-        self._cargar_grados()
         self.combo_grado = ttk.Combobox(content_frame, values=self._grado_nombres, state="readonly", style="Large.TCombobox")
-        # Default: grado_id = 1 si existe
-        try:
-            idx_default = self._grado_ids.index(1)
-            self.combo_grado.current(idx_default)
-        except ValueError:
-            self.combo_grado.set("Seleccione grado")
+        self.combo_grado.set("Seleccione grado")
         self.combo_grado.grid(row=1, column=1, sticky="ew", padx=8, pady=6, ipady=8)
 
         # Fila 2: Institucion (ocupa 2 columnas)
@@ -252,14 +302,8 @@ class IngresosView(ttk.Frame):
         # Concepto a cancelar (combobox) – horizontal, no expandir todo el ancho
         self._concepto_ids: List[int] = []
         self._concepto_nombres: List[str] = []
-        self._cargar_conceptos_pago()
         self.combo_concepto = ttk.Combobox(row, values=self._concepto_nombres, state="readonly", width=28, style="Large.TCombobox")
-        # Default: concepto_pago_id = 1 si existe
-        try:
-            idx_default = self._concepto_ids.index(1)
-            self.combo_concepto.current(idx_default)
-        except ValueError:
-            self.combo_concepto.set("Concepto a cancelar")
+        self.combo_concepto.set("Concepto a cancelar")
         self.combo_concepto.pack(side=tk.LEFT, padx=(0, 8), ipady=8)
 
         # Monto (entry) – horizontal, ancho auto por contenido
@@ -267,6 +311,9 @@ class IngresosView(ttk.Frame):
         self._init_placeholder(self.entry_monto, "Monto")
         self.entry_monto.pack(side=tk.LEFT, ipady=8)
 
+        # Mismo concepto y monto para varios estudiantes (p. ej. todo un grado)
+        ttk.Button(row, text="Por lote...", command=self._on_pagos_lote, width=12).pack(side=tk.LEFT, padx=(8, 0), ipady=4)
+
     def _build_section_ingresos_notas(self, parent: ttk.Frame) -> None:
         section = ttk.Frame(parent)
         section.pack(fill=tk.X, pady=(0, 12))
@@ -320,23 +367,13 @@ class IngresosView(ttk.Frame):
         # Botón Guardar Estudiante (siempre visible)
         ttk.Button(row1, text="Guardar Estudiante", command=self._on_guardar_estudiante, width=15, style="Save.TButton").grid(row=0, column=0, sticky="ew", padx=4)
         
-        # Botón Modificar Estudiante (solo si tiene permiso)
-        if has_action_permission(self._usuario_id, "Modificar Estudiantes", "academia.db"):
-            self.btn_modificar_estudiante = ttk.Button(row1, text="Modificar Estudiante", command=self._on_modificar_estudiante, width=15, style="Edit.TButton")
-            self.btn_modificar_estudiante.grid(row=0, column=1, sticky="ew", padx=4)
-        else:
-            # Crear botón deshabilitado
-            self.btn_modificar_estudiante = ttk.Button(row1, text="Modificar Estudiante", state="disabled", width=15, style="Large.TButton")
-            self.btn_modificar_estudiante.grid(row=0, column=1, sticky="ew", padx=4)
-        
-        # Botón Eliminar Estudiante (solo si tiene permiso)
-        if has_action_permission(self._usuario_id, "Eliminar Estudiantes", "academia.db"):
-            self.btn_eliminar_estudiante = ttk.Button(row1, text="Eliminar Estudiante", command=self._on_eliminar_estudiante, width=15, style="Delete.TButton")
-            self.btn_eliminar_estudiante.grid(row=0, column=2, sticky="ew", padx=4)
-        else:
-            # Crear botón deshabilitado
-            self.btn_eliminar_estudiante = ttk.Button(row1, text="Eliminar Estudiante", state="disabled", width=15, style="Large.TButton")
-            self.btn_eliminar_estudiante.grid(row=0, column=2, sticky="ew", padx=4)
+        # Botón Modificar Estudiante (se habilita según los permisos de la sesión)
+        self.btn_modificar_estudiante = ttk.Button(row1, text="Modificar Estudiante", width=15)
+        self.btn_modificar_estudiante.grid(row=0, column=1, sticky="ew", padx=4)
+        
+        # Botón Eliminar Estudiante (se habilita según los permisos de la sesión)
+        self.btn_eliminar_estudiante = ttk.Button(row1, text="Eliminar Estudiante", width=15)
+        self.btn_eliminar_estudiante.grid(row=0, column=2, sticky="ew", padx=4)
 
         # Fila 2: Pago
         row2 = ttk.Frame(content_frame)
@@ -347,23 +384,13 @@ class IngresosView(ttk.Frame):
         # Botón Guardar Pago (siempre visible)
         ttk.Button(row2, text="Guardar Pago", command=self._on_guardar_pago, width=15, style="Save.TButton").grid(row=0, column=0, sticky="ew", padx=4)
         
-        # Botón Modificar Pago (solo si tiene permiso)
-        if has_action_permission(self._usuario_id, "Modificar Pagos", "academia.db"):
-            self.btn_modificar_pago = ttk.Button(row2, text="Modificar Pago", command=self._on_modificar_pago, width=15, style="Edit.TButton")
-            self.btn_modificar_pago.grid(row=0, column=1, sticky="ew", padx=4)
-        else:
-            # Crear botón deshabilitado
-            self.btn_modificar_pago = ttk.Button(row2, text="Modificar Pago", state="disabled", width=15, style="Large.TButton")
-            self.btn_modificar_pago.grid(row=0, column=1, sticky="ew", padx=4)
-        
-        # Botón Eliminar Pago (solo si tiene permiso)
-        if has_action_permission(self._usuario_id, "Eliminar Pagos", "academia.db"):
-            self.btn_eliminar_pago = ttk.Button(row2, text="Eliminar Pago", command=self._on_eliminar_pago, width=15, style="Delete.TButton")
-            self.btn_eliminar_pago.grid(row=0, column=2, sticky="ew", padx=4)
-        else:
-            # Crear botón deshabilitado
-            self.btn_eliminar_pago = ttk.Button(row2, text="Eliminar Pago", state="disabled", width=15, style="Large.TButton")
-            self.btn_eliminar_pago.grid(row=0, column=2, sticky="ew", padx=4)
+        # Botón Modificar Pago (se habilita según los permisos de la sesión)
+        self.btn_modificar_pago = ttk.Button(row2, text="Modificar Pago", width=15)
+        self.btn_modificar_pago.grid(row=0, column=1, sticky="ew", padx=4)
+        
+        # Botón Eliminar Pago (se habilita según los permisos de la sesión)
+        self.btn_eliminar_pago = ttk.Button(row2, text="Eliminar Pago", width=15)
+        self.btn_eliminar_pago.grid(row=0, column=2, sticky="ew", padx=4)
 
         # Fila 3: Nota
         row3 = ttk.Frame(content_frame)
@@ -374,23 +401,13 @@ class IngresosView(ttk.Frame):
         # Botón Guardar Nota (siempre visible)
         ttk.Button(row3, text="Guardar Nota", command=self._on_guardar_nota, width=15, style="Save.TButton").grid(row=0, column=0, sticky="ew", padx=4)
         
-        # Botón Modificar Nota (solo si tiene permiso)
-        if has_action_permission(self._usuario_id, "Modificar Notas", "academia.db"):
-            self.btn_modificar_nota = ttk.Button(row3, text="Modificar Nota", command=self._on_modificar_nota, width=15, style="Edit.TButton")
-            self.btn_modificar_nota.grid(row=0, column=1, sticky="ew", padx=4)
-        else:
-            # Crear botón deshabilitado
-            self.btn_modificar_nota = ttk.Button(row3, text="Modificar Nota", state="disabled", width=15, style="Large.TButton")
-            self.btn_modificar_nota.grid(row=0, column=1, sticky="ew", padx=4)
-        
-        # Botón Eliminar Nota (solo si tiene permiso)
-        if has_action_permission(self._usuario_id, "Eliminar Notas", "academia.db"):
-            self.btn_eliminar_nota = ttk.Button(row3, text="Eliminar Nota", command=self._on_eliminar_nota, width=15, style="Delete.TButton")
-            self.btn_eliminar_nota.grid(row=0, column=2, sticky="ew", padx=4)
-        else:
-            # Crear botón deshabilitado
-            self.btn_eliminar_nota = ttk.Button(row3, text="Eliminar Nota", state="disabled", width=15, style="Large.TButton")
-            self.btn_eliminar_nota.grid(row=0, column=2, sticky="ew", padx=4)
+        # Botón Modificar Nota (se habilita según los permisos de la sesión)
+        self.btn_modificar_nota = ttk.Button(row3, text="Modificar Nota", width=15)
+        self.btn_modificar_nota.grid(row=0, column=1, sticky="ew", padx=4)
+        
+        # Botón Eliminar Nota (se habilita según los permisos de la sesión)
+        self.btn_eliminar_nota = ttk.Button(row3, text="Eliminar Nota", width=15)
+        self.btn_eliminar_nota.grid(row=0, column=2, sticky="ew", padx=4)
 
         # Fila 4: Sistema
         row4 = ttk.Frame(content_frame)
@@ -401,6 +418,22 @@ class IngresosView(ttk.Frame):
         ttk.Button(row4, text="Cerrar sesión", command=self._on_cerrar_sesion, width=15, style="Logout.TButton").grid(row=0, column=1, sticky="ew", padx=4)
         ttk.Button(row4, text="Salir", command=self._on_salir, width=15, style="Exit.TButton").grid(row=0, column=2, sticky="ew", padx=4)
 
+        self._apply_permissions()
+
+    def _has_action(self, action: str) -> bool:
+        if self._permisos is not None:
+            return self._permisos.has_action(action)
+        return has_action_permission(self._usuario_id, action, "academia.db")
+
+    def _apply_permissions(self) -> None:
+        """Habilita o deshabilita los botones según los permisos de la sesión."""
+        for atributo, permiso, metodo, estilo in self._BOTONES_CON_PERMISO:
+            boton = getattr(self, atributo)
+            if self._has_action(permiso):
+                boton.configure(state="normal", command=getattr(self, metodo), style=estilo)
+            else:
+                boton.configure(state="disabled", command="", style="Large.TButton")
+
     def _get_selected_grado_id(self) -> int:
         try:
             nombre = self.combo_grado.get()
@@ -417,12 +450,25 @@ class IngresosView(ttk.Frame):
         grado_id = self._get_selected_grado_id()
         if not nombre or not apellido:
             return
-        new_id = insert_estudiante(nombre, apellido, telefono, grado_id, institucion, "academia.db")
-        if new_id:
-            self._load_students_table()
+
+        def listo(row) -> None:
+            if not row:
+                return
+            self._ingresos.estudiante_guardado(row[0], row[1])
+            search_text = self.students_search_entry.get().strip()
+            if search_text:
+                # Con un filtro activo se vuelve a evaluar la búsqueda
+                self._students_search.run_now(search_text)
+            else:
+                self.tree_students.insert_row(row)
             self._clear_student_inputs()
             self._deselect_all_tables()
 
+        self._dispatcher.submit(
+            insert_estudiante, nombre, apellido, telefono, grado_id, institucion, "academia.db",
+            write=True, on_success=listo,
+        )
+
     def _on_modificar_estudiante(self) -> None:
         selection = self.tree_students.selection()
         if not selection:
@@ -438,12 +484,20 @@ class IngresosView(ttk.Frame):
         grado_id = self._get_selected_grado_id()
         if not nombre or not apellido:
             return
-        ok = update_estudiante(estudiante_id, nombre, apellido, telefono, grado_id, institucion, "academia.db")
-        if ok:
-            self._load_students_table()
+
+        def listo(row) -> None:
+            if not row:
+                return
+            self._ingresos.estudiante_guardado(row[0], row[1])
+            self.tree_students.update_row(row)
             self._clear_student_inputs()
             self._deselect_all_tables()
 
+        self._dispatcher.submit(
+            update_estudiante, estudiante_id, nombre, apellido, telefono, grado_id, institucion, "academia.db",
+            write=True, on_success=listo,
+        )
+
     def _get_selected_concepto_id(self) -> int:
         try:
             nombre = self.combo_concepto.get()
@@ -471,26 +525,68 @@ class IngresosView(ttk.Frame):
             return
         if concepto_id <= 0 or estudiante_id <= 0 or usuario_id <= 0:
             return
-        new_id = insert_pago(concepto_id, estudiante_id, usuario_id, monto, "academia.db")
-        if new_id:
-            self._load_payments_table()
+
+        def listo(ingreso) -> None:
+            if not ingreso:
+                return
+            search_text = self.payments_search_entry.get().strip()
+            if search_text:
+                self._payments_search.run_now(search_text)
+            else:
+                self.tree_payments.insert_row(ingreso.table_row())
             self.entry_monto.delete(0, tk.END)
             self._init_placeholder(self.entry_monto, "Monto")
             self._deselect_all_tables()
 
+        self._dispatcher.submit(
+            self._ingresos.agregar, concepto_id, estudiante_id, usuario_id, monto,
+            write=True, on_success=listo,
+        )
+
+    def _on_pagos_lote(self) -> None:
+        """Abre la ventana para registrar el mismo pago a varios estudiantes."""
+        if self._usuario_id <= 0:
+            return
+        monto = self.entry_monto.get().strip()
+        PagosLoteDialog(
+            self, self._dispatcher, self._ingresos, self._usuario_id,
+            list(zip(self._concepto_ids, self._concepto_nombres)),
+            list(zip(self._grado_ids, self._grado_nombres)),
+            on_saved=self._on_pagos_lote_guardados,
+            concepto_id=self._get_selected_concepto_id(),
+            monto="" if monto == "Monto" else monto,
+        )
+
+    def _on_pagos_lote_guardados(self, ingresos) -> None:
+        search_text = self.payments_search_entry.get().strip()
+        if search_text:
+            self._payments_search.run_now(search_text)
+        else:
+            # Una sola actualización de la tabla para todo el lote
+            self.tree_payments.insert_rows([ingreso.table_row() for ingreso in ingresos])
+        self._deselect_all_tables()
+
     def _on_payment_select(self, event: tk.Event) -> None:
         selection = self.tree_payments.selection()
         if not selection:
+            self._dispatcher.cancel("pago")
             return
         iid = selection[0]
         try:
             pago_id = int(iid)
         except ValueError:
             return
-        data = fetch_pago_by_id(pago_id, "academia.db")
-        if not data:
+        # Una selección nueva reemplaza a la que aún no terminó de cargar
+        self._dispatcher.submit(
+            self._ingresos.obtener, pago_id,
+            key="pago", on_success=self._show_pago,
+        )
+
+    def _show_pago(self, ingreso) -> None:
+        """Muestra en el formulario el Ingreso leído del repositorio."""
+        if not ingreso:
             return
-        concepto_id, estudiante_id, monto, _ = data
+        concepto_id, estudiante_id, monto = ingreso.concepto_pago_id, ingreso.estudiante_id, ingreso.monto
         # Seleccionar concepto por id
         try:
             idx = self._concepto_ids.index(concepto_id)
@@ -523,11 +619,18 @@ class IngresosView(ttk.Frame):
             return
         if pago_id <= 0 or concepto_id <= 0 or estudiante_id <= 0 or usuario_id <= 0:
             return
-        ok = update_pago(pago_id, concepto_id, estudiante_id, usuario_id, monto, "academia.db")
-        if ok:
-            self._load_payments_table()
+
+        def listo(ingreso) -> None:
+            if not ingreso:
+                return
+            self.tree_payments.update_row(ingreso.table_row())
             self._deselect_all_tables()
 
+        self._dispatcher.submit(
+            self._ingresos.actualizar, pago_id, concepto_id, estudiante_id, usuario_id, monto,
+            write=True, on_success=listo,
+        )
+
     def _clear_student_inputs(self) -> None:
         for entry, placeholder in [
             (self.entry_nombre, "Nombre"),
@@ -562,33 +665,135 @@ class IngresosView(ttk.Frame):
         entry.bind("<FocusIn>", on_focus_in)
         entry.bind("<FocusOut>", on_focus_out)
 
-    def _cargar_grados(self) -> None:
-        data = fetch_grados_with_ids("academia.db")
+    def _load_initial_data(self) -> None:
+        """Pide catálogos y primeras páginas de las tablas sin bloquear el dibujo."""
+        self._load_catalogos()
+        self._students_search.run_now("")
+        self._payments_search.run_now("")
+
+    def _load_catalogos(self) -> None:
+        """Lee grados y conceptos de pago en segundo plano."""
+        def leer_catalogos():
+            versiones = table_versions("academia.db", self._DEPENDENCIAS["catalogos"])
+            return versiones, fetch_grados_with_ids("academia.db"), fetch_conceptos_pago_with_ids("academia.db")
+
+        def mostrar(catalogos) -> None:
+            versiones, grados, conceptos = catalogos
+            self._versiones["catalogos"] = versiones
+            self._set_grados(grados)
+            self._set_conceptos_pago(conceptos)
+
+        self._dispatcher.submit(leer_catalogos, key="catalogos", on_success=mostrar)
+
+    def _set_grados(self, data) -> None:
         self._grado_ids = [item[0] for item in data]
         self._grado_nombres = [item[1] for item in data]
+        self.combo_grado.configure(values=self._grado_nombres)
+        # Default: grado_id = 1 si existe
+        try:
+            idx_default = self._grado_ids.index(1)
+            self.combo_grado.current(idx_default)
+        except ValueError:
+            self.combo_grado.set("Seleccione grado")
 
-    def _cargar_conceptos_pago(self) -> None:
-        data = fetch_conceptos_pago_with_ids("academia.db")
+    def _set_conceptos_pago(self, data) -> None:
         self._concepto_ids = [item[0] for item in data]
         self._concepto_nombres = [item[1] for item in data]
+        self.combo_concepto.configure(values=self._concepto_nombres)
+        # Default: concepto_pago_id = 1 si existe
+        try:
+            idx_default = self._concepto_ids.index(1)
+            self.combo_concepto.current(idx_default)
+        except ValueError:
+            self.combo_concepto.set("Concepto a cancelar")
+
+    def _students_source(self, search_text: str = "") -> TableSource:
+        """Fuente paginada por estudiante_id, opcionalmente filtrada por nombre."""
+        return KeysetTableSource(
+            count_fn=lambda: count_estudiantes(search_text, "academia.db"),
+            page_fn=lambda after_id, limit: fetch_estudiantes_page(after_id, limit, search_text, "academia.db"),
+            key_at_fn=lambda offset: fetch_estudiante_id_at(offset, search_text, "academia.db"),
+            position_fn=lambda estudiante_id: count_estudiantes_before(estudiante_id, search_text, "academia.db"),
+        )
+
+    def _payments_source(self, search_text: str = "", estudiante_ids=None) -> TableSource:
+        """Fuente paginada por pago_id, opcionalmente filtrada por nombre o ids de estudiante."""
+        ingresos = self._ingresos
+        return KeysetTableSource(
+            count_fn=lambda: ingresos.contar(search_text, estudiante_ids),
+            page_fn=lambda after_id, limit: ingresos.pagina(after_id, limit, search_text, estudiante_ids),
+            key_at_fn=lambda offset: ingresos.id_en(offset, search_text, estudiante_ids),
+            position_fn=lambda pago_id: ingresos.posicion(pago_id, search_text, estudiante_ids),
+        )
 
     def _load_students_table(self) -> None:
-        for row in self.tree_students.get_children():
-            self.tree_students.delete(row)
-        rows = fetch_estudiantes_for_table("academia.db")
-        # Almacenar datos originales para filtros
-        self._all_students_data = rows
-        for idx, (estudiante_id, nombre, institucion, grado, telefono) in enumerate(rows, start=1):
-            self.tree_students.insert("", tk.END, iid=str(estudiante_id), values=(idx, nombre, institucion, grado, telefono))
+        """Vuelve a leer en segundo plano la tabla de estudiantes conservando filtro, posición y selección."""
+        self.tree_students.refresh()
 
     def _load_payments_table(self) -> None:
-        for row in self.tree_payments.get_children():
-            self.tree_payments.delete(row)
-        rows = fetch_pagos_for_table("academia.db")
-        # Almacenar datos originales para filtros
-        self._all_payments_data = rows
-        for idx, (pago_id, concepto, estudiante, usuario, monto, fecha) in enumerate(rows, start=1):
-            self.tree_payments.insert("", tk.END, iid=str(pago_id), values=(idx, concepto, estudiante, usuario, monto, fecha))
+        """Vuelve a leer en segundo plano la tabla de pagos conservando filtro, posición y selección."""
+        self.tree_payments.refresh()
+
+    def _on_db_busy(self, busy: bool) -> None:
+        """Muestra el cursor de espera mientras hay operaciones pendientes."""
+        try:
+            self.configure(cursor="watch" if busy else "")
+        except tk.TclError:
+            pass
+
+    # --- Sesión ------------------------------------------------------------
+
+    def attach_user(self, usuario_id: int, permisos=None) -> None:
+        """Asocia la vista a la sesión de usuario_id y aplica sus permisos.
+
+        Solo se vuelven a leer los datos cuyas tablas cambiaron desde que se
+        cargaron.
+        """
+        self._usuario_id = usuario_id or 0
+        self._permisos = permisos
+        self._apply_permissions()
+        self._refresh_changed_data()
+
+    def detach_user(self) -> None:
+        """Desvincula la vista al cerrar sesión; los widgets y datos se conservan."""
+        self._dispatcher.cancel("estudiante")
+        self._dispatcher.cancel("pago")
+        self.reset()
+        self._usuario_id = 0
+        self._permisos = None
+        self._apply_permissions()
+
+    def reset(self) -> None:
+        """Deja formularios, búsquedas y selección como recién creados."""
+        self._deselect_all_tables()
+        self._clear_student_inputs()
+        self._clear_payment_inputs()
+        self._clear_notas_inputs()
+        if self.students_search_entry.get():
+            self.students_search_entry.delete(0, tk.END)
+            self._students_search.run_now("")
+        if self.payments_search_entry.get():
+            self.payments_search_entry.delete(0, tk.END)
+            self._payments_search.run_now("")
+
+    def _data_changed(self, nombre: str) -> bool:
+        cargado = self._versiones.get(nombre)
+        # Lo que aún no se cargó lo pide _load_initial_data
+        return cargado is not None and cargado != table_versions("academia.db", self._DEPENDENCIAS[nombre])
+
+    def _refresh_changed_data(self) -> None:
+        if self._data_changed("catalogos"):
+            self._load_catalogos()
+        if self._data_changed("estudiantes"):
+            self._students_search.run_now(self.students_search_entry.get().strip())
+        if self._data_changed("pagos"):
+            self._payments_search.run_now(self.payments_search_entry.get().strip())
+
+    def _on_destroy(self, event: tk.Event) -> None:
+        if event.widget is self:
+            self._students_search.cancel()
+            self._payments_search.cancel()
+            self._dispatcher.close()
 
     def _on_salir(self) -> None:
         self.winfo_toplevel().destroy()
@@ -600,11 +805,11 @@ class IngresosView(ttk.Frame):
             from tkinter import messagebox
             messagebox.showinfo("Actualizando Sistema", "Refrescando todos los datos del sistema...")
             
-            # Refrescar datos de grados
-            self._cargar_grados()
+            # Releer los catálogos aunque la caché aún no haya vencido
+            invalidate_catalogs("academia.db")
             
-            # Refrescar datos de conceptos de pago
-            self._cargar_conceptos_pago()
+            # Refrescar grados y conceptos de pago en segundo plano
+            self._load_catalogos()
             
             # Refrescar tabla de estudiantes
             self._load_students_table()
@@ -649,13 +854,26 @@ class IngresosView(ttk.Frame):
     def _on_student_select(self, event: tk.Event) -> None:
         selection = self.tree_students.selection()
         if not selection:
+            self._dispatcher.cancel("estudiante")
             return
         iid = selection[0]
         try:
             estudiante_id = int(iid)
         except ValueError:
             return
-        data = fetch_estudiante_by_id(estudiante_id, "academia.db")
+
+        def cargar():
+            return (
+                fetch_estudiante_by_id(estudiante_id, "academia.db"),
+                fetch_calificacion_by_estudiante(estudiante_id, "academia.db"),
+            )
+
+        # Una selección nueva reemplaza a la que aún no terminó de cargar
+        self._dispatcher.submit(cargar, key="estudiante", on_success=self._show_estudiante)
+
+    def _show_estudiante(self, resultado) -> None:
+        """Muestra en el formulario los datos y las notas del estudiante seleccionado."""
+        data, notas = resultado
         if not data:
             return
         nombre, apellido, institucion, grado_id, telefono = data
@@ -671,7 +889,7 @@ class IngresosView(ttk.Frame):
             pass
         
         # Cargar notas del estudiante
-        self._load_estudiante_notas(estudiante_id)
+        self._show_estudiante_notas(notas)
 
     def _set_entry_text(self, entry: ttk.Entry, text: str) -> None:
         entry.configure(foreground="#000")
@@ -688,9 +906,8 @@ class IngresosView(ttk.Frame):
         except ValueError:
             return 0.0
 
-    def _load_estudiante_notas(self, estudiante_id: int) -> None:
-        """Carga las notas de un estudiante en los inputs."""
-        data = fetch_calificacion_by_estudiante(estudiante_id, "academia.db")
+    def _show_estudiante_notas(self, data) -> None:
+        """Carga en los inputs las notas (resultado de fetch_calificacion_by_estudiante)."""
         if data:
             _, nota_uno, nota_dos, nota_tres, nota_cuatro = data
             self._set_entry_text(self.entry_nota1, str(nota_uno))
@@ -747,17 +964,21 @@ class IngresosView(ttk.Frame):
         nota_tres = self._get_nota_value(self.entry_nota3)
         nota_cuatro = self._get_nota_value(self.entry_nota4)
         
-        # Verificar si ya existe una calificación para este estudiante
-        existing = fetch_calificacion_by_estudiante(estudiante_id, "academia.db")
-        if existing:
-            # Actualizar calificación existente
-            calificacion_id, _, _, _, _ = existing
-            ok = update_calificacion(calificacion_id, nota_uno, nota_dos, nota_tres, nota_cuatro, "academia.db")
-        else:
+        def guardar() -> bool:
+            # Verificar si ya existe una calificación para este estudiante
+            existing = fetch_calificacion_by_estudiante(estudiante_id, "academia.db")
+            if existing:
+                # Actualizar calificación existente
+                calificacion_id, _, _, _, _ = existing
+                return update_calificacion(calificacion_id, nota_uno, nota_dos, nota_tres, nota_cuatro, "academia.db")
             # Insertar nueva calificación
             new_id = insert_calificacion(estudiante_id, nota_uno, nota_dos, nota_tres, nota_cuatro, "academia.db")
-            ok = new_id is not None
+            return new_id is not None
         
+        self._dispatcher.submit(guardar, write=True, on_success=self._on_notas_escritas)
+
+    def _on_notas_escritas(self, ok: bool) -> None:
+        """Limpia el formulario de notas cuando la escritura terminó bien."""
         if ok:
             self._clear_notas_inputs()
             self._deselect_all_tables()
@@ -768,22 +989,20 @@ class IngresosView(ttk.Frame):
         if estudiante_id <= 0:
             return
         
-        # Verificar si existe una calificación para este estudiante
-        existing = fetch_calificacion_by_estudiante(estudiante_id, "academia.db")
-        if not existing:
-            return  # No hay calificación para modificar
-        
         nota_uno = self._get_nota_value(self.entry_nota1)
         nota_dos = self._get_nota_value(self.entry_nota2)
         nota_tres = self._get_nota_value(self.entry_nota3)
         nota_cuatro = self._get_nota_value(self.entry_nota4)
         
-        calificacion_id, _, _, _, _ = existing
-        ok = update_calificacion(calificacion_id, nota_uno, nota_dos, nota_tres, nota_cuatro, "academia.db")
+        def modificar() -> bool:
+            # Verificar si existe una calificación para este estudiante
+            existing = fetch_calificacion_by_estudiante(estudiante_id, "academia.db")
+            if not existing:
+                return False  # No hay calificación para modificar
+            calificacion_id, _, _, _, _ = existing
+            return update_calificacion(calificacion_id, nota_uno, nota_dos, nota_tres, nota_cuatro, "academia.db")
         
-        if ok:
-            self._clear_notas_inputs()
-            self._deselect_all_tables()
+        self._dispatcher.submit(modificar, write=True, on_success=self._on_notas_escritas)
 
     def _on_eliminar_nota(self) -> None:
         """Elimina las notas de un estudiante."""
@@ -791,17 +1010,15 @@ class IngresosView(ttk.Frame):
         if estudiante_id <= 0:
             return
         
-        # Verificar si existe una calificación para este estudiante
-        existing = fetch_calificacion_by_estudiante(estudiante_id, "academia.db")
-        if not existing:
-            return  # No hay calificación para eliminar
-        
-        calificacion_id, _, _, _, _ = existing
-        ok = delete_calificacion(calificacion_id, "academia.db")
+        def eliminar() -> bool:
+            # Verificar si existe una calificación para este estudiante
+            existing = fetch_calificacion_by_estudiante(estudiante_id, "academia.db")
+            if not existing:
+                return False  # No hay calificación para eliminar
+            calificacion_id, _, _, _, _ = existing
+            return delete_calificacion(calificacion_id, "academia.db")
         
-        if ok:
-            self._clear_notas_inputs()
-            self._deselect_all_tables()
+        self._dispatcher.submit(eliminar, write=True, on_success=self._on_notas_escritas)
 
     def _on_eliminar_pago(self) -> None:
         """Elimina un pago seleccionado."""
@@ -813,12 +1030,15 @@ class IngresosView(ttk.Frame):
         except ValueError:
             return
         
-        ok = delete_pago(pago_id, "academia.db")
-        if ok:
-            self._load_payments_table()
+        def listo(ok: bool) -> None:
+            if not ok:
+                return
+            self.tree_payments.remove_row(pago_id)
             # Limpiar inputs de pago
             self.entry_monto.delete(0, tk.END)
             self._init_placeholder(self.entry_monto, "Monto")
+        
+        self._dispatcher.submit(self._ingresos.eliminar, pago_id, write=True, on_success=listo)
 
     def _on_eliminar_estudiante(self) -> None:
         """Elimina un estudiante y todas sus relaciones."""
@@ -830,69 +1050,96 @@ class IngresosView(ttk.Frame):
         except ValueError:
             return
         
-        ok = delete_estudiante_cascade(estudiante_id, "academia.db")
-        if ok:
-            # Recargar todas las tablas
-            self._load_students_table()
+        def listo(ok: bool) -> None:
+            if not ok:
+                return
+            self.tree_students.remove_row(estudiante_id)
+            # La eliminación en cascada pudo quitar varios pagos
             self._load_payments_table()
             # Limpiar todos los inputs
             self._clear_student_inputs()
             self._clear_notas_inputs()
             self.entry_monto.delete(0, tk.END)
             self._init_placeholder(self.entry_monto, "Monto")
-
-    def _on_students_search(self, event: tk.Event) -> None:
-        """Filtra la tabla de estudiantes por nombre."""
-        search_text = self.students_search_entry.get().lower().strip()
-        
-        # Limpiar tabla
-        for row in self.tree_students.get_children():
-            self.tree_students.delete(row)
         
+        def eliminar() -> bool:
+            ok = delete_estudiante_cascade(estudiante_id, "academia.db")
+            if ok:
+                self._ingresos.estudiante_eliminado(estudiante_id)
+            return ok
+
+        self._dispatcher.submit(eliminar, write=True, on_success=listo)
+
+    def _filtro_nombres(self, tabla: str) -> IncrementalFilter:
+        """Filtro de nombres normalizados para una tabla.
+
+        Se arma desde el índice compartido de estudiantes y se rehace cuando
+        este cambia. Cada tabla tiene el suyo para que el estrechamiento
+        incremental siga solo las búsquedas de esa tabla. Corre en los hilos
+        lectores.
+        """
+        index = get_estudiantes_index("academia.db")
+        with self._filtros_lock:
+            actual = self._filtros_nombre.get(tabla)
+            if actual is None or actual[0] != index.version:
+                version, items = index.normalized_items()
+                actual = (version, IncrementalFilter(items))
+                self._filtros_nombre[tabla] = actual
+            return actual[1]
+
+    def _buscar_estudiantes(self, search_text: str):
+        """Resuelve la búsqueda de estudiantes fuera del hilo de Tk."""
+        versiones = table_versions("academia.db", self._DEPENDENCIAS["estudiantes"])
         if not search_text:
             # Mostrar todos los estudiantes
-            for idx, (estudiante_id, nombre, institucion, grado, telefono) in enumerate(self._all_students_data, start=1):
-                self.tree_students.insert("", tk.END, iid=str(estudiante_id), values=(idx, nombre, institucion, grado, telefono))
+            source = self._students_source()
+        elif has_student_fts("academia.db"):
+            # Búsqueda por prefijos en la tabla FTS (nombre, institución, teléfono)
+            source = ListTableSource(search_estudiantes_for_table(search_text, "academia.db"))
         else:
-            # Filtrar por nombre
-            filtered_data = []
-            for estudiante_id, nombre, institucion, grado, telefono in self._all_students_data:
-                if search_text in nombre.lower():
-                    filtered_data.append((estudiante_id, nombre, institucion, grado, telefono))
-            
-            for idx, (estudiante_id, nombre, institucion, grado, telefono) in enumerate(filtered_data, start=1):
-                self.tree_students.insert("", tk.END, iid=str(estudiante_id), values=(idx, nombre, institucion, grado, telefono))
+            # Filtrar por nombre en memoria; las filas se leen por página
+            estudiante_ids = self._filtro_nombres("estudiantes").filter(search_text)
+            source = KeyListTableSource(
+                estudiante_ids, lambda keys: fetch_estudiantes_by_ids(keys, "academia.db")
+            )
+        return versiones, source, prefetch(source, self.tree_students.page_size)
+
+    def _buscar_pagos(self, search_text: str):
+        """Resuelve la búsqueda de pagos fuera del hilo de Tk."""
+        versiones = table_versions("academia.db", self._DEPENDENCIAS["pagos"])
+        if not search_text:
+            source = self._payments_source()
+        else:
+            estudiante_ids = self._filtro_nombres("pagos").filter(search_text)
+            source = self._payments_source(estudiante_ids=estudiante_ids)
+        return versiones, source, prefetch(source, self.tree_payments.page_size)
+
+    def _show_students_search(self, search_text: str, resultado) -> None:
+        versiones, source, prefetched = resultado
+        self._versiones["estudiantes"] = versiones
+        self.tree_students.set_source(source, prefetched)
+
+    def _show_payments_search(self, search_text: str, resultado) -> None:
+        versiones, source, prefetched = resultado
+        self._versiones["pagos"] = versiones
+        self.tree_payments.set_source(source, prefetched)
+
+    def _on_students_search(self, event: tk.Event) -> None:
+        """Filtra la tabla de estudiantes por nombre cuando se deja de escribir."""
+        self._students_search.schedule(self.students_search_entry.get().strip())
 
     def _clear_students_search(self) -> None:
         """Limpia el campo de búsqueda de estudiantes y muestra todos los datos."""
         self.students_search_entry.delete(0, tk.END)
-        self._on_students_search(None)
+        self._students_search.run_now("")
 
     def _on_payments_search(self, event: tk.Event) -> None:
-        """Filtra la tabla de pagos por nombre del estudiante."""
-        search_text = self.payments_search_entry.get().lower().strip()
-        
-        # Limpiar tabla
-        for row in self.tree_payments.get_children():
-            self.tree_payments.delete(row)
-        
-        if not search_text:
-            # Mostrar todos los pagos
-            for idx, (pago_id, concepto, estudiante, usuario, monto, fecha) in enumerate(self._all_payments_data, start=1):
-                self.tree_payments.insert("", tk.END, iid=str(pago_id), values=(idx, concepto, estudiante, usuario, monto, fecha))
-        else:
-            # Filtrar por nombre del estudiante
-            filtered_data = []
-            for pago_id, concepto, estudiante, usuario, monto, fecha in self._all_payments_data:
-                if search_text in estudiante.lower():
-                    filtered_data.append((pago_id, concepto, estudiante, usuario, monto, fecha))
-            
-            for idx, (pago_id, concepto, estudiante, usuario, monto, fecha) in enumerate(filtered_data, start=1):
-                self.tree_payments.insert("", tk.END, iid=str(pago_id), values=(idx, concepto, estudiante, usuario, monto, fecha))
+        """Filtra la tabla de pagos por nombre del estudiante cuando se deja de escribir."""
+        self._payments_search.schedule(self.payments_search_entry.get().strip())
 
     def _clear_payments_search(self) -> None:
         """Limpia el campo de búsqueda de pagos y muestra todos los datos."""
         self.payments_search_entry.delete(0, tk.END)
-        self._on_payments_search(None)
+        self._payments_search.run_now("")
 
 
@@ -0,0 +1,181 @@
+"""
+Registro de pagos por lote.
+
+`PagosLoteDialog` registra el mismo concepto y monto para varios
+estudiantes a la vez (por ejemplo la mensualidad de todo un grado): se
+elige el grado, la vista previa lista a sus estudiantes (todos
+seleccionados; se pueden quitar con Ctrl/Shift + clic) y al confirmar se
+insertan todos los pagos en una sola transacción con
+`IngresosRepository.agregar_lote`.
+"""
+
+import tkinter as tk
+from tkinter import messagebox, ttk
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from database.executor import TkDispatcher
+from ingresos.ingresos_db import Ingreso, IngresosRepository, fetch_estudiantes_by_grado
+
+
+class PagosLoteDialog(tk.Toplevel):
+    """Ventana de pagos por lote de IngresosView.
+
+    Usa el dispatcher de la vista: si la ventana se cierra mientras se
+    guarda, on_saved(ingresos) igual se llama al terminar.
+    """
+
+    def __init__(
+        self,
+        parent: tk.Widget,
+        dispatcher: TkDispatcher,
+        repositorio: IngresosRepository,
+        usuario_id: int,
+        conceptos: Sequence[Tuple[int, str]],
+        grados: Sequence[Tuple[int, str]],
+        on_saved: Callable[[List[Ingreso]], None],
+        concepto_id: Optional[int] = None,
+        monto: str = "",
+    ):
+        super().__init__(parent)
+        self.title("Pagos por lote")
+        self.transient(parent.winfo_toplevel())
+        self._dispatcher = dispatcher
+        self._ingresos = repositorio
+        self._usuario_id = usuario_id
+        self._on_saved = on_saved
+        self._concepto_ids = [item[0] for item in conceptos]
+        self._grado_ids = [item[0] for item in grados]
+        self._guardando = False
+
+        body = ttk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True, padx=16, pady=12)
+
+        ttk.Label(body, text="Pagos por lote", font=("Segoe UI", 14, "bold")).pack(anchor="w", pady=(0, 8))
+
+        row = ttk.Frame(body)
+        row.pack(fill=tk.X, pady=6)
+        self.combo_concepto = ttk.Combobox(row, values=[item[1] for item in conceptos], state="readonly", width=28, style="Large.TCombobox")
+        self.combo_concepto.set("Concepto a cancelar")
+        if concepto_id in self._concepto_ids:
+            self.combo_concepto.current(self._concepto_ids.index(concepto_id))
+        self.combo_concepto.pack(side=tk.LEFT, padx=(0, 8), ipady=8)
+        ttk.Label(row, text="Monto:", font=("Segoe UI", 12)).pack(side=tk.LEFT, padx=(0, 5))
+        self.entry_monto = ttk.Entry(row, width=12, style="Large.TEntry")
+        self.entry_monto.insert(0, monto)
+        self.entry_monto.pack(side=tk.LEFT, ipady=8)
+        self.entry_monto.bind("<KeyRelease>", lambda event: self._update_resumen())
+
+        row = ttk.Frame(body)
+        row.pack(fill=tk.X, pady=6)
+        self.combo_grado = ttk.Combobox(row, values=[item[1] for item in grados], state="readonly", width=28, style="Large.TCombobox")
+        self.combo_grado.set("Seleccione grado")
+        self.combo_grado.pack(side=tk.LEFT, padx=(0, 8), ipady=8)
+        self.combo_grado.bind("<<ComboboxSelected>>", self._on_grado_select)
+        ttk.Button(row, text="Todos", command=self._seleccionar_todos, width=10).pack(side=tk.LEFT, padx=(0, 4))
+        ttk.Button(row, text="Ninguno", command=self._seleccionar_ninguno, width=10).pack(side=tk.LEFT)
+
+        # Vista previa: estudiantes del grado; los seleccionados reciben el pago
+        table_frame = ttk.Frame(body)
+        table_frame.pack(fill=tk.BOTH, expand=True, pady=6)
+        self.tree_preview = ttk.Treeview(
+            table_frame, columns=("nombre",), show="headings", selectmode="extended", height=12, style="Large.Treeview"
+        )
+        self.tree_preview.heading("nombre", text="Estudiante")
+        self.tree_preview.column("nombre", width=360, anchor="w")
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree_preview.yview)
+        self.tree_preview.configure(yscrollcommand=scrollbar.set)
+        self.tree_preview.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree_preview.bind("<<TreeviewSelect>>", lambda event: self._update_resumen())
+
+        self.label_resumen = ttk.Label(body, text="", font=("Segoe UI", 12))
+        self.label_resumen.pack(anchor="w", pady=(6, 8))
+
+        actions = ttk.Frame(body)
+        actions.pack(fill=tk.X)
+        actions.columnconfigure(0, weight=1)
+        actions.columnconfigure(1, weight=1)
+        self.btn_registrar = ttk.Button(actions, text="Registrar pagos", command=self._on_registrar, style="Save.TButton")
+        self.btn_registrar.grid(row=0, column=0, sticky="ew", padx=4)
+        ttk.Button(actions, text="Cancelar", command=self.destroy, style="Exit.TButton").grid(row=0, column=1, sticky="ew", padx=4)
+
+        self._update_resumen()
+        self.grab_set()
+
+    def _get_monto(self) -> Optional[float]:
+        try:
+            return float(self.entry_monto.get().strip())
+        except ValueError:
+            return None
+
+    def _get_concepto_id(self) -> int:
+        index = self.combo_concepto.current()
+        return self._concepto_ids[index] if index >= 0 else 0
+
+    def _on_grado_select(self, event: tk.Event) -> None:
+        index = self.combo_grado.current()
+        if index < 0:
+            return
+        self.tree_preview.delete(*self.tree_preview.get_children())
+        self.label_resumen.configure(text="Cargando estudiantes...")
+        self._dispatcher.submit(
+            fetch_estudiantes_by_grado, self._grado_ids[index], "academia.db",
+            key="pagos_lote_estudiantes", on_success=self._show_estudiantes,
+        )
+
+    def _show_estudiantes(self, estudiantes) -> None:
+        if not self.winfo_exists():
+            return
+        self.tree_preview.delete(*self.tree_preview.get_children())
+        for estudiante_id, nombre in estudiantes:
+            self.tree_preview.insert("", tk.END, iid=str(estudiante_id), values=(nombre,))
+        self._seleccionar_todos()
+
+    def _seleccionar_todos(self) -> None:
+        self.tree_preview.selection_set(self.tree_preview.get_children())
+        self._update_resumen()
+
+    def _seleccionar_ninguno(self) -> None:
+        self.tree_preview.selection_remove(self.tree_preview.selection())
+        self._update_resumen()
+
+    def _update_resumen(self) -> None:
+        cantidad = len(self.tree_preview.selection())
+        monto = self._get_monto()
+        total = f"total {cantidad * monto:,.2f}" if monto is not None else "monto inválido"
+        self.label_resumen.configure(text=f"{cantidad} de {len(self.tree_preview.get_children())} estudiantes · {total}")
+        listo = cantidad > 0 and monto is not None and not self._guardando
+        self.btn_registrar.configure(state="normal" if listo else "disabled")
+
+    def _on_registrar(self) -> None:
+        concepto_id = self._get_concepto_id()
+        monto = self._get_monto()
+        estudiante_ids = [int(iid) for iid in self.tree_preview.selection()]
+        if concepto_id <= 0 or monto is None or not estudiante_ids or self._usuario_id <= 0:
+            return
+        concepto = self.combo_concepto.get()
+        if not messagebox.askyesno(
+            "Confirmar pagos",
+            f"Se registrarán {len(estudiante_ids)} pagos de {concepto} por {monto:,.2f} "
+            f"(total {len(estudiante_ids) * monto:,.2f}).\n¿Continuar?",
+            parent=self,
+        ):
+            return
+        self._guardando = True
+        self._update_resumen()
+        self._dispatcher.submit(
+            self._ingresos.agregar_lote, concepto_id, estudiante_ids, self._usuario_id, monto,
+            write=True, on_success=self._guardado,
+        )
+
+    def _guardado(self, ingresos: List[Ingreso]) -> None:
+        if ingresos:
+            self._on_saved(ingresos)
+        if not self.winfo_exists():
+            return
+        if not ingresos:
+            self._guardando = False
+            self._update_resumen()
+            messagebox.showerror("Error", "No se registró ningún pago. Intente de nuevo.", parent=self)
+            return
+        self.destroy()
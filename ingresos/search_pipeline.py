@@ -0,0 +1,129 @@
+"""
+Búsqueda mientras se escribe para las tablas de IngresosView.
+
+- `DebouncedSearch` espera a que el texto deje de cambiar durante
+  `SEARCH_SETTINGS['debounce_ms']` antes de buscar, y envía la búsqueda al
+  TkDispatcher con una clave propia: una búsqueda nueva reemplaza a la que
+  aún está en curso y su resultado ya no se dibuja.
+- `IncrementalFilter` guarda los nombres ya normalizados (minúsculas, sin
+  tildes) y, cuando la consulta nueva contiene a la anterior (el caso de
+  seguir escribiendo), filtra solo sobre el resultado previo.
+"""
+
+import threading
+from typing import Callable, Generic, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+from consultas.consultas_index import normalize_text
+
+
+# Configuración por defecto de la búsqueda
+SEARCH_SETTINGS = {
+    'debounce_ms': 250,  # Pausa de escritura antes de ejecutar la búsqueda
+}
+
+K = TypeVar("K", bound=Hashable)
+
+
+class IncrementalFilter(Generic[K]):
+    """Filtro por subcadena sobre textos normalizados de antemano.
+
+    items son pares (clave, texto_normalizado) en el orden en que deben
+    devolverse las claves. Es seguro usarlo desde varios hilos.
+    """
+
+    def __init__(self, items: Sequence[Tuple[K, str]]):
+        self._keys: List[K] = [key for key, _ in items]
+        self._texts: List[str] = [text for _, text in items]
+        self._lock = threading.Lock()
+        self._last_query = ""
+        self._last_matches: Optional[List[int]] = None
+        self.narrowed = 0   # Búsquedas resueltas sobre el resultado anterior
+        self.full_scans = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def filter(self, text: str) -> List[K]:
+        """Claves cuyo texto contiene a text (sin distinguir mayúsculas ni tildes)."""
+        query = normalize_text(text)
+        if not query:
+            return list(self._keys)
+        with self._lock:
+            texts = self._texts
+            if self._last_matches is not None and self._last_query in query:
+                # Toda coincidencia de la consulta nueva contiene a la anterior
+                candidates: Sequence[int] = self._last_matches
+                self.narrowed += 1
+            else:
+                candidates = range(len(texts))
+                self.full_scans += 1
+            matches = [pos for pos in candidates if query in texts[pos]]
+            self._last_query = query
+            self._last_matches = matches
+            return [self._keys[pos] for pos in matches]
+
+
+class DebouncedSearch:
+    """Ejecuta worker(texto) en segundo plano cuando el texto deja de cambiar.
+
+    on_result(texto, resultado) se llama en el hilo de Tk solo para la
+    búsqueda más reciente.
+    """
+
+    def __init__(
+        self,
+        widget,
+        dispatcher,
+        worker: Callable[[str], object],
+        on_result: Callable[[str, object], None],
+        key: str,
+        delay_ms: Optional[int] = None,
+    ):
+        self._widget = widget
+        self._dispatcher = dispatcher
+        self._worker = worker
+        self._on_result = on_result
+        self._key = key
+        self._delay = delay_ms
+        self._after_id: Optional[str] = None
+        self._last_text: Optional[str] = None
+
+    @property
+    def delay_ms(self) -> int:
+        return int(self._delay if self._delay is not None else SEARCH_SETTINGS['debounce_ms'])
+
+    def schedule(self, text: str) -> None:
+        """Programa la búsqueda de text, descartando la programada antes."""
+        self._cancel_timer()
+        self._after_id = self._widget.after(self.delay_ms, self._fire, text)
+
+    def run_now(self, text: str) -> None:
+        """Busca de inmediato (por ejemplo al limpiar o tras guardar)."""
+        self._cancel_timer()
+        self._submit(text)
+
+    def cancel(self) -> None:
+        self._cancel_timer()
+        self._dispatcher.cancel(self._key)
+
+    def _cancel_timer(self) -> None:
+        if self._after_id is not None:
+            try:
+                self._widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _fire(self, text: str) -> None:
+        self._after_id = None
+        if text == self._last_text:
+            # Teclas que no cambian el texto (flechas, Shift...)
+            return
+        self._submit(text)
+
+    def _submit(self, text: str) -> None:
+        self._last_text = text
+        self._dispatcher.submit(
+            self._worker, text,
+            key=self._key, on_success=lambda result: self._on_result(text, result),
+        )
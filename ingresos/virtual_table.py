@@ -0,0 +1,810 @@
+"""
+Tabla virtual para listados grandes en Tkinter.
+
+`VirtualTreeview` muestra un ttk.Treeview que solo contiene las filas de la
+ventana visible. Las filas se piden por páginas a una `TableSource`; las
+fuentes SQL usan paginación por clave (`id > ?`), así que desplazarse por
+millones de filas mantiene constante la memoria: solo viven en Python las
+páginas de `PagedRowCache` y en Tk los ítems visibles.
+
+La selección se guarda como clave lógica (el iid de la fila), por lo que se
+conserva aunque la fila salga de la ventana visible. Las filas que salen de
+la ventana se desvinculan (detach) en lugar de borrarse, y se vuelven a
+vincular si reaparecen al desplazarse o al cambiar el filtro.
+
+Con un `dispatcher` (database.executor.TkDispatcher) la vista no lee la
+fuente en el hilo de Tk: las recargas, las páginas que faltan y las
+búsquedas de posición se piden en segundo plano, y mientras llegan las
+filas que faltan se muestran como "Cargando...".
+"""
+
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+
+class TableSource:
+    """Origen de filas para VirtualTreeview.
+
+    Cada fila es una tupla cuyo primer elemento es la clave única (se usa como
+    iid). Las filas se entregan ordenadas por esa posición.
+    """
+
+    # False si position_of consulta la base (la vista la pide en segundo plano)
+    positions_in_memory = True
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def fetch_rows(self, offset: int, limit: int, after_key=None) -> List[tuple]:
+        """Filas desde la posición offset. after_key es la clave de la fila
+        anterior cuando se conoce, para continuar sin recorrer las previas."""
+        raise NotImplementedError
+
+    def position_of(self, key) -> Optional[int]:
+        """Posición (base 0) de la fila con la clave dada."""
+        raise NotImplementedError
+
+    # Las fuentes que guardan sus filas en memoria aplican aquí los cambios
+    # hechos por la vista; las fuentes SQL ya leen el estado actualizado.
+
+    def row_inserted(self, position: int, row: tuple) -> None:
+        pass
+
+    def row_replaced(self, row: tuple) -> None:
+        pass
+
+    def row_removed(self, key) -> None:
+        pass
+
+
+class ListTableSource(TableSource):
+    """Fuente sobre una lista ya cargada (por ejemplo, resultados de búsqueda)."""
+
+    def __init__(self, rows: Sequence[tuple]):
+        self._rows = list(rows)
+        self._positions: Optional[Dict[str, int]] = None
+
+    def count(self) -> int:
+        return len(self._rows)
+
+    def fetch_rows(self, offset: int, limit: int, after_key=None) -> List[tuple]:
+        return self._rows[offset:offset + limit]
+
+    def position_of(self, key) -> Optional[int]:
+        if self._positions is None:
+            self._positions = {str(row[0]): pos for pos, row in enumerate(self._rows)}
+        return self._positions.get(str(key))
+
+    def row_inserted(self, position: int, row: tuple) -> None:
+        self._rows.insert(position, row)
+        self._positions = None
+
+    def row_replaced(self, row: tuple) -> None:
+        position = self.position_of(row[0])
+        if position is not None:
+            self._rows[position] = row
+
+    def row_removed(self, key) -> None:
+        position = self.position_of(key)
+        if position is not None:
+            del self._rows[position]
+            self._positions = None
+
+
+class KeyListTableSource(TableSource):
+    """Fuente sobre una lista de claves ya filtrada; las filas se leen por página.
+
+    rows_fn(keys) retorna las filas de esas claves en el mismo orden. Sirve
+    para resultados de búsqueda grandes: en memoria solo quedan las claves.
+    """
+
+    def __init__(self, keys: Sequence, rows_fn: Callable[[Sequence], List[tuple]]):
+        self._keys = list(keys)
+        self._rows_fn = rows_fn
+        self._positions: Optional[Dict[str, int]] = None
+
+    def count(self) -> int:
+        return len(self._keys)
+
+    def fetch_rows(self, offset: int, limit: int, after_key=None) -> List[tuple]:
+        keys = self._keys[offset:offset + limit]
+        return self._rows_fn(keys) if keys else []
+
+    def position_of(self, key) -> Optional[int]:
+        if self._positions is None:
+            self._positions = {str(k): pos for pos, k in enumerate(self._keys)}
+        return self._positions.get(str(key))
+
+    def row_inserted(self, position: int, row: tuple) -> None:
+        self._keys.insert(position, row[0])
+        self._positions = None
+
+    def row_removed(self, key) -> None:
+        position = self.position_of(key)
+        if position is not None:
+            del self._keys[position]
+            self._positions = None
+
+
+class KeysetTableSource(TableSource):
+    """Fuente SQL con paginación por clave.
+
+    - count_fn(): total de filas
+    - page_fn(after_key, limit): filas con clave mayor que after_key (None = inicio)
+    - key_at_fn(offset): clave de la fila en la posición offset
+    - position_fn(key): cantidad de filas con clave menor
+    """
+
+    positions_in_memory = False
+
+    def __init__(
+        self,
+        count_fn: Callable[[], int],
+        page_fn: Callable[[object, int], List[tuple]],
+        key_at_fn: Callable[[int], object],
+        position_fn: Callable[[object], int],
+        key_type: Callable = int,
+    ):
+        self._count_fn = count_fn
+        self._page_fn = page_fn
+        self._key_at_fn = key_at_fn
+        self._position_fn = position_fn
+        self._key_type = key_type
+
+    def count(self) -> int:
+        return self._count_fn()
+
+    def fetch_rows(self, offset: int, limit: int, after_key=None) -> List[tuple]:
+        if after_key is None and offset > 0:
+            # Salto sin página previa en caché: ubicar la clave anterior
+            after_key = self._key_at_fn(offset - 1)
+            if after_key is None:
+                return []
+        return self._page_fn(after_key, limit)
+
+    def position_of(self, key) -> Optional[int]:
+        try:
+            return self._position_fn(self._key_type(key))
+        except (TypeError, ValueError):
+            return None
+
+
+class PagedRowCache:
+    """Caché LRU de páginas de una TableSource.
+
+    Guarda como máximo max_pages páginas de page_size filas. Cuando la página
+    anterior está en caché se continúa desde su última clave, que es el caso
+    común al desplazarse.
+    """
+
+    def __init__(self, source: TableSource, page_size: int = 200, max_pages: int = 6):
+        self.page_size = max(1, int(page_size))
+        self.max_pages = max(2, int(max_pages))
+        self._source = source
+        self._pages: "OrderedDict[int, List[tuple]]" = OrderedDict()
+        self._total: Optional[int] = None
+        self.fetches = 0
+
+    @property
+    def source(self) -> TableSource:
+        return self._source
+
+    def reset(self, source: Optional[TableSource] = None) -> None:
+        """Descarta las páginas (y cambia de fuente si se indica)."""
+        if source is not None:
+            self._source = source
+        self._pages.clear()
+        self._total = None
+
+    def seed(self, total: int, first_page: List[tuple]) -> None:
+        """Carga el total y la primera página leídos de antemano (ver prefetch)."""
+        self.store(0, first_page, total)
+
+    def store(self, index: int, page: List[tuple], total: Optional[int] = None) -> None:
+        """Guarda una página (y el total, si se indica) leída en segundo plano."""
+        if total is not None:
+            self._total = max(0, int(total))
+        self._pages[index] = list(page)
+        self._pages.move_to_end(index)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def count(self) -> int:
+        if self._total is None:
+            self._total = max(0, int(self._source.count()))
+        return self._total
+
+    def known_count(self) -> Optional[int]:
+        """Total si ya se leyó; None si habría que consultar la fuente."""
+        return self._total
+
+    def cached_page(self, index: int) -> Optional[List[tuple]]:
+        """Página en caché sin consultar la fuente (None si falta)."""
+        page = self._pages.get(index)
+        if page is not None:
+            self._pages.move_to_end(index)
+        return page
+
+    def previous_key(self, index: int):
+        """Última clave de la página anterior, si está en caché."""
+        previous = self._pages.get(index - 1)
+        return previous[-1][0] if previous else None
+
+    def _page(self, index: int) -> List[tuple]:
+        page = self._pages.get(index)
+        if page is not None:
+            self._pages.move_to_end(index)
+            return page
+        after_key = None
+        previous = self._pages.get(index - 1)
+        if previous:
+            after_key = previous[-1][0]
+        page = self._source.fetch_rows(index * self.page_size, self.page_size, after_key)
+        self.fetches += 1
+        self._pages[index] = page
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return page
+
+    def rows(self, start: int, count: int) -> List[tuple]:
+        """Filas en [start, start + count)."""
+        result: List[tuple] = []
+        total = self.count()
+        pos = max(0, start)
+        end = min(total, start + count)
+        while pos < end:
+            index = pos // self.page_size
+            page = self._page(index)
+            chunk = page[pos - index * self.page_size:end - index * self.page_size]
+            if not chunk:
+                break
+            result.extend(chunk)
+            pos += len(chunk)
+        return result
+
+    def _cached_position(self, key) -> Optional[int]:
+        key = str(key)
+        for index, page in self._pages.items():
+            for pos, row in enumerate(page):
+                if str(row[0]) == key:
+                    return index * self.page_size + pos
+        return None
+
+    def position_of(self, key, lookup: bool = True) -> Optional[int]:
+        """Posición de la fila; con lookup=False no consulta una fuente SQL."""
+        position = self._cached_position(key)
+        if position is None and (lookup or self._source.positions_in_memory):
+            position = self._source.position_of(key)
+        return position
+
+    def _drop_pages_from(self, index: int) -> None:
+        for stale in [i for i in self._pages if i >= index]:
+            del self._pages[stale]
+
+    def replace_row(self, row: tuple) -> Optional[int]:
+        """Reemplaza en caché la fila con la misma clave. Retorna su posición o None."""
+        self._source.row_replaced(row)
+        position = self._cached_position(row[0])
+        if position is None:
+            return None
+        index = position // self.page_size
+        self._pages[index][position - index * self.page_size] = row
+        return position
+
+    def insert_row(self, row: tuple, lookup: bool = True) -> Optional[int]:
+        """Registra una fila recién creada y retorna su posición.
+
+        Si la clave es mayor que la última fila conocida (el caso de un id
+        autoincremental) la posición es el final y no se consulta la fuente.
+        Con lookup=False, si habría que consultar la base no se registra nada
+        y se retorna None (el llamador vuelve a leer la fuente).
+        """
+        position = None
+        if self._total == 0:
+            position = 0
+        elif self._total is not None:
+            last_index = (self._total - 1) // self.page_size
+            last_page = self._pages.get(last_index)
+            if last_page and last_index * self.page_size + len(last_page) == self._total:
+                try:
+                    if last_page[-1][0] < row[0]:
+                        position = self._total
+                except TypeError:
+                    pass
+        if position is None:
+            if not lookup and (self._total is None or not self._source.positions_in_memory):
+                return None
+            position = self._source.position_of(row[0])
+            if position is None:
+                position = self.count()
+        self._source.row_inserted(position, row)
+        if self._total is not None:
+            self._total += 1
+
+        index = position // self.page_size
+        self._drop_pages_from(index + 1)
+        page = self._pages.get(index)
+        if page is not None:
+            page.insert(position - index * self.page_size, row)
+            # La fila desplazada fuera de la página se vuelve a pedir por clave
+            del page[self.page_size:]
+        return position
+
+    def remove_row(self, key) -> Optional[int]:
+        """Quita una fila eliminada. Retorna la posición que ocupaba o None."""
+        position = self._cached_position(key)
+        self._source.row_removed(key)
+        if position is None:
+            # Fuera de la caché no se sabe si la fila pertenecía a la fuente
+            self.reset()
+            return None
+        if self._total is not None:
+            self._total = max(0, self._total - 1)
+        # Las páginas siguientes quedaron corridas una posición
+        self._drop_pages_from(position // self.page_size)
+        return position
+
+
+def prefetch(source: TableSource, page_size: int) -> Tuple[int, List[tuple]]:
+    """Lee el total y la primera página de source.
+
+    Pensado para correr fuera del hilo de Tk; el resultado se pasa a
+    VirtualTreeview.set_source para que el primer dibujo no consulte la base.
+    """
+    return source.count(), source.fetch_rows(0, page_size)
+
+
+# Prefijo de los iid de las filas que aún se están leyendo
+_PLACEHOLDER = "cargando:"
+
+
+def default_row_values(position: int, row: tuple) -> tuple:
+    """Columna "No." (posición + 1) seguida de las columnas de la fila sin la clave."""
+    return (position + 1, *row[1:])
+
+
+class VirtualTreeview(ttk.Frame):
+    """Treeview con barra de desplazamiento que solo materializa la ventana visible.
+
+    Expone la parte de la API de ttk.Treeview que usan las vistas
+    (heading, column, selection, selection_set, selection_remove, see,
+    identify_row, bind). `bind("<<TreeviewSelect>>", ...)` se invoca solo
+    cuando cambia la selección lógica, no al redibujar la ventana.
+
+    Con dispatcher las lecturas de la fuente corren fuera del hilo de Tk.
+    """
+
+    def __init__(
+        self,
+        parent: tk.Widget,
+        columns: Sequence[str],
+        source: Optional[TableSource] = None,
+        page_size: int = 200,
+        max_pages: int = 6,
+        row_values: Callable[[int, tuple], tuple] = default_row_values,
+        style: Optional[str] = None,
+        dispatcher=None,
+    ):
+        super().__init__(parent)
+        self._cache = PagedRowCache(source or ListTableSource([]), page_size, max_pages)
+        self._row_values = row_values
+        self._dispatcher = dispatcher
+        self._key = f"tabla-{id(self)}"
+        # Cambia con cada recarga: descarta las lecturas pedidas antes
+        self._generation = 0
+        self._loading: Set[int] = set()
+        self._offset = 0
+        self._visible_rows = 10
+        self._window_keys: List[str] = []
+        # Ítems desvinculados que se pueden volver a mostrar sin crearlos de nuevo
+        self._detached: "OrderedDict[str, None]" = OrderedDict()
+        self._selected: Optional[str] = None
+        self._select_callbacks: List[Callable] = []
+
+        options = {"columns": tuple(columns), "show": "headings", "selectmode": "browse"}
+        if style:
+            options["style"] = style
+        self.tree = ttk.Treeview(self, **options)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        try:
+            self._row_height = int(ttk.Style().lookup(style or "Treeview", "rowheight") or 20)
+        except (tk.TclError, ValueError):
+            self._row_height = 20
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_units(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_units(3))
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self._visible_rows))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self._visible_rows))
+        self.tree.bind("<Home>", lambda e: self._move_selection_to(0))
+        self.tree.bind("<End>", lambda e: self._move_selection_to(self._row_count() - 1))
+
+    # --- API compatible con ttk.Treeview -------------------------------
+
+    def heading(self, column: str, **kwargs):
+        return self.tree.heading(column, **kwargs)
+
+    def column(self, column: str, **kwargs):
+        return self.tree.column(column, **kwargs)
+
+    def identify_row(self, y: int) -> str:
+        return self.tree.identify_row(y)
+
+    def get_children(self) -> tuple:
+        """iids materializados (solo la ventana visible)."""
+        return tuple(self._window_keys)
+
+    def bind(self, sequence=None, func=None, add=None):
+        if sequence == "<<TreeviewSelect>>" and func is not None:
+            if not add:
+                self._select_callbacks.clear()
+            self._select_callbacks.append(func)
+            return None
+        return self.tree.bind(sequence, func, add)
+
+    def selection(self) -> tuple:
+        return (self._selected,) if self._selected is not None else ()
+
+    def selection_set(self, *items) -> None:
+        keys = self._flatten(items)
+        if not keys:
+            self.selection_remove(self.selection())
+            return
+        self._selected = keys[0]
+        if self._selected in self._window_keys:
+            self.tree.selection_set(self._selected)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+        self.after_idle(self._notify_select)
+
+    def selection_remove(self, *items) -> None:
+        if self._selected is None or self._selected not in self._flatten(items):
+            return
+        self._selected = None
+        if self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+        self.after_idle(self._notify_select)
+
+    def see(self, item) -> None:
+        key = str(item)
+        if key in self._window_keys:
+            return
+        position = self._cache.position_of(key, lookup=self._dispatcher is None)
+        if position is not None:
+            self._scroll_to(position - self._visible_rows // 2)
+        elif self._dispatcher is not None:
+            self._see_async(key)
+
+    # --- Datos -----------------------------------------------------------
+
+    @property
+    def total_rows(self) -> int:
+        return self._row_count()
+
+    @property
+    def page_size(self) -> int:
+        return self._cache.page_size
+
+    def set_source(self, source: TableSource, prefetched: Optional[Tuple[int, List[tuple]]] = None) -> None:
+        """Cambia la fuente (por ejemplo al filtrar) y vuelve al inicio.
+
+        prefetched es el resultado de prefetch(source, page_size) cuando ya se
+        leyó en segundo plano.
+        """
+        self._cache.reset(source)
+        self._invalidate()
+        if prefetched is not None:
+            self._cache.seed(*prefetched)
+        self._offset = 0
+        self._render()
+
+    def refresh(self) -> None:
+        """Vuelve a leer la fuente conservando la posición y la selección.
+
+        Con dispatcher se sigue mostrando la ventana actual hasta que llegan
+        el total y las páginas visibles.
+        """
+        if self._dispatcher is None:
+            self._cache.reset()
+            self._render()
+            return
+        self._invalidate()
+        generation = self._generation
+        source = self._cache.source
+        page_size = self._cache.page_size
+        first = self._offset // page_size
+        last = (self._offset + self._visible_rows - 1) // page_size
+
+        def leer():
+            pages = {}
+            after_key = None
+            for index in range(first, last + 1):
+                pages[index] = source.fetch_rows(index * page_size, page_size, after_key)
+                if not pages[index]:
+                    break
+                after_key = pages[index][-1][0]
+            return source.count(), pages
+
+        def mostrar(resultado) -> None:
+            if generation != self._generation:
+                return
+            total, pages = resultado
+            self._cache.reset()
+            for index, page in pages.items():
+                self._cache.store(index, page, total)
+            self._render()
+
+        self._dispatcher.submit(leer, key=f"{self._key}-recarga", on_success=mostrar)
+
+    def insert_row(self, row: tuple) -> None:
+        """Agrega una fila recién creada sin releer la fuente.
+
+        Solo se redibuja la ventana visible; los números de fila se calculan
+        al dibujar, así que no hay que renumerar el resto.
+        """
+        self.insert_rows([row])
+
+    def insert_rows(self, rows: Sequence[tuple]) -> None:
+        """Agrega varias filas recién creadas y redibuja una sola vez."""
+        if not rows:
+            return
+        self._invalidate()
+        for row in rows:
+            if self._cache.insert_row(row, lookup=self._dispatcher is None) is None:
+                # Ubicarla requiere consultar la base: se relee en segundo plano
+                self.refresh()
+                return
+        self._render()
+
+    def update_row(self, row: tuple) -> None:
+        """Reemplaza una fila modificada; solo toca su ítem si está visible."""
+        key = str(row[0])
+        position = self._cache.replace_row(row)
+        if position is not None and key in self._window_keys:
+            self.tree.item(key, values=self._row_values(position, row))
+
+    def remove_row(self, item) -> None:
+        """Quita una fila eliminada sin releer toda la fuente."""
+        key = str(item)
+        if self._selected == key:
+            self._selected = None
+        self._invalidate()
+        self._cache.remove_row(key)
+        self._render()
+
+    # --- Lecturas en segundo plano ----------------------------------------
+
+    def _invalidate(self) -> None:
+        """Descarta las lecturas en curso: la caché cambió desde que se pidieron."""
+        self._generation += 1
+        self._loading.clear()
+
+    def _row_count(self) -> int:
+        if self._dispatcher is None:
+            return self._cache.count()
+        return self._cache.known_count() or 0
+
+    def _request_page(self, index: int) -> None:
+        """Pide una página (y el total si falta) y redibuja al recibirla."""
+        if index in self._loading:
+            return
+        self._loading.add(index)
+        generation = self._generation
+        source = self._cache.source
+        page_size = self._cache.page_size
+        after_key = self._cache.previous_key(index)
+        need_total = self._cache.known_count() is None
+
+        def leer():
+            total = source.count() if need_total else None
+            return total, source.fetch_rows(index * page_size, page_size, after_key)
+
+        def mostrar(resultado) -> None:
+            if generation != self._generation:
+                return
+            self._loading.discard(index)
+            total, page = resultado
+            self._cache.store(index, page, total)
+            self._render()
+
+        def fallo(exc: BaseException) -> None:
+            if generation == self._generation:
+                self._loading.discard(index)
+
+        self._dispatcher.submit(
+            leer, key=f"{self._key}-pagina-{index}", on_success=mostrar, on_error=fallo
+        )
+
+    def _see_async(self, key: str) -> None:
+        generation = self._generation
+        source = self._cache.source
+
+        def mostrar(position: Optional[int]) -> None:
+            if generation == self._generation and position is not None and key not in self._window_keys:
+                self._scroll_to(position - self._visible_rows // 2)
+
+        self._dispatcher.submit(source.position_of, key, key=f"{self._key}-posicion", on_success=mostrar)
+
+    def _window_rows(self) -> Tuple[Optional[int], List[Optional[tuple]]]:
+        """Total y filas de la ventana con lo que hay en caché; None donde falta una página."""
+        total = self._cache.known_count()
+        if total is None:
+            self._request_page(max(0, self._offset) // self._cache.page_size)
+            return None, []
+        self._offset = min(max(0, self._offset), max(0, total - self._visible_rows))
+        page_size = self._cache.page_size
+        rows: List[Optional[tuple]] = []
+        pos = self._offset
+        end = min(total, self._offset + self._visible_rows)
+        while pos < end:
+            index = pos // page_size
+            page_end = min(end, (index + 1) * page_size)
+            page = self._cache.cached_page(index)
+            if page is None:
+                self._request_page(index)
+                rows.extend([None] * (page_end - pos))
+            else:
+                chunk = page[pos - index * page_size:page_end - index * page_size]
+                rows.extend(chunk)
+                if len(chunk) < page_end - pos:
+                    break
+            pos = page_end
+        return total, rows
+
+    def _placeholder_values(self, position: int) -> tuple:
+        columns = len(self.tree["columns"])
+        return ((position + 1, "Cargando...") + ("",) * columns)[:columns]
+
+    # --- Dibujo ------------------------------------------------------------
+
+    @staticmethod
+    def _flatten(items) -> List[str]:
+        keys: List[str] = []
+        for item in items:
+            if isinstance(item, (tuple, list)):
+                keys.extend(str(i) for i in item)
+            elif item is not None and item != "":
+                keys.append(str(item))
+        return keys
+
+    def _render(self) -> None:
+        if self._dispatcher is None:
+            total = self._cache.count()
+            self._offset = min(max(0, self._offset), max(0, total - self._visible_rows))
+            rows = self._cache.rows(self._offset, self._visible_rows)
+        else:
+            total, rows = self._window_rows()
+            if total is None:
+                # Se conserva lo dibujado hasta que llegue el total
+                return
+        keys = [
+            str(row[0]) if row is not None else f"{_PLACEHOLDER}{self._offset + index}"
+            for index, row in enumerate(rows)
+        ]
+
+        wanted = set(keys)
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted]
+        if stale:
+            selected = [iid for iid in self.tree.selection() if iid in stale]
+            if selected:
+                self.tree.selection_remove(selected)
+            self.tree.detach(*stale)
+            for iid in stale:
+                self._detached[iid] = None
+                self._detached.move_to_end(iid)
+        for index, (key, row) in enumerate(zip(keys, rows)):
+            if row is None:
+                values = self._placeholder_values(self._offset + index)
+            else:
+                values = self._row_values(self._offset + index, row)
+            if self.tree.exists(key):
+                # move() también vuelve a vincular un ítem desvinculado
+                self.tree.item(key, values=values)
+                self.tree.move(key, "", index)
+                self._detached.pop(key, None)
+            else:
+                self.tree.insert("", index, iid=key, values=values)
+        self._window_keys = keys
+
+        excess = len(self._detached) - max(64, 3 * self._visible_rows)
+        if excess > 0:
+            oldest = [self._detached.popitem(last=False)[0] for _ in range(excess)]
+            self.tree.delete(*oldest)
+
+        if self._selected in wanted:
+            if self.tree.selection() != (self._selected,):
+                self.tree.selection_set(self._selected)
+        if total:
+            self.scrollbar.set(self._offset / total, min(1.0, (self._offset + len(keys)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _scroll_to(self, offset: int) -> None:
+        self._offset = offset
+        self._render()
+
+    def _scroll_units(self, units: int) -> str:
+        self._scroll_to(self._offset + units)
+        return "break"
+
+    def _yview(self, *args) -> None:
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * self._row_count()))
+        elif args[0] == "scroll":
+            step = self._visible_rows if str(args[2]).startswith("page") else 1
+            self._scroll_to(self._offset + int(args[1]) * step)
+
+    def _on_mousewheel(self, event: tk.Event) -> str:
+        if event.delta:
+            return self._scroll_units(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_configure(self, event: tk.Event) -> None:
+        # La fila de encabezados ocupa aproximadamente una fila
+        rows = max(1, (event.height - self._row_height) // self._row_height)
+        if rows != self._visible_rows or not self._window_keys:
+            self._visible_rows = rows
+            self._render()
+
+    def _on_tree_select(self, event: tk.Event) -> None:
+        selected = self.tree.selection()
+        if selected and selected[0].startswith(_PLACEHOLDER):
+            # Una fila que aún se está leyendo no se puede seleccionar
+            self.tree.selection_remove(selected)
+            return
+        if selected:
+            new = selected[0]
+        elif self._selected in self._window_keys and self.tree.exists(self._selected):
+            # El usuario quitó la selección de una fila visible
+            new = None
+        else:
+            # La fila seleccionada salió de la ventana al redibujar
+            return
+        if new != self._selected:
+            self._selected = new
+            self._notify_select(event)
+
+    def _notify_select(self, event: Optional[tk.Event] = None) -> None:
+        for callback in list(self._select_callbacks):
+            callback(event)
+
+    def _move_selection(self, delta: int) -> str:
+        if self._selected is None:
+            return self._move_selection_to(self._offset)
+        if self._selected in self._window_keys:
+            position = self._offset + self._window_keys.index(self._selected)
+        else:
+            position = self._cache.position_of(self._selected, lookup=self._dispatcher is None)
+            if position is None:
+                position = self._offset
+        return self._move_selection_to(position + delta)
+
+    def _move_selection_to(self, position: int) -> str:
+        total = self._row_count()
+        if total <= 0:
+            return "break"
+        position = min(max(0, position), total - 1)
+        if position < self._offset:
+            self._scroll_to(position)
+        elif position >= self._offset + self._visible_rows:
+            self._scroll_to(position - self._visible_rows + 1)
+        index = position - self._offset
+        if 0 <= index < len(self._window_keys):
+            key = self._window_keys[index]
+            if key.startswith(_PLACEHOLDER):
+                return "break"
+            self.selection_set(key)
+            self.tree.focus(key)
+            self.tree.see(key)
+        return "break"
@@ -0,0 +1,170 @@
+"""
+Pestañas construidas bajo demanda para el Notebook principal.
+
+`LazyNotebook` registra cada pestaña como una fábrica y agrega al Notebook
+solo un marco vacío. La vista se construye la primera vez que se selecciona
+la pestaña (<<NotebookTabChanged>>), así que al iniciar sesión solo se crea
+la pestaña visible. Tras el primer dibujo se ejecutan en el DBExecutor las
+funciones de precarga de las pestañas aún no abiertas, para que sus datos
+compartidos (por ejemplo el índice de estudiantes) ya estén listos.
+
+Las vistas construidas se conservan entre sesiones: al cerrar sesión se
+ocultan o deshabilitan sus pestañas (`hide`, `disable`) y al iniciar otra
+se vuelven a mostrar (`show`), sin reconstruir widgets ni estilos.
+"""
+
+import time
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, List, Optional
+
+from database.executor import get_executor
+
+
+# Configuración por defecto de las pestañas diferidas
+TAB_SETTINGS = {
+    'prefetch': True,          # Precargar datos de las pestañas aún no abiertas
+    'prefetch_delay_ms': 300,  # Espera tras el primer dibujo antes de precargar
+}
+
+
+class _LazyTab:
+    def __init__(self, container: ttk.Frame, factory: Callable[[tk.Widget], tk.Widget], prefetch: Optional[Callable[[], None]]):
+        self.container = container
+        self.factory = factory
+        self.prefetch = prefetch
+        self.view: Optional[tk.Widget] = None
+
+
+class LazyNotebook:
+    """Administra las pestañas diferidas de un ttk.Notebook.
+
+    `timings` guarda en milisegundos lo que tardó cada pestaña en
+    construirse y las marcas registradas con `mark_first_paint`.
+    """
+
+    def __init__(self, notebook: ttk.Notebook):
+        self.notebook = notebook
+        self._tabs: Dict[str, _LazyTab] = {}
+        self.timings: Dict[str, float] = {}
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed, add="+")
+
+    def names(self) -> List[str]:
+        return list(self._tabs)
+
+    def add(
+        self,
+        name: str,
+        text: str,
+        factory: Callable[[tk.Widget], tk.Widget],
+        prefetch: Optional[Callable[[], None]] = None,
+    ) -> ttk.Frame:
+        """Registra una pestaña; factory(parent) crea la vista al abrirla.
+
+        Si el nombre ya estaba registrado se conserva la pestaña existente.
+        """
+        if name in self._tabs:
+            return self._tabs[name].container
+        container = ttk.Frame(self.notebook)
+        self.notebook.add(container, text=text)
+        self._tabs[name] = _LazyTab(container, factory, prefetch)
+        return container
+
+    def view(self, name: str) -> Optional[tk.Widget]:
+        """Vista ya construida de la pestaña, o None si aún no se abrió."""
+        tab = self._tabs.get(name)
+        return tab.view if tab is not None else None
+
+    def built_views(self) -> List[tk.Widget]:
+        """Vistas ya construidas, en el orden de las pestañas."""
+        return [tab.view for tab in self._tabs.values() if tab.view is not None]
+
+    def show(self, name: str) -> None:
+        """Muestra y habilita la pestaña (vuelve a su posición si estaba oculta)."""
+        tab = self._tabs.get(name)
+        if tab is not None:
+            self.notebook.add(tab.container)
+            self.notebook.tab(tab.container, state="normal")
+
+    def hide(self, name: str) -> None:
+        tab = self._tabs.get(name)
+        if tab is not None:
+            self.notebook.hide(tab.container)
+
+    def disable(self, name: str) -> None:
+        """Deshabilita la pestaña si está visible (una oculta sigue oculta)."""
+        tab = self._tabs.get(name)
+        if tab is not None and self.notebook.tab(tab.container, "state") != "hidden":
+            self.notebook.tab(tab.container, state="disabled")
+
+    def is_visible(self, name: str) -> bool:
+        tab = self._tabs.get(name)
+        return tab is not None and self.notebook.tab(tab.container, "state") != "hidden"
+
+    def ensure_built(self, name: str) -> Optional[tk.Widget]:
+        """Construye la vista de la pestaña si todavía no existe."""
+        tab = self._tabs.get(name)
+        if tab is None:
+            return None
+        if tab.view is None:
+            start = time.perf_counter()
+            tab.view = tab.factory(tab.container)
+            tab.view.pack(fill=tk.BOTH, expand=True)
+            self.timings[name] = (time.perf_counter() - start) * 1000
+        return tab.view
+
+    def select(self, name: str) -> None:
+        """Selecciona la pestaña construyéndola en el acto."""
+        tab = self._tabs.get(name)
+        if tab is None:
+            return
+        self.ensure_built(name)
+        self.notebook.select(tab.container)
+
+    def remove_all(self) -> None:
+        """Quita y destruye todas las pestañas diferidas."""
+        for tab in self._tabs.values():
+            try:
+                self.notebook.forget(tab.container)
+            except tk.TclError:
+                pass
+            tab.container.destroy()
+        self._tabs.clear()
+
+    def mark_first_paint(self, label: str, started: float) -> None:
+        """Registra en timings[label] los ms desde started hasta el primer dibujo.
+
+        started es un valor de time.perf_counter(). Después se programa la
+        precarga de las pestañas no abiertas.
+        """
+        def medir() -> None:
+            try:
+                # Completa geometría y dibujo pendientes antes de medir
+                self.notebook.update_idletasks()
+            except tk.TclError:
+                return
+            self.timings[label] = (time.perf_counter() - started) * 1000
+            self.schedule_prefetch()
+
+        self.notebook.after_idle(medir)
+
+    def schedule_prefetch(self) -> None:
+        """Ejecuta en segundo plano la precarga de las pestañas visibles no construidas."""
+        if not TAB_SETTINGS['prefetch']:
+            return
+        self.notebook.after(TAB_SETTINGS['prefetch_delay_ms'], self._prefetch)
+
+    def _prefetch(self) -> None:
+        for name, tab in self._tabs.items():
+            if tab.view is None and tab.prefetch is not None and self.is_visible(name):
+                get_executor().submit(tab.prefetch)
+
+    def _on_tab_changed(self, event: tk.Event) -> None:
+        try:
+            current = self.notebook.select()
+        except tk.TclError:
+            return
+        for name, tab in self._tabs.items():
+            if str(tab.container) == current:
+                self.ensure_built(name)
+                break
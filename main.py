@@ -1,9 +1,32 @@
-import tkinter as tk
-from tkinter import ttk
+import argparse
+import os
+import sys
+import time
+
+from startup_profile import StartupProfiler
+
+# Perfil del arranque: se crea antes de los imports para poder medirlos
+startup_profiler = StartupProfiler()
+
+with startup_profiler.importing("tkinter"):
+    import tkinter as tk
+    from tkinter import ttk
+
+with startup_profiler.importing("lazy_tabs"):
+    from lazy_tabs import LazyNotebook
+
+# Capa de datos remota (python -m servicio.servidor en otra máquina): las
+# funciones de datos se reemplazan antes de que las vistas las importen
+SERVIDOR_DATOS = os.environ.get("ACADEMIA_SERVIDOR")
+if SERVIDOR_DATOS:
+    with startup_profiler.importing("servicio.cliente"):
+        from servicio.cliente import instalar_remoto
+    instalar_remoto(SERVIDOR_DATOS, os.environ.get("ACADEMIA_TOKEN"))
 
 # Importa Login
 try:
-    from login.login import create_login_frame
+    with startup_profiler.importing("login.login"):
+        from login.login import create_login_frame
 except Exception as exc:
     def create_login_frame(parent: tk.Widget, on_success):  # type: ignore
         frame = ttk.Frame(parent)
@@ -12,7 +35,8 @@ except Exception as exc:
 
 # Importa el módulo principal de la sección Ingresos
 try:
-    from ingresos.ingresos import create_ingresos_tab
+    with startup_profiler.importing("ingresos.ingresos"):
+        from ingresos.ingresos import create_ingresos_tab
 except Exception as exc:
     # Fallback temporal si el módulo aún no existe
     def create_ingresos_tab(parent: tk.Widget) -> tk.Widget:
@@ -22,7 +46,8 @@ except Exception as exc:
 
 # Importa el módulo de gestión de usuarios
 try:
-    from usuarios.registro_usuarios import create_usuarios_tab
+    with startup_profiler.importing("usuarios.registro_usuarios"):
+        from usuarios.registro_usuarios import create_usuarios_tab
 except Exception as exc:
     # Fallback temporal si el módulo aún no existe
     def create_usuarios_tab(parent: tk.Widget, on_logout_callback=None) -> tk.Widget:
@@ -32,14 +57,26 @@ except Exception as exc:
 
 # Importa el sistema de permisos
 try:
-    from permissions import (
-        has_tab_permission, 
-        get_accessible_tabs, 
-        get_user_role,
-        is_admin
-    )
+    with startup_profiler.importing("permissions"):
+        from permissions import (
+            has_tab_permission, 
+            get_accessible_tabs, 
+            get_user_role,
+            is_admin,
+            load_permission_set,
+            invalidate_permissions,
+        )
 except Exception as exc:
     # Fallback temporal si el módulo aún no existe
+    class _AllowAllPermissions:
+        def has_tab(self, tab_name: str) -> bool:
+            return True
+        def has_action(self, action: str) -> bool:
+            return True
+    def load_permission_set(usuario_id: int, db_path: str = "academia.db", refresh: bool = False) -> _AllowAllPermissions:
+        return _AllowAllPermissions()
+    def invalidate_permissions(usuario_id: int | None = None, db_path: str | None = None) -> None:
+        pass
     def has_tab_permission(usuario_id: int, tab_name: str, db_path: str = "academia.db") -> bool:
         return True  # Permitir todo por defecto
     def get_accessible_tabs(usuario_id: int, db_path: str = "academia.db") -> list:
@@ -51,26 +88,33 @@ except Exception as exc:
 
 # Importa el módulo de consultas
 try:
-    from consultas.consultas import create_consultas_tab
+    with startup_profiler.importing("consultas.consultas"):
+        from consultas.consultas import create_consultas_tab, prefetch_consultas_data
 except Exception as exc:
     # Fallback temporal si el módulo aún no existe
     def create_consultas_tab(parent: tk.Widget, on_logout_callback=None) -> tk.Widget:
         frame = ttk.Frame(parent)
         ttk.Label(frame, text=f"Error cargando Consultas: {exc}").pack(padx=12, pady=12)
         return frame
+    def prefetch_consultas_data(db_path: str = "academia.db") -> None:
+        pass
 
+# Importa las migraciones de esquema y la búsqueda de texto completo
+try:
+    with startup_profiler.importing("database.migrations"):
+        from database.migrations import apply_migrations
+    with startup_profiler.importing("database.fts"):
+        from database.fts import enable_student_fts
+except Exception as exc:
+    # Fallback: continuar sin migraciones si el módulo no está disponible
+    def apply_migrations(db_path: str = "academia.db") -> int:
+        return 0
+    def enable_student_fts(db_path: str = "academia.db") -> bool:
+        return False
 
-def create_main_window() -> tk.Tk:
-    root = tk.Tk()
-    root.title("Gestión de Pagos y Notas")
-    
-    # Configurar DPI awareness para Windows
-    try:
-        from ctypes import windll
-        windll.shcore.SetProcessDpiAwareness(1)
-    except:
-        pass
-    
+
+def configure_styles() -> ttk.Style:
+    """Configura los estilos ttk de la aplicación (tema clam y paleta institucional)."""
     # Configurar colores del sistema con paleta educativa profesional
     style = ttk.Style()
     
@@ -302,6 +346,24 @@ def create_main_window() -> tk.Tk:
                    darkcolor=LIGHT_GRAY,
                    lightcolor=LIGHT_GRAY)
     
+    return style
+
+
+def create_main_window() -> tk.Tk:
+    with startup_profiler.phase("ventana"):
+        root = tk.Tk()
+        root.title("Gestión de Pagos y Notas")
+    
+        # Configurar DPI awareness para Windows
+        try:
+            from ctypes import windll
+            windll.shcore.SetProcessDpiAwareness(1)
+        except:
+            pass
+    
+    with startup_profiler.phase("estilos"):
+        configure_styles()
+    
     # Maximiza/ajusta a pantalla disponible
     try:
         root.state("zoomed")  # Windows
@@ -319,27 +381,41 @@ def create_main_window() -> tk.Tk:
     notebook = ttk.Notebook(root)
     notebook.pack(fill=tk.BOTH, expand=True)
 
+    # Administra las pestañas de sección (construcción diferida y reutilización)
+    tabs = LazyNotebook(notebook)
+    root.lazy_tabs = tabs
+
     # Variables para controlar el estado de las pestañas
     login_tab_index = 0
-    ingresos_tab_index = 1
-    usuarios_tab_index = 2
-    consultas_tab_index = 3
     current_usuario_id = None
+    current_permisos = None
+
+    def con_sesion(view: tk.Widget) -> tk.Widget:
+        """Asocia una vista a la sesión actual (si la vista lo admite)."""
+        attach_user = getattr(view, "attach_user", None)
+        if attach_user is not None and current_usuario_id is not None:
+            attach_user(current_usuario_id, current_permisos)
+        return view
 
     def on_logout_callback() -> None:
-        nonlocal current_usuario_id
+        nonlocal current_usuario_id, current_permisos
         
-        # Limpiar usuario actual
+        # Limpiar usuario actual y sus permisos en caché
+        if current_usuario_id is not None:
+            invalidate_permissions(current_usuario_id, "academia.db")
         current_usuario_id = None
+        current_permisos = None
+        
+        # Las vistas se conservan para la próxima sesión; solo se limpian
+        for view in tabs.built_views():
+            detach_user = getattr(view, "detach_user", None)
+            if detach_user is not None:
+                detach_user()
         
         # Habilitar pestaña de login y deshabilitar otras
         notebook.tab(login_tab_index, state="normal")
-        if len(notebook.tabs()) > ingresos_tab_index:
-            notebook.tab(ingresos_tab_index, state="disabled")
-        if len(notebook.tabs()) > usuarios_tab_index:
-            notebook.tab(usuarios_tab_index, state="disabled")
-        if len(notebook.tabs()) > consultas_tab_index:
-            notebook.tab(consultas_tab_index, state="disabled")
+        for name in tabs.names():
+            tabs.disable(name)
         
         # Cambiar a la pestaña de login
         notebook.select(login_tab_index)
@@ -350,68 +426,120 @@ def create_main_window() -> tk.Tk:
             login_frame._clear_fields()
 
     def on_login_success(usuario_id: int) -> None:
-        nonlocal current_usuario_id
+        nonlocal current_usuario_id, current_permisos
+        login_started = time.perf_counter()
         
         # Guardar el usuario actual
         current_usuario_id = usuario_id
         
-        # Obtener rol del usuario
-        user_role = get_user_role(usuario_id, "academia.db")
-        
-        # Eliminar todas las pestañas excepto la de login
-        tabs_to_remove = []
-        for i in range(len(notebook.tabs())):
-            if i != login_tab_index:  # No eliminar la pestaña de login
-                tabs_to_remove.append(i)
+        # Cargar todos los permisos del usuario en una sola consulta
+        current_permisos = load_permission_set(usuario_id, "academia.db", refresh=True)
         
-        # Eliminar pestañas en orden inverso para evitar problemas de índices
-        for i in reversed(tabs_to_remove):
-            notebook.forget(i)
-        
-        # Crear pestañas según permisos del usuario actual
-        current_tab_index = 1  # Empezar después de la pestaña de login
-        
-        # Crear pestaña de ingresos solo si tiene permiso
-        if has_tab_permission(usuario_id, "ingresos", "academia.db"):
-            ingresos_tab = create_ingresos_tab(notebook, usuario_id, on_logout_callback)
-            notebook.add(ingresos_tab, text="Ingresos")
-            current_tab_index += 1
-        
-        # Crear pestaña de consultas solo si tiene permiso
-        if has_tab_permission(usuario_id, "consultas", "academia.db"):
-            consultas_tab = create_consultas_tab(notebook, on_logout_callback)
-            notebook.add(consultas_tab, text="Consultas")
-            current_tab_index += 1
-        
-        # Crear pestaña de usuarios solo si tiene permiso
-        if has_tab_permission(usuario_id, "registro_usuarios", "academia.db"):
-            usuarios_tab = create_usuarios_tab(notebook, on_logout_callback)
-            notebook.add(usuarios_tab, text="Usuarios")
-            current_tab_index += 1
+        # Mostrar solo las pestañas permitidas; las vistas ya construidas se
+        # reutilizan con la nueva sesión y las demás se crean al abrirlas
+        visibles = []
+        for name in tabs.names():
+            if current_permisos.has_tab(name):
+                tabs.show(name)
+                visibles.append(name)
+                view = tabs.view(name)
+                if view is not None:
+                    con_sesion(view)
+            else:
+                tabs.hide(name)
         
         # Deshabilitar pestaña de login
         notebook.tab(login_tab_index, state="disabled")
         
-        # Habilitar todas las pestañas creadas (ya están habilitadas por defecto)
-        for i in range(1, len(notebook.tabs())):
-            notebook.tab(i, state="normal")
-        
-        # Cambiar a la primera pestaña disponible (la primera después del login)
-        if len(notebook.tabs()) > 1:
-            notebook.select(1)  # Seleccionar la primera pestaña después del login
+        # Abrir la primera pestaña disponible
+        if visibles:
+            tabs.select(visibles[0])
+            tabs.mark_first_paint("login_a_pantalla", login_started)
 
     # Crear pestaña de login
-    login_frame = create_login_frame(notebook, on_login_success)
-    notebook.add(login_frame, text="Login")
+    with startup_profiler.phase("login"):
+        login_frame = create_login_frame(notebook, on_login_success)
+        notebook.add(login_frame, text="Login")
+
+    # Las pestañas de cada sección se registran una sola vez, ocultas hasta
+    # iniciar sesión; sus vistas se construyen al abrirse por primera vez
+    tabs.add("ingresos", "Ingresos",
+             lambda parent: con_sesion(create_ingresos_tab(parent, current_usuario_id, on_logout_callback)))
+    tabs.add("consultas", "Consultas",
+             lambda parent: con_sesion(create_consultas_tab(parent, on_logout_callback)),
+             prefetch=lambda: prefetch_consultas_data("academia.db"))
+    tabs.add("registro_usuarios", "Usuarios",
+             lambda parent: con_sesion(create_usuarios_tab(parent, on_logout_callback)))
+    for name in tabs.names():
+        tabs.hide(name)
     
     # Inicialmente solo habilitar la pestaña de login
     notebook.select(login_tab_index)
 
+    # Diagnóstico de consultas, solo para administradores
+    diagnostico = None
+
+    def on_diagnostico(event: tk.Event | None = None) -> None:
+        nonlocal diagnostico
+        if current_usuario_id is None or not is_admin(current_usuario_id, "academia.db"):
+            return
+        if diagnostico is not None and diagnostico.winfo_exists():
+            diagnostico.lift()
+            return
+        from diagnostico import DiagnosticoDialog
+        diagnostico = DiagnosticoDialog(root)
+
+    root.bind_all("<Control-Shift-D>", on_diagnostico)
+
+    # Puntos de entrada de la sesión (los usa benchmarks/bench_login_cycles.py)
+    root.iniciar_sesion = on_login_success
+    root.cerrar_sesion = on_logout_callback
+
     return root
 
 
-def main() -> None:
-    root = create_main_window()
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Gestión de Pagos y Notas")
+    parser.add_argument("--profile-startup", nargs="?", const="-", metavar="ARCHIVO",
+                        help="Informe de tiempos del arranque (en pantalla o como JSON en ARCHIVO)")
+    parser.add_argument("--exit-after-paint", action="store_true",
+                        help="Cerrar tras el primer dibujo (para benchmarks/bench_startup.py)")
+    parser.add_argument("--instrumentar", action="store_true",
+                        help="Registrar tiempos y consultas lentas de la capa de datos (panel con Ctrl+Shift+D)")
+    args = parser.parse_args(argv)
+
+    if args.instrumentar:
+        from database.instrumentation import configure_instrumentation
+        configure_instrumentation(enabled=True)
+
+    # Con servidor de datos, migraciones y FTS las aplica el servidor
+    if not SERVIDOR_DATOS:
+        # Aplicar índices y cambios de esquema pendientes antes de abrir la UI
+        with startup_profiler.phase("migraciones"):
+            apply_migrations("academia.db")
+        # Búsqueda FTS5 de estudiantes (si SQLite no la soporta se usa LIKE)
+        with startup_profiler.phase("fts"):
+            enable_student_fts("academia.db")
+    try:
+        root = create_main_window()
+    except tk.TclError as exc:
+        if not args.profile_startup:
+            raise
+        # Sin pantalla: el informe conserva imports y fases ya medidos
+        startup_profiler.fail(str(exc))
+        startup_profiler.write_report(args.profile_startup)
+        sys.exit(1)
+
+    def primer_dibujo() -> None:
+        # Completa geometría y dibujo pendientes antes de medir
+        root.update_idletasks()
+        startup_profiler.mark("primer_dibujo")
+        if args.profile_startup:
+            startup_profiler.write_report(args.profile_startup)
+        if args.exit_after_paint:
+            root.destroy()
+
+    root.after_idle(primer_dibujo)
     root.mainloop()
 
 
@@ -2,11 +2,14 @@
 Sistema de permisos para la aplicación Academia.
 
 Define los permisos por rol y funciones para verificar acceso basado en la tabla permiso_rol.
+Los permisos de cada usuario se cargan con una sola consulta en un PermissionSet
+que se guarda en caché hasta que se invalida explícitamente (login o cambios de rol).
 """
 
-from typing import Dict, List, Set
-import sqlite3
-from pathlib import Path
+import threading
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from database.pool import get_connection
 
 
 # Mapeo de permisos a pestañas (basado en la funcionalidad)
@@ -30,6 +33,108 @@ PERMISSION_TO_TAB_MAPPING = {
 }
 
 
+class PermissionSet:
+    """Permisos de un usuario cargados en memoria.
+
+    Las verificaciones `has_tab` y `has_action` son búsquedas en conjuntos,
+    sin acceso a la base de datos.
+    """
+
+    __slots__ = ("usuario_id", "role", "actions", "tabs")
+
+    def __init__(self, usuario_id: int, role: Optional[str] = None, actions: FrozenSet[str] = frozenset()):
+        self.usuario_id = usuario_id
+        self.role = role
+        self.actions = frozenset(actions)
+        self.tabs = frozenset(
+            PERMISSION_TO_TAB_MAPPING[action] for action in self.actions if action in PERMISSION_TO_TAB_MAPPING
+        )
+
+    def has_tab(self, tab_name: str) -> bool:
+        return tab_name in self.tabs
+
+    def has_action(self, action: str) -> bool:
+        return action in self.actions
+
+    def __repr__(self) -> str:
+        return f"PermissionSet(usuario_id={self.usuario_id!r}, role={self.role!r}, actions={len(self.actions)})"
+
+
+_permission_cache: Dict[Tuple[str, int], PermissionSet] = {}
+_permission_lock = threading.Lock()
+
+
+def _query_permission_set(usuario_id: int, db_path: str) -> Optional[PermissionSet]:
+    """Carga rol y permisos del usuario en una sola consulta. None si falla."""
+    try:
+        with get_connection(db_path) as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT r.nombre_rol, p.nombre_permiso
+                FROM usuario_rol ur
+                JOIN rol r ON ur.rol_id = r.rol_id
+                LEFT JOIN permiso_rol pr ON r.rol_id = pr.rol_id
+                LEFT JOIN permiso p ON pr.permiso_id = p.permiso_id
+                WHERE ur.usuario_id = ?
+                ORDER BY ur.usuario_rol_id;
+            """, (usuario_id,))
+            role = None
+            actions: Set[str] = set()
+            for nombre_rol, nombre_permiso in cur.fetchall():
+                if role is None:
+                    role = nombre_rol
+                if nombre_permiso is not None:
+                    actions.add(nombre_permiso)
+            return PermissionSet(usuario_id, role, frozenset(actions))
+    except Exception:
+        return None
+
+
+def load_permission_set(usuario_id: int, db_path: str = "academia.db", refresh: bool = False) -> PermissionSet:
+    """
+    Obtiene el PermissionSet de un usuario, consultando la base solo si no está en caché.
+    
+    Args:
+        usuario_id: ID del usuario
+        db_path: Ruta a la base de datos
+        refresh: Si es True, descarta la copia en caché y vuelve a consultar
+        
+    Returns:
+        PermissionSet del usuario (vacío si no se pudo cargar)
+    """
+    key = (str(db_path), usuario_id)
+    if not refresh:
+        cached = _permission_cache.get(key)
+        if cached is not None:
+            return cached
+
+    permission_set = _query_permission_set(usuario_id, db_path)
+    if permission_set is None:
+        # No guardar fallos en caché para reintentar en la próxima verificación
+        return PermissionSet(usuario_id)
+    with _permission_lock:
+        _permission_cache[key] = permission_set
+    return permission_set
+
+
+def invalidate_permissions(usuario_id: Optional[int] = None, db_path: Optional[str] = None) -> None:
+    """
+    Descarta permisos en caché.
+    
+    Args:
+        usuario_id: Usuario a invalidar; None invalida todos los usuarios
+        db_path: Base de datos a invalidar; None invalida todas
+    """
+    with _permission_lock:
+        for key in list(_permission_cache):
+            cached_db, cached_usuario = key
+            if usuario_id is not None and cached_usuario != usuario_id:
+                continue
+            if db_path is not None and cached_db != str(db_path):
+                continue
+            del _permission_cache[key]
+
+
 def get_user_role(usuario_id: int, db_path: str = "academia.db") -> str | None:
     """
     Obtiene el rol de un usuario por su ID.
@@ -41,28 +146,7 @@ def get_user_role(usuario_id: int, db_path: str = "academia.db") -> str | None:
     Returns:
         Nombre del rol o None si no se encuentra
     """
-    try:
-        if not Path(db_path).exists():
-            return None
-            
-        conn = sqlite3.connect(db_path)
-        try:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT r.nombre_rol
-                FROM usuario u
-                JOIN usuario_rol ur ON u.usuario_id = ur.usuario_id
-                JOIN rol r ON ur.rol_id = r.rol_id
-                WHERE u.usuario_id = ?;
-            """, (usuario_id,))
-            
-            result = cur.fetchone()
-            return result[0] if result else None
-            
-        finally:
-            conn.close()
-    except Exception:
-        return None
+    return load_permission_set(usuario_id, db_path).role
 
 
 def has_tab_permission(usuario_id: int, tab_name: str, db_path: str = "academia.db") -> bool:
@@ -77,40 +161,7 @@ def has_tab_permission(usuario_id: int, tab_name: str, db_path: str = "academia.
     Returns:
         True si tiene permiso, False en caso contrario
     """
-    try:
-        if not Path(db_path).exists():
-            return False
-            
-        conn = sqlite3.connect(db_path)
-        try:
-            cur = conn.cursor()
-            # Buscar si el usuario tiene algún permiso que mapee a la pestaña solicitada
-            cur.execute("""
-                SELECT COUNT(*) 
-                FROM usuario u
-                JOIN usuario_rol ur ON u.usuario_id = ur.usuario_id
-                JOIN rol r ON ur.rol_id = r.rol_id
-                JOIN permiso_rol pr ON r.rol_id = pr.rol_id
-                JOIN permiso p ON pr.permiso_id = p.permiso_id
-                WHERE u.usuario_id = ? AND ? IN (
-                    SELECT DISTINCT tab_name 
-                    FROM (
-                        SELECT 'registro_usuarios' as tab_name WHERE p.nombre_permiso IN ('Crear Usuarios', 'Eliminar Usuarios', 'Modificar Usuarios', 'Consultar Usuarios')
-                        UNION
-                        SELECT 'ingresos' as tab_name WHERE p.nombre_permiso IN ('Registrar Estudiantes', 'Eliminar Estudiantes', 'Modificar Estudiantes', 'Registrar Notas', 'Eliminar Notas', 'Modificar Notas', 'Registrar Pagos', 'Modificar Pagos', 'Eliminar Pagos')
-                        UNION
-                        SELECT 'consultas' as tab_name WHERE p.nombre_permiso IN ('Consultar Estudiantes', 'Consultar Notas', 'Consultar Pagos')
-                    )
-                );
-            """, (usuario_id, tab_name))
-            
-            result = cur.fetchone()
-            return result[0] > 0 if result else False
-            
-        finally:
-            conn.close()
-    except Exception:
-        return False
+    return load_permission_set(usuario_id, db_path).has_tab(tab_name)
 
 
 def has_action_permission(usuario_id: int, action: str, db_path: str = "academia.db") -> bool:
@@ -125,30 +176,7 @@ def has_action_permission(usuario_id: int, action: str, db_path: str = "academia
     Returns:
         True si tiene permiso, False en caso contrario
     """
-    try:
-        if not Path(db_path).exists():
-            return False
-            
-        conn = sqlite3.connect(db_path)
-        try:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT COUNT(*) 
-                FROM usuario u
-                JOIN usuario_rol ur ON u.usuario_id = ur.usuario_id
-                JOIN rol r ON ur.rol_id = r.rol_id
-                JOIN permiso_rol pr ON r.rol_id = pr.rol_id
-                JOIN permiso p ON pr.permiso_id = p.permiso_id
-                WHERE u.usuario_id = ? AND p.nombre_permiso = ?;
-            """, (usuario_id, action))
-            
-            result = cur.fetchone()
-            return result[0] > 0 if result else False
-            
-        finally:
-            conn.close()
-    except Exception:
-        return False
+    return load_permission_set(usuario_id, db_path).has_action(action)
 
 
 def get_user_permissions(usuario_id: int, db_path: str = "academia.db") -> Dict[str, any]:
@@ -162,42 +190,11 @@ def get_user_permissions(usuario_id: int, db_path: str = "academia.db") -> Dict[
     Returns:
         Diccionario con los permisos del usuario
     """
-    try:
-        if not Path(db_path).exists():
-            return {"tabs": [], "actions": []}
-            
-        conn = sqlite3.connect(db_path)
-        try:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT p.nombre_permiso
-                FROM usuario u
-                JOIN usuario_rol ur ON u.usuario_id = ur.usuario_id
-                JOIN rol r ON ur.rol_id = r.rol_id
-                JOIN permiso_rol pr ON r.rol_id = pr.rol_id
-                JOIN permiso p ON pr.permiso_id = p.permiso_id
-                WHERE u.usuario_id = ?
-                ORDER BY p.nombre_permiso;
-            """, (usuario_id,))
-            
-            permissions = [row[0] for row in cur.fetchall()]
-            
-            # Mapear permisos a pestañas
-            tabs = set()
-            for permission in permissions:
-                if permission in PERMISSION_TO_TAB_MAPPING:
-                    tabs.add(PERMISSION_TO_TAB_MAPPING[permission])
-            
-            return {
-                "tabs": list(tabs),
-                "actions": permissions
-            }
-            
-        finally:
-            conn.close()
-    except Exception:
-        return {"tabs": [], "actions": []}
-
+    permission_set = load_permission_set(usuario_id, db_path)
+    return {
+        "tabs": list(permission_set.tabs),
+        "actions": sorted(permission_set.actions)
+    }
 
 def get_accessible_tabs(usuario_id: int, db_path: str = "academia.db") -> List[str]:
     """
@@ -0,0 +1 @@
+# Modo servicio: capa de datos por HTTP/JSON y cliente remoto
@@ -0,0 +1,278 @@
+"""
+Cliente del servidor de datos (servicio.servidor).
+
+`ClienteAcademia` envía las operaciones por HTTP/JSON reutilizando una
+conexión por hilo. `instalar_remoto` reemplaza las funciones de los
+módulos *_db y de permissions por versiones remotas con la misma firma, y
+hace que create_ingresos_repository use `RemoteIngresosRepository`: las
+vistas de Tk funcionan sin cambios contra una base en otra máquina.
+
+Debe llamarse antes de importar las vistas, que importan las funciones por
+nombre (main.py lo hace si está definida la variable ACADEMIA_SERVIDOR).
+El argumento db_path de las funciones remotas se ignora: el servidor
+decide la base. Los errores de red se registran y la función retorna lo
+mismo que la original cuando falla la base ([], None, False...). Las
+funciones que el servidor no publica (gestión de usuarios) retornan ese
+mismo valor de error sin tocar ninguna base local.
+"""
+
+import functools
+import http.client
+import inspect
+import json
+import logging
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from database.changes import mark_changed
+from ingresos.ingresos_db import INGRESOS_SETTINGS, IngresosRepository
+from servicio.protocolo import (
+    REPOSITORIO,
+    desde_json,
+    SUSTITUTOS,
+    metodo_repositorio,
+    no_publicadas,
+    operaciones,
+    parametros,
+    tipo_retorno,
+    valor_en_error,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Errores que indican que el servidor cerró una conexión reutilizada
+_CONEXION_VENCIDA = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+class ErrorRemoto(Exception):
+    """El servidor respondió con un error o no se pudo contactar."""
+
+    def __init__(self, mensaje: str, estado: Optional[int] = None):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class ClienteAcademia:
+    """Conexión keep-alive (una por hilo) a un servidor de datos."""
+
+    def __init__(self, url: str, token: Optional[str] = None, timeout: float = 10.0):
+        partes = urlsplit(url if "://" in url else f"http://{url}")
+        if partes.scheme != "http" or not partes.hostname:
+            raise ValueError(f"URL de servidor inválida: {url}")
+        self.url = f"http://{partes.netloc}"
+        self.host = partes.hostname
+        self.puerto = partes.port or 80
+        self.timeout = timeout
+        self._encabezados = {"Content-Type": "application/json"}
+        if token:
+            self._encabezados["Authorization"] = f"Bearer {token}"
+        self._local = threading.local()
+
+    def _conexion(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """Conexión del hilo actual y si ya se usó antes (puede estar vencida)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn, True
+        conn = http.client.HTTPConnection(self.host, self.puerto, timeout=self.timeout)
+        self._local.conn = conn
+        return conn, False
+
+    def cerrar(self) -> None:
+        """Cierra la conexión del hilo actual."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def pedir(self, metodo: str, ruta: str, cuerpo: Optional[dict] = None) -> dict:
+        """Envía una petición y retorna la respuesta JSON; lanza ErrorRemoto si falla."""
+        datos = None if cuerpo is None else json.dumps(cuerpo).encode("utf-8")
+        for intento in (1, 2):
+            conn, reutilizada = self._conexion()
+            try:
+                conn.request(metodo, ruta, body=datos, headers=self._encabezados)
+                respuesta = conn.getresponse()
+                contenido = respuesta.read()
+            except _CONEXION_VENCIDA as exc:
+                self.cerrar()
+                # Solo se reintenta si el servidor cerró una conexión inactiva
+                if reutilizada and intento == 1:
+                    continue
+                raise ErrorRemoto(f"Sin respuesta de {self.url}: {exc}") from exc
+            except (OSError, http.client.HTTPException) as exc:
+                self.cerrar()
+                raise ErrorRemoto(f"No se pudo contactar {self.url}: {exc}") from exc
+            if respuesta.will_close:
+                self.cerrar()
+            try:
+                resultado = json.loads(contenido)
+            except ValueError as exc:
+                raise ErrorRemoto(f"Respuesta inválida de {self.url}{ruta}", respuesta.status) from exc
+            if respuesta.status != 200:
+                raise ErrorRemoto(resultado.get("error", f"HTTP {respuesta.status}"), respuesta.status)
+            return resultado
+        raise AssertionError("inalcanzable")
+
+    def llamar(self, modulo: str, nombre: str, argumentos: Dict[str, Any]) -> Tuple[Any, List[str]]:
+        """Ejecuta /api/<modulo>/<nombre>; retorna (resultado JSON, tablas modificadas)."""
+        respuesta = self.pedir("POST", f"/api/{modulo}/{nombre}", argumentos)
+        return respuesta.get("resultado"), respuesta.get("cambios", [])
+
+    def salud(self) -> dict:
+        return self.pedir("GET", "/salud")["resultado"]
+
+
+def _funcion_remota(cliente: ClienteAcademia, modulo: str, func: Callable, nombre: Optional[str] = None) -> Callable:
+    """Versión remota de una función de datos, con su firma y su valor de error.
+
+    `nombre` es la operación del servidor que la atiende (por defecto la del
+    mismo nombre).
+    """
+    tipo = tipo_retorno(func)
+    firma = inspect.signature(func)
+    en_error = valor_en_error(tipo)
+    nombre = nombre or func.__name__
+
+    @functools.wraps(func)
+    def remota(*args, **kwargs):
+        llamada = firma.bind(*args, **kwargs)
+        argumentos = dict(llamada.arguments)
+        db_path = argumentos.pop("db_path", "academia.db")
+        try:
+            resultado, cambios = cliente.llamar(modulo, nombre, argumentos)
+        except ErrorRemoto as exc:
+            logger.warning("%s.%s falló en el servidor: %s", modulo, nombre, exc)
+            return en_error
+        if cambios:
+            mark_changed(db_path, *cambios)
+        return desde_json(resultado, tipo)
+
+    return remota
+
+
+def _funcion_no_disponible(modulo: str, func: Callable) -> Callable:
+    """Reemplazo de una función que el servidor no publica: falla sin tocar la base local."""
+    en_error = valor_en_error(tipo_retorno(func))
+
+    @functools.wraps(func)
+    def no_disponible(*args, **kwargs):
+        logger.warning("%s.%s no está disponible en modo remoto", modulo, func.__name__)
+        return en_error
+
+    return no_disponible
+
+
+class RemoteIngresosRepository(IngresosRepository):
+    """IngresosRepository cuyas operaciones atiende el servidor."""
+
+    def __init__(self, cliente: ClienteAcademia, db_path: str = "academia.db"):
+        self.cliente = cliente
+        self.db_path = db_path
+
+    def _llamar(self, nombre: str, *args, **kwargs):
+        metodo = metodo_repositorio(nombre)
+        tipo = tipo_retorno(metodo)
+        argumentos = dict(zip(parametros(metodo), args))
+        argumentos.update(kwargs)
+        try:
+            resultado, cambios = self.cliente.llamar(REPOSITORIO, nombre, argumentos)
+        except ErrorRemoto as exc:
+            logger.warning("repositorio.%s falló en el servidor: %s", nombre, exc)
+            return valor_en_error(tipo)
+        if cambios:
+            mark_changed(self.db_path, *cambios)
+        return desde_json(resultado, tipo)
+
+    def listar(self):
+        return self._llamar("listar")
+
+    def obtener(self, ingreso_id):
+        return self._llamar("obtener", ingreso_id)
+
+    def buscar(self, texto):
+        return self._llamar("buscar", texto)
+
+    def entre_fechas(self, desde, hasta):
+        return self._llamar("entre_fechas", desde, hasta)
+
+    def agregar(self, concepto_pago_id, estudiante_id, usuario_id, monto, fecha=None):
+        return self._llamar("agregar", concepto_pago_id, estudiante_id, usuario_id, monto, fecha)
+
+    def agregar_lote(self, concepto_pago_id, estudiante_ids, usuario_id, monto, fecha=None):
+        return self._llamar("agregar_lote", concepto_pago_id, list(estudiante_ids), usuario_id, monto, fecha)
+
+    def actualizar(self, ingreso_id, concepto_pago_id, estudiante_id, usuario_id, monto):
+        return self._llamar("actualizar", ingreso_id, concepto_pago_id, estudiante_id, usuario_id, monto)
+
+    def eliminar(self, ingreso_id):
+        return self._llamar("eliminar", ingreso_id)
+
+    def contar(self, search_text="", estudiante_ids=None):
+        return self._llamar("contar", search_text, _lista(estudiante_ids))
+
+    def pagina(self, after_id, limit, search_text="", estudiante_ids=None):
+        return self._llamar("pagina", after_id, limit, search_text, _lista(estudiante_ids))
+
+    def id_en(self, offset, search_text="", estudiante_ids=None):
+        return self._llamar("id_en", offset, search_text, _lista(estudiante_ids))
+
+    def posicion(self, ingreso_id, search_text="", estudiante_ids=None):
+        return self._llamar("posicion", ingreso_id, search_text, _lista(estudiante_ids))
+
+    # El servidor mantiene sus propios índices de nombres
+    def estudiante_guardado(self, estudiante_id, nombre_completo):
+        pass
+
+    def estudiante_eliminado(self, estudiante_id):
+        pass
+
+
+def _lista(valores: Optional[Iterable[int]]) -> Optional[List[int]]:
+    return None if valores is None else list(valores)
+
+
+_cliente: Optional[ClienteAcademia] = None
+
+
+def cliente_instalado() -> Optional[ClienteAcademia]:
+    """Cliente activo desde instalar_remoto (None si se usa la base local)."""
+    return _cliente
+
+
+def instalar_remoto(url: str, token: Optional[str] = None, timeout: float = 10.0) -> ClienteAcademia:
+    """Hace que las funciones de datos de este proceso se ejecuten en el servidor.
+
+    Reemplaza las funciones en sus módulos y en los módulos ya importados
+    que las importaron por nombre (por ejemplo consultas.consultas_index).
+    """
+    global _cliente
+    cliente = ClienteAcademia(url, token, timeout)
+    reemplazos = {}
+    for clave, func in operaciones().items():
+        modulo = clave.split("/", 1)[0]
+        reemplazos[id(func)] = (func, _funcion_remota(cliente, modulo, func))
+    for clave, func in no_publicadas().items():
+        modulo = clave.split("/", 1)[0]
+        sustituto = SUSTITUTOS.get(clave)
+        if sustituto is not None:
+            reemplazo = _funcion_remota(cliente, modulo, func, sustituto.split("/", 1)[1])
+        else:
+            reemplazo = _funcion_no_disponible(modulo, func)
+        reemplazos[id(func)] = (func, reemplazo)
+    for modulo in list(sys.modules.values()):
+        atributos = getattr(modulo, "__dict__", None)
+        if not atributos or modulo.__name__.startswith("servicio."):
+            continue
+        for nombre, valor in list(atributos.items()):
+            reemplazo = reemplazos.get(id(valor))
+            if reemplazo is not None and reemplazo[0] is valor:
+                setattr(modulo, nombre, reemplazo[1])
+    INGRESOS_SETTINGS['engine'] = 'remoto'
+    INGRESOS_SETTINGS['servidor'] = cliente.url
+    INGRESOS_SETTINGS['token'] = token
+    _cliente = cliente
+    logger.info("Capa de datos remota: %s (%d operaciones)", cliente.url, len(reemplazos))
+    return cliente
@@ -0,0 +1,207 @@
+"""
+Operaciones que expone el servidor y su conversión a JSON.
+
+Una operación es una función de los módulos *_db o de permissions listada
+en PUBLICADAS; se publica como `POST /api/<módulo>/<función>` con los demás
+argumentos por nombre en un objeto JSON. Los métodos de IngresosRepository
+se publican como `POST /api/repositorio/<método>`.
+
+El token del servidor lo comparten todas las estaciones y el servidor no
+sabe qué usuario llama, así que no se publica nada que dé más de lo que ya
+da ese token: la gestión de usuarios (alta, cambios, bajas) solo se hace
+con la base local, y los datos de un usuario se publican sin su contraseña.
+
+JSON no distingue tuplas de listas ni admite claves numéricas, así que el
+cliente reconstruye cada resultado a partir de la anotación de retorno de
+la función original (List[tuple], Dict[int, float], Ingreso, PermissionSet).
+"""
+
+import dataclasses
+import importlib
+import inspect
+import types
+import typing
+from typing import Any, Callable, Dict, Tuple
+
+from ingresos.ingresos_db import IngresosRepository
+from permissions import PermissionSet
+
+
+# Operaciones publicadas por módulo; lo que no está aquí no se atiende
+PUBLICADAS: Dict[str, Tuple[str, ...]] = {
+    "ingresos.ingresos_db": (
+        "fetch_grados", "fetch_grados_with_ids", "fetch_conceptos_pago_with_ids",
+        "fetch_estudiantes_for_table", "search_estudiantes_for_table", "count_estudiantes",
+        "fetch_estudiantes_page", "fetch_estudiante_id_at", "count_estudiantes_before",
+        "fetch_estudiantes_by_ids", "fetch_estudiantes_by_grado", "fetch_estudiante_by_id",
+        "insert_estudiante", "update_estudiante", "delete_estudiante_cascade",
+        "fetch_pagos_for_table", "count_pagos", "fetch_pagos_page", "fetch_pago_id_at",
+        "count_pagos_before", "fetch_pago_by_id", "insert_pago", "insert_pagos_bulk",
+        "update_pago", "delete_pago",
+        "fetch_calificacion_by_estudiante", "insert_calificacion", "update_calificacion",
+        "delete_calificacion",
+        "validar_credenciales", "authenticate_user",
+    ),
+    "consultas.consultas_db": (
+        "fetch_estudiantes_for_autocomplete", "fetch_estudiante_complete_data",
+        "search_estudiantes_by_name", "fetch_conceptos_pago_for_solvency",
+        "fetch_pagos_by_estudiante_and_concepto", "fetch_totales_pagados_by_estudiante",
+        "fetch_solvencia_por_grado", "check_solvency_status", "fetch_exam_conceptos_pago",
+        "fetch_calificaciones_by_estudiante", "fetch_estudiante_resumen",
+    ),
+    "usuarios.usuarios_db": (
+        "fetch_roles_with_ids", "fetch_usuarios_for_table", "fetch_usuario_sin_contrasena",
+        "is_user_admin",
+    ),
+    "permissions": (
+        "load_permission_set", "get_user_role", "has_tab_permission", "has_action_permission",
+        "get_user_permissions", "get_accessible_tabs", "is_admin", "is_teacher", "is_consultant",
+        "get_user_permissions_list", "has_any_permission", "has_all_permissions",
+    ),
+}
+MODULOS = tuple(PUBLICADAS)
+
+# Funciones con db_path que solo tienen sentido en el proceso que las llama
+LOCALES = frozenset({"create_ingresos_repository", "invalidate_permissions"})
+
+# En modo remoto estas funciones se atienden con la operación publicada indicada
+SUSTITUTOS = {"usuarios_db/fetch_usuario_by_id": "usuarios_db/fetch_usuario_sin_contrasena"}
+
+REPOSITORIO = "repositorio"
+REPOSITORIO_METODOS = (
+    "listar", "obtener", "buscar", "entre_fechas", "agregar", "agregar_lote", "actualizar", "eliminar",
+    "contar", "pagina", "id_en", "posicion",
+)
+
+# Operaciones que escriben (el modo asyncio del servidor las envía al hilo escritor)
+PREFIJOS_ESCRITURA = ("insert_", "update_", "delete_")
+REPOSITORIO_ESCRITURAS = frozenset({"agregar", "agregar_lote", "actualizar", "eliminar"})
+
+
+def operaciones() -> Dict[str, Callable]:
+    """{"módulo/función": función} de todas las operaciones publicadas."""
+    resultado = {}
+    for nombre_modulo, nombres in PUBLICADAS.items():
+        modulo = importlib.import_module(nombre_modulo)
+        corto = nombre_modulo.rsplit(".", 1)[-1]
+        for nombre in nombres:
+            func = getattr(modulo, nombre)
+            if "db_path" not in inspect.signature(func).parameters:
+                raise TypeError(f"{nombre_modulo}.{nombre} no recibe db_path")
+            resultado[f"{corto}/{nombre}"] = func
+    return resultado
+
+
+def no_publicadas() -> Dict[str, Callable]:
+    """{"módulo/función": función} de las funciones de datos que el servidor no atiende.
+
+    En modo remoto no deben tocar una base local: el cliente las reemplaza
+    por su sustituto o por una versión que falla con su valor de error.
+    """
+    publicadas = operaciones()
+    resultado = {}
+    for nombre_modulo in PUBLICADAS:
+        modulo = importlib.import_module(nombre_modulo)
+        corto = nombre_modulo.rsplit(".", 1)[-1]
+        for nombre, func in inspect.getmembers(modulo, inspect.isfunction):
+            if nombre.startswith("_") or nombre in LOCALES or inspect.unwrap(func).__module__ != modulo.__name__:
+                continue
+            # Las versiones *_async llaman a la versión síncrona del módulo
+            if inspect.iscoroutinefunction(func):
+                continue
+            clave = f"{corto}/{nombre}"
+            if clave not in publicadas and "db_path" in inspect.signature(func).parameters:
+                resultado[clave] = func
+    return resultado
+
+
+def es_escritura(modulo: str, nombre: str) -> bool:
+    """True si /api/<modulo>/<nombre> modifica la base."""
+    if modulo == REPOSITORIO:
+        return nombre in REPOSITORIO_ESCRITURAS
+    return nombre.startswith(PREFIJOS_ESCRITURA)
+
+
+def metodo_repositorio(nombre: str) -> Callable:
+    """Método de IngresosRepository (sin enlazar) para leer su firma y anotaciones."""
+    return getattr(IngresosRepository, nombre)
+
+
+def a_json(valor: Any) -> Any:
+    """Convierte un resultado de la capa de datos a tipos que json puede escribir."""
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return [a_json(item) for item in valor]
+    if isinstance(valor, dict):
+        return {str(clave): a_json(item) for clave, item in valor.items()}
+    if dataclasses.is_dataclass(valor):
+        return {campo.name: a_json(getattr(valor, campo.name)) for campo in dataclasses.fields(valor)}
+    if isinstance(valor, PermissionSet):
+        return {"usuario_id": valor.usuario_id, "role": valor.role, "actions": sorted(valor.actions)}
+    raise TypeError(f"No se puede convertir a JSON: {type(valor).__name__}")
+
+
+def tipo_retorno(func: Callable) -> Any:
+    """Anotación de retorno resuelta (Any si no tiene o no se puede resolver)."""
+    try:
+        return typing.get_type_hints(func).get("return", Any)
+    except Exception:
+        return Any
+
+
+def desde_json(valor: Any, tipo: Any) -> Any:
+    """Reconstruye un valor JSON con la forma que indica la anotación `tipo`."""
+    if valor is None or tipo is Any:
+        return valor
+    origen = typing.get_origin(tipo)
+    argumentos = typing.get_args(tipo)
+    if origen is typing.Union or origen is types.UnionType:
+        opciones = [arg for arg in argumentos if arg is not type(None)]
+        return desde_json(valor, opciones[0]) if len(opciones) == 1 else valor
+    if origen in (list, typing.List) or origen is getattr(typing, "Sequence", None):
+        return [desde_json(item, argumentos[0] if argumentos else Any) for item in valor]
+    if origen is tuple or tipo is tuple:
+        if not argumentos:
+            return tuple(valor)
+        if len(argumentos) == 2 and argumentos[1] is Ellipsis:
+            return tuple(desde_json(item, argumentos[0]) for item in valor)
+        return tuple(desde_json(item, arg) for item, arg in zip(valor, argumentos))
+    if origen is dict or tipo is dict:
+        clave, item = argumentos if argumentos else (Any, Any)
+        return {_clave(k, clave): desde_json(v, item) for k, v in valor.items()}
+    if tipo is PermissionSet:
+        return PermissionSet(valor["usuario_id"], valor.get("role"), frozenset(valor.get("actions", ())))
+    if isinstance(tipo, type) and dataclasses.is_dataclass(tipo):
+        pistas = typing.get_type_hints(tipo)
+        return tipo(**{nombre: desde_json(item, pistas.get(nombre, Any)) for nombre, item in valor.items()})
+    return valor
+
+
+def _clave(texto: str, tipo: Any) -> Any:
+    if tipo is int:
+        return int(texto)
+    if tipo is float:
+        return float(texto)
+    return texto
+
+
+def valor_en_error(tipo: Any) -> Any:
+    """Lo que retorna la función original cuando falla ([], {}, False, 0, None...)."""
+    origen = typing.get_origin(tipo) or tipo
+    if origen in (list, typing.List):
+        return []
+    if origen is dict:
+        return {}
+    if tipo is bool:
+        return False
+    if tipo is int:
+        return 0
+    if tipo is float:
+        return 0.0
+    return None
+
+
+def parametros(func: Callable) -> Tuple[str, ...]:
+    """Nombres de los parámetros que el cliente envía (todos menos db_path y self)."""
+    return tuple(nombre for nombre in inspect.signature(func).parameters if nombre not in ("db_path", "self"))
@@ -0,0 +1,445 @@
+"""
+Servidor HTTP/JSON de la capa de datos (modo sin interfaz).
+
+Publica las funciones de ingresos_db, consultas_db, usuarios_db y
+permissions de la lista servicio.protocolo.PUBLICADAS (sin la gestión de
+usuarios ni contraseñas) sobre una sola base de datos:
+
+    POST /api/<módulo>/<función>     {"argumento": valor, ...}
+    POST /api/repositorio/<método>   métodos de IngresosRepository
+    GET  /api                        operaciones disponibles
+    GET  /salud                      estado del pool de conexiones
+    GET  /diagnostico                snapshot de database.instrumentation
+
+La respuesta es {"resultado": ..., "cambios": [tablas]}: `cambios` son las
+tablas que la operación marcó con mark_changed, para que el cliente invalide
+sus cachés (database.changes) igual que si hubiera escrito localmente.
+
+Hay dos modos; en ambos las conexiones HTTP/1.1 se mantienen abiertas entre
+peticiones:
+
+- hilos (por defecto): cada conexión se atiende en un hilo con las
+  conexiones del pool de la base; `--max-concurrentes` limita las
+  peticiones que acceden a la vez (las demás esperan y, si no hay lugar en
+  unos segundos, reciben 503);
+- `--asyncio`: un solo hilo atiende todas las conexiones y las operaciones
+  se ejecutan en database.aio (`--max-concurrentes` lectores que agrupan
+  las lecturas pendientes en una conexión, escrituras en un único hilo).
+  Admite cientos de clientes sin un hilo por cada uno.
+
+Con `--agrupar-escrituras` los pagos y calificaciones que llegan a la vez se
+confirman en una sola transacción (database.write_queue); `--synchronous`
+elige la durabilidad de esos commits.
+
+Uso:
+    python -m servicio.servidor [--db academia.db] [--host 127.0.0.1] [--puerto 8765] [--token SECRETO] [--asyncio]
+                                [--agrupar-escrituras [--synchronous FULL]]
+"""
+
+import argparse
+import asyncio
+import hmac
+import inspect
+import ipaddress
+import json
+import logging
+import sys
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from database import instrumentation
+from database.aio import AsyncDBExecutor
+from database.changes import changed_tables, db_versions
+from database.pool import configure_pools, get_pool
+from database.write_queue import configure_write_queue
+from database.write_queue import is_enabled as write_queue_enabled
+from ingresos.ingresos_db import SQLiteIngresosRepository
+from servicio.protocolo import REPOSITORIO, REPOSITORIO_METODOS, a_json, es_escritura, operaciones, parametros
+
+
+logger = logging.getLogger(__name__)
+
+# Configuración por defecto del servidor
+SERVIDOR_SETTINGS = {
+    'host': '127.0.0.1',
+    'puerto': 8765,
+    'max_concurrentes': 8,     # Peticiones que usan la base a la vez
+    'espera_lugar': 5.0,       # Segundos que una petición espera lugar antes del 503
+    'max_cuerpo': 1 << 20,     # Bytes aceptados en el cuerpo de una petición
+    'inactividad': 60.0,       # Segundos que se mantiene abierta una conexión sin peticiones
+}
+
+
+class ErrorPeticion(Exception):
+    """Petición rechazada antes de ejecutarse (400, 404, 413...)."""
+
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class Llamada(NamedTuple):
+    func: Callable
+    argumentos: inspect.BoundArguments
+    escritura: bool
+
+
+class Operaciones:
+    """Operaciones publicadas sobre una base; las usan los dos modos del servidor."""
+
+    def __init__(self, db_path: str, token: Optional[str] = None):
+        self.db_path = str(db_path)
+        self.token = token
+        self.funciones: Dict[str, Callable] = operaciones()
+        self.repositorio = SQLiteIngresosRepository(self.db_path)
+
+    def resolver(self, modulo: str, nombre: str) -> Optional[Callable]:
+        """Función (o método del repositorio) que atiende /api/<modulo>/<nombre>."""
+        if modulo == REPOSITORIO:
+            return getattr(self.repositorio, nombre) if nombre in REPOSITORIO_METODOS else None
+        return self.funciones.get(f"{modulo}/{nombre}")
+
+    def catalogo(self) -> Dict[str, list]:
+        """{"ruta": [parámetros]} de todas las operaciones."""
+        rutas = {f"/api/{clave}": list(parametros(func)) for clave, func in self.funciones.items()}
+        for nombre in REPOSITORIO_METODOS:
+            rutas[f"/api/{REPOSITORIO}/{nombre}"] = list(parametros(getattr(self.repositorio, nombre)))
+        return rutas
+
+    def autorizado(self, encabezado: Optional[str]) -> bool:
+        if self.token is None:
+            return True
+        return hmac.compare_digest((encabezado or "").encode(), f"Bearer {self.token}".encode())
+
+    def consultar(self, ruta: str) -> Tuple[int, dict]:
+        """Respuesta de un GET."""
+        if ruta == "/api":
+            return 200, {"resultado": self.catalogo()}
+        if ruta == "/salud":
+            try:
+                pool = get_pool(self.db_path).stats()
+            except Exception as exc:
+                return 503, {"error": f"Base no disponible: {exc}"}
+            return 200, {"resultado": {"db": self.db_path, "pool": pool}}
+        if ruta == "/diagnostico":
+            return 200, {"resultado": instrumentation.snapshot()}
+        return 404, {"error": f"Ruta desconocida: {ruta}"}
+
+    def preparar(self, ruta: str, cuerpo: bytes) -> Llamada:
+        """Valida un POST y enlaza sus argumentos; lanza ErrorPeticion si no se puede ejecutar."""
+        try:
+            argumentos = json.loads(cuerpo or b"{}")
+        except ValueError as exc:
+            raise ErrorPeticion(400, f"JSON inválido: {exc}")
+        if not isinstance(argumentos, dict):
+            raise ErrorPeticion(400, "Se esperaba un objeto JSON con los argumentos")
+        partes = ruta.strip("/").split("/")
+        func = self.resolver(partes[1], partes[2]) if len(partes) == 3 and partes[0] == "api" else None
+        if func is None:
+            raise ErrorPeticion(404, f"Operación desconocida: {ruta}")
+        try:
+            firma = inspect.signature(func)
+            if "db_path" in argumentos:
+                raise TypeError("db_path lo define el servidor")
+            if "db_path" in firma.parameters:
+                argumentos["db_path"] = self.db_path
+            enlazados = firma.bind(**argumentos)
+        except TypeError as exc:
+            raise ErrorPeticion(400, f"Argumentos inválidos: {exc}")
+        return Llamada(func, enlazados, es_escritura(partes[1], partes[2]))
+
+    def ejecutar(self, llamada: Llamada) -> dict:
+        """Ejecuta la operación y arma el cuerpo de la respuesta."""
+        antes = db_versions(self.db_path)
+        resultado = llamada.func(*llamada.argumentos.args, **llamada.argumentos.kwargs)
+        return {"resultado": a_json(resultado), "cambios": list(changed_tables(self.db_path, antes))}
+
+
+def _json(cuerpo: dict) -> bytes:
+    return json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Modo hilos
+# ---------------------------------------------------------------------------
+
+class ServidorAcademia(ThreadingHTTPServer):
+    """ThreadingHTTPServer con las operaciones de una base de datos."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, direccion: Tuple[str, int], db_path: str, token: Optional[str] = None, max_concurrentes: Optional[int] = None):
+        self.nucleo = Operaciones(db_path, token)
+        max_concurrentes = max_concurrentes or SERVIDOR_SETTINGS['max_concurrentes']
+        self.lugares = threading.BoundedSemaphore(max_concurrentes)
+        # Un lugar por conexión del pool: ninguna petición espera conexión
+        # (más la del hilo de la cola de escrituras, si está activa)
+        configure_pools(max_size=max_concurrentes + (1 if write_queue_enabled() else 0))
+        super().__init__(direccion, ManejadorAcademia)
+
+
+class ManejadorAcademia(BaseHTTPRequestHandler):
+    """Atiende las peticiones de una conexión (varias, con keep-alive)."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "Academia/1.0"
+    # Encabezados y cuerpo salen en dos escrituras: con Nagle, el ACK
+    # diferido del cliente agrega ~40 ms a cada respuesta en keep-alive
+    disable_nagle_algorithm = True
+    server: ServidorAcademia
+
+    def setup(self) -> None:
+        self.timeout = SERVIDOR_SETTINGS['inactividad']
+        super().setup()
+
+    def do_GET(self) -> None:
+        if self._autorizado():
+            self._responder(*self.server.nucleo.consultar(self.path))
+
+    def do_POST(self) -> None:
+        if not self._autorizado():
+            return
+        try:
+            llamada = self.server.nucleo.preparar(self.path, self._leer_cuerpo())
+        except ErrorPeticion as exc:
+            self._responder(exc.estado, {"error": str(exc)})
+            return
+
+        if not self.server.lugares.acquire(timeout=SERVIDOR_SETTINGS['espera_lugar']):
+            self._responder(503, {"error": "Servidor ocupado"})
+            return
+        try:
+            cuerpo = self.server.nucleo.ejecutar(llamada)
+        except Exception as exc:
+            logger.exception("Error en %s", self.path)
+            self._responder(500, {"error": str(exc)})
+            return
+        finally:
+            self.server.lugares.release()
+        self._responder(200, cuerpo)
+
+    def _autorizado(self) -> bool:
+        if self.server.nucleo.autorizado(self.headers.get("Authorization")):
+            return True
+        # El cuerpo sin leer impediría reutilizar la conexión
+        self.close_connection = True
+        self._responder(401, {"error": "No autorizado"})
+        return False
+
+    def _leer_cuerpo(self) -> bytes:
+        try:
+            largo = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            largo = -1
+        if largo < 0 or largo > SERVIDOR_SETTINGS['max_cuerpo']:
+            self.close_connection = True
+            raise ErrorPeticion(413, "Cuerpo inválido o demasiado grande")
+        return self.rfile.read(largo)
+
+    def _responder(self, estado: int, cuerpo: dict) -> None:
+        datos = _json(cuerpo)
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def crear_servidor(db_path: str = "academia.db", host: Optional[str] = None, puerto: Optional[int] = None, token: Optional[str] = None, max_concurrentes: Optional[int] = None) -> ServidorAcademia:
+    """Crea el servidor sin iniciarlo (`serve_forever()`); puerto 0 elige uno libre."""
+    if not Path(db_path).exists():
+        raise FileNotFoundError(db_path)
+    host = SERVIDOR_SETTINGS['host'] if host is None else host
+    puerto = SERVIDOR_SETTINGS['puerto'] if puerto is None else puerto
+    return ServidorAcademia((host, puerto), db_path, token=token, max_concurrentes=max_concurrentes)
+
+
+# ---------------------------------------------------------------------------
+# Modo asyncio
+# ---------------------------------------------------------------------------
+
+class ServidorAsync:
+    """Servidor HTTP/1.1 mínimo sobre asyncio que ejecuta en database.aio."""
+
+    MAX_ENCABEZADOS = 100
+
+    def __init__(self, db_path: str, token: Optional[str] = None, max_concurrentes: Optional[int] = None):
+        max_concurrentes = max_concurrentes or SERVIDOR_SETTINGS['max_concurrentes']
+        self.nucleo = Operaciones(db_path, token)
+        self.executor = AsyncDBExecutor(readers=max_concurrentes)
+        # Una conexión por lector más la del hilo escritor
+        configure_pools(max_size=max_concurrentes + 1)
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def iniciar(self, host: str, puerto: int) -> Tuple[str, int]:
+        """Empieza a aceptar conexiones; retorna (host, puerto) (puerto 0 elige uno libre)."""
+        self.server = await asyncio.start_server(self._conexion, host, puerto, backlog=ServidorAcademia.request_queue_size)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def cerrar(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    async def _conexion(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    linea = await asyncio.wait_for(reader.readline(), SERVIDOR_SETTINGS['inactividad'])
+                except asyncio.TimeoutError:
+                    break
+                if not linea:
+                    break
+                partes = linea.decode("latin-1").split()
+                if len(partes) != 3:
+                    await self._enviar(writer, 400, {"error": "Línea de petición inválida"}, cerrar=True)
+                    break
+                metodo, ruta, version = partes
+                encabezados = await self._leer_encabezados(reader)
+                if encabezados is None:
+                    await self._enviar(writer, 431, {"error": "Encabezados demasiado grandes"}, cerrar=True)
+                    break
+                mantener = version == "HTTP/1.1" and encabezados.get("connection", "").lower() != "close"
+
+                if not self.nucleo.autorizado(encabezados.get("authorization")):
+                    await self._enviar(writer, 401, {"error": "No autorizado"}, cerrar=True)
+                    break
+                try:
+                    largo = int(encabezados.get("content-length", 0))
+                except ValueError:
+                    largo = -1
+                if largo < 0 or largo > SERVIDOR_SETTINGS['max_cuerpo']:
+                    await self._enviar(writer, 413, {"error": "Cuerpo inválido o demasiado grande"}, cerrar=True)
+                    break
+                cuerpo = await reader.readexactly(largo)
+
+                estado, respuesta = await self._atender(metodo, ruta, cuerpo)
+                await self._enviar(writer, estado, respuesta, cerrar=not mantener)
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _leer_encabezados(self, reader: asyncio.StreamReader) -> Optional[Dict[str, str]]:
+        encabezados: Dict[str, str] = {}
+        for _ in range(self.MAX_ENCABEZADOS):
+            linea = await reader.readline()
+            if linea in (b"\r\n", b"\n", b""):
+                return encabezados
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            encabezados[nombre.strip().lower()] = valor.strip()
+        return None
+
+    async def _atender(self, metodo: str, ruta: str, cuerpo: bytes) -> Tuple[int, dict]:
+        if metodo == "GET":
+            return self.nucleo.consultar(ruta)
+        if metodo != "POST":
+            return 405, {"error": f"Método no admitido: {metodo}"}
+        try:
+            llamada = self.nucleo.preparar(ruta, cuerpo)
+        except ErrorPeticion as exc:
+            return exc.estado, {"error": str(exc)}
+        try:
+            if llamada.escritura:
+                return 200, await self.executor.write(self.nucleo.ejecutar, llamada)
+            return 200, await self.executor.read(self.nucleo.db_path, self.nucleo.ejecutar, llamada)
+        except Exception as exc:
+            logger.exception("Error en %s", ruta)
+            return 500, {"error": str(exc)}
+
+    async def _enviar(self, writer: asyncio.StreamWriter, estado: int, cuerpo: dict, cerrar: bool = False) -> None:
+        datos = _json(cuerpo)
+        encabezados = (
+            f"HTTP/1.1 {estado} {HTTPStatus(estado).phrase}\r\n"
+            f"Server: {ManejadorAcademia.server_version}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(datos)}\r\n"
+            + ("Connection: close\r\n" if cerrar else "")
+            + "\r\n"
+        )
+        writer.write(encabezados.encode("latin-1") + datos)
+        await writer.drain()
+
+
+async def servir_async(db_path: str, host: str, puerto: int, token: Optional[str] = None, max_concurrentes: Optional[int] = None) -> None:
+    """Atiende peticiones en modo asyncio hasta que se cancela."""
+    if not Path(db_path).exists():
+        raise FileNotFoundError(db_path)
+    servidor = ServidorAsync(db_path, token, max_concurrentes)
+    host, puerto = await servidor.iniciar(host, puerto)
+    logger.info("Sirviendo %s en http://%s:%s con asyncio (%d operaciones)", db_path, host, puerto, len(servidor.nucleo.funciones))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await servidor.cerrar()
+
+
+def _es_local(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="academia.db", help="Base de datos que se publica")
+    parser.add_argument("--host", default=SERVIDOR_SETTINGS['host'])
+    parser.add_argument("--puerto", type=int, default=SERVIDOR_SETTINGS['puerto'])
+    parser.add_argument("--token", help="Exigir 'Authorization: Bearer TOKEN' en cada petición")
+    parser.add_argument("--max-concurrentes", type=int, default=SERVIDOR_SETTINGS['max_concurrentes'])
+    parser.add_argument("--asyncio", action="store_true", help="Atender todas las conexiones en un hilo con database.aio")
+    parser.add_argument("--instrumentar", action="store_true", help="Registrar tiempos (GET /diagnostico)")
+    parser.add_argument("--agrupar-escrituras", action="store_true", help="Confirmar pagos y calificaciones simultáneos en una transacción")
+    parser.add_argument("--synchronous", choices=["OFF", "NORMAL", "FULL", "EXTRA"], type=str.upper, help="PRAGMA synchronous de los commits agrupados")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.instrumentar:
+        instrumentation.configure_instrumentation(enabled=True)
+    if args.agrupar_escrituras:
+        configure_write_queue(enabled=True, synchronous=args.synchronous)
+    if not _es_local(args.host) and not args.token:
+        logger.warning("Escuchando en %s sin --token: cualquiera en la red puede leer y modificar la base", args.host)
+
+    from database.fts import enable_student_fts
+    from database.migrations import apply_migrations
+    try:
+        apply_migrations(args.db)
+        enable_student_fts(args.db)
+        if args.asyncio:
+            try:
+                asyncio.run(servir_async(args.db, args.host, args.puerto, args.token, args.max_concurrentes))
+            except KeyboardInterrupt:
+                pass
+            return 0
+        servidor = crear_servidor(args.db, args.host, args.puerto, args.token, args.max_concurrentes)
+    except OSError as exc:
+        print(f"No se pudo iniciar el servidor: {exc}", file=sys.stderr)
+        return 2
+
+    host, puerto = servidor.server_address[:2]
+    logger.info("Sirviendo %s en http://%s:%s (%d operaciones)", args.db, host, puerto, len(servidor.nucleo.funciones))
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
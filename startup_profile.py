@@ -0,0 +1,118 @@
+"""
+Perfil del arranque de la aplicación.
+
+main.py crea un `StartupProfiler` antes de sus imports y registra con él
+cada import (tiempo, módulos cargados y el error si el import falló y se
+usó el respaldo), las fases del arranque (migraciones, creación de la
+ventana, estilos, pantalla de login) y el primer dibujo. Con
+`python main.py --profile-startup [ARCHIVO]` el informe se imprime o se
+guarda en JSON; benchmarks/bench_startup.py lo usa para comparar el
+arranque en frío contra `STARTUP_BUDGET`.
+
+Los tiempos de import dependen del orden: un módulo ya cargado por un
+import anterior no se vuelve a contar.
+"""
+
+import json
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+# Presupuesto del arranque en frío (pensado para los equipos lentos de recepción)
+STARTUP_BUDGET = {
+    'imports_ms': 1500,  # Suma de los imports de main.py
+    'total_ms': 5000,    # Desde que arranca el intérprete hasta el primer dibujo
+}
+
+
+class StartupProfiler:
+    """Registra tiempos del arranque en milisegundos desde su creación."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.started_epoch = time.time()
+        self.imports: List[dict] = []
+        self.phases: List[dict] = []
+        self.marks: Dict[str, float] = {}
+        self.error: Optional[str] = None
+
+    def _elapsed_ms(self, since: float) -> float:
+        return round((time.perf_counter() - since) * 1000, 2)
+
+    @contextmanager
+    def importing(self, label: str) -> Iterator[None]:
+        """Mide un bloque de imports; los errores se registran y se propagan."""
+        modules_before = len(sys.modules)
+        start = time.perf_counter()
+        entry = {'modulo': label, 'ms': 0.0, 'modulos_cargados': 0, 'error': None}
+        try:
+            yield
+        except Exception as exc:
+            entry['error'] = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            entry['ms'] = self._elapsed_ms(start)
+            entry['modulos_cargados'] = len(sys.modules) - modules_before
+            self.imports.append(entry)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({'fase': name, 'ms': self._elapsed_ms(start)})
+
+    def mark(self, name: str) -> None:
+        """Registra los ms transcurridos desde el inicio hasta ahora."""
+        self.marks[name] = self._elapsed_ms(self.started)
+
+    def fail(self, message: str) -> None:
+        self.error = message
+        self.mark("error")
+
+    def report(self) -> dict:
+        return {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'inicio_epoch': self.started_epoch,
+            'fin_epoch': time.time(),
+            'imports_ms': round(sum(entry['ms'] for entry in self.imports), 2),
+            'imports': list(self.imports),
+            'fases': list(self.phases),
+            'marcas': dict(self.marks),
+            'error': self.error,
+        }
+
+    def write_report(self, destination: str = "-") -> dict:
+        """Imprime el informe (destination "-") o lo guarda como JSON."""
+        report = self.report()
+        if destination == "-":
+            print(format_report(report))
+        else:
+            with open(destination, "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2, ensure_ascii=False)
+        return report
+
+
+def format_report(report: dict) -> str:
+    lines = ["Perfil de arranque", "", f"{'import':<36}{'ms':>10}{'módulos':>10}"]
+    for entry in report['imports']:
+        estado = "  (falló)" if entry['error'] else ""
+        lines.append(f"{entry['modulo']:<36}{entry['ms']:>10.1f}{entry['modulos_cargados']:>10}{estado}")
+    lines.append(f"{'total imports':<36}{report['imports_ms']:>10.1f}")
+    lines += ["", f"{'fase':<36}{'ms':>10}"]
+    for entry in report['fases']:
+        lines.append(f"{entry['fase']:<36}{entry['ms']:>10.1f}")
+    lines += ["", f"{'marca (desde el inicio)':<36}{'ms':>10}"]
+    for name, ms in report['marcas'].items():
+        lines.append(f"{name:<36}{ms:>10.1f}")
+    for entry in report['imports']:
+        if entry['error']:
+            lines.append(f"\nError al importar {entry['modulo']}: {entry['error']}")
+    if report['error']:
+        lines.append(f"\nError: {report['error']}")
+    return "\n".join(lines)
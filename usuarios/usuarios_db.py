@@ -1,20 +1,19 @@
-import sqlite3
-from pathlib import Path
 from typing import List, Optional, Tuple
 
+from database.catalog_cache import cached_catalog
+from database.changes import mark_changed
+from database.pool import get_connection
+from permissions import invalidate_permissions
 
+
+@cached_catalog("rol")
 def fetch_roles_with_ids(db_path: str = "academia.db") -> List[Tuple[int, str]]:
     """Retorna lista de tuplas (rol_id, nombre_rol) ordenadas por rol_id."""
     try:
-        if not Path(db_path).exists():
-            return []
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute("SELECT rol_id, nombre_rol FROM rol ORDER BY rol_id;")
             return [(int(rol_id), nombre_rol) for rol_id, nombre_rol in cur.fetchall()]
-        finally:
-            conn.close()
     except Exception:
         return []
 
@@ -24,10 +23,7 @@ def fetch_roles_with_ids(db_path: str = "academia.db") -> List[Tuple[int, str]]:
 def fetch_usuarios_for_table(db_path: str = "academia.db") -> List[Tuple[int, str, str]]:
     """Retorna lista de tuplas (usuario_id, nombre, nombre_rol) para la tabla."""
     try:
-        if not Path(db_path).exists():
-            return []
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute("""
                 SELECT u.usuario_id, u.nombre, r.nombre_rol
@@ -37,19 +33,28 @@ def fetch_usuarios_for_table(db_path: str = "academia.db") -> List[Tuple[int, st
                 ORDER BY u.usuario_id;
             """)
             return [(int(usuario_id), nombre, nombre_rol or "Sin rol") for usuario_id, nombre, nombre_rol in cur.fetchall()]
-        finally:
-            conn.close()
     except Exception:
         return []
 
 
+def _usuario_table_row(conn, usuario_id: int) -> Optional[Tuple[int, str, str]]:
+    """Fila (usuario_id, nombre, nombre_rol) con la forma de fetch_usuarios_for_table."""
+    row = conn.execute("""
+        SELECT u.usuario_id, u.nombre, r.nombre_rol
+        FROM usuario u
+        LEFT JOIN usuario_rol ur ON u.usuario_id = ur.usuario_id
+        LEFT JOIN rol r ON ur.rol_id = r.rol_id
+        WHERE u.usuario_id = ?;
+    """, (usuario_id,)).fetchone()
+    if row is None:
+        return None
+    return (int(row[0]), row[1], row[2] or "Sin rol")
+
+
 def fetch_usuario_by_id(usuario_id: int, db_path: str = "academia.db") -> Optional[Tuple[str, str, int]]:
     """Retorna (nombre, contrasena, rol_id) para el usuario dado."""
     try:
-        if not Path(db_path).exists():
-            return None
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute("""
                 SELECT u.nombre, u.contrasena, ur.rol_id
@@ -62,19 +67,23 @@ def fetch_usuario_by_id(usuario_id: int, db_path: str = "academia.db") -> Option
                 return None
             nombre, contrasena, rol_id = row
             return (nombre, contrasena, rol_id or 0)
-        finally:
-            conn.close()
     except Exception:
         return None
 
 
-def insert_usuario(nombre: str, contrasena: str, rol_id: int, db_path: str = "academia.db") -> Optional[int]:
-    """Inserta un usuario y devuelve su nuevo usuario_id."""
+def fetch_usuario_sin_contrasena(usuario_id: int, db_path: str = "academia.db") -> Optional[Tuple[str, str, int]]:
+    """Como fetch_usuario_by_id pero con la contraseña vacía (lo que publica el servidor)."""
+    datos = fetch_usuario_by_id(usuario_id, db_path)
+    if datos is None:
+        return None
+    nombre, _, rol_id = datos
+    return (nombre, "", rol_id)
+
+
+def insert_usuario(nombre: str, contrasena: str, rol_id: int, db_path: str = "academia.db") -> Optional[Tuple[int, str, str]]:
+    """Inserta un usuario y devuelve su fila (usuario_id, nombre, nombre_rol) para la tabla."""
     try:
-        if not Path(db_path).exists():
-            return None
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             # Insertar usuario
             cur.execute(
@@ -97,20 +106,17 @@ def insert_usuario(nombre: str, contrasena: str, rol_id: int, db_path: str = "ac
                 )
             
             conn.commit()
-            return usuario_id
-        finally:
-            conn.close()
+            invalidate_permissions(usuario_id, db_path)
+            mark_changed(db_path, "usuario", "usuario_rol")
+            return _usuario_table_row(conn, usuario_id)
     except Exception:
         return None
 
 
-def update_usuario(usuario_id: int, nombre: str, contrasena: str, rol_id: int, db_path: str = "academia.db") -> bool:
-    """Actualiza un usuario por su ID."""
+def update_usuario(usuario_id: int, nombre: str, contrasena: str, rol_id: int, db_path: str = "academia.db") -> Optional[Tuple[int, str, str]]:
+    """Actualiza un usuario por su ID y devuelve su fila para la tabla (None si no existe)."""
     try:
-        if not Path(db_path).exists():
-            return False
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             # Actualizar usuario
             cur.execute(
@@ -121,6 +127,9 @@ def update_usuario(usuario_id: int, nombre: str, contrasena: str, rol_id: int, d
                 """,
                 (nombre, contrasena, usuario_id)
             )
+            if cur.rowcount <= 0:
+                conn.rollback()
+                return None
             
             # Actualizar rol
             cur.execute("DELETE FROM usuario_rol WHERE usuario_id = ?;", (usuario_id,))
@@ -134,29 +143,26 @@ def update_usuario(usuario_id: int, nombre: str, contrasena: str, rol_id: int, d
                 )
             
             conn.commit()
-            return cur.rowcount > 0
-        finally:
-            conn.close()
+            invalidate_permissions(usuario_id, db_path)
+            mark_changed(db_path, "usuario", "usuario_rol")
+            return _usuario_table_row(conn, usuario_id)
     except Exception:
-        return False
+        return None
 
 
 def delete_usuario(usuario_id: int, db_path: str = "academia.db") -> bool:
     """Elimina un usuario por su ID."""
     try:
-        if not Path(db_path).exists():
-            return False
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             # Eliminar relaciones primero
             cur.execute("DELETE FROM usuario_rol WHERE usuario_id = ?;", (usuario_id,))
             # Eliminar usuario
             cur.execute("DELETE FROM usuario WHERE usuario_id = ?;", (usuario_id,))
             conn.commit()
+            invalidate_permissions(usuario_id, db_path)
+            mark_changed(db_path, "usuario", "usuario_rol")
             return cur.rowcount > 0
-        finally:
-            conn.close()
     except Exception:
         return False
 
@@ -164,10 +170,7 @@ def delete_usuario(usuario_id: int, db_path: str = "academia.db") -> bool:
 def is_user_admin(usuario_id: int, db_path: str = "academia.db") -> bool:
     """Verifica si un usuario tiene rol de administrador."""
     try:
-        if not Path(db_path).exists():
-            return False
-        conn = sqlite3.connect(db_path)
-        try:
+        with get_connection(db_path) as conn:
             cur = conn.cursor()
             cur.execute("""
                 SELECT r.nombre_rol
@@ -177,7 +180,5 @@ def is_user_admin(usuario_id: int, db_path: str = "academia.db") -> bool:
             """, (usuario_id,))
             result = cur.fetchone()
             return result is not None
-        finally:
-            conn.close()
     except Exception:
         return False
\ No newline at end of file
@@ -10,14 +10,30 @@ from usuarios.usuarios_db import (
     update_usuario,
     delete_usuario,
 )
+from database.changes import table_versions
+from database.executor import TkDispatcher
 
 
 class UsuariosView(ttk.Frame):
-    """Vista para la gestión de usuarios."""
+    """Vista para la gestión de usuarios.
+
+    La vista se crea una vez por proceso: `attach_user` la asocia a una
+    sesión y `detach_user` la limpia al cerrar sesión.
+    """
+
+    # Tablas de las que depende cada dato mostrado; si alguna cambió se vuelve a leer
+    _DEPENDENCIAS = {
+        "roles": ("rol",),
+        "usuarios": ("usuario", "usuario_rol", "rol"),
+    }
 
     def __init__(self, parent: tk.Widget, on_logout_callback=None):
         super().__init__(parent)
         self.on_logout_callback = on_logout_callback
+        self._usuario_id = 0
+        self._permisos = None
+        # Contadores de cambios (database.changes) con que se leyó cada dato
+        self._versiones: dict = {}
         
         # Los estilos de botones se configuran globalmente en main.py
         style = ttk.Style()
@@ -29,10 +45,21 @@ class UsuariosView(ttk.Frame):
         # Configure the frame to expand and fill the available space
         self.pack(fill=tk.BOTH, expand=True)
 
+        # Renumeración diferida de la columna "No." tras eliminar filas
+        self._usuarios_count = 0
+        self._renumber_from: int | None = None
+
+        # Lecturas y escrituras corren en segundo plano; los resultados vuelven al hilo de Tk
+        self._dispatcher = TkDispatcher(self)
+        self._dispatcher.add_busy_listener(self._on_db_busy)
+        self.bind("<Destroy>", self._on_destroy, add="+")
+
         self._build_header()
         self._build_layout()
         self._build_formulario(self.left_col)
         self._build_tabla(self.right_col)
+        # Roles y usuarios se leen en segundo plano después del primer dibujo
+        self.after_idle(self._load_initial_data)
 
     def _build_header(self) -> None:
         """Construye el encabezado."""
@@ -91,9 +118,8 @@ class UsuariosView(ttk.Frame):
 
         # Configurar columnas
         inputs_frame.columnconfigure(1, weight=1)
-
-        # Cargar roles
-        self._load_roles()
+        self._rol_ids: list = []
+        self._rol_nombres: list = []
 
         # Botones
         buttons_frame = ttk.Frame(center_frame)
@@ -145,15 +171,28 @@ class UsuariosView(ttk.Frame):
         self.tree_usuarios.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=5)
 
-        # Cargar datos
-        self._load_usuarios_table()
-
         # Bind para selección
         self.tree_usuarios.bind("<<TreeviewSelect>>", self._on_usuario_select)
 
+    def _load_initial_data(self) -> None:
+        self._load_roles()
+        self._load_usuarios_table()
+
     def _load_roles(self) -> None:
+        """Carga en segundo plano los roles del combobox."""
+        self._dispatcher.submit(
+            self._leer_versionado, "roles", fetch_roles_with_ids, key="roles", on_success=self._show_roles
+        )
+
+    def _leer_versionado(self, nombre: str, fetch):
+        """Ejecuta fetch en segundo plano junto con los contadores de sus tablas."""
+        versiones = table_versions("academia.db", self._DEPENDENCIAS[nombre])
+        return nombre, versiones, fetch("academia.db")
+
+    def _show_roles(self, resultado) -> None:
         """Carga los roles en el combobox."""
-        roles = fetch_roles_with_ids("academia.db")
+        nombre, versiones, roles = resultado
+        self._versiones[nombre] = versiones
         self._rol_ids = [rol_id for rol_id, _ in roles]
         self._rol_nombres = [nombre for _, nombre in roles]
         
@@ -162,13 +201,63 @@ class UsuariosView(ttk.Frame):
             self.combo_rol.current(0)
 
     def _load_usuarios_table(self) -> None:
+        """Lee en segundo plano los usuarios de la tabla."""
+        self._dispatcher.submit(
+            self._leer_versionado, "usuarios", fetch_usuarios_for_table,
+            key="usuarios", on_success=self._show_usuarios_table,
+        )
+
+    def _show_usuarios_table(self, resultado) -> None:
         """Carga los usuarios en la tabla."""
+        nombre, versiones, rows = resultado
+        self._versiones[nombre] = versiones
         for row in self.tree_usuarios.get_children():
             self.tree_usuarios.delete(row)
         
-        rows = fetch_usuarios_for_table("academia.db")
         for idx, (usuario_id, nombre, rol) in enumerate(rows, start=1):
             self.tree_usuarios.insert("", tk.END, iid=str(usuario_id), values=(idx, usuario_id, nombre, rol))
+        self._usuarios_count = len(rows)
+        self._renumber_from = None
+
+    def _append_usuario_row(self, row: tuple) -> None:
+        """Agrega al final la fila de un usuario recién creado."""
+        usuario_id, nombre, rol = row
+        self._usuarios_count += 1
+        self.tree_usuarios.insert("", tk.END, iid=str(usuario_id), values=(self._usuarios_count, usuario_id, nombre, rol))
+
+    def _update_usuario_row(self, row: tuple) -> None:
+        """Actualiza en su lugar la fila de un usuario modificado."""
+        usuario_id, nombre, rol = row
+        iid = str(usuario_id)
+        if not self.tree_usuarios.exists(iid):
+            self._append_usuario_row(row)
+            return
+        self.tree_usuarios.set(iid, "nombre", nombre)
+        self.tree_usuarios.set(iid, "rol", rol)
+
+    def _remove_usuario_row(self, usuario_id: int) -> None:
+        """Quita la fila de un usuario eliminado y renumera después las siguientes."""
+        iid = str(usuario_id)
+        if not self.tree_usuarios.exists(iid):
+            return
+        index = self.tree_usuarios.index(iid)
+        self.tree_usuarios.delete(iid)
+        self._usuarios_count -= 1
+        if self._renumber_from is None:
+            self._renumber_from = index
+            self.after_idle(self._renumber_usuarios)
+        else:
+            self._renumber_from = min(self._renumber_from, index)
+
+    def _renumber_usuarios(self) -> None:
+        """Actualiza la columna "No." solo desde la primera fila desplazada."""
+        start = self._renumber_from
+        self._renumber_from = None
+        if start is None:
+            return
+        children = self.tree_usuarios.get_children()
+        for idx in range(start, len(children)):
+            self.tree_usuarios.set(children[idx], "num", idx + 1)
 
     def _get_selected_rol_id(self) -> int:
         """Obtiene el ID del rol seleccionado."""
@@ -200,9 +289,17 @@ class UsuariosView(ttk.Frame):
         """Maneja la selección de un usuario en la tabla."""
         usuario_id = self._get_selected_usuario_id()
         if usuario_id <= 0:
+            self._dispatcher.cancel("usuario")
             return
         
-        data = fetch_usuario_by_id(usuario_id, "academia.db")
+        # Una selección nueva reemplaza a la que aún no terminó de cargar
+        self._dispatcher.submit(
+            fetch_usuario_by_id, usuario_id, "academia.db",
+            key="usuario", on_success=self._show_usuario,
+        )
+
+    def _show_usuario(self, data) -> None:
+        """Llena el formulario con el resultado de fetch_usuario_by_id."""
         if not data:
             return
         
@@ -231,10 +328,12 @@ class UsuariosView(ttk.Frame):
         if not nombre or not contrasena:
             return
         
-        new_id = insert_usuario(nombre, contrasena, rol_id, "academia.db")
-        if new_id:
-            self._load_usuarios_table()
-            self._clear_inputs()
+        def listo(row) -> None:
+            if row:
+                self._append_usuario_row(row)
+                self._clear_inputs()
+        
+        self._dispatcher.submit(insert_usuario, nombre, contrasena, rol_id, "academia.db", write=True, on_success=listo)
 
     def _on_eliminar(self) -> None:
         """Elimina el usuario seleccionado."""
@@ -242,10 +341,12 @@ class UsuariosView(ttk.Frame):
         if usuario_id <= 0:
             return
         
-        ok = delete_usuario(usuario_id, "academia.db")
-        if ok:
-            self._load_usuarios_table()
-            self._clear_inputs()
+        def listo(ok: bool) -> None:
+            if ok:
+                self._remove_usuario_row(usuario_id)
+                self._clear_inputs()
+        
+        self._dispatcher.submit(delete_usuario, usuario_id, "academia.db", write=True, on_success=listo)
 
 
     def _on_guardar_cambios(self) -> None:
@@ -261,10 +362,53 @@ class UsuariosView(ttk.Frame):
         if not nombre or not contrasena:
             return
         
-        ok = update_usuario(usuario_id, nombre, contrasena, rol_id, "academia.db")
-        if ok:
+        def listo(row) -> None:
+            if row:
+                self._update_usuario_row(row)
+                self._clear_inputs()
+        
+        self._dispatcher.submit(update_usuario, usuario_id, nombre, contrasena, rol_id, "academia.db", write=True, on_success=listo)
+
+    def _on_db_busy(self, busy: bool) -> None:
+        """Muestra el cursor de espera mientras hay operaciones pendientes."""
+        try:
+            self.configure(cursor="watch" if busy else "")
+        except tk.TclError:
+            pass
+
+    def _on_destroy(self, event: tk.Event) -> None:
+        if event.widget is self:
+            self._dispatcher.close()
+
+    # --- Sesión ------------------------------------------------------------
+
+    def attach_user(self, usuario_id: int, permisos=None) -> None:
+        """Asocia la vista a una sesión y relee solo los datos que cambiaron."""
+        self._usuario_id = usuario_id or 0
+        self._permisos = permisos
+        if self._data_changed("roles"):
+            self._load_roles()
+        if self._data_changed("usuarios"):
             self._load_usuarios_table()
-            self._clear_inputs()
+
+    def detach_user(self) -> None:
+        """Desvincula la vista al cerrar sesión; la tabla se conserva."""
+        self.reset()
+        self._usuario_id = 0
+        self._permisos = None
+
+    def reset(self) -> None:
+        """Quita la selección y limpia el formulario."""
+        self._dispatcher.cancel("usuario")
+        selection = self.tree_usuarios.selection()
+        if selection:
+            self.tree_usuarios.selection_remove(selection)
+        self._clear_inputs()
+
+    def _data_changed(self, nombre: str) -> bool:
+        cargado = self._versiones.get(nombre)
+        # Lo que aún no se cargó lo pide _load_initial_data
+        return cargado is not None and cargado != table_versions("academia.db", self._DEPENDENCIAS[nombre])
 
     def _on_salir(self) -> None:
         """Cierra la aplicación."""